@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Benchmark: MemoryMerger insert scaling
+
+Inserts N observations one at a time into a MemoryMerger whose token
+budget forces continuous trimming, and reports time per insert. With
+running token counters the per-insert cost stays flat as N grows.
+
+Usage:
+    python benchmarks/bench_memory_merger.py [--sizes 2500 5000 10000]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from lib.memory_merger import MemoryMerger
+from lib.observer import Observation
+
+
+def run(n: int, max_tokens: int) -> float:
+    """Insert n observations and return elapsed seconds"""
+    now = datetime.now()
+    observations = [
+        Observation(
+            id=f"obs_{i:06d}",
+            timestamp=now,
+            priority="medium",
+            category="fact",
+            content=f"Benchmark observation number {i} about memory scaling",
+        )
+        for i in range(n)
+    ]
+
+    with tempfile.TemporaryDirectory() as d:
+        merger = MemoryMerger(d, max_tokens=max_tokens, flush_interval=3600.0)
+        start = time.perf_counter()
+        for obs in observations:
+            merger.add_observations([obs])
+        elapsed = time.perf_counter() - start
+        merger.flush()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="MemoryMerger insert benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2500, 5000, 10000])
+    parser.add_argument("--max-tokens", type=int, default=30000)
+    args = parser.parse_args()
+
+    print(f"{'N':>8} {'total (s)':>10} {'per insert (us)':>16}")
+    for n in args.sizes:
+        elapsed = run(n, args.max_tokens)
+        print(f"{n:>8} {elapsed:>10.3f} {elapsed / n * 1e6:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
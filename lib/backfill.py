@@ -0,0 +1,474 @@
+"""
+Backfill for OC-Memory
+Bulk ingestion of files that already exist in the watch directories
+
+FileWatcher only reacts to new events, so existing notes are never
+ingested. Backfill walks the watch directories in parallel, skips files
+whose content was already processed (or duplicates another file in the
+same run), copies the rest in batches and extracts observations with a
+bounded worker pool, or on the async extraction pipeline. Progress is checkpointed so an interrupted run
+resumes where it stopped.
+"""
+
+import concurrent.futures
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from lib.config import get_state_dir
+from lib.extraction_pipeline import AsyncExtractionPipeline
+from lib.hash_store import ContentHashStore, content_hash
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_FILENAME = "backfill.checkpoint"
+
+# Same filter as the file watcher
+MARKDOWN_SUFFIXES = ('.md', '.markdown')
+
+# (source path, file content)
+FileItem = Tuple[Path, str]
+
+
+# =============================================================================
+# Directory walk
+# =============================================================================
+
+def _scan_dir(directory: Path) -> Tuple[List[Path], List[Path]]:
+    """List markdown files and subdirectories of one directory"""
+    files: List[Path] = []
+    subdirs: List[Path] = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not entry.name.startswith('.'):
+                            subdirs.append(Path(entry.path))
+                    elif entry.is_file() and entry.name.lower().endswith(MARKDOWN_SUFFIXES):
+                        files.append(Path(entry.path))
+                except OSError:
+                    continue
+    except OSError as e:
+        logger.warning(f"Cannot scan {directory}: {e}")
+    return files, subdirs
+
+
+def walk_markdown_files(
+    dirs: Iterable[str],
+    recursive: bool = True,
+    workers: int = 8,
+) -> Iterator[Path]:
+    """
+    Yield markdown files under ``dirs``, scanning directories in parallel.
+    Hidden directories (e.g. .git, .obsidian) are skipped.
+
+    Args:
+        dirs: Root directories
+        recursive: Descend into subdirectories
+        workers: Directories scanned concurrently
+    """
+    pending = [Path(d).expanduser().resolve() for d in dirs]
+    pending = [d for d in pending if d.is_dir()]
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="backfill-scan") as pool:
+        while pending:
+            results = list(pool.map(_scan_dir, pending))
+            pending = []
+            for files, subdirs in results:
+                yield from sorted(files)
+                if recursive:
+                    pending.extend(subdirs)
+
+
+# =============================================================================
+# Checkpoint
+# =============================================================================
+
+class BackfillCheckpoint:
+    """
+    Append-only list of source files a backfill has finished.
+
+    One path per line; a torn last line from a crash is ignored. The
+    file is removed once a backfill completes.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Checkpoint file path
+        """
+        self.path = Path(path).expanduser().resolve()
+        self._lock = threading.Lock()
+
+    def load(self) -> Set[str]:
+        """Paths completed by a previous, interrupted run"""
+        try:
+            text = self.path.read_text(encoding='utf-8')
+        except FileNotFoundError:
+            return set()
+        lines = text.split('\n')
+        if not text.endswith('\n'):
+            lines = lines[:-1]  # torn write
+        return {line for line in lines if line}
+
+    def mark_done(self, paths: Iterable[Path]) -> None:
+        """Record finished source files"""
+        lines = ''.join(f"{Path(p).resolve()}\n" for p in paths)
+        if not lines:
+            return
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+
+    def clear(self) -> None:
+        """Forget progress (next run starts from scratch)"""
+        with self._lock:
+            try:
+                self.path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+# =============================================================================
+# Backfill
+# =============================================================================
+
+@dataclass
+class BackfillStats:
+    """Counters of one backfill run"""
+    found: int = 0
+    resumed: int = 0       # finished by an earlier, interrupted run
+    unchanged: int = 0     # content already processed before
+    duplicates: int = 0    # same content as another file in this run
+    copied: int = 0
+    extracted: int = 0
+    observations: int = 0
+    errors: int = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+class Backfill:
+    """
+    Bulk ingestion of existing files.
+
+    The daemon supplies the per-file steps:
+    - ``ingest(path)`` copies one file into memory (with metadata)
+    - ``extract(items, sink)`` extracts observations from a batch of
+      (path, content) items and records their hashes; observations bound
+      for the vector store are passed to ``sink`` instead of being
+      written one batch at a time. It must raise on failure: only files
+      extracted successfully are checkpointed (with their duplicates)
+    - ``store(observations)`` writes a large batch to the vector store
+
+    Extraction runs on this class's thread pool, or, given an
+    AsyncExtractionPipeline (processing.mode: async), ``extract`` is a
+    coroutine function run on the pipeline's event loop under its
+    ``max_in_flight`` bound.
+    """
+
+    def __init__(
+        self,
+        dirs: Iterable[str],
+        hash_store: ContentHashStore,
+        checkpoint: BackfillCheckpoint,
+        ingest: Callable[[Path], Any],
+        extract: Optional[Callable[[List[FileItem], Callable[[list], None]], Any]] = None,
+        store: Optional[Callable[[list], Any]] = None,
+        pipeline: Optional[AsyncExtractionPipeline] = None,
+        recursive: bool = True,
+        workers: int = 8,
+        batch_size: int = 32,
+        batch_max_chars: int = 8000,
+        store_batch_size: int = 500,
+        progress_interval: float = 5.0,
+        progress: Optional[Callable[[BackfillStats], None]] = None,
+    ):
+        """
+        Args:
+            dirs: Directories to backfill
+            hash_store: Content hashes of already processed files
+            checkpoint: Progress checkpoint
+            ingest: Copies one file into the memory directory
+            extract: Observation extraction for a batch (None = copy only)
+            store: Bulk vector store writer (None = no vector store)
+            pipeline: Running async pipeline for extraction (None = thread pool)
+            recursive: Descend into subdirectories
+            workers: Threads for scanning, hashing, copying and extraction
+            batch_size: Files copied/checkpointed per batch
+            batch_max_chars: Maximum characters per extraction call
+            store_batch_size: Observations buffered per ``store`` call
+            progress_interval: Seconds between progress log lines
+            progress: Optional callback receiving stats after each batch
+        """
+        self.dirs = list(dirs)
+        self.hash_store = hash_store
+        self.checkpoint = checkpoint
+        self.ingest = ingest
+        self.extract = extract
+        self.store = store
+        self.pipeline = pipeline
+        self.recursive = recursive
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.batch_max_chars = batch_max_chars
+        self.store_batch_size = max(1, store_batch_size)
+        self.progress_interval = progress_interval
+        self.progress = progress
+
+        self.stats = BackfillStats()
+        self._lock = threading.Lock()
+        self._seen_digests: Set[str] = set()
+        self._done_digests: Set[str] = set()
+        self._failed_digests: Set[str] = set()
+        self._buffer: list = []
+        self._last_progress = 0.0
+
+    def run(self) -> BackfillStats:
+        """
+        Backfill all files; resumes an interrupted run.
+
+        Returns:
+            BackfillStats of this run
+        """
+        done = self.checkpoint.load()
+        if done:
+            logger.info(f"Resuming backfill: {len(done)} files already done")
+
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="backfill") as pool:
+            batch: List[Path] = []
+            for path in walk_markdown_files(self.dirs, self.recursive, self.workers):
+                self.stats.found += 1
+                if str(path.resolve()) in done:
+                    self.stats.resumed += 1
+                    continue
+                batch.append(path)
+                if len(batch) >= self.batch_size:
+                    self._process_batch(pool, batch)
+                    batch = []
+            if batch:
+                self._process_batch(pool, batch)
+
+        self._flush_store()
+        self.checkpoint.clear()
+        logger.info(
+            f"Backfill finished in {time.monotonic() - start:.1f}s: {self.stats.to_dict()}"
+        )
+        return self.stats
+
+    # =========================================================================
+    # Batch processing
+    # =========================================================================
+
+    def _process_batch(self, pool: ThreadPoolExecutor, paths: List[Path]) -> None:
+        # 1. Read and hash in parallel, drop unchanged/duplicate content;
+        #    failed files are never checkpointed, so a resumed run retries them
+        items: List[Tuple[FileItem, str]] = []
+        duplicates: List[Tuple[Path, str]] = []
+        finished: List[Path] = []
+        for path, loaded in zip(paths, pool.map(self._read, paths)):
+            if loaded is None:
+                continue
+            content, digest = loaded
+            if not content.strip():
+                finished.append(path)
+                continue
+            if self.hash_store.is_unchanged(path, digest):
+                self.stats.unchanged += 1
+                finished.append(path)
+                continue
+            if digest in self._seen_digests:
+                # Recorded once the first file with this content is done
+                duplicates.append((path, digest))
+                continue
+            self._seen_digests.add(digest)
+            items.append(((path, content), digest))
+
+        # 2. Copy into memory in parallel
+        copied: List[Tuple[FileItem, str]] = []
+        for (item, digest), ok in zip(items, pool.map(self._ingest, [i for i, _ in items])):
+            if ok:
+                copied.append((item, digest))
+            else:
+                self._failed_digests.add(digest)
+        self.stats.copied += len(copied)
+
+        # 3. Extract observations (or just record hashes without an LLM)
+        done: List[Tuple[FileItem, str]] = []
+        if self.extract is None:
+            for (path, _), digest in copied:
+                self.hash_store.update(path, digest)
+            done = copied
+        elif copied:
+            digests = {item[0]: digest for item, digest in copied}
+            groups = self._group([item for item, _ in copied])
+            for group, ok in zip(groups, self._extract_groups(pool, groups)):
+                for item in group:
+                    if ok:
+                        done.append((item, digests[item[0]]))
+                    else:
+                        self._failed_digests.add(digests[item[0]])
+            self.stats.extracted += len(done)
+        finished.extend(path for (path, _), _ in done)
+        self._done_digests.update(digest for _, digest in done)
+
+        # 4. Duplicates follow the first file with their content; if that
+        #    one failed they are left for the next run as well
+        for path, digest in duplicates:
+            if digest in self._done_digests:
+                self.stats.duplicates += 1
+                self.hash_store.update(path, digest)
+                finished.append(path)
+
+        self.checkpoint.mark_done(finished)
+        self._report()
+
+    def _read(self, path: Path) -> Optional[Tuple[str, str]]:
+        try:
+            content = path.read_text(encoding='utf-8')
+        except Exception as e:
+            logger.warning(f"Backfill cannot read {path}: {e}")
+            with self._lock:
+                self.stats.errors += 1
+            return None
+        return content, content_hash(content)
+
+    def _ingest(self, item: FileItem) -> bool:
+        try:
+            self.ingest(item[0])
+            return True
+        except Exception as e:
+            logger.error(f"Backfill failed to copy {item[0]}: {e}")
+            with self._lock:
+                self.stats.errors += 1
+            return False
+
+    def _group(self, items: List[FileItem]) -> List[List[FileItem]]:
+        """Group items into extraction calls of at most batch_max_chars"""
+        groups: List[List[FileItem]] = []
+        current: List[FileItem] = []
+        chars = 0
+        for item in items:
+            size = len(item[1])
+            if current and chars + size > self.batch_max_chars:
+                groups.append(current)
+                current, chars = [], 0
+            current.append(item)
+            chars += size
+        if current:
+            groups.append(current)
+        return groups
+
+    def _extract_groups(self, pool: ThreadPoolExecutor, groups: List[List[FileItem]]) -> List[bool]:
+        """Extract every group; True for the groups that succeeded"""
+        if self.pipeline is None:
+            return list(pool.map(self._extract, groups))
+
+        futures = [
+            self.pipeline.submit_batch(group, lambda batch: self.extract(batch, self._collect))
+            for group in groups
+        ]
+        concurrent.futures.wait(futures)
+        results = []
+        for group, future in zip(groups, futures):
+            # The pipeline has logged the failure already
+            ok = future.exception() is None
+            if not ok:
+                with self._lock:
+                    self.stats.errors += 1
+            results.append(ok)
+        return results
+
+    def _extract(self, group: List[FileItem]) -> bool:
+        try:
+            self.extract(group, self._collect)
+            return True
+        except Exception as e:
+            logger.error(f"Backfill extraction failed for {len(group)} file(s): {e}")
+            with self._lock:
+                self.stats.errors += 1
+            return False
+
+    # =========================================================================
+    # Vector store batching
+    # =========================================================================
+
+    def _collect(self, observations: list) -> None:
+        """Sink for extracted observations; writes in large batches"""
+        with self._lock:
+            self.stats.observations += len(observations)
+            if self.store is None:
+                return
+            self._buffer.extend(observations)
+            if len(self._buffer) < self.store_batch_size:
+                return
+            batch, self._buffer = self._buffer, []
+        self._write_store(batch)
+
+    def _flush_store(self) -> None:
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        if batch:
+            self._write_store(batch)
+
+    def _write_store(self, batch: list) -> None:
+        try:
+            self.store(batch)
+        except Exception as e:
+            logger.warning(f"Backfill failed to store {len(batch)} observations: {e}")
+            with self._lock:
+                self.stats.errors += 1
+
+    def _report(self) -> None:
+        if self.progress is not None:
+            self.progress(self.stats)
+
+        now = time.monotonic()
+        if now - self._last_progress < self.progress_interval:
+            return
+        self._last_progress = now
+        s = self.stats
+        done = s.resumed + s.unchanged + s.duplicates + s.copied + s.errors
+        logger.info(
+            f"Backfill progress: {done}/{s.found} files "
+            f"(copied {s.copied}, unchanged {s.unchanged}, duplicates {s.duplicates}, "
+            f"observations {s.observations}, errors {s.errors})"
+        )
+
+
+def create_backfill(
+    config: Dict[str, Any],
+    hash_store: ContentHashStore,
+    ingest: Callable[[Path], Any],
+    extract: Optional[Callable[[List[FileItem], Callable[[list], None]], Any]] = None,
+    store: Optional[Callable[[list], Any]] = None,
+    pipeline: Optional[AsyncExtractionPipeline] = None,
+) -> Backfill:
+    """Create a Backfill over watch.dirs from config dictionary"""
+    backfill_config = config.get('backfill', {})
+    watch_config = config.get('watch', {})
+
+    return Backfill(
+        dirs=watch_config.get('dirs', []),
+        hash_store=hash_store,
+        checkpoint=BackfillCheckpoint(str(get_state_dir(config) / CHECKPOINT_FILENAME)),
+        ingest=ingest,
+        extract=extract,
+        store=store,
+        pipeline=pipeline,
+        recursive=watch_config.get('recursive', True),
+        workers=backfill_config.get('workers', 8),
+        batch_size=backfill_config.get('batch_size', 32),
+        batch_max_chars=config.get('processing', {}).get('batch_max_chars', 8000),
+        store_batch_size=backfill_config.get('store_batch_size', 500),
+        progress_interval=backfill_config.get('progress_interval', 5.0),
+    )
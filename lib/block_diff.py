@@ -0,0 +1,88 @@
+"""
+Block Diff for OC-Memory
+Block-level diff of markdown files for incremental observation
+
+Splits markdown into blocks (paragraphs, list runs, headings separated
+by blank lines) and extracts only the new or changed blocks with a
+little surrounding context, so an edit costs tokens proportional to
+its size rather than to the size of the file.
+"""
+
+import difflib
+import re
+from typing import List, Optional
+
+_BLANK_LINES_RE = re.compile(r"\n\s*\n")
+
+# Separator placed between non-adjacent hunks
+HUNK_SEPARATOR = "\n\n[...]\n\n"
+
+
+def split_blocks(text: str) -> List[str]:
+    """Split markdown text into non-empty blocks"""
+    return [block.strip() for block in _BLANK_LINES_RE.split(text) if block.strip()]
+
+
+def changed_hunks(old: str, new: str, context: int = 1) -> List[str]:
+    """
+    Get the new/changed regions of ``new`` relative to ``old``.
+
+    Args:
+        old: Previously processed content
+        new: Current content
+        context: Unchanged blocks to include before and after each change
+
+    Returns:
+        List of hunk texts (empty if nothing was added or changed)
+    """
+    old_blocks = split_blocks(old)
+    new_blocks = split_blocks(new)
+
+    matcher = difflib.SequenceMatcher(a=old_blocks, b=new_blocks, autojunk=False)
+
+    # Ranges of new_blocks to send, widened by context and merged
+    ranges: List[List[int]] = []
+    for tag, _, _, j1, j2 in matcher.get_opcodes():
+        if tag not in ('insert', 'replace'):
+            continue
+        start = max(0, j1 - context)
+        end = min(len(new_blocks), j2 + context)
+        if ranges and start <= ranges[-1][1]:
+            ranges[-1][1] = max(ranges[-1][1], end)
+        else:
+            ranges.append([start, end])
+
+    return ["\n\n".join(new_blocks[start:end]) for start, end in ranges]
+
+
+def incremental_content(
+    old: Optional[str],
+    new: str,
+    context: int = 1,
+    max_ratio: float = 0.6,
+) -> str:
+    """
+    Text to send for observation after a file changed.
+
+    Args:
+        old: Previously processed content (None if never processed)
+        new: Current content
+        context: Unchanged blocks of context around each change
+        max_ratio: If the hunks exceed this fraction of the file, the
+                   whole file is returned instead
+
+    Returns:
+        The changed hunks, the full content, or "" if nothing new
+        was added (e.g. only deletions)
+    """
+    if old is None:
+        return new
+
+    hunks = changed_hunks(old, new, context=context)
+    if not hunks:
+        return ""
+
+    delta = HUNK_SEPARATOR.join(hunks)
+    if len(delta) > max_ratio * len(new):
+        return new
+    return delta
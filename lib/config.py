@@ -3,6 +3,7 @@ Configuration Management for OC-Memory
 Loads and validates YAML configuration files
 """
 
+import os
 import yaml
 from pathlib import Path
 from typing import Dict, Any, Optional
@@ -89,6 +90,11 @@ def expand_paths(config: Dict[str, Any]) -> Dict[str, Any]:
             str(Path(d).expanduser().resolve())
             for d in config['watch']['dirs']
         ]
+    if 'watch' in config and 'session_logs' in config['watch']:
+        config['watch']['session_logs'] = [
+            str(Path(d).expanduser().resolve())
+            for d in config['watch']['session_logs']
+        ]
 
     # Expand memory directory
     if 'memory' in config and 'dir' in config['memory']:
@@ -99,6 +105,48 @@ def expand_paths(config: Dict[str, Any]) -> Dict[str, Any]:
     return config
 
 
+def get_state_dir(config: Dict[str, Any]) -> Path:
+    """
+    Directory for daemon state (hash store, checkpoints)
+
+    Uses memory.state_dir if set, otherwise a hidden .oc-memory
+    directory inside the memory directory.
+
+    Args:
+        config: Configuration dictionary
+
+    Returns:
+        Resolved state directory path (not created)
+    """
+    memory_config = config.get('memory', {})
+    state_dir = memory_config.get('state_dir')
+    if state_dir is None:
+        mem_dir = memory_config.get('dir', '~/.openclaw/workspace/memory')
+        return Path(mem_dir).expanduser().resolve() / '.oc-memory'
+    return Path(state_dir).expanduser().resolve()
+
+
+def get_cache_dir(config: Dict[str, Any]) -> Path:
+    """
+    Directory for disposable caches (downloaded Dropbox copies)
+
+    Uses memory.cache_dir if set, otherwise $XDG_CACHE_HOME/oc-memory
+    (~/.cache/oc-memory). The default is kept outside the memory
+    directory so cached notes are never taken for Hot memory.
+
+    Args:
+        config: Configuration dictionary
+
+    Returns:
+        Resolved cache directory path (not created)
+    """
+    cache_dir = config.get('memory', {}).get('cache_dir')
+    if cache_dir is None:
+        cache_home = os.environ.get('XDG_CACHE_HOME') or '~/.cache'
+        return Path(cache_home).expanduser().resolve() / 'oc-memory'
+    return Path(cache_dir).expanduser().resolve()
+
+
 def get_config(config_path: str = "config.yaml") -> Dict[str, Any]:
     """
     Load, validate, and expand configuration
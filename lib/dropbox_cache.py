@@ -0,0 +1,377 @@
+"""
+Dropbox Cache for OC-Memory
+Size-bounded local copies of Cold tier files with a full-text index
+
+Files fetched from Dropbox for searches are kept under the cache
+directory, evicted least-recently-used once the total size exceeds the
+limit, and indexed with a local SearchIndex. Queries answered from
+Dropbox recently are answered again from the cache alone, with content
+and snippets and no network round-trip.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from lib.search_index import SearchIndex, tokenize
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIRNAME = "dropbox_cache"
+INDEX_FILENAME = "index.sqlite3"
+ENTRIES_FILENAME = "entries.sqlite3"
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Seconds a query answered from Dropbox is then answered from the cache
+DEFAULT_QUERY_TTL = 300.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    path_lower TEXT PRIMARY KEY,
+    path_display TEXT NOT NULL,
+    rev TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    modified TEXT NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_lru ON entries (last_access);
+CREATE TABLE IF NOT EXISTS queries (
+    query TEXT PRIMARY KEY,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS query_matches (
+    query TEXT NOT NULL,
+    rank INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    name TEXT NOT NULL,
+    modified TEXT NOT NULL,
+    PRIMARY KEY (query, rank)
+);
+"""
+
+
+@dataclass
+class CachedFile:
+    """A Dropbox file to admit into the cache (already written to its path)"""
+    path_lower: str
+    path_display: str
+    rev: str
+    size: int
+    modified: str = ""
+
+
+def _index_text(file_path: Path, content: str) -> str:
+    """Index the file name with the body (Dropbox search matches names too)"""
+    return f"{file_path.stem}\n{content}"
+
+
+# =============================================================================
+# Dropbox Cache
+# =============================================================================
+
+class DropboxCache:
+    """LRU cache of downloaded Dropbox files, searchable offline"""
+
+    def __init__(
+        self,
+        cache_dir: str,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        query_ttl: float = DEFAULT_QUERY_TTL,
+    ):
+        """
+        Args:
+            cache_dir: Directory for cached files and their index
+            max_bytes: Total size of cached files before LRU eviction
+            query_ttl: Seconds a query fetched from Dropbox is then
+                       served locally (0 = always ask Dropbox)
+        """
+        self.cache_dir = Path(cache_dir).expanduser().resolve()
+        self.files_dir = self.cache_dir / "files"
+        self.files_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.query_ttl = query_ttl
+        self._lock = threading.Lock()
+
+        self.db_path = self.cache_dir / ENTRIES_FILENAME
+        with closing(self._connect()) as conn:
+            conn.executescript(_SCHEMA)
+
+        self.index = SearchIndex(
+            str(self.files_dir),
+            index_path=str(self.cache_dir / INDEX_FILENAME),
+            transform=_index_text,
+        )
+
+        self.hits = 0
+        self.evicted = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(str(self.db_path), timeout=30.0)
+
+    def path_for(self, path_lower: str) -> Path:
+        """Local path of a cached Dropbox file"""
+        return self.files_dir / path_lower.lstrip("/")
+
+    # =========================================================================
+    # Contents
+    # =========================================================================
+
+    def missing(self, files: Iterable[CachedFile]) -> List[CachedFile]:
+        """Files not cached at their current revision"""
+        files = list(files)
+        if not files:
+            return []
+        with closing(self._connect()) as conn:
+            cached = dict(conn.execute(
+                "SELECT path_lower, rev FROM entries WHERE path_lower IN "
+                f"({','.join('?' * len(files))})",
+                [f.path_lower for f in files],
+            ))
+        return [f for f in files if cached.get(f.path_lower) != f.rev]
+
+    def admit(self, files: Iterable[CachedFile]) -> int:
+        """
+        Record and index files written to their ``path_for`` location,
+        then evict least-recently-used files over the size limit.
+
+        Returns:
+            Number of files admitted
+        """
+        files = [f for f in files if self.path_for(f.path_lower).exists()]
+        if not files:
+            return 0
+
+        now = time.time()
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO entries "
+                "(path_lower, path_display, rev, size, modified, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                ((f.path_lower, f.path_display, f.rev, f.size, f.modified, now)
+                 for f in files),
+            )
+        for f in files:
+            self.index.add_file(self.path_for(f.path_lower))
+
+        self._evict()
+        return len(files)
+
+    def discard(self, paths_lower: Iterable[str]) -> int:
+        """
+        Drop cached files (e.g. changed or deleted in Dropbox).
+
+        Returns:
+            Number of files dropped
+        """
+        removed = []
+        with self._lock, closing(self._connect()) as conn, conn:
+            for path_lower in paths_lower:
+                if conn.execute(
+                    "DELETE FROM entries WHERE path_lower = ?", (path_lower,)
+                ).rowcount:
+                    removed.append(path_lower)
+        self._remove_files(removed)
+        return len(removed)
+
+    def discard_stale(self, revs: Dict[str, Optional[str]]) -> int:
+        """
+        Drop cached files whose revision changed.
+
+        Args:
+            revs: Lowercase path -> current rev (None if deleted)
+
+        Returns:
+            Number of files dropped
+        """
+        if not revs:
+            return 0
+        with closing(self._connect()) as conn:
+            cached = dict(conn.execute("SELECT path_lower, rev FROM entries"))
+        return self.discard(p for p, rev in revs.items() if p in cached and cached[p] != rev)
+
+    def _evict(self) -> None:
+        """Drop least-recently-used files until the total fits max_bytes"""
+        with self._lock, closing(self._connect()) as conn, conn:
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            victims = []
+            for path_lower, size in conn.execute(
+                "SELECT path_lower, size FROM entries ORDER BY last_access"
+            ):
+                if total <= self.max_bytes:
+                    break
+                victims.append(path_lower)
+                total -= size
+            conn.executemany(
+                "DELETE FROM entries WHERE path_lower = ?", ((p,) for p in victims)
+            )
+        self.evicted += len(victims)
+        self._remove_files(victims)
+        logger.debug(f"Dropbox cache evicted {len(victims)} files")
+
+    def _remove_files(self, paths_lower: List[str]) -> None:
+        if not paths_lower:
+            return
+        self.index.remove_keys(p.lstrip("/") for p in paths_lower)
+        for path_lower in paths_lower:
+            try:
+                os.remove(self.path_for(path_lower))
+            except OSError:
+                pass
+
+    # =========================================================================
+    # Queries
+    # =========================================================================
+
+    @staticmethod
+    def _query_key(query: str) -> str:
+        return " ".join(tokenize(query))
+
+    def is_fresh(self, query: str) -> bool:
+        """Whether the query was answered from Dropbox within query_ttl"""
+        if self.query_ttl <= 0:
+            return False
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT fetched_at FROM queries WHERE query = ?", (self._query_key(query),)
+            ).fetchone()
+        return row is not None and time.time() - row[0] < self.query_ttl
+
+    def remember_query(self, query: str, matches: Iterable[Dict[str, Any]] = ()) -> None:
+        """
+        Mark a query as answered from Dropbox (its matches are cached).
+
+        Args:
+            query: Search query
+            matches: Dropbox matches in rank order ('path', 'name',
+                     'modified'), kept so matches without indexable text
+                     are still returned while the query is fresh
+        """
+        key = self._query_key(query)
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO queries (query, fetched_at) VALUES (?, ?)",
+                (key, time.time()),
+            )
+            conn.execute("DELETE FROM query_matches WHERE query = ?", (key,))
+            conn.executemany(
+                "INSERT INTO query_matches (query, rank, path, name, modified) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    (key, rank, m['path'], m['name'], str(m.get('modified') or ''))
+                    for rank, m in enumerate(matches)
+                ),
+            )
+
+    def query_matches(self, query: str) -> List[Dict[str, Any]]:
+        """Dropbox matches recorded with a remembered query, in rank order"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT path, name, modified FROM query_matches "
+                "WHERE query = ? ORDER BY rank",
+                (self._query_key(query),),
+            ).fetchall()
+        return [{'path': path, 'name': name, 'modified': modified}
+                for path, name, modified in rows]
+
+    def forget_queries(self) -> None:
+        """Send the next lookups to Dropbox (remote contents changed)"""
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM queries")
+            conn.execute("DELETE FROM query_matches")
+
+    def search(self, query: str, max_results: int = 10) -> List[Dict[str, Any]]:
+        """
+        Full-text search over cached files.
+
+        Returns:
+            List of result dicts with 'path', 'name', 'modified', 'content',
+            'snippet', 'score' and 'local_path'
+        """
+        hits = self.index.search(query, limit=max_results)
+        if not hits:
+            return []
+
+        keys = ["/" + hit.key for hit in hits]
+        with closing(self._connect()) as conn:
+            entries = {
+                row[0]: row[1:]
+                for row in conn.execute(
+                    "SELECT path_lower, path_display, modified FROM entries "
+                    f"WHERE path_lower IN ({','.join('?' * len(keys))})",
+                    keys,
+                )
+            }
+
+        results = []
+        for hit, path_lower in zip(hits, keys):
+            if path_lower not in entries:
+                continue
+            try:
+                content = hit.path.read_text(encoding="utf-8")
+            except (OSError, UnicodeDecodeError):
+                continue
+            path_display, modified = entries[path_lower]
+            # Hit offsets count the file name line added by _index_text
+            offset = hit.offset - len(hit.path.stem) - 1
+            results.append({
+                'path': path_display,
+                'name': path_display.rsplit("/", 1)[-1],
+                'modified': modified,
+                'content': content,
+                'snippet': self._extract_snippet(content, query, offset),
+                'score': hit.score,
+                'local_path': str(hit.path),
+            })
+
+        if results:
+            now = time.time()
+            with self._lock, closing(self._connect()) as conn, conn:
+                conn.executemany(
+                    "UPDATE entries SET last_access = ? WHERE path_lower = ?",
+                    ((now, r['path'].lower()) for r in results),
+                )
+            self.hits += len(results)
+        return results
+
+    @staticmethod
+    def _extract_snippet(
+        content: str, query: str, offset: int, context_chars: int = 150
+    ) -> str:
+        """Text around the query, or around the index offset if it does not occur"""
+        idx = content.lower().find(query.lower())
+        match_len = len(query)
+        if idx == -1:
+            if not 0 <= offset < len(content):
+                return content[:300]
+            idx, match_len = offset, 0
+        start = max(0, idx - context_chars)
+        end = min(len(content), idx + match_len + context_chars)
+        snippet = content[start:end].strip()
+        if start > 0:
+            snippet = "..." + snippet
+        if end < len(content):
+            snippet = snippet + "..."
+        return snippet
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        with closing(self._connect()) as conn:
+            files, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        return {
+            'files': files,
+            'bytes': size,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'evicted': self.evicted,
+        }
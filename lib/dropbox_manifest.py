@@ -0,0 +1,353 @@
+"""
+Dropbox Manifest for OC-Memory
+Persistent local view of a synced Dropbox folder
+
+Records every remote file (rev, content hash, size, modified time) as
+of the saved ``list_folder`` cursor, plus the local state each file had
+when it was last synced. With both, a sync only needs the remote delta
+since the cursor and the local files whose size/mtime changed.
+
+Local files are compared with Dropbox by content hash (the SHA-256 of
+the SHA-256 digests of each 4 MB block), cached per file by inode,
+size and mtime so each version of a file is read at most once.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = "dropbox_manifest.sqlite3"
+
+# Block size of the Dropbox content_hash algorithm
+HASH_BLOCK_SIZE = 4 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS remote (
+    path_lower TEXT PRIMARY KEY,
+    path_display TEXT NOT NULL,
+    rev TEXT NOT NULL,
+    content_hash TEXT,
+    size INTEGER NOT NULL,
+    modified REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS local (
+    path_lower TEXT PRIMARY KEY,
+    local_path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    rev TEXT,
+    content_hash TEXT
+);
+CREATE TABLE IF NOT EXISTS cursors (
+    folder TEXT PRIMARY KEY,
+    cursor TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS hashes (
+    local_path TEXT PRIMARY KEY,
+    inode INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    content_hash TEXT NOT NULL
+);
+"""
+
+
+def content_hash(file_path: Path) -> str:
+    """
+    Dropbox content hash of a local file.
+
+    Args:
+        file_path: File to hash
+
+    Returns:
+        Hex digest comparable with FileMetadata.content_hash
+    """
+    overall = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        while True:
+            block = f.read(HASH_BLOCK_SIZE)
+            if not block:
+                break
+            overall.update(hashlib.sha256(block).digest())
+    return overall.hexdigest()
+
+
+# =============================================================================
+# Records
+# =============================================================================
+
+@dataclass
+class RemoteEntry:
+    """A file in Dropbox as of the saved cursor"""
+    path_lower: str
+    path_display: str
+    rev: str
+    content_hash: Optional[str]
+    size: int
+    modified: float
+
+
+@dataclass
+class LocalEntry:
+    """A local file as it was when last synced, and the rev it matched"""
+    path_lower: str
+    local_path: str
+    size: int
+    mtime: float
+    rev: Optional[str] = None
+    content_hash: Optional[str] = None
+
+
+# Rows below a folder: prefix compare (no LIKE escaping of '_' and '%')
+_UNDER = "substr(path_lower, 1, ?) = ?"
+
+
+def _prefix(folder: str) -> str:
+    return folder.rstrip("/").lower() + "/"
+
+
+# =============================================================================
+# Manifest
+# =============================================================================
+
+class DropboxManifest:
+    """SQLite store of remote entries, local sync state and list cursors"""
+
+    def __init__(self, db_path: str):
+        """
+        Args:
+            db_path: SQLite file path (parent directories are created)
+        """
+        self.db_path = Path(db_path).expanduser().resolve()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        with closing(self._connect()) as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(str(self.db_path), timeout=30.0)
+
+    # =========================================================================
+    # Remote side
+    # =========================================================================
+
+    def get_cursor(self, folder: str) -> Optional[str]:
+        """Saved list_folder cursor of a remote folder"""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT cursor FROM cursors WHERE folder = ?", (folder.lower(),)
+            ).fetchone()
+        return row[0] if row else None
+
+    def apply_remote_changes(
+        self,
+        folder: str,
+        upserts: Iterable[RemoteEntry],
+        deletions: Iterable[str],
+        cursor: Optional[str] = None,
+        reset: bool = False,
+    ) -> None:
+        """
+        Apply one page of list_folder results, atomically with the cursor
+        if one is given.
+
+        Args:
+            folder: Remote folder the cursor belongs to
+            upserts: Files added or modified
+            deletions: Lowercase paths deleted (files or whole folders)
+            cursor: Cursor returned with this page (None = keep the saved
+                    one, e.g. until the page's downloads have succeeded)
+            reset: Forget all remote entries under the folder first
+                   (start of a full listing)
+        """
+        prefix = _prefix(folder)
+        with self._lock, closing(self._connect()) as conn, conn:
+            if reset:
+                conn.execute(
+                    f"DELETE FROM remote WHERE {_UNDER}", (len(prefix), prefix)
+                )
+            for path_lower in deletions:
+                below = path_lower.rstrip("/") + "/"
+                conn.execute(
+                    f"DELETE FROM remote WHERE path_lower = ? OR {_UNDER}",
+                    (path_lower, len(below), below),
+                )
+            conn.executemany(
+                "INSERT OR REPLACE INTO remote "
+                "(path_lower, path_display, rev, content_hash, size, modified) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    (e.path_lower, e.path_display, e.rev, e.content_hash, e.size, e.modified)
+                    for e in upserts
+                ),
+            )
+            if cursor is not None:
+                conn.execute(
+                    "INSERT OR REPLACE INTO cursors (folder, cursor) VALUES (?, ?)",
+                    (folder.lower(), cursor),
+                )
+
+    def set_cursor(self, folder: str, cursor: str) -> None:
+        """Save the list_folder cursor of a remote folder"""
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cursors (folder, cursor) VALUES (?, ?)",
+                (folder.lower(), cursor),
+            )
+
+    def put_remote(self, *entries: RemoteEntry) -> None:
+        """Record remote files we just wrote (without moving the cursor)"""
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO remote "
+                "(path_lower, path_display, rev, content_hash, size, modified) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    (e.path_lower, e.path_display, e.rev, e.content_hash, e.size, e.modified)
+                    for e in entries
+                ),
+            )
+
+    def get_remote(self, path_lower: str) -> Optional[RemoteEntry]:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT path_lower, path_display, rev, content_hash, size, modified "
+                "FROM remote WHERE path_lower = ?",
+                (path_lower,),
+            ).fetchone()
+        return RemoteEntry(*row) if row else None
+
+    def remote_entries(self, folder: str) -> Dict[str, RemoteEntry]:
+        """All known remote files under a folder, by lowercase path"""
+        prefix = _prefix(folder)
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT path_lower, path_display, rev, content_hash, size, modified "
+                f"FROM remote WHERE {_UNDER}",
+                (len(prefix), prefix),
+            ).fetchall()
+        return {row[0]: RemoteEntry(*row) for row in rows}
+
+    def reset(self, folder: str) -> None:
+        """Forget the cursor of a folder so the next sync lists it in full"""
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM cursors WHERE folder = ?", (folder.lower(),))
+
+    # =========================================================================
+    # Local side
+    # =========================================================================
+
+    def local_entries(self, folder: str) -> Dict[str, LocalEntry]:
+        """Last synced local state of files under a remote folder"""
+        prefix = _prefix(folder)
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT path_lower, local_path, size, mtime, rev, content_hash "
+                f"FROM local WHERE {_UNDER}",
+                (len(prefix), prefix),
+            ).fetchall()
+        return {row[0]: LocalEntry(*row) for row in rows}
+
+    def get_local(self, path_lower: str) -> Optional[LocalEntry]:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT path_lower, local_path, size, mtime, rev, content_hash "
+                "FROM local WHERE path_lower = ?",
+                (path_lower,),
+            ).fetchone()
+        return LocalEntry(*row) if row else None
+
+    def put_local(self, *entries: LocalEntry) -> None:
+        """Record the local state of files after they were synced"""
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO local "
+                "(path_lower, local_path, size, mtime, rev, content_hash) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    (e.path_lower, e.local_path, e.size, e.mtime, e.rev, e.content_hash)
+                    for e in entries
+                ),
+            )
+
+    def remove_local(self, paths_lower: Iterable[str]) -> int:
+        """Forget local files (and their cached hashes) by lowercase path"""
+        removed = 0
+        with self._lock, closing(self._connect()) as conn, conn:
+            for path_lower in paths_lower:
+                row = conn.execute(
+                    "SELECT local_path FROM local WHERE path_lower = ?", (path_lower,)
+                ).fetchone()
+                if row is None:
+                    continue
+                conn.execute("DELETE FROM hashes WHERE local_path = ?", row)
+                conn.execute("DELETE FROM local WHERE path_lower = ?", (path_lower,))
+                removed += 1
+        return removed
+
+    # =========================================================================
+    # Content hashes
+    # =========================================================================
+
+    def hash_file(self, local_path: Path, stat: Optional[os.stat_result] = None) -> str:
+        """
+        Content hash of a local file, reusing the cached value while the
+        file's inode, size and mtime are unchanged.
+
+        Args:
+            local_path: File to hash
+            stat: Result of stat() on the file, if already known
+
+        Returns:
+            Dropbox content hash
+        """
+        key = str(local_path)
+        stat = stat or os.stat(local_path)
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT content_hash FROM hashes "
+                "WHERE local_path = ? AND inode = ? AND size = ? AND mtime_ns = ?",
+                (key, stat.st_ino, stat.st_size, stat.st_mtime_ns),
+            ).fetchone()
+        if row:
+            return row[0]
+
+        digest = content_hash(local_path)
+        self.put_hashes([(local_path, stat, digest)])
+        return digest
+
+    def put_hashes(
+        self, items: Iterable[Tuple[Path, os.stat_result, Optional[str]]]
+    ) -> None:
+        """Cache known content hashes (e.g. of files just downloaded)"""
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO hashes "
+                "(local_path, inode, size, mtime_ns, content_hash) VALUES (?, ?, ?, ?, ?)",
+                (
+                    (str(path), stat.st_ino, stat.st_size, stat.st_mtime_ns, digest)
+                    for path, stat, digest in items
+                    if digest
+                ),
+            )
+
+    def get_stats(self) -> Dict[str, int]:
+        with closing(self._connect()) as conn:
+            remote = conn.execute("SELECT COUNT(*) FROM remote").fetchone()[0]
+            local = conn.execute("SELECT COUNT(*) FROM local").fetchone()[0]
+            cursors = conn.execute("SELECT COUNT(*) FROM cursors").fetchone()[0]
+            hashes = conn.execute("SELECT COUNT(*) FROM hashes").fetchone()[0]
+        return {
+            'remote_files': remote,
+            'local_files': local,
+            'cursors': cursors,
+            'hashed_files': hashes,
+        }
@@ -3,14 +3,34 @@ Dropbox Sync Client for OC-Memory
 Cloud backup and reverse lookup for Cold memory
 
 Provides upload/download/search operations for syncing
-Obsidian vault or memory archives to Dropbox.
+Obsidian vault or memory archives to Dropbox. Syncs are incremental:
+a local manifest and the saved list_folder cursor mean only remote
+changes since the last sync and locally modified files are touched.
+Files are compared by Dropbox content hash, never by timestamps alone,
+so identical content is not transferred. Transfers run in parallel and
+uploads are streamed in chunks (see lib/dropbox_transfer.py). Search
+matches are prefetched into a local cache with its own full-text index
+(see lib/dropbox_cache.py), so repeat lookups need no network.
 """
 
 import logging
 import os
-from datetime import datetime
+import shutil
+import uuid
+from datetime import timezone
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
+
+from lib.config import get_cache_dir, get_state_dir
+from lib.dropbox_cache import (
+    CACHE_DIRNAME,
+    DEFAULT_MAX_BYTES,
+    DEFAULT_QUERY_TTL,
+    CachedFile,
+    DropboxCache,
+)
+from lib.dropbox_manifest import MANIFEST_FILENAME, DropboxManifest, LocalEntry, RemoteEntry
+from lib.dropbox_transfer import DEFAULT_CHUNK_SIZE, DEFAULT_MAX_WORKERS, TransferEngine
 
 logger = logging.getLogger(__name__)
 
@@ -57,6 +77,12 @@ class DropboxSync:
         refresh_token: Optional[str] = None,
         remote_folder: str = "/OC-Memory",
         local_dir: Optional[str] = None,
+        manifest_path: Optional[str] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        cache_dir: Optional[str] = None,
+        cache_max_bytes: int = DEFAULT_MAX_BYTES,
+        cache_query_ttl: float = DEFAULT_QUERY_TTL,
     ):
         """
         Args:
@@ -65,6 +91,13 @@ class DropboxSync:
             refresh_token: OAuth2 refresh token
             remote_folder: Remote folder path in Dropbox
             local_dir: Local directory to sync
+            manifest_path: Sync manifest file (default: hidden file in
+                           the synced local directory)
+            max_workers: Concurrent uploads/downloads
+            chunk_size: Upload chunk size in bytes
+            cache_dir: Local cache of files found by search (None = no cache)
+            cache_max_bytes: Cache size before LRU eviction
+            cache_query_ttl: Seconds a searched query is answered from the cache
         """
         self.app_key = app_key or os.environ.get("DROPBOX_APP_KEY", "")
         self.app_secret = app_secret or os.environ.get("DROPBOX_APP_SECRET", "")
@@ -72,6 +105,17 @@ class DropboxSync:
         self.remote_folder = remote_folder
         self.local_dir = Path(local_dir).expanduser().resolve() if local_dir else None
         self._client = None
+        # Bumped on every successful upload (remote content changed)
+        self.generation = 0
+        self.manifest_path = manifest_path
+        self._manifests: Dict[Path, DropboxManifest] = {}
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self._engine: Optional[TransferEngine] = None
+        self.cache_dir = cache_dir
+        self.cache_max_bytes = cache_max_bytes
+        self.cache_query_ttl = cache_query_ttl
+        self._cache: Optional[DropboxCache] = None
 
     @property
     def is_configured(self) -> bool:
@@ -128,20 +172,40 @@ class DropboxSync:
             return None
 
         self._ensure_client()
-        import dropbox
 
         if remote_path is None:
             remote_path = f"{self.remote_folder}/{local_path.name}"
 
+        metadata = self._upload(local_path, remote_path)
+        return remote_path if metadata is not None else None
+
+    @property
+    def cache(self) -> Optional[DropboxCache]:
+        """Local cache of searched files (None if disabled)"""
+        if self._cache is None and self.cache_dir:
+            self._cache = DropboxCache(
+                self.cache_dir,
+                max_bytes=self.cache_max_bytes,
+                query_ttl=self.cache_query_ttl,
+            )
+        return self._cache
+
+    @property
+    def transfers(self) -> TransferEngine:
+        """Transfer engine bound to the current client"""
+        if self._engine is None or self._engine.client is not self._client:
+            self._engine = TransferEngine(
+                self._client, max_workers=self.max_workers, chunk_size=self.chunk_size
+            )
+        return self._engine
+
+    def _upload(self, local_path: Path, remote_path: str):
+        """Upload a file; returns the new FileMetadata, or None on failure"""
         try:
-            with open(local_path, 'rb') as f:
-                self._client.files_upload(
-                    f.read(),
-                    remote_path,
-                    mode=dropbox.files.WriteMode.overwrite,
-                )
+            metadata = self.transfers.upload(local_path, remote_path)
+            self.generation += 1
             logger.info(f"Uploaded: {local_path.name} -> {remote_path}")
-            return remote_path
+            return metadata
         except Exception as e:
             logger.error(f"Upload failed for {local_path.name}: {e}")
             return None
@@ -170,12 +234,15 @@ class DropboxSync:
             local_path = self.local_dir / filename
 
         local_path = Path(local_path)
-        local_path.parent.mkdir(parents=True, exist_ok=True)
+        metadata = self._download(remote_path, local_path)
+        return local_path if metadata is not None else None
 
+    def _download(self, remote_path: str, local_path: Path):
+        """Download a file; returns its FileMetadata, or None on failure"""
         try:
-            self._client.files_download_to_file(str(local_path), remote_path)
+            metadata = self.transfers.download(remote_path, local_path)
             logger.info(f"Downloaded: {remote_path} -> {local_path}")
-            return local_path
+            return metadata
         except Exception as e:
             logger.error(f"Download failed for {remote_path}: {e}")
             return None
@@ -184,14 +251,27 @@ class DropboxSync:
         self,
         local_dir: Optional[Path] = None,
         remote_folder: Optional[str] = None,
+        changed_paths: Optional[List[Path]] = None,
     ) -> SyncResult:
         """
         Sync local directory with Dropbox folder.
-        Uploads new/modified local files, downloads new remote files.
+        Uploads new/modified local files, downloads new/modified remote files.
+
+        Remote changes come from the saved list_folder cursor (a full
+        listing only on the first sync or after the cursor expired),
+        which only advances once every change was downloaded;
+        local changes are files whose size/mtime differ from the
+        manifest. Candidates on either side are compared by content
+        hash, so unchanged files are never transferred. A file that
+        differs on both sides is counted as a conflict: with a common
+        sync history the local version is kept, without one (first
+        sync) the newer version wins.
 
         Args:
             local_dir: Local directory to sync
             remote_folder: Remote folder path
+            changed_paths: Local files known to have changed (e.g. from a
+                           file watcher); skips the local directory scan
 
         Returns:
             SyncResult with operation counts
@@ -199,7 +279,7 @@ class DropboxSync:
         self._ensure_client()
 
         local_dir = Path(local_dir) if local_dir else self.local_dir
-        remote_folder = remote_folder or self.remote_folder
+        remote_folder = (remote_folder or self.remote_folder).rstrip("/")
         result = SyncResult()
 
         if local_dir is None:
@@ -207,44 +287,184 @@ class DropboxSync:
 
         local_dir = Path(local_dir).expanduser().resolve()
         local_dir.mkdir(parents=True, exist_ok=True)
+        manifest = self._get_manifest(local_dir)
+
+        remote_changes, cursor = self._fetch_remote_changes(manifest, remote_folder)
+        if remote_changes and self.cache is not None:
+            self.cache.discard_stale({
+                path: entry.rev if entry else None for path, entry in remote_changes.items()
+            })
+            self.cache.forget_queries()
+        known = manifest.local_entries(remote_folder)
+        local_changes = self._find_local_changes(
+            local_dir, remote_folder, known, manifest, changed_paths
+        )
+
+        # Upload new/modified local files; paths settled here are not downloaded
+        uploads = []
+        settled = set()
+        pending_remote = dict(remote_changes)
+        for path_lower, (local_path, stat) in local_changes.items():
+            remote_path = f"{remote_folder}/{local_path.relative_to(local_dir).as_posix()}"
+            remote = manifest.get_remote(path_lower)
+            record = known.get(path_lower)
+            try:
+                digest = manifest.hash_file(local_path, stat)
+            except OSError as e:
+                logger.error(f"Cannot read {local_path}: {e}")
+                result.errors += 1
+                continue
 
-        # Get remote file listing
-        remote_files = self._list_remote_files(remote_folder)
-
-        # Get local files
-        local_files = {}
-        for md_file in local_dir.rglob("*.md"):
-            rel_path = md_file.relative_to(local_dir)
-            remote_path = f"{remote_folder}/{rel_path.as_posix()}"
-            local_files[remote_path] = md_file
-
-        # Upload new/modified local files
-        for remote_path, local_path in local_files.items():
-            if remote_path in remote_files:
-                local_mtime = local_path.stat().st_mtime
-                remote_mtime = remote_files[remote_path].get('modified', 0)
-                if local_mtime <= remote_mtime:
+            if record is not None and record.content_hash == digest:
+                # Touched but not modified
+                manifest.put_local(
+                    self._local_entry(path_lower, local_path, stat, record.rev, digest)
+                )
+                if remote is not None and remote.rev != record.rev:
+                    # Edited in Dropbox meanwhile: take the remote version
+                    pending_remote[path_lower] = remote
+                else:
+                    settled.add(path_lower)
+                continue
+            if remote is not None and record is None and remote.modified > stat.st_mtime:
+                # Never synced and Dropbox is newer: settled by the download pass
+                pending_remote[path_lower] = remote
+                continue
+            settled.add(path_lower)
+            if remote is not None and remote.content_hash == digest:
+                # Dropbox already has this content
+                manifest.put_local(
+                    self._local_entry(path_lower, local_path, stat, remote.rev, digest)
+                )
+                result.skipped += 1
+                continue
+            if remote is not None and record is None:
+                logger.warning(f"Conflict on {remote_path}: never synced, keeping newer local copy")
+                result.conflicts += 1
+            elif remote is not None and remote.rev != record.rev:
+                logger.warning(f"Conflict on {remote_path}: changed on both sides, keeping local")
+                result.conflicts += 1
+            uploads.append((path_lower, local_path, stat, digest, remote_path))
+
+        uploaded = self.transfers.upload_many([(u[1], u[4]) for u in uploads])
+        remote_entries, local_entries = [], []
+        for (path_lower, local_path, stat, digest, _), metadata in zip(uploads, uploaded):
+            if metadata is None:
+                result.errors += 1
+                continue
+            self.generation += 1
+            entry = self._remote_entry(metadata)
+            remote_entries.append(entry)
+            local_entries.append(
+                self._local_entry(path_lower, local_path, stat, entry.rev, digest)
+            )
+            result.uploaded += 1
+        manifest.put_remote(*remote_entries)
+        manifest.put_local(*local_entries)
+
+        # Download new/modified remote files
+        downloads = []
+        download_errors = 0
+        prefix_len = len(remote_folder) + 1
+        for path_lower, remote in pending_remote.items():
+            if remote is None or path_lower in settled:
+                continue
+            record = known.get(path_lower)
+            if record is not None and record.rev == remote.rev:
+                # Our own upload coming back through the cursor
+                continue
+
+            local_path = local_dir / remote.path_display[prefix_len:]
+            if (record is not None and record.content_hash == remote.content_hash
+                    and local_path.exists()):
+                # New revision, same content (e.g. restored or re-uploaded)
+                manifest.put_local(
+                    self._local_entry(path_lower, local_path, local_path.stat(),
+                                      remote.rev, record.content_hash)
+                )
+                continue
+            if record is None and local_path.exists():
+                # No sync history for an existing file: compare content
+                try:
+                    stat = local_path.stat()
+                    digest = manifest.hash_file(local_path, stat)
+                except OSError as e:
+                    logger.error(f"Cannot read {local_path}: {e}")
+                    download_errors += 1
+                    continue
+                if digest == remote.content_hash:
+                    manifest.put_local(
+                        self._local_entry(path_lower, local_path, stat, remote.rev, digest)
+                    )
                     result.skipped += 1
                     continue
+                result.conflicts += 1
+                if remote.modified <= stat.st_mtime:
+                    # Not scanned this time (changed_paths hint); the
+                    # next full scan uploads the newer local copy
+                    logger.warning(
+                        f"Conflict on {remote.path_display}: never synced, keeping newer local copy"
+                    )
+                    continue
+                logger.warning(
+                    f"Conflict on {remote.path_display}: never synced, keeping newer Dropbox copy"
+                )
 
-            if self.upload_file(local_path, remote_path):
-                result.uploaded += 1
-            else:
-                result.errors += 1
+            downloads.append((path_lower, remote, local_path))
 
-        # Download new remote files
-        for remote_path, info in remote_files.items():
-            if remote_path not in local_files:
-                rel_path = remote_path[len(remote_folder):].lstrip("/")
-                local_path = local_dir / rel_path
-                if self.download_file(remote_path, local_path):
-                    result.downloaded += 1
-                else:
-                    result.errors += 1
+        downloaded = self.transfers.download_many(
+            [(remote.path_display, local_path) for _, remote, local_path in downloads]
+        )
+        local_entries, hashes = [], []
+        for (path_lower, remote, local_path), metadata in zip(downloads, downloaded):
+            if metadata is None:
+                download_errors += 1
+                continue
+            stat = local_path.stat()
+            hashes.append((local_path, stat, remote.content_hash))
+            local_entries.append(
+                self._local_entry(path_lower, local_path, stat, remote.rev, remote.content_hash)
+            )
+            result.downloaded += 1
+        manifest.put_hashes(hashes)
+        manifest.put_local(*local_entries)
+
+        # Advance past the listed changes only once they are all applied;
+        # otherwise the next sync lists them again and retries
+        result.errors += download_errors
+        if cursor is not None and not download_errors:
+            manifest.set_cursor(remote_folder, cursor)
 
         logger.info(f"Sync complete: {result}")
         return result
 
+    def wait_for_changes(
+        self,
+        timeout: int = 30,
+        local_dir: Optional[Path] = None,
+        remote_folder: Optional[str] = None,
+    ) -> bool:
+        """
+        Block until the remote folder changes after the last sync (longpoll).
+
+        Args:
+            timeout: Seconds to wait (Dropbox accepts 30-480)
+            local_dir: Local directory whose manifest holds the cursor
+            remote_folder: Remote folder path
+
+        Returns:
+            True if there are changes to sync (also when no cursor exists yet)
+        """
+        self._ensure_client()
+        local_dir = Path(local_dir or self.local_dir or ".").expanduser().resolve()
+        remote_folder = (remote_folder or self.remote_folder).rstrip("/")
+
+        cursor = self._get_manifest(local_dir).get_cursor(remote_folder)
+        if cursor is None:
+            return True
+        result = self._client.files_list_folder_longpoll(cursor, timeout=timeout)
+        return bool(result.changes)
+
     def search(
         self,
         query: str,
@@ -253,6 +473,13 @@ class DropboxSync:
         """
         Search for files in Dropbox.
 
+        With a cache, matching files are prefetched and results come
+        from the cache's full-text index, including 'content',
+        'snippet' and 'score', followed by matches without indexable
+        text. A query whose matches all reached the cache is answered
+        from it, with the same results and without contacting Dropbox,
+        for the cache's query TTL.
+
         Args:
             query: Search query
             max_results: Maximum results
@@ -260,24 +487,107 @@ class DropboxSync:
         Returns:
             List of result dicts with 'path', 'name', 'modified'
         """
+        cache = self.cache
+        if cache is not None and cache.is_fresh(query):
+            return self._merge_cached(query, cache.query_matches(query), max_results)
+
         self._ensure_client()
 
         try:
             result = self._client.files_search_v2(query)
-            results = []
-
-            for match in result.matches[:max_results]:
-                metadata = match.metadata.get_metadata()
-                results.append({
-                    'path': metadata.path_display,
-                    'name': metadata.name,
-                    'modified': getattr(metadata, 'client_modified', ''),
-                })
-
-            return results
+            matches = [match.metadata.get_metadata() for match in result.matches[:max_results]]
         except Exception as e:
             logger.error(f"Search failed: {e}")
-            return []
+            # Offline: whatever the cache has is better than nothing
+            if cache is None:
+                return []
+            return self._merge_cached(query, cache.query_matches(query), max_results)
+
+        results = [
+            {
+                'path': metadata.path_display,
+                'name': metadata.name,
+                'modified': str(getattr(metadata, 'client_modified', '') or ''),
+            }
+            for metadata in matches
+        ]
+        if cache is None:
+            return results
+
+        self.prefetch(matches)
+        # Answer locally next time only if every cacheable match made it in
+        if not cache.missing(self._cacheable(matches)):
+            cache.remember_query(query, results)
+
+        return self._merge_cached(query, results, max_results)
+
+    def _merge_cached(
+        self, query: str, matches: List[Dict[str, Any]], max_results: int
+    ) -> List[Dict[str, Any]]:
+        """Ranked cached copies first, then matches that are not indexable text"""
+        cached = self.cache.search(query, max_results)
+        found = {item['path'].lower() for item in cached}
+        return (cached + [r for r in matches if r['path'].lower() not in found])[:max_results]
+
+    def _cacheable(self, files: List[Any]) -> List[CachedFile]:
+        """Files among ``files`` that the cache holds (skips folders and oversized files)"""
+        import dropbox
+
+        return [
+            CachedFile(
+                path_lower=f.path_lower,
+                path_display=f.path_display,
+                rev=f.rev,
+                size=f.size,
+                modified=str(getattr(f, 'client_modified', '') or ''),
+            )
+            for f in files
+            # Folders have no content; oversized files would evict everything
+            if isinstance(f, dropbox.files.FileMetadata) and f.size <= self.cache.max_bytes
+        ]
+
+    def prefetch(self, files: List[Any]) -> int:
+        """
+        Download files into the cache concurrently (skipping up-to-date copies).
+
+        Args:
+            files: Dropbox FileMetadata objects (e.g. search matches)
+
+        Returns:
+            Number of files downloaded
+        """
+        cache = self.cache
+        if cache is None:
+            return 0
+
+        missing = cache.missing(self._cacheable(files))
+        if not missing:
+            return 0
+
+        self._ensure_client()
+        # Download beside the final path, so readers never see partial
+        # files; unique names keep concurrent prefetches of a file apart
+        targets = [cache.path_for(f.path_lower) for f in missing]
+        parts = [
+            target.with_name(f"{target.name}.{uuid.uuid4().hex}.part") for target in targets
+        ]
+        fetched = self.transfers.download_many(
+            [(f.path_display, part) for f, part in zip(missing, parts)]
+        )
+
+        admitted = []
+        for f, part, target, metadata in zip(missing, parts, targets, fetched):
+            if metadata is None:
+                try:
+                    os.remove(part)
+                except OSError:
+                    pass
+                continue
+            os.replace(part, target)
+            admitted.append(f)
+        cache.admit(admitted)
+        logger.info(f"Prefetched {len(admitted)}/{len(missing)} Dropbox files into cache")
+        return len(admitted)
 
     def reverse_lookup(
         self,
@@ -287,6 +597,8 @@ class DropboxSync:
         """
         Search Dropbox and download matching files (Cold -> Hot reverse lookup).
 
+        Cached copies are reused instead of being downloaded again.
+
         Args:
             query: Search query
             download_dir: Directory to download to
@@ -301,43 +613,133 @@ class DropboxSync:
             raise ValueError("download_dir must be specified")
 
         downloaded = []
+        remote = []
         for result in search_results:
-            local_path = self.download_file(result['path'], download_dir / result['name'])
-            if local_path:
-                downloaded.append(local_path)
+            target = download_dir / result['name']
+            if result.get('local_path'):
+                target.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(result['local_path'], target)
+                downloaded.append(target)
+            else:
+                remote.append((result['path'], target))
+
+        if remote:
+            self._ensure_client()
+            fetched = self.transfers.download_many(remote)
+            downloaded.extend(
+                target for (_, target), metadata in zip(remote, fetched) if metadata
+            )
 
         logger.info(f"Reverse lookup: downloaded {len(downloaded)} files for '{query}'")
         return downloaded
 
     def get_stats(self) -> Dict[str, Any]:
         """Get sync statistics"""
-        return {
+        stats = {
             'configured': self.is_configured,
             'remote_folder': self.remote_folder,
             'local_dir': str(self.local_dir) if self.local_dir else None,
         }
+        if self._engine is not None:
+            stats['transfers'] = self._engine.get_stats()
+        if self._cache is not None:
+            stats['cache'] = self._cache.get_stats()
+        if self._manifests:
+            stats['manifest'] = {
+                str(path): manifest.get_stats()
+                for path, manifest in self._manifests.items()
+            }
+        return stats
 
     # =========================================================================
     # Private helpers
     # =========================================================================
 
-    def _list_remote_files(self, folder: str) -> Dict[str, Dict[str, Any]]:
-        """List files in a remote folder"""
+    def _get_manifest(self, local_dir: Path) -> DropboxManifest:
+        """Manifest of a synced local directory (opened once per path)"""
+        path = Path(
+            self.manifest_path or local_dir / f".{MANIFEST_FILENAME}"
+        ).expanduser().resolve()
+        if path not in self._manifests:
+            self._manifests[path] = DropboxManifest(str(path))
+        return self._manifests[path]
+
+    @staticmethod
+    def _remote_entry(metadata) -> RemoteEntry:
+        # client_modified is naive UTC
+        modified = (
+            metadata.client_modified.replace(tzinfo=timezone.utc).timestamp()
+            if metadata.client_modified else 0.0
+        )
+        return RemoteEntry(
+            path_lower=metadata.path_lower,
+            path_display=metadata.path_display,
+            rev=metadata.rev,
+            content_hash=getattr(metadata, 'content_hash', None),
+            size=metadata.size,
+            modified=modified,
+        )
+
+    @staticmethod
+    def _local_entry(
+        path_lower: str,
+        local_path: Path,
+        stat: os.stat_result,
+        rev: Optional[str],
+        digest: Optional[str] = None,
+    ) -> LocalEntry:
+        return LocalEntry(
+            path_lower=path_lower,
+            local_path=str(local_path),
+            size=stat.st_size,
+            mtime=stat.st_mtime,
+            rev=rev,
+            content_hash=digest,
+        )
+
+    def _fetch_remote_changes(
+        self, manifest: DropboxManifest, folder: str
+    ) -> Tuple[Dict[str, Optional[RemoteEntry]], Optional[str]]:
+        """
+        Apply remote changes since the saved cursor to the manifest.
+        The cursor itself is not saved: the caller does that once the
+        changes were downloaded, so failed downloads are listed again.
+
+        Returns:
+            (changed lowercase paths -> new entry (None if deleted),
+             cursor after the last listed page or None)
+        """
         import dropbox
 
-        files = {}
+        changes: Dict[str, Optional[RemoteEntry]] = {}
+        cursor = manifest.get_cursor(folder)
+        reached = None
         try:
-            result = self._client.files_list_folder(folder, recursive=True)
+            result, reset = None, cursor is None
+            if cursor is not None:
+                try:
+                    result = self._client.files_list_folder_continue(cursor)
+                except dropbox.exceptions.ApiError as e:
+                    if not (hasattr(e.error, 'is_reset') and e.error.is_reset()):
+                        raise
+                    logger.info(f"Dropbox cursor for {folder} expired; listing in full")
+                    reset = True
+            if result is None:
+                result = self._client.files_list_folder(folder, recursive=True)
 
             while True:
+                upserts, deletions = [], []
                 for entry in result.entries:
                     if isinstance(entry, dropbox.files.FileMetadata):
-                        modified_ts = entry.client_modified.timestamp() if entry.client_modified else 0
-                        files[entry.path_display] = {
-                            'name': entry.name,
-                            'modified': modified_ts,
-                            'size': entry.size,
-                        }
+                        remote = self._remote_entry(entry)
+                        upserts.append(remote)
+                        changes[remote.path_lower] = remote
+                    elif isinstance(entry, dropbox.files.DeletedMetadata):
+                        deletions.append(entry.path_lower)
+                        changes[entry.path_lower] = None
+                manifest.apply_remote_changes(folder, upserts, deletions, reset=reset)
+                reached = result.cursor
+                reset = False
 
                 if not result.has_more:
                     break
@@ -347,7 +749,48 @@ class DropboxSync:
             if "not_found" not in str(e).lower():
                 logger.error(f"Error listing remote folder {folder}: {e}")
 
-        return files
+        return changes, reached
+
+    @staticmethod
+    def _find_local_changes(
+        local_dir: Path,
+        remote_folder: str,
+        known: Dict[str, LocalEntry],
+        manifest: DropboxManifest,
+        changed_paths: Optional[List[Path]] = None,
+    ) -> Dict[str, Tuple[Path, os.stat_result]]:
+        """
+        Local files whose size/mtime differ from the manifest.
+
+        Without ``changed_paths`` the directory is scanned (stat only, no
+        reads) and records of deleted files are dropped.
+
+        Returns:
+            Lowercase remote path -> (local path, stat)
+        """
+        full_scan = changed_paths is None
+        candidates = local_dir.rglob("*.md") if full_scan else (
+            Path(p).expanduser().resolve() for p in changed_paths
+        )
+
+        changes = {}
+        seen = set()
+        for local_path in candidates:
+            try:
+                rel = local_path.relative_to(local_dir).as_posix()
+                stat = local_path.stat()
+            except (ValueError, OSError):
+                continue
+            path_lower = f"{remote_folder}/{rel}".lower()
+            seen.add(path_lower)
+
+            record = known.get(path_lower)
+            if record is None or (record.size, record.mtime) != (stat.st_size, stat.st_mtime):
+                changes[path_lower] = (local_path, stat)
+
+        if full_scan:
+            manifest.remove_local(p for p in known if p not in seen)
+        return changes
 
 
 # =============================================================================
@@ -364,4 +807,13 @@ def create_dropbox_sync(config: Dict[str, Any]) -> Optional[DropboxSync]:
     return DropboxSync(
         app_key=dropbox_config.get('app_key'),
         remote_folder=dropbox_config.get('remote_folder', '/OC-Memory'),
+        manifest_path=str(get_state_dir(config) / MANIFEST_FILENAME),
+        max_workers=dropbox_config.get('max_workers', DEFAULT_MAX_WORKERS),
+        chunk_size=int(dropbox_config.get('chunk_size_mb', 8) * 1024 * 1024),
+        cache_dir=(
+            str(get_cache_dir(config) / CACHE_DIRNAME)
+            if dropbox_config.get('cache', True) else None
+        ),
+        cache_max_bytes=int(dropbox_config.get('cache_size_mb', 256) * 1024 * 1024),
+        cache_query_ttl=dropbox_config.get('cache_query_ttl', DEFAULT_QUERY_TTL),
     )
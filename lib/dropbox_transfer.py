@@ -0,0 +1,247 @@
+"""
+Dropbox Transfer Engine for OC-Memory
+Parallel, chunked uploads and downloads
+
+Uploads stream each file from disk into an upload session in fixed-size
+chunks, so memory use is bounded by workers x chunk size regardless of
+file size. Sessions are committed together with
+upload_session_finish_batch, which takes the namespace lock once per
+batch instead of once per file. Downloads stream straight to disk.
+Both run on a bounded thread pool.
+"""
+
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Dropbox recommends chunks in multiples of 4 MB (at most 150 MB)
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+
+DEFAULT_MAX_WORKERS = 8
+
+# Entries accepted by one upload_session_finish_batch call
+FINISH_BATCH_SIZE = 1000
+
+
+def client_modified(mtime: float) -> datetime:
+    """Dropbox client_modified for a local mtime (naive UTC, whole seconds)"""
+    return datetime.fromtimestamp(int(mtime), timezone.utc).replace(tzinfo=None)
+
+
+# =============================================================================
+# Transfer Engine
+# =============================================================================
+
+class TransferEngine:
+    """Runs Dropbox uploads and downloads on a bounded thread pool"""
+
+    def __init__(
+        self,
+        client: Any,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ):
+        """
+        Args:
+            client: dropbox.Dropbox instance
+            max_workers: Concurrent transfers
+            chunk_size: Bytes read and sent per upload request
+        """
+        self.client = client
+        self.max_workers = max(1, max_workers)
+        self.chunk_size = max(1, chunk_size)
+        self._lock = threading.Lock()
+
+        self.bytes_uploaded = 0
+        self.bytes_downloaded = 0
+        self.sessions = 0
+        self.batches = 0
+
+    # =========================================================================
+    # Uploads
+    # =========================================================================
+
+    def upload(self, local_path: Path, remote_path: str):
+        """
+        Upload one file (a single request if it fits in one chunk).
+
+        Returns:
+            FileMetadata of the new revision
+
+        Raises:
+            OSError, dropbox.exceptions.ApiError: Upload failed
+        """
+        import dropbox
+
+        local_path = Path(local_path)
+        size = local_path.stat().st_size
+        if size > self.chunk_size:
+            arg = self._stage(local_path, remote_path)
+            return self.client.files_upload_session_finish(b"", arg.cursor, arg.commit)
+
+        with open(local_path, 'rb') as f:
+            data = f.read()
+            metadata = self.client.files_upload(
+                data,
+                remote_path,
+                mode=dropbox.files.WriteMode.overwrite,
+                client_modified=client_modified(os.fstat(f.fileno()).st_mtime),
+            )
+        self._count('bytes_uploaded', len(data))
+        return metadata
+
+    def upload_many(self, items: Sequence[Tuple[Path, str]]) -> List[Optional[Any]]:
+        """
+        Upload files through parallel sessions and batch commits.
+
+        Args:
+            items: (local path, remote path) pairs
+
+        Returns:
+            FileMetadata per item, in order (None where the upload failed)
+        """
+        results: List[Optional[Any]] = [None] * len(items)
+        if not items:
+            return results
+
+        staged = []
+        with ThreadPoolExecutor(self.max_workers, thread_name_prefix="dropbox-up") as pool:
+            futures = {
+                pool.submit(self._stage, Path(local), remote): i
+                for i, (local, remote) in enumerate(items)
+            }
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    staged.append((i, future.result()))
+                except Exception as e:
+                    logger.error(f"Upload failed for {items[i][0]}: {e}")
+        staged.sort(key=lambda pair: pair[0])
+
+        for start in range(0, len(staged), FINISH_BATCH_SIZE):
+            batch = staged[start:start + FINISH_BATCH_SIZE]
+            try:
+                result = self.client.files_upload_session_finish_batch_v2(
+                    [arg for _, arg in batch]
+                )
+            except Exception as e:
+                logger.error(f"Upload batch commit failed ({len(batch)} files): {e}")
+                continue
+            self._count('batches', 1)
+
+            for (i, _), entry in zip(batch, result.entries):
+                if entry.is_success():
+                    results[i] = entry.get_success()
+                else:
+                    logger.error(f"Upload failed for {items[i][1]}: {entry.get_failure()}")
+
+        return results
+
+    def _stage(self, local_path: Path, remote_path: str):
+        """
+        Stream a file into a closed upload session, ready to commit.
+
+        Returns:
+            dropbox.files.UploadSessionFinishArg
+        """
+        import dropbox
+
+        with open(local_path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            chunk = f.read(self.chunk_size)
+            offset = len(chunk)
+            closed = offset >= stat.st_size
+            session_id = self.client.files_upload_session_start(chunk, close=closed).session_id
+
+            while not closed:
+                chunk = f.read(self.chunk_size)
+                cursor = dropbox.files.UploadSessionCursor(session_id, offset)
+                # An empty read (file shrank) still has to close the session
+                closed = not chunk or offset + len(chunk) >= stat.st_size
+                self.client.files_upload_session_append_v2(chunk, cursor, close=closed)
+                offset += len(chunk)
+
+        self._count('bytes_uploaded', offset)
+        self._count('sessions', 1)
+        return dropbox.files.UploadSessionFinishArg(
+            cursor=dropbox.files.UploadSessionCursor(session_id, offset),
+            commit=dropbox.files.CommitInfo(
+                path=remote_path,
+                mode=dropbox.files.WriteMode.overwrite,
+                client_modified=client_modified(stat.st_mtime),
+            ),
+        )
+
+    # =========================================================================
+    # Downloads
+    # =========================================================================
+
+    def download(self, remote_path: str, local_path: Path):
+        """
+        Download one file, streaming to disk.
+
+        Returns:
+            FileMetadata of the downloaded revision
+
+        Raises:
+            OSError, dropbox.exceptions.ApiError: Download failed
+        """
+        local_path = Path(local_path)
+        local_path.parent.mkdir(parents=True, exist_ok=True)
+        metadata = self.client.files_download_to_file(str(local_path), remote_path)
+        self._count('bytes_downloaded', getattr(metadata, 'size', 0) or 0)
+        return metadata
+
+    def download_many(self, items: Sequence[Tuple[str, Path]]) -> List[Optional[Any]]:
+        """
+        Download files in parallel.
+
+        Args:
+            items: (remote path, local path) pairs
+
+        Returns:
+            FileMetadata per item, in order (None where the download failed)
+        """
+        results: List[Optional[Any]] = [None] * len(items)
+        if not items:
+            return results
+
+        with ThreadPoolExecutor(self.max_workers, thread_name_prefix="dropbox-down") as pool:
+            futures = {
+                pool.submit(self.download, remote, local): i
+                for i, (remote, local) in enumerate(items)
+            }
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    results[i] = future.result()
+                except Exception as e:
+                    logger.error(f"Download failed for {items[i][0]}: {e}")
+
+        return results
+
+    # =========================================================================
+    # Stats
+    # =========================================================================
+
+    def _count(self, name: str, amount: int) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get transfer statistics"""
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'chunk_size': self.chunk_size,
+                'bytes_uploaded': self.bytes_uploaded,
+                'bytes_downloaded': self.bytes_downloaded,
+                'upload_sessions': self.sessions,
+                'upload_batches': self.batches,
+            }
@@ -0,0 +1,297 @@
+"""
+Embedding Cache for OC-Memory
+Persistent content-hash -> embedding cache for the vector store
+
+Observations repeat often and so do queries; without a cache ChromaDB
+re-embeds identical text on every call. Vectors are appended to a flat
+float32 file that is read through mmap, and a SQLite index maps the
+hash of (model, text) to a row of that file.
+"""
+
+import hashlib
+import logging
+import mmap
+import sqlite3
+import threading
+from array import array
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+VECTORS_FILENAME = "vectors.f32"
+INDEX_FILENAME = "index.sqlite3"
+
+_FLOAT_SIZE = array('f').itemsize
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    hash TEXT PRIMARY KEY,
+    row INTEGER NOT NULL
+);
+"""
+
+
+def embedding_key(text: str, model: str = "") -> str:
+    """Cache key of a text for a given embedding model"""
+    return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+
+# =============================================================================
+# Embedding Cache
+# =============================================================================
+
+class EmbeddingCache:
+    """
+    Append-only store of float32 vectors with a hash index.
+
+    All vectors share one dimension, fixed by the first write. The vector
+    file is memory-mapped for reads and remapped after it grows.
+    """
+
+    def __init__(self, cache_dir: str):
+        """
+        Args:
+            cache_dir: Directory holding the vector file and index
+        """
+        self.cache_dir = Path(cache_dir).expanduser().resolve()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.vectors_path = self.cache_dir / VECTORS_FILENAME
+        self.index_path = self.cache_dir / INDEX_FILENAME
+
+        self._lock = threading.Lock()
+        self._mmap: Optional[mmap.mmap] = None
+        self._mapped_size = 0
+
+        with closing(self._connect()) as conn:
+            conn.executescript(_SCHEMA)
+            row = conn.execute("SELECT value FROM meta WHERE key = 'dim'").fetchone()
+        self.dim: Optional[int] = int(row[0]) if row else None
+
+        self.vectors_path.touch(exist_ok=True)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(str(self.index_path), timeout=30.0)
+
+    # =========================================================================
+    # Reads
+    # =========================================================================
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, List[float]]:
+        """
+        Look up cached vectors.
+
+        Args:
+            keys: embedding_key() values
+
+        Returns:
+            Dict of key -> vector for the keys that are cached
+        """
+        if not keys:
+            return {}
+
+        rows: Dict[str, int] = {}
+        with closing(self._connect()) as conn:
+            if self.dim is None:
+                # Another process may have made the first write since
+                row = conn.execute("SELECT value FROM meta WHERE key = 'dim'").fetchone()
+                if row is None:
+                    return {}
+                self.dim = int(row[0])
+            unique = list(dict.fromkeys(keys))
+            # Stay below SQLite's bound-parameter limit
+            for start in range(0, len(unique), 500):
+                chunk = unique[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows.update(conn.execute(
+                    f"SELECT hash, row FROM entries WHERE hash IN ({placeholders})", chunk
+                ))
+
+        if not rows:
+            return {}
+
+        row_bytes = self.dim * _FLOAT_SIZE
+        result: Dict[str, List[float]] = {}
+        with self._lock:
+            view = self._view(max(rows.values()) + 1)
+            if view is None:
+                return {}
+            for key, row in rows.items():
+                vector = array('f')
+                vector.frombytes(view[row * row_bytes:(row + 1) * row_bytes])
+                result[key] = vector.tolist()
+        return result
+
+    def _view(self, min_rows: int) -> Optional[mmap.mmap]:
+        """mmap of the vector file covering at least ``min_rows`` rows"""
+        needed = min_rows * self.dim * _FLOAT_SIZE
+        if self._mmap is None or self._mapped_size < needed:
+            self._close_map()
+            size = self.vectors_path.stat().st_size
+            if size < needed:
+                return None
+            with open(self.vectors_path, 'rb') as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._mapped_size = size
+        return self._mmap
+
+    def _close_map(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+            self._mapped_size = 0
+
+    # =========================================================================
+    # Writes
+    # =========================================================================
+
+    def put_many(self, items: Dict[str, Sequence[float]]) -> int:
+        """
+        Store vectors for keys that are not cached yet.
+
+        Args:
+            items: key -> vector
+
+        Returns:
+            Number of vectors written
+        """
+        if not items:
+            return 0
+
+        with self._lock, closing(self._connect()) as conn, conn:
+            # The write lock serialises row allocation across processes
+            # sharing the cache directory
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT value FROM meta WHERE key = 'dim'").fetchone()
+            if row:
+                self.dim = int(row[0])
+            else:
+                self.dim = len(next(iter(items.values())))
+                conn.execute(
+                    "INSERT INTO meta (key, value) VALUES ('dim', ?)",
+                    (str(self.dim),),
+                )
+
+            known = set()
+            keys = list(items)
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                known.update(k for (k,) in conn.execute(
+                    f"SELECT hash FROM entries WHERE hash IN ({placeholders})", chunk
+                ))
+
+            new = [
+                (key, vector) for key, vector in items.items()
+                if key not in known and len(vector) == self.dim
+            ]
+            skipped = len(items) - len(known) - len(new)
+            if skipped:
+                logger.warning(f"Skipped {skipped} embeddings with dimension != {self.dim}")
+            if not new:
+                return 0
+
+            # Rows come from the index, not the file size, so a torn tail
+            # left by an interrupted write is overwritten instead of
+            # shifting every row after it
+            (last_row,) = conn.execute("SELECT MAX(row) FROM entries").fetchone()
+            first_row = 0 if last_row is None else last_row + 1
+
+            # Windows cannot resize a file that is mapped
+            self._close_map()
+            with open(self.vectors_path, 'r+b') as f:
+                f.truncate(first_row * self.dim * _FLOAT_SIZE)
+                f.seek(0, 2)
+                for _, vector in new:
+                    f.write(array('f', vector).tobytes())
+
+            conn.executemany(
+                "INSERT INTO entries (hash, row) VALUES (?, ?)",
+                ((key, first_row + i) for i, (key, _) in enumerate(new)),
+            )
+        return len(new)
+
+    def count(self) -> int:
+        """Number of cached vectors"""
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def close(self) -> None:
+        """Release the memory map"""
+        with self._lock:
+            self._close_map()
+
+
+# =============================================================================
+# Embedding function
+# =============================================================================
+
+class CachedEmbeddingFunction:
+    """
+    ChromaDB embedding function that consults an EmbeddingCache first.
+
+    Only texts missing from the cache (deduplicated within the call) are
+    passed to the wrapped embedding function.
+    """
+
+    def __init__(
+        self,
+        backend: Callable[[List[str]], Any],
+        cache: EmbeddingCache,
+        model_name: str = "default",
+    ):
+        """
+        Args:
+            backend: Embedding function computing vectors for a list of texts
+            cache: Persistent vector cache
+            model_name: Part of the cache key, so switching models never
+                        returns stale vectors
+        """
+        self.backend = backend
+        self.cache = cache
+        self.model_name = model_name
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        texts = list(input)
+        keys = [embedding_key(text, self.model_name) for text in texts]
+        cached = self.cache.get_many(keys)
+
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in cached:
+                missing.setdefault(key, text)
+
+        if missing:
+            vectors = self.backend(list(missing.values()))
+            computed = {
+                key: [float(x) for x in vector]
+                for key, vector in zip(missing, vectors)
+            }
+            self.cache.put_many(computed)
+            cached.update(computed)
+
+        with self._lock:
+            self.misses += len(missing)
+            self.hits += len(texts) - len(missing)
+
+        return [cached[key] for key in keys]
+
+    @staticmethod
+    def name() -> str:
+        return "oc_memory_cached"
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'cached_vectors': self.cache.count(),
+        }
@@ -0,0 +1,517 @@
+"""
+Extraction Pipeline for OC-Memory
+Bounded work queue that drains file events into LLM extraction
+
+Decouples FileWatcher callbacks from slow LLM calls: events are queued,
+a pool of worker threads reads the files, batches small files together
+and hands each batch to a handler (typically Observer.observe).
+
+The asyncio variant runs the handler as a coroutine on a background
+event loop, so hundreds of files can be in flight at once (e.g. during
+a backfill) without a thread per request.
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import queue
+import threading
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Sentinel telling a worker to exit
+_STOP = object()
+
+# (source path, file content)
+FileItem = Tuple[Path, str]
+
+
+# =============================================================================
+# Extraction Pipeline
+# =============================================================================
+
+class ExtractionPipeline:
+    """
+    Worker pool draining a bounded queue of changed files.
+
+    - Files already waiting in the queue are not queued twice.
+    - Files smaller than ``batch_max_chars`` are grouped (up to
+      ``batch_max_files`` per batch) into a single handler call.
+    - ``submit`` blocks when the queue is full, applying backpressure
+      to the producer instead of growing memory without bound.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[List[FileItem]], Any],
+        workers: int = 4,
+        queue_size: int = 256,
+        batch_max_files: int = 8,
+        batch_max_chars: int = 8000,
+    ):
+        """
+        Args:
+            handler: Called with a list of (path, content) per batch
+            workers: Number of worker threads
+            queue_size: Maximum number of queued files
+            batch_max_files: Maximum files per batch
+            batch_max_chars: Maximum total characters per batch; files at
+                             least this large are always processed alone
+        """
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.batch_max_files = max(1, batch_max_files)
+        self.batch_max_chars = batch_max_chars
+
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        self._pending: Set[Path] = set()
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+        # Statistics
+        self.submitted = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.batches = 0
+        self.files_processed = 0
+        self.errors = 0
+
+    @property
+    def is_running(self) -> bool:
+        return any(t.is_alive() for t in self._threads)
+
+    def start(self) -> None:
+        """Start the worker threads"""
+        if self.is_running:
+            return
+
+        self._threads = [
+            threading.Thread(
+                target=self._worker,
+                name=f"extraction-worker-{i}",
+                daemon=True,
+            )
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.info(f"Extraction pipeline started ({self.workers} workers)")
+
+    def submit(
+        self,
+        file_path: Path,
+        block: bool = True,
+        timeout: Optional[float] = None,
+    ) -> bool:
+        """
+        Queue a file for extraction.
+
+        Args:
+            file_path: Changed file
+            block: Wait for space when the queue is full
+            timeout: Maximum seconds to wait (None = forever)
+
+        Returns:
+            True if queued (or already queued), False if the queue was full
+        """
+        file_path = Path(file_path)
+
+        with self._lock:
+            if file_path in self._pending:
+                self.coalesced += 1
+                return True
+            self._pending.add(file_path)
+
+        try:
+            self._queue.put(file_path, block=block, timeout=timeout)
+        except queue.Full:
+            with self._lock:
+                self._pending.discard(file_path)
+                self.rejected += 1
+            logger.warning(f"Extraction queue full, dropping {file_path}")
+            return False
+
+        with self._lock:
+            self.submitted += 1
+        return True
+
+    def join(self) -> None:
+        """Block until every queued file has been processed"""
+        self._queue.join()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Finish queued work and stop the workers.
+
+        Args:
+            timeout: Maximum seconds to wait per worker
+        """
+        if not self._threads:
+            return
+
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        logger.info(f"Extraction pipeline stopped: {self.get_stats()}")
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get pipeline statistics"""
+        return {
+            'queued': self._queue.qsize(),
+            'submitted': self.submitted,
+            'coalesced': self.coalesced,
+            'rejected': self.rejected,
+            'batches': self.batches,
+            'files_processed': self.files_processed,
+            'errors': self.errors,
+        }
+
+    # =========================================================================
+    # Worker
+    # =========================================================================
+
+    def _worker(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                return
+
+            taken = 1
+            stop_after = False
+            batch: List[FileItem] = []
+            batch_chars = 0
+
+            loaded = self._load(item)
+            if loaded:
+                batch.append(loaded)
+                batch_chars = len(loaded[1])
+
+            # Pull more small files into the same batch without waiting
+            while (
+                batch_chars < self.batch_max_chars
+                and len(batch) < self.batch_max_files
+            ):
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                taken += 1
+                if item is _STOP:
+                    stop_after = True
+                    break
+
+                loaded = self._load(item)
+                if not loaded:
+                    continue
+                if batch_chars + len(loaded[1]) > self.batch_max_chars:
+                    # Too big to join this batch; run it on its own
+                    self._run([loaded])
+                    continue
+                batch.append(loaded)
+                batch_chars += len(loaded[1])
+
+            if batch:
+                self._run(batch)
+
+            for _ in range(taken):
+                self._queue.task_done()
+            if stop_after:
+                return
+
+    def _load(self, file_path: Path) -> Optional[FileItem]:
+        """Read a queued file; later events for it may queue it again"""
+        with self._lock:
+            self._pending.discard(file_path)
+
+        try:
+            content = file_path.read_text(encoding='utf-8')
+        except FileNotFoundError:
+            logger.debug(f"File vanished before extraction: {file_path}")
+            return None
+        except Exception as e:
+            logger.warning(f"Cannot read {file_path}: {e}")
+            with self._lock:
+                self.errors += 1
+            return None
+
+        if not content.strip():
+            return None
+        return (file_path, content)
+
+    def _run(self, batch: List[FileItem]) -> None:
+        try:
+            self.handler(batch)
+        except Exception as e:
+            logger.error(
+                f"Extraction failed for batch of {len(batch)} file(s): {e}"
+            )
+            with self._lock:
+                self.errors += 1
+        finally:
+            with self._lock:
+                self.batches += 1
+                self.files_processed += len(batch)
+
+
+# =============================================================================
+# Async Extraction Pipeline
+# =============================================================================
+
+class AsyncExtractionPipeline(ExtractionPipeline):
+    """
+    Extraction on an asyncio event loop running in a background thread.
+
+    Every file is its own handler call (no batching; ``submit_batch``
+    takes items grouped by the caller); up to ``max_in_flight`` calls
+    run concurrently. ``queue_size`` bounds
+    queued plus in-flight files, and ``submit`` blocks beyond that.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[List[FileItem]], Awaitable[Any]],
+        max_in_flight: int = 64,
+        queue_size: int = 256,
+        on_stop: Optional[Callable[[], Awaitable[Any]]] = None,
+    ):
+        """
+        Args:
+            handler: Coroutine function called with [(path, content)]
+            max_in_flight: Maximum concurrent handler calls
+            queue_size: Maximum queued plus in-flight files
+            on_stop: Coroutine function run on the loop before it stops
+                     (e.g. closing async clients bound to the loop)
+        """
+        super().__init__(handler, workers=1, queue_size=queue_size)
+        self.max_in_flight = max(1, max_in_flight)
+        self.on_stop = on_stop
+
+        self._slots = threading.BoundedSemaphore(max(1, queue_size))
+        self._futures: Set[concurrent.futures.Future] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._loop_thread is not None and self._loop_thread.is_alive()
+
+    def start(self) -> None:
+        """Start the event loop thread"""
+        if self.is_running:
+            return
+
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(
+            target=self._loop.run_forever,
+            name="extraction-loop",
+            daemon=True,
+        )
+        self._loop_thread.start()
+        self._semaphore = self._run_on_loop(self._make_semaphore())
+        logger.info(
+            f"Async extraction pipeline started (max {self.max_in_flight} in flight)"
+        )
+
+    async def _make_semaphore(self) -> asyncio.Semaphore:
+        return asyncio.Semaphore(self.max_in_flight)
+
+    def _run_on_loop(self, coro: Awaitable[Any]) -> Any:
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def submit(
+        self,
+        file_path: Path,
+        block: bool = True,
+        timeout: Optional[float] = None,
+    ) -> bool:
+        """
+        Schedule a file for extraction.
+
+        Args:
+            file_path: Changed file
+            block: Wait for a free slot when ``queue_size`` files are pending
+            timeout: Maximum seconds to wait (None = forever)
+
+        Returns:
+            True if scheduled (or already pending), False if no slot was free
+        """
+        if not self.is_running:
+            raise RuntimeError("AsyncExtractionPipeline is not running")
+        file_path = Path(file_path)
+
+        with self._lock:
+            if file_path in self._pending:
+                self.coalesced += 1
+                return True
+            self._pending.add(file_path)
+
+        if not self._slots.acquire(blocking=block, timeout=timeout if block else None):
+            with self._lock:
+                self._pending.discard(file_path)
+                self.rejected += 1
+            logger.warning(f"Extraction queue full, dropping {file_path}")
+            return False
+
+        future = asyncio.run_coroutine_threadsafe(self._process(file_path), self._loop)
+        with self._lock:
+            self.submitted += 1
+            self._futures.add(future)
+        future.add_done_callback(self._forget)
+        return True
+
+    def submit_batch(
+        self,
+        batch: List[FileItem],
+        handler: Optional[Callable[[List[FileItem]], Awaitable[Any]]] = None,
+    ) -> concurrent.futures.Future:
+        """
+        Schedule extraction of items the caller has already loaded (e.g. a
+        backfill), under the same ``max_in_flight`` and ``queue_size``
+        bounds as submitted files. Blocks while no slot is free.
+
+        Args:
+            batch: [(path, content)] handled in one call
+            handler: Coroutine function used instead of the pipeline's own
+
+        Returns:
+            Future that fails with the handler's exception, so the caller
+            can tell which batches to retry
+        """
+        if not self.is_running:
+            raise RuntimeError("AsyncExtractionPipeline is not running")
+
+        self._slots.acquire()
+        future = asyncio.run_coroutine_threadsafe(
+            self._process_batch(batch, handler or self.handler), self._loop
+        )
+        with self._lock:
+            self.submitted += len(batch)
+            self._futures.add(future)
+        future.add_done_callback(self._forget)
+        return future
+
+    def _forget(self, future: concurrent.futures.Future) -> None:
+        with self._lock:
+            self._futures.discard(future)
+
+    async def _process(self, file_path: Path) -> None:
+        try:
+            async with self._semaphore:
+                loaded = await asyncio.to_thread(self._load, file_path)
+                if loaded:
+                    await self._run_async([loaded])
+        finally:
+            self._slots.release()
+
+    async def _process_batch(
+        self,
+        batch: List[FileItem],
+        handler: Callable[[List[FileItem]], Awaitable[Any]],
+    ) -> None:
+        try:
+            async with self._semaphore:
+                await self._run_async(batch, handler, raise_errors=True)
+        finally:
+            self._slots.release()
+
+    async def _run_async(
+        self,
+        batch: List[FileItem],
+        handler: Optional[Callable[[List[FileItem]], Awaitable[Any]]] = None,
+        raise_errors: bool = False,
+    ) -> None:
+        try:
+            await (handler or self.handler)(batch)
+        except Exception as e:
+            logger.error(
+                f"Extraction failed for batch of {len(batch)} file(s): {e}"
+            )
+            with self._lock:
+                self.errors += 1
+            if raise_errors:
+                raise
+        finally:
+            with self._lock:
+                self.batches += 1
+                self.files_processed += len(batch)
+
+    def join(self) -> None:
+        """Block until every scheduled file has been processed"""
+        while True:
+            with self._lock:
+                futures = list(self._futures)
+            if not futures:
+                return
+            concurrent.futures.wait(futures)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Finish scheduled work and stop the event loop.
+
+        Args:
+            timeout: Maximum seconds to wait for the loop thread
+        """
+        if not self.is_running:
+            return
+
+        self.join()
+        if self.on_stop is not None:
+            try:
+                self._run_on_loop(self.on_stop())
+            except Exception as e:
+                logger.debug(f"Extraction pipeline on_stop failed: {e}")
+
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join(timeout)
+        self._loop.close()
+        self._loop_thread = None
+        self._loop = None
+        logger.info(f"Async extraction pipeline stopped: {self.get_stats()}")
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get pipeline statistics ('queued' counts pending and in-flight files)"""
+        stats = super().get_stats()
+        stats['queued'] = len(self._futures)
+        return stats
+
+
+def create_extraction_pipeline(
+    config: Dict[str, Any],
+    handler: Callable[[List[FileItem]], Any],
+    async_handler: Optional[Callable[[List[FileItem]], Awaitable[Any]]] = None,
+    on_stop: Optional[Callable[[], Awaitable[Any]]] = None,
+) -> ExtractionPipeline:
+    """
+    Create an extraction pipeline from config dictionary.
+
+    ``processing.mode`` selects 'threads' (default) or 'async'; async mode
+    requires ``async_handler``.
+    """
+    processing_config = config.get('processing', {})
+    mode = processing_config.get('mode', 'threads')
+
+    if mode == 'async':
+        if async_handler is None:
+            raise ValueError("processing.mode 'async' requires an async handler")
+        return AsyncExtractionPipeline(
+            handler=async_handler,
+            max_in_flight=processing_config.get('max_in_flight', 64),
+            queue_size=processing_config.get('queue_size', 256),
+            on_stop=on_stop,
+        )
+    if mode != 'threads':
+        logger.warning(f"Unknown processing mode: {mode}, using threads")
+
+    return ExtractionPipeline(
+        handler=handler,
+        workers=processing_config.get('workers', 4),
+        queue_size=processing_config.get('queue_size', 256),
+        batch_max_files=processing_config.get('batch_max_files', 8),
+        batch_max_chars=processing_config.get('batch_max_chars', 8000),
+    )
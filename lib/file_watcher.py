@@ -4,32 +4,175 @@ Monitors user directories for markdown file changes
 """
 
 import logging
+import threading
+import time
 from pathlib import Path
-from typing import Callable, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler, FileSystemEvent
 
 
+class EventDebouncer:
+    """
+    Per-path debounce stage for file events.
+
+    Each event (re)starts a quiet period for its path; the callback fires
+    once the path has been quiet for ``quiet_period`` seconds. Bursts of
+    writes from multi-step editor saves collapse into a single call.
+    """
+
+    def __init__(
+        self,
+        callback: Callable,
+        quiet_period: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            callback: Signature: callback(file_path: Path, event_type: str)
+            quiet_period: Seconds without events before a path fires
+            clock: Monotonic time source in seconds
+        """
+        self.callback = callback
+        self.quiet_period = quiet_period
+        self._clock = clock
+        self.logger = logging.getLogger(__name__)
+
+        # path -> (deadline, event_type)
+        self._pending: Dict[Path, Tuple[float, str]] = {}
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    def start(self) -> None:
+        """Start the dispatch thread"""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name="file-event-debouncer", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, flush: bool = True) -> None:
+        """
+        Stop the dispatch thread.
+
+        Args:
+            flush: Fire events still waiting for their quiet period
+        """
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if flush:
+            self.flush()
+
+    def schedule(self, file_path: Path, event_type: str) -> None:
+        """Record an event and restart the path's quiet period"""
+        with self._cond:
+            previous = self._pending.get(file_path)
+            # 'created'/'moved' describe the logical change better than
+            # the 'modified' events that follow them
+            if previous and previous[1] != 'modified':
+                event_type = previous[1]
+            self._pending[file_path] = (self._clock() + self.quiet_period, event_type)
+            self._cond.notify()
+
+    def cancel(self, file_path: Path) -> None:
+        """Drop a pending event (e.g. the file was deleted or moved away)"""
+        with self._cond:
+            self._pending.pop(file_path, None)
+
+    def pending_count(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def flush(self) -> None:
+        """Fire all pending events immediately"""
+        with self._cond:
+            due = [(path, event_type) for path, (_, event_type) in self._pending.items()]
+            self._pending.clear()
+        self._fire(due)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._running:
+                    return
+                if not self._pending:
+                    self._cond.wait()
+                    continue
+
+                now = self._clock()
+                next_deadline = min(deadline for deadline, _ in self._pending.values())
+                if next_deadline > now:
+                    self._cond.wait(next_deadline - now)
+                    continue
+
+                due = [
+                    (path, event_type)
+                    for path, (deadline, event_type) in self._pending.items()
+                    if deadline <= now
+                ]
+                for path, _ in due:
+                    del self._pending[path]
+
+            self._fire(due)
+
+    def _fire(self, events: List[Tuple[Path, str]]) -> None:
+        for file_path, event_type in events:
+            if not file_path.exists():
+                self.logger.debug(f"Skipping vanished file: {file_path}")
+                continue
+            try:
+                self.callback(file_path, event_type=event_type)
+            except Exception as e:
+                self.logger.error(f"Error in callback for {file_path}: {e}")
+
+
 class MarkdownFileHandler(FileSystemEventHandler):
     """
     Event handler for markdown file changes
     Filters for .md files and triggers callback
     """
 
-    def __init__(self, callback: Optional[Callable] = None):
+    def __init__(
+        self,
+        callback: Optional[Callable] = None,
+        debouncer: Optional[EventDebouncer] = None,
+    ):
         """
         Args:
             callback: Function to call when markdown file changes
                       Signature: callback(file_path: Path, event_type: str)
+            debouncer: Optional debounce stage; events are routed through
+                       it instead of calling the callback directly
         """
         super().__init__()
         self.callback = callback
+        self.debouncer = debouncer
         self.logger = logging.getLogger(__name__)
 
     def _is_markdown_file(self, path: str) -> bool:
         """Check if file is a markdown file"""
         return Path(path).suffix.lower() in ['.md', '.markdown']
 
+    def _dispatch(self, file_path: Path, event_type: str) -> None:
+        """Hand an event to the debouncer, or straight to the callback"""
+        if self.debouncer is not None:
+            self.debouncer.schedule(file_path, event_type)
+            return
+
+        if self.callback:
+            try:
+                self.callback(file_path, event_type=event_type)
+            except Exception as e:
+                self.logger.error(f"Error in callback for {file_path}: {e}")
+
     def on_created(self, event: FileSystemEvent) -> None:
         """Handle file creation events"""
         if event.is_directory:
@@ -38,12 +181,7 @@ class MarkdownFileHandler(FileSystemEventHandler):
         if self._is_markdown_file(event.src_path):
             file_path = Path(event.src_path)
             self.logger.info(f"New markdown file detected: {file_path}")
-
-            if self.callback:
-                try:
-                    self.callback(file_path, event_type='created')
-                except Exception as e:
-                    self.logger.error(f"Error in callback for {file_path}: {e}")
+            self._dispatch(file_path, 'created')
 
     def on_modified(self, event: FileSystemEvent) -> None:
         """Handle file modification events"""
@@ -53,12 +191,31 @@ class MarkdownFileHandler(FileSystemEventHandler):
         if self._is_markdown_file(event.src_path):
             file_path = Path(event.src_path)
             self.logger.debug(f"Markdown file modified: {file_path}")
+            self._dispatch(file_path, 'modified')
+
+    def on_moved(self, event: FileSystemEvent) -> None:
+        """
+        Handle renames, including atomic saves where an editor writes a
+        temp file and renames it over the markdown file.
+        """
+        if event.is_directory:
+            return
 
-            if self.callback:
-                try:
-                    self.callback(file_path, event_type='modified')
-                except Exception as e:
-                    self.logger.error(f"Error in callback for {file_path}: {e}")
+        if self.debouncer is not None and self._is_markdown_file(event.src_path):
+            self.debouncer.cancel(Path(event.src_path))
+
+        if self._is_markdown_file(event.dest_path):
+            file_path = Path(event.dest_path)
+            self.logger.debug(f"Markdown file moved into place: {file_path}")
+            self._dispatch(file_path, 'moved')
+
+    def on_deleted(self, event: FileSystemEvent) -> None:
+        """Handle deletions (drops pending debounced events)"""
+        if event.is_directory or self.debouncer is None:
+            return
+
+        if self._is_markdown_file(event.src_path):
+            self.debouncer.cancel(Path(event.src_path))
 
 
 class FileWatcher:
@@ -71,18 +228,24 @@ class FileWatcher:
         self,
         watch_dirs: List[str],
         callback: Optional[Callable] = None,
-        recursive: bool = True
+        recursive: bool = True,
+        debounce_seconds: float = 0.5,
     ):
         """
         Args:
             watch_dirs: List of directory paths to watch
             callback: Function to call when files change
             recursive: Watch subdirectories recursively
+            debounce_seconds: Quiet period per file before the callback
+                              fires (0 = call on every event)
         """
         self.watch_dirs = [Path(d).expanduser().resolve() for d in watch_dirs]
         self.callback = callback
         self.recursive = recursive
         self.observer = Observer()
+        self.debouncer: Optional[EventDebouncer] = None
+        if callback and debounce_seconds > 0:
+            self.debouncer = EventDebouncer(callback, quiet_period=debounce_seconds)
         self.logger = logging.getLogger(__name__)
 
         # Validate watch directories
@@ -92,7 +255,9 @@ class FileWatcher:
 
     def start(self) -> None:
         """Start watching directories"""
-        handler = MarkdownFileHandler(callback=self.callback)
+        handler = MarkdownFileHandler(callback=self.callback, debouncer=self.debouncer)
+        if self.debouncer is not None:
+            self.debouncer.start()
 
         for watch_dir in self.watch_dirs:
             if not watch_dir.exists():
@@ -110,6 +275,8 @@ class FileWatcher:
         self.logger.info("Stopping FileWatcher...")
         self.observer.stop()
         self.observer.join()
+        if self.debouncer is not None:
+            self.debouncer.stop(flush=True)
         self.logger.info("FileWatcher stopped")
 
     def is_alive(self) -> bool:
@@ -119,8 +286,6 @@ class FileWatcher:
 
 # Example usage and testing
 if __name__ == "__main__":
-    import time
-
     # Setup logging
     logging.basicConfig(
         level=logging.INFO,
@@ -0,0 +1,183 @@
+"""
+Content Hash Store for OC-Memory
+Persistent record of the content last processed per source file
+
+Lets the daemon skip copying and LLM extraction for files whose
+meaningful content has not changed, including across restarts, and
+keeps a compressed snapshot of the last processed version so only the
+changed part of a file needs to be observed.
+"""
+
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+import zlib
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from lib.config import get_state_dir
+
+logger = logging.getLogger(__name__)
+
+HASH_STORE_FILENAME = "content_hashes.sqlite3"
+
+_FRONTMATTER_RE = re.compile(r"\A---\r?\n.*?\r?\n---\r?\n?", re.DOTALL)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hashes (
+    path TEXT PRIMARY KEY,
+    hash TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    path TEXT PRIMARY KEY,
+    content BLOB NOT NULL
+);
+"""
+
+
+# =============================================================================
+# Hashing
+# =============================================================================
+
+def content_hash(content: str) -> str:
+    """
+    Hash the meaningful content of a markdown file.
+
+    YAML frontmatter is ignored and whitespace runs are collapsed, so
+    edits that only touch metadata or formatting hash the same.
+    """
+    body = _FRONTMATTER_RE.sub("", content, count=1)
+    normalized = _WHITESPACE_RE.sub(" ", body).strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+# =============================================================================
+# Content Hash Store
+# =============================================================================
+
+class ContentHashStore:
+    """
+    SQLite-backed map of source path -> content hash.
+
+    The (size, mtime) seen when a hash was recorded is kept as well, so
+    ``is_unchanged_stat`` can skip files without reading them.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Args:
+            db_path: SQLite database file path
+        """
+        self.db_path = Path(db_path).expanduser().resolve()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+        with closing(self._connect()) as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(str(self.db_path), timeout=30.0)
+
+    @staticmethod
+    def _key(file_path: Path) -> str:
+        return str(Path(file_path).expanduser().resolve())
+
+    def get(self, file_path: Path) -> Optional[str]:
+        """Get the recorded hash for a file, or None"""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT hash FROM hashes WHERE path = ?", (self._key(file_path),)
+            ).fetchone()
+        return row[0] if row else None
+
+    def is_unchanged(self, file_path: Path, digest: str) -> bool:
+        """True if ``digest`` matches the recorded hash for the file"""
+        return self.get(file_path) == digest
+
+    def is_unchanged_stat(self, file_path: Path) -> bool:
+        """True if size and mtime match those recorded with the hash"""
+        try:
+            stat = Path(file_path).stat()
+        except OSError:
+            return False
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT size, mtime FROM hashes WHERE path = ?", (self._key(file_path),)
+            ).fetchone()
+        return row is not None and row == (stat.st_size, stat.st_mtime)
+
+    def get_snapshot(self, file_path: Path) -> Optional[str]:
+        """Get the last processed content of a file, or None"""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT content FROM snapshots WHERE path = ?", (self._key(file_path),)
+            ).fetchone()
+        if not row:
+            return None
+        try:
+            return zlib.decompress(row[0]).decode("utf-8")
+        except (zlib.error, UnicodeDecodeError) as e:
+            logger.warning(f"Corrupt snapshot for {file_path}: {e}")
+            return None
+
+    def update(
+        self,
+        file_path: Path,
+        digest: str,
+        content: Optional[str] = None,
+    ) -> None:
+        """
+        Record the hash of the content just processed for a file.
+
+        Args:
+            file_path: Source file
+            digest: content_hash() of the processed content
+            content: Processed content to keep as the diff baseline
+        """
+        try:
+            stat = Path(file_path).stat()
+            size, mtime = stat.st_size, stat.st_mtime
+        except OSError:
+            size, mtime = -1, 0.0
+
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO hashes (path, hash, size, mtime, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (self._key(file_path), digest, size, mtime, datetime.now().isoformat()),
+            )
+            if content is not None:
+                conn.execute(
+                    "INSERT OR REPLACE INTO snapshots (path, content) VALUES (?, ?)",
+                    (self._key(file_path), zlib.compress(content.encode("utf-8"))),
+                )
+
+    def remove(self, file_path: Path) -> None:
+        """Forget a file"""
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM hashes WHERE path = ?", (self._key(file_path),))
+            conn.execute("DELETE FROM snapshots WHERE path = ?", (self._key(file_path),))
+
+    def count(self) -> int:
+        """Number of tracked files"""
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM hashes").fetchone()[0]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'tracked_files': self.count(),
+            'db_path': str(self.db_path),
+        }
+
+
+def create_hash_store(config: Dict[str, Any]) -> ContentHashStore:
+    """Create a ContentHashStore from config dictionary"""
+    return ContentHashStore(str(get_state_dir(config) / HASH_STORE_FILENAME))
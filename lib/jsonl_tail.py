@@ -0,0 +1,225 @@
+"""
+JSONL Tail Reader for OC-Memory
+Incremental reading of append-only session transcripts
+
+Remembers the byte offset and inode reached in each log file, so every
+run only parses the messages appended since the previous one. Handles
+truncation (file shorter than the saved offset) and rotation (new inode)
+by starting over from the beginning of the file.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from lib.config import get_state_dir
+
+logger = logging.getLogger(__name__)
+
+OFFSET_STORE_FILENAME = "log_offsets.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS offsets (
+    path TEXT PRIMARY KEY,
+    inode INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    updated_at TEXT NOT NULL
+);
+"""
+
+
+def parse_message_line(line: str) -> Optional[Dict[str, str]]:
+    """
+    Parse one JSONL transcript line into a message dict.
+
+    Returns:
+        {'role', 'content'} dict, or None for blank/invalid/non-message lines
+    """
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        entry = json.loads(line)
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(entry, dict) or 'role' not in entry or 'content' not in entry:
+        return None
+    return {'role': entry['role'], 'content': entry['content']}
+
+
+# =============================================================================
+# Offset Store
+# =============================================================================
+
+@dataclass
+class LogPosition:
+    """Where reading of a log file stopped"""
+    inode: int
+    offset: int
+
+
+class LogOffsetStore:
+    """SQLite-backed map of log path -> (inode, byte offset)"""
+
+    def __init__(self, db_path: str):
+        """
+        Args:
+            db_path: SQLite database file path
+        """
+        self.db_path = Path(db_path).expanduser().resolve()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+        with closing(self._connect()) as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(str(self.db_path), timeout=30.0)
+
+    @staticmethod
+    def _key(file_path: Path) -> str:
+        return str(Path(file_path).expanduser().resolve())
+
+    def get(self, file_path: Path) -> Optional[LogPosition]:
+        """Get the saved position for a log file, or None"""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT inode, offset FROM offsets WHERE path = ?", (self._key(file_path),)
+            ).fetchone()
+        return LogPosition(inode=row[0], offset=row[1]) if row else None
+
+    def set(self, file_path: Path, position: LogPosition) -> None:
+        """Save the position reached in a log file"""
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO offsets (path, inode, offset, updated_at) "
+                "VALUES (?, ?, ?, ?)",
+                (self._key(file_path), position.inode, position.offset,
+                 datetime.now().isoformat()),
+            )
+
+    def remove(self, file_path: Path) -> None:
+        """Forget a log file (it will be read from the start next time)"""
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM offsets WHERE path = ?", (self._key(file_path),))
+
+    def count(self) -> int:
+        """Number of tracked log files"""
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM offsets").fetchone()[0]
+
+
+# =============================================================================
+# Tail Reader
+# =============================================================================
+
+class JsonlTailReader:
+    """
+    Yields only the messages appended to a JSONL log since the last read.
+
+    A trailing line without a newline is treated as still being written
+    and is left for the next read. The new position is saved once the
+    generator is exhausted, so an interrupted read is repeated rather
+    than lost. With ``commit=False`` the position is held until
+    ``commit()``, so a caller can advance only after processing succeeded.
+    """
+
+    def __init__(self, store: LogOffsetStore):
+        """
+        Args:
+            store: Persistent offset store
+        """
+        self.store = store
+        self._pending: Dict[str, LogPosition] = {}
+        self._lock = threading.Lock()
+
+    def start_offset(self, log_file: Path) -> int:
+        """
+        Byte offset the next read of ``log_file`` starts at
+        (0 for new, truncated or rotated files).
+        """
+        log_file = Path(log_file)
+        try:
+            stat = log_file.stat()
+        except OSError:
+            return 0
+
+        position = self.store.get(log_file)
+        if position is None:
+            return 0
+        if position.inode != stat.st_ino:
+            logger.info(f"Log rotated, reading from start: {log_file}")
+            return 0
+        if position.offset > stat.st_size:
+            logger.info(f"Log truncated, reading from start: {log_file}")
+            return 0
+        return position.offset
+
+    def read_new(self, log_file: Path, commit: bool = True) -> Iterator[Dict[str, str]]:
+        """
+        Yield messages appended since the last committed read.
+
+        Args:
+            log_file: Path to .jsonl transcript
+            commit: Save the new position when the generator is exhausted
+                    (False = hold it until ``commit(log_file)``)
+        """
+        log_file = Path(log_file)
+        offset = self.start_offset(log_file)
+
+        try:
+            with open(log_file, 'rb') as f:
+                inode = Path(log_file).stat().st_ino
+                f.seek(offset)
+                for raw in f:
+                    if not raw.endswith(b'\n'):
+                        # Partial line still being written
+                        break
+                    offset += len(raw)
+                    message = parse_message_line(raw.decode('utf-8', errors='replace'))
+                    if message is not None:
+                        yield message
+        except FileNotFoundError:
+            logger.error(f"Log file not found: {log_file}")
+            return
+
+        position = LogPosition(inode=inode, offset=offset)
+        if commit:
+            self.store.set(log_file, position)
+        else:
+            with self._lock:
+                self._pending[LogOffsetStore._key(log_file)] = position
+
+    def commit(self, log_file: Path) -> bool:
+        """
+        Save the position reached by the last exhausted
+        ``read_new(log_file, commit=False)``.
+
+        Returns:
+            False if there was no such read to commit
+        """
+        with self._lock:
+            position = self._pending.pop(LogOffsetStore._key(log_file), None)
+        if position is None:
+            return False
+        self.store.set(log_file, position)
+        return True
+
+    def reset(self, log_file: Path) -> None:
+        """Read ``log_file`` from the beginning next time"""
+        with self._lock:
+            self._pending.pop(LogOffsetStore._key(log_file), None)
+        self.store.remove(log_file)
+
+
+def create_tail_reader(config: Dict[str, Any]) -> JsonlTailReader:
+    """Create a JsonlTailReader whose offsets live in the state directory"""
+    return JsonlTailReader(
+        LogOffsetStore(str(get_state_dir(config) / OFFSET_STORE_FILENAME))
+    )
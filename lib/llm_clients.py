@@ -0,0 +1,227 @@
+"""
+LLM Clients for OC-Memory
+Shared, lazily-built LLM API clients with connection pooling
+
+Observer and Reflector used to construct a new client on every call,
+paying a fresh TLS handshake each time. The registry builds one client
+per provider/credentials/settings and reuses it, so HTTP keep-alive
+connections are pooled across calls and threads. Async clients are
+cached per event loop, since their connections belong to the loop that
+opened them.
+"""
+
+import asyncio
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Defaults for the `llm` config section
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT = 60.0
+
+
+# =============================================================================
+# Client Registry
+# =============================================================================
+
+class LLMClientRegistry:
+    """
+    Thread-safe cache of provider clients.
+
+    - OpenAI: one ``OpenAI`` client per (api_key, pool_size, timeout),
+      backed by an ``httpx.Client`` with a bounded keep-alive pool.
+    - Google: ``genai.configure`` runs once per API key and one
+      ``GenerativeModel`` is kept per model name.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._openai: Dict[Tuple[str, int, float], Any] = {}
+        # Keyed by the loop object itself (not its id, which may be reused)
+        self._async_openai: Dict[Tuple[str, int, float, asyncio.AbstractEventLoop], Any] = {}
+        self._google_models: Dict[Tuple[str, str], Any] = {}
+        self._google_key: Optional[str] = None
+
+        # Statistics
+        self.created = 0
+        self.reused = 0
+
+    def openai(
+        self,
+        api_key: str,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> Any:
+        """
+        Get a pooled OpenAI client.
+
+        Args:
+            api_key: OpenAI API key
+            pool_size: Maximum (keep-alive) connections
+            timeout: Request timeout in seconds
+
+        Raises:
+            ImportError: If the openai package is not installed
+        """
+        key = (api_key, pool_size, timeout)
+        with self._lock:
+            client = self._openai.get(key)
+            if client is not None:
+                self.reused += 1
+                return client
+
+            import httpx
+            from openai import OpenAI
+
+            http_client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=pool_size,
+                    max_keepalive_connections=pool_size,
+                ),
+                timeout=timeout,
+            )
+            client = OpenAI(api_key=api_key, timeout=timeout, http_client=http_client)
+            self._openai[key] = client
+            self.created += 1
+            logger.debug(f"OpenAI client created (pool={pool_size}, timeout={timeout}s)")
+            return client
+
+    def async_openai(
+        self,
+        api_key: str,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> Any:
+        """
+        Get a pooled AsyncOpenAI client for the running event loop.
+
+        Args:
+            api_key: OpenAI API key
+            pool_size: Maximum (keep-alive) connections
+            timeout: Request timeout in seconds
+
+        Raises:
+            ImportError: If the openai package is not installed
+            RuntimeError: If called outside a running event loop
+        """
+        key = (api_key, pool_size, timeout, asyncio.get_running_loop())
+        with self._lock:
+            client = self._async_openai.get(key)
+            if client is not None:
+                self.reused += 1
+                return client
+
+            # Drop clients of loops that were closed without aclose()
+            for stale in [k for k in self._async_openai if k[3].is_closed()]:
+                del self._async_openai[stale]
+
+            import httpx
+            from openai import AsyncOpenAI
+
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=pool_size,
+                    max_keepalive_connections=pool_size,
+                ),
+                timeout=timeout,
+            )
+            client = AsyncOpenAI(api_key=api_key, timeout=timeout, http_client=http_client)
+            self._async_openai[key] = client
+            self.created += 1
+            logger.debug(f"AsyncOpenAI client created (pool={pool_size}, timeout={timeout}s)")
+            return client
+
+    async def aclose(self) -> None:
+        """Close the async clients belonging to the running event loop"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            keys = [key for key in self._async_openai if key[3] is loop]
+            clients = [self._async_openai.pop(key) for key in keys]
+        for client in clients:
+            try:
+                await client.close()
+            except Exception as e:
+                logger.debug(f"Error closing AsyncOpenAI client: {e}")
+
+    def google_model(self, api_key: str, model: str) -> Any:
+        """
+        Get a cached Gemini ``GenerativeModel``.
+
+        Args:
+            api_key: Google API key
+            model: Model name
+
+        Raises:
+            ImportError: If google-generativeai is not installed
+        """
+        key = (api_key, model)
+        with self._lock:
+            instance = self._google_models.get(key)
+            if instance is not None and self._google_key == api_key:
+                self.reused += 1
+                return instance
+
+            import google.generativeai as genai
+
+            # genai.configure is process-global; only redo it for a new key
+            if self._google_key != api_key:
+                genai.configure(api_key=api_key)
+                self._google_key = api_key
+
+            instance = genai.GenerativeModel(model)
+            self._google_models[key] = instance
+            self.created += 1
+            logger.debug(f"Gemini model client created: {model}")
+            return instance
+
+    def close(self) -> None:
+        """Close pooled connections and forget all clients"""
+        with self._lock:
+            for client in self._openai.values():
+                try:
+                    client.close()
+                except Exception as e:
+                    logger.debug(f"Error closing OpenAI client: {e}")
+            self._openai.clear()
+            # Async clients can only be closed on their own loop (aclose)
+            self._async_openai.clear()
+            self._google_models.clear()
+            self._google_key = None
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get registry statistics"""
+        return {
+            'openai_clients': len(self._openai),
+            'async_openai_clients': len(self._async_openai),
+            'google_models': len(self._google_models),
+            'created': self.created,
+            'reused': self.reused,
+        }
+
+
+# =============================================================================
+# Shared registry
+# =============================================================================
+
+_registry: Optional[LLMClientRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_client_registry() -> LLMClientRegistry:
+    """Get the process-wide client registry (built on first use)"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = LLMClientRegistry()
+    return _registry
+
+
+def close_clients() -> None:
+    """Close all shared clients (e.g. on daemon shutdown)"""
+    with _registry_lock:
+        registry = _registry
+    if registry is not None:
+        registry.close()
@@ -8,14 +8,18 @@ automatically indexes and uses for context.
 
 import logging
 import re
+import threading
+import time
+from collections import deque
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from lib.tokenizer import HeuristicTokenizer, Tokenizer, get_tokenizer
 
 logger = logging.getLogger(__name__)
 
-# Approximate tokens per word ratio
-TOKENS_PER_WORD = 1.3
+_heuristic = HeuristicTokenizer()
 
 
 # =============================================================================
@@ -23,11 +27,63 @@ TOKENS_PER_WORD = 1.3
 # =============================================================================
 
 def estimate_tokens(text: str) -> int:
-    """Estimate token count from text (approximate)"""
-    if not text:
-        return 0
-    words = len(text.split())
-    return int(words * TOKENS_PER_WORD)
+    """Estimate token count from text (heuristic, no vocabulary needed)"""
+    return _heuristic.count(text)
+
+
+# =============================================================================
+# Section
+# =============================================================================
+
+class _Section:
+    """
+    Entries of one memory section (newest first) with per-line token
+    counts, so inserts and evictions adjust a running total in O(1).
+    """
+
+    __slots__ = ('lines', 'line_tokens', 'tokens', 'count')
+
+    def __init__(
+        self,
+        lines: Iterable[str] = (),
+        count: Callable[[str], int] = estimate_tokens,
+    ):
+        self.count = count
+        self.lines: Deque[str] = deque()
+        self.line_tokens: Deque[int] = deque()
+        self.tokens = 0
+        for line in lines:
+            self.append_oldest(line)
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.lines)
+
+    def __contains__(self, line: str) -> bool:
+        return line in self.lines
+
+    def push_newest(self, line: str, count: Optional[int] = None) -> None:
+        if count is None:
+            count = self.count(line)
+        self.lines.appendleft(line)
+        self.line_tokens.appendleft(count)
+        self.tokens += count
+
+    def append_oldest(self, line: str) -> None:
+        count = self.count(line)
+        self.lines.append(line)
+        self.line_tokens.append(count)
+        self.tokens += count
+
+    def pop_newest(self) -> str:
+        self.tokens -= self.line_tokens.popleft()
+        return self.lines.popleft()
+
+    def pop_oldest(self) -> str:
+        self.tokens -= self.line_tokens.pop()
+        return self.lines.pop()
 
 
 # =============================================================================
@@ -38,6 +94,10 @@ class MemoryMerger:
     """
     Manages the active_memory.md file.
     Organizes observations into sections and enforces token limits.
+
+    Sections are kept in memory between calls and only re-parsed when the
+    file changes on disk (mtime/size). Entry inserts mark the model dirty
+    and are written back at most once per ``flush_interval`` seconds.
     """
 
     # Section headers in order
@@ -49,21 +109,41 @@ class MemoryMerger:
         "Critical Decisions",
     ]
 
+    # Written by save() for empty sections; not an entry
+    EMPTY_PLACEHOLDER = "_No entries yet._"
+
     def __init__(
         self,
         memory_dir: str,
         filename: str = "active_memory.md",
         max_tokens: int = 30000,
+        flush_interval: float = 0.0,
+        tokenizer: Optional[Tokenizer] = None,
     ):
         """
         Args:
             memory_dir: OpenClaw memory directory
             filename: Memory file name
             max_tokens: Maximum token limit for the file
+            flush_interval: Minimum seconds between file rewrites for
+                            coalesced inserts (0 = write through)
+            tokenizer: Token counter for the budget (default tokenizer if None)
         """
         self.memory_dir = Path(memory_dir).expanduser().resolve()
         self.memory_file = self.memory_dir / filename
         self.max_tokens = max_tokens
+        self.flush_interval = flush_interval
+        self.tokenizer = tokenizer or get_tokenizer()
+
+        # In-memory section model (newest entry first in each section)
+        self._sections: Optional[Dict[str, _Section]] = None
+        self._file_signature: Optional[Tuple[int, int]] = None
+        self._pending: Dict[str, List[str]] = {}  # unflushed inserts
+        self._dirty = False
+        self._last_flush = 0.0
+        self._flush_timer: Optional[threading.Timer] = None
+        self._skeleton_tokens: Optional[int] = None
+        self._lock = threading.RLock()
 
         # Ensure directory exists
         self.memory_dir.mkdir(parents=True, exist_ok=True)
@@ -72,44 +152,26 @@ class MemoryMerger:
         """Get path to active memory file"""
         return self.memory_file
 
+    @property
+    def dirty(self) -> bool:
+        """True if there are changes not yet written to disk"""
+        return self._dirty
+
     def load(self) -> Dict[str, List[str]]:
         """
         Load and parse the current memory file into sections.
 
         Returns:
             Dict mapping section names to lists of content lines
+            (a copy; modify and pass to save() to persist)
         """
-        sections: Dict[str, List[str]] = {s: [] for s in self.SECTIONS}
-
-        if not self.memory_file.exists():
-            return sections
-
-        try:
-            content = self.memory_file.read_text(encoding='utf-8')
-        except Exception as e:
-            logger.error(f"Failed to read memory file: {e}")
-            return sections
-
-        current_section = None
-
-        for line in content.split('\n'):
-            # Check if line is a section header
-            header_match = re.match(r'^## (.+)$', line.strip())
-            if header_match:
-                header_name = header_match.group(1).strip()
-                if header_name in sections:
-                    current_section = header_name
-                continue
-
-            # Add line to current section
-            if current_section and line.strip():
-                sections[current_section].append(line)
-
-        return sections
+        with self._lock:
+            sections = self._get_sections()
+            return {name: list(lines) for name, lines in sections.items()}
 
     def save(self, sections: Dict[str, List[str]]) -> Path:
         """
-        Save sections to the memory file.
+        Replace all sections and write the memory file immediately.
 
         Args:
             sections: Dict mapping section names to content lines
@@ -117,33 +179,46 @@ class MemoryMerger:
         Returns:
             Path to saved file
         """
-        lines = [
-            "# Active Memory",
-            f"<!-- Updated: {datetime.now().isoformat()} -->",
-            f"<!-- Token estimate: {self._estimate_section_tokens(sections)} -->",
-            "",
-        ]
-
-        for section_name in self.SECTIONS:
-            lines.append(f"## {section_name}")
-            lines.append("")
-
-            section_lines = sections.get(section_name, [])
-            if section_lines:
-                lines.extend(section_lines)
-            else:
-                lines.append("_No entries yet._")
-            lines.append("")
-
-        content = '\n'.join(lines)
+        with self._lock:
+            self._sections = {
+                name: self._new_section(sections.get(name, [])) for name in self.SECTIONS
+            }
+            # Caller's sections are authoritative over the file on disk
+            self._file_signature = self._stat_signature()
+            self._pending = {}
+            self._dirty = True
+            return self.flush()
+
+    def flush(self) -> Path:
+        """
+        Write pending changes to the memory file.
 
-        try:
-            self.memory_file.write_text(content, encoding='utf-8')
+        Returns:
+            Path to the memory file
+        """
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+
+            if not self._dirty:
+                return self.memory_file
+
+            # Merge in any external edit made since our last read
+            content = self._render(self._get_sections())
+
+            try:
+                self.memory_file.write_text(content, encoding='utf-8')
+            except Exception as e:
+                logger.error(f"Failed to save memory file: {e}")
+                raise
+
+            self._file_signature = self._stat_signature()
+            self._pending = {}
+            self._dirty = False
+            self._last_flush = time.monotonic()
             logger.info(f"Memory file saved: {self.memory_file}")
             return self.memory_file
-        except Exception as e:
-            logger.error(f"Failed to save memory file: {e}")
-            raise
 
     def add_observations(self, observations: list) -> int:
         """
@@ -158,33 +233,31 @@ class MemoryMerger:
         if not observations:
             return 0
 
-        sections = self.load()
-        added = 0
+        with self._lock:
+            sections = self._get_sections()
+            added = 0
 
-        for obs in observations:
-            md_line = obs.to_markdown()
-            section = self._map_category_to_section(obs.category)
+            for obs in observations:
+                md_line = obs.to_markdown()
+                section = self._map_category_to_section(obs.category)
 
-            # Check token limit before adding
-            sections[section].insert(0, md_line)  # newest first
-            if self._estimate_section_tokens(sections) > self.max_tokens:
-                # Remove oldest entries from Observations Log first
-                sections[section].pop(0)  # undo
-                self._trim_to_fit(sections)
-                # Try again after trimming
-                if self._estimate_section_tokens(sections) < self.max_tokens:
-                    sections[section].insert(0, md_line)
+                # Make room before adding (oldest Observations Log first)
+                line_tokens = self.tokenizer.count(md_line)
+                if self._estimate_section_tokens(sections) + line_tokens > self.max_tokens:
+                    self._trim_to_fit(sections, reserve=line_tokens)
+
+                if self._estimate_section_tokens(sections) + line_tokens <= self.max_tokens:
+                    sections[section].push_newest(md_line, line_tokens)  # newest first
+                    self._pending.setdefault(section, []).append(md_line)
                     added += 1
                 else:
                     logger.warning("Token limit reached, skipping observation")
-            else:
-                added += 1
 
-        if added > 0:
-            self.save(sections)
-            logger.info(f"Added {added} observations to memory")
+            if added > 0:
+                self._mark_dirty()
+                logger.info(f"Added {added} observations to memory")
 
-        return added
+            return added
 
     def add_context(self, context: str) -> None:
         """
@@ -193,9 +266,12 @@ class MemoryMerger:
         Args:
             context: New context text
         """
-        sections = self.load()
-        sections["Current Context"] = [context]
-        self.save(sections)
+        with self._lock:
+            sections = self._get_sections()
+            sections["Current Context"] = self._new_section([context])
+            self._pending.pop("Current Context", None)
+            self._dirty = True
+            self.flush()
 
     def add_entry(self, section: str, entry: str) -> bool:
         """
@@ -212,21 +288,24 @@ class MemoryMerger:
             logger.error(f"Unknown section: {section}")
             return False
 
-        sections = self.load()
-        sections[section].insert(0, entry)
+        with self._lock:
+            sections = self._get_sections()
+            sections[section].push_newest(entry)
+            self._pending.setdefault(section, []).append(entry)
 
-        if self._estimate_section_tokens(sections) > self.max_tokens:
-            self._trim_to_fit(sections)
+            if self._estimate_section_tokens(sections) > self.max_tokens:
+                self._trim_to_fit(sections)
 
-        self.save(sections)
-        return True
+            self._mark_dirty()
+            return True
 
     def get_token_count(self) -> int:
         """Get current token count of memory file"""
-        if not self.memory_file.exists():
-            return 0
-        content = self.memory_file.read_text(encoding='utf-8')
-        return estimate_tokens(content)
+        with self._lock:
+            if self._sections is None and not self.memory_file.exists():
+                return 0
+            sections = self._get_sections()
+            return self._estimate_section_tokens(sections) + self._overhead_tokens()
 
     def clear_section(self, section: str) -> None:
         """Clear all entries in a section"""
@@ -234,9 +313,127 @@ class MemoryMerger:
             logger.error(f"Unknown section: {section}")
             return
 
-        sections = self.load()
-        sections[section] = []
-        self.save(sections)
+        with self._lock:
+            sections = self._get_sections()
+            sections[section] = self._new_section()
+            self._pending.pop(section, None)
+            self._dirty = True
+            self.flush()
+
+    # =========================================================================
+    # Section model
+    # =========================================================================
+
+    def _new_section(self, lines: Iterable[str] = ()) -> _Section:
+        return _Section(lines, count=self.tokenizer.count)
+
+    def _stat_signature(self) -> Optional[Tuple[int, int]]:
+        """(mtime_ns, size) of the memory file, or None if missing"""
+        try:
+            stat = self.memory_file.stat()
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _get_sections(self) -> Dict[str, _Section]:
+        """
+        Return the in-memory section model, re-parsing the file only if it
+        changed on disk since it was last read or written by us.
+        """
+        signature = self._stat_signature()
+        if self._sections is not None and signature == self._file_signature:
+            return self._sections
+
+        if self._sections is not None:
+            logger.info("Memory file changed on disk, reloading")
+
+        sections = self._parse_file()
+        # Re-apply inserts that were not flushed before the external edit
+        for section, entries in self._pending.items():
+            for entry in entries:
+                if entry not in sections[section]:
+                    sections[section].push_newest(entry)
+
+        self._sections = sections
+        self._file_signature = signature
+        return sections
+
+    def _parse_file(self) -> Dict[str, _Section]:
+        """Parse the memory file from disk into sections"""
+        sections: Dict[str, _Section] = {s: self._new_section() for s in self.SECTIONS}
+
+        if not self.memory_file.exists():
+            return sections
+
+        try:
+            content = self.memory_file.read_text(encoding='utf-8')
+        except Exception as e:
+            logger.error(f"Failed to read memory file: {e}")
+            return sections
+
+        current_section = None
+
+        for line in content.split('\n'):
+            # Check if line is a section header
+            header_match = re.match(r'^## (.+)$', line.strip())
+            if header_match:
+                header_name = header_match.group(1).strip()
+                if header_name in sections:
+                    current_section = header_name
+                continue
+
+            # Add line to current section
+            stripped = line.strip()
+            if current_section and stripped and stripped != self.EMPTY_PLACEHOLDER:
+                sections[current_section].append_oldest(line)
+
+        return sections
+
+    def _render(self, sections: Dict[str, _Section]) -> str:
+        """Render sections into the memory file content"""
+        lines = [
+            "# Active Memory",
+            f"<!-- Updated: {datetime.now().isoformat()} -->",
+            f"<!-- Token estimate: {self._estimate_section_tokens(sections)} -->",
+            "",
+        ]
+
+        for section_name in self.SECTIONS:
+            lines.append(f"## {section_name}")
+            lines.append("")
+
+            section_lines = sections.get(section_name)
+            if section_lines:
+                lines.extend(section_lines)
+            else:
+                lines.append(self.EMPTY_PLACEHOLDER)
+            lines.append("")
+
+        return '\n'.join(lines)
+
+    def _mark_dirty(self) -> None:
+        """
+        Mark the model dirty and write it back, coalescing writes so the
+        file is rewritten at most once per flush window.
+        """
+        self._dirty = True
+
+        wait = self._last_flush + self.flush_interval - time.monotonic()
+        if wait <= 0:
+            self.flush()
+        elif self._flush_timer is None:
+            self._flush_timer = threading.Timer(wait, self._timed_flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def _timed_flush(self) -> None:
+        """Flush from the write-back timer thread"""
+        try:
+            with self._lock:
+                self._flush_timer = None
+                self.flush()
+        except Exception as e:
+            logger.error(f"Deferred memory flush failed: {e}")
 
     @staticmethod
     def _map_category_to_section(category: str) -> str:
@@ -250,34 +447,38 @@ class MemoryMerger:
         }
         return mapping.get(category, 'Observations Log')
 
-    def _estimate_section_tokens(self, sections: Dict[str, List[str]]) -> int:
-        """Estimate total tokens across all sections"""
-        total_text = ""
-        for lines in sections.values():
-            total_text += '\n'.join(lines) + '\n'
-        return estimate_tokens(total_text)
+    def _estimate_section_tokens(self, sections: Dict[str, _Section]) -> int:
+        """Total tokens across all sections (sum of running counters)"""
+        return sum(section.tokens for section in sections.values())
+
+    def _overhead_tokens(self) -> int:
+        """Tokens of the fixed file skeleton (title, headers, comments)"""
+        if self._skeleton_tokens is None:
+            empty = {name: self._new_section() for name in self.SECTIONS}
+            self._skeleton_tokens = self.tokenizer.count(self._render(empty))
+        return self._skeleton_tokens
 
-    def _trim_to_fit(self, sections: Dict[str, List[str]]) -> None:
+    def _trim_to_fit(self, sections: Dict[str, _Section], reserve: int = 0) -> None:
         """
-        Trim sections to fit within token limit.
-        Removes oldest entries from Observations Log first.
+        Trim sections to fit within token limit, leaving ``reserve``
+        tokens free. Removes oldest entries from Observations Log first.
         """
-        while self._estimate_section_tokens(sections) > self.max_tokens:
+        while self._estimate_section_tokens(sections) + reserve > self.max_tokens:
             # Try removing from Observations Log first (oldest = last)
             if sections["Observations Log"]:
-                removed = sections["Observations Log"].pop()
+                removed = sections["Observations Log"].pop_oldest()
                 logger.debug(f"Trimmed observation: {removed[:50]}...")
                 continue
 
             # Then from Completed Tasks
             if sections["Completed Tasks"]:
-                sections["Completed Tasks"].pop()
+                sections["Completed Tasks"].pop_oldest()
                 continue
 
             # Last resort: trim other sections
             for section_name in reversed(self.SECTIONS):
                 if sections[section_name]:
-                    sections[section_name].pop()
+                    sections[section_name].pop_oldest()
                     break
             else:
                 break  # Nothing left to trim
@@ -300,8 +501,10 @@ def create_merger(config: Dict) -> MemoryMerger:
     memory_config = config.get('memory', {})
     memory_dir = memory_config.get('dir', '~/.openclaw/workspace/memory')
     max_tokens = memory_config.get('max_tokens', 30000)
+    flush_interval = memory_config.get('flush_interval', 2.0)
 
     return MemoryMerger(
         memory_dir=memory_dir,
         max_tokens=max_tokens,
+        flush_interval=flush_interval,
     )
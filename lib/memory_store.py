@@ -3,16 +3,35 @@ Memory Store for OC-Memory
 ChromaDB-based vector storage for semantic search
 
 Provides persistent vector storage with semantic search
-capabilities for the Hot memory tier.
+capabilities for the Hot memory tier. Observations can be buffered
+(write-behind) so bursts are embedded and upserted in large batches,
+and embeddings can be cached by content hash so duplicate observations
+and repeated queries never reach the embedding model. A BM25 index over
+the same documents is kept alongside the collection, so exact
+identifiers (file names, error codes, ticket numbers) can be found by
+lexical or hybrid search.
 """
 
 import logging
+import threading
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 
+from lib.config import get_state_dir
+from lib.embedding_cache import CachedEmbeddingFunction, EmbeddingCache
+from lib.rank_fusion import RRF_K, reciprocal_rank_fusion
+from lib.search_index import SearchIndex
+
 logger = logging.getLogger(__name__)
 
+EMBEDDING_CACHE_DIRNAME = "embeddings"
+
+# BM25 index over observation documents, inside the ChromaDB directory
+LEXICAL_INDEX_FILENAME = "observations_bm25.sqlite3"
+
+SEARCH_MODES = ("vector", "lexical", "hybrid")
+
 
 # =============================================================================
 # Memory Store
@@ -22,22 +41,66 @@ class MemoryStore:
     """
     ChromaDB-backed vector store for observations.
     Provides semantic search over stored observations.
+
+    With ``batch_size`` > 0, ``add_observations`` only buffers; the buffer
+    is written in one upsert once it holds ``batch_size`` observations or
+    ``flush_interval`` seconds after the first buffered one. Reads flush
+    first, so buffered observations are always visible to queries.
     """
 
     def __init__(
         self,
         persist_dir: str = ".chromadb",
         collection_name: str = "observations",
+        batch_size: int = 0,
+        flush_interval: float = 2.0,
+        max_buffer: int = 10000,
+        embedding_cache_dir: Optional[str] = None,
+        search_mode: str = "vector",
+        lexical_index: bool = True,
     ):
         """
         Args:
             persist_dir: Directory for ChromaDB persistence
             collection_name: Name of the ChromaDB collection
+            batch_size: Observations per buffered upsert (0 = write-through)
+            flush_interval: Maximum seconds an observation stays buffered
+            max_buffer: Observations kept for retry after a failed flush;
+                        beyond it the oldest are dropped (batch_size,
+                        not this bound, triggers flushes)
+            embedding_cache_dir: Directory of the persistent embedding
+                                 cache (None = embed every call)
+            search_mode: Default search() mode: 'vector', 'lexical' or 'hybrid'
+            lexical_index: Maintain the BM25 index needed by the lexical
+                           and hybrid modes
+
+        Raises:
+            ValueError: Unknown search mode
         """
+        if search_mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode: {search_mode}")
+
         self.persist_dir = Path(persist_dir).expanduser().resolve()
         self.collection_name = collection_name
         self._client = None
         self._collection = None
+        self.embedding_cache_dir = embedding_cache_dir
+        self.embedding_function: Optional[CachedEmbeddingFunction] = None
+
+        self.search_mode = search_mode
+        self.lexical_enabled = lexical_index
+        self._lexical_index: Optional[SearchIndex] = None
+        self._lexical_synced = False
+
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max(max_buffer, batch_size, 1)
+        self._buffer: list = []
+        self._flush_timer: Optional[threading.Timer] = None
+        self._lock = threading.RLock()
+        self.flushes = 0
+        # Bumped on every write so search result caches can invalidate
+        self.generation = 0
 
     def _ensure_initialized(self):
         """Lazy-initialize ChromaDB client and collection"""
@@ -49,10 +112,13 @@ class MemoryStore:
             self._client = chromadb.PersistentClient(
                 path=str(self.persist_dir)
             )
-            self._collection = self._client.get_or_create_collection(
-                name=self.collection_name,
-                metadata={"hnsw:space": "cosine"},
-            )
+            if self.embedding_cache_dir:
+                from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+                self.embedding_function = CachedEmbeddingFunction(
+                    DefaultEmbeddingFunction(),
+                    EmbeddingCache(self.embedding_cache_dir),
+                )
+            self._collection = self._get_or_create_collection()
             logger.info(
                 f"ChromaDB initialized: {self.persist_dir} "
                 f"(collection: {self.collection_name})"
@@ -64,6 +130,16 @@ class MemoryStore:
             logger.error(f"Failed to initialize ChromaDB: {e}")
             raise
 
+    def _get_or_create_collection(self):
+        kwargs = {}
+        if self.embedding_function is not None:
+            kwargs["embedding_function"] = self.embedding_function
+        return self._client.get_or_create_collection(
+            name=self.collection_name,
+            metadata={"hnsw:space": "cosine"},
+            **kwargs,
+        )
+
     def add_observation(
         self,
         obs_id: str,
@@ -96,23 +172,105 @@ class MemoryStore:
             documents=[content],
             metadatas=[clean_meta],
         )
+        self._index_lexical([(obs_id, content)])
+        self.generation += 1
         logger.debug(f"Added observation: {obs_id}")
 
     def add_observations(self, observations: list) -> int:
         """
         Add multiple observations from Observation objects.
+        When buffering is enabled they are written by a later flush.
 
         Args:
             observations: List of Observation objects
 
         Returns:
-            Number of observations added
+            Number of observations added (or buffered)
         """
         self._ensure_initialized()
 
         if not observations:
             return 0
 
+        # Buffered observations are flushed before any read, so they
+        # count as written for cached search results
+        self.generation += 1
+
+        if self.batch_size <= 0:
+            return self._upsert_observations(observations)
+
+        with self._lock:
+            self._buffer.extend(observations)
+            if len(self._buffer) >= self.batch_size:
+                self.flush()
+            elif self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.flush_interval, self._timed_flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+        return len(observations)
+
+    @property
+    def pending(self) -> int:
+        """Number of buffered, not yet written observations"""
+        with self._lock:
+            return len(self._buffer)
+
+    def flush(self) -> int:
+        """
+        Write buffered observations in a single upsert.
+
+        Returns:
+            Number of observations written
+        """
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._buffer:
+                return 0
+            batch, self._buffer = self._buffer, []
+
+            try:
+                written = self._upsert_observations(batch)
+            except Exception:
+                # Keep them for the next flush, within the buffer bound
+                combined = batch + self._buffer
+                if len(combined) > self.max_buffer:
+                    logger.warning(
+                        f"Memory store buffer full, dropped "
+                        f"{len(combined) - self.max_buffer} observations"
+                    )
+                self._buffer = combined[-self.max_buffer:]
+                raise
+            self.flushes += 1
+            return written
+
+    def close(self) -> None:
+        """Flush buffered observations and stop the flush timer"""
+        self.flush()
+
+    def _timed_flush(self) -> None:
+        """Flush from the write-behind timer thread"""
+        try:
+            with self._lock:
+                self._flush_timer = None
+                self.flush()
+        except Exception as e:
+            logger.error(f"Deferred memory store flush failed: {e}")
+
+    def _flush_before_read(self) -> None:
+        """Make buffered observations visible to queries"""
+        if self._buffer:
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning(f"Memory store flush before read failed: {e}")
+
+    def _upsert_observations(self, observations: list) -> int:
+        """Embed and upsert observations in one call"""
+        # Later duplicates of an ID replace earlier ones (upsert semantics)
+        observations = list({obs.id: obs for obs in observations}.values())
+
         ids = [obs.id for obs in observations]
         documents = [obs.content for obs in observations]
         metadatas = [
@@ -129,6 +287,7 @@ class MemoryStore:
             documents=documents,
             metadatas=metadatas,
         )
+        self._index_lexical(zip(ids, documents))
 
         logger.info(f"Added {len(observations)} observations to store")
         return len(observations)
@@ -138,20 +297,48 @@ class MemoryStore:
         query: str,
         n_results: int = 5,
         where: Optional[Dict[str, Any]] = None,
+        mode: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
         """
-        Semantic search over stored observations.
+        Search stored observations.
 
         Args:
             query: Search query text
             n_results: Number of results to return
             where: Optional metadata filter
+            mode: 'vector' (semantic), 'lexical' (BM25) or 'hybrid'
+                  (both rankings fused with RRF); default: search_mode
 
         Returns:
-            List of result dicts with 'id', 'content', 'metadata', 'distance'
+            List of result dicts with 'id', 'content', 'metadata',
+            'distance' (None if the vector search did not find it) and
+            'score' (0..1, higher is better), best first
+
+        Raises:
+            ValueError: Unknown mode, or a lexical mode without the index
         """
+        mode = mode or self.search_mode
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode: {mode}")
+        if mode != "vector" and not self.lexical_enabled:
+            raise ValueError(f"Search mode '{mode}' needs the lexical index")
+
         self._ensure_initialized()
+        self._flush_before_read()
+
+        if mode == "vector":
+            return self._search_vector(query, n_results, where)
+        if mode == "lexical":
+            return self._search_lexical(query, n_results, where)
+        return self._search_hybrid(query, n_results, where)
 
+    def _search_vector(
+        self,
+        query: str,
+        n_results: int,
+        where: Optional[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        """Nearest neighbours by embedding (cosine distance)"""
         kwargs = {
             "query_texts": [query],
             "n_results": min(n_results, self.count()),
@@ -173,12 +360,128 @@ class MemoryStore:
                     'metadata': results['metadatas'][0][i] if results.get('metadatas') else {},
                     'distance': results['distances'][0][i] if results.get('distances') else 0.0,
                 })
+        for item in items:
+            # Cosine distance: 0 = identical, 2 = opposite
+            item['score'] = max(0.0, 1.0 - item['distance'] / 2.0)
 
         return items
 
+    def _search_lexical(
+        self,
+        query: str,
+        n_results: int,
+        where: Optional[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        """BM25 ranking over observation documents"""
+        self._sync_lexical_index()
+        # Over-fetch when a metadata filter may drop hits
+        limit = n_results * 4 if where else n_results
+        hits = self.lexical_index.search(query, limit=limit)
+        if not hits:
+            return []
+
+        kwargs: Dict[str, Any] = {"ids": [hit.key for hit in hits]}
+        if where:
+            kwargs["where"] = where
+        result = self._collection.get(**kwargs)
+
+        found = {}
+        if result and result['ids']:
+            for i, obs_id in enumerate(result['ids']):
+                found[obs_id] = (
+                    result['documents'][i] if result.get('documents') else '',
+                    result['metadatas'][i] if result.get('metadatas') else {},
+                )
+
+        items = []
+        for hit in hits:
+            if hit.key not in found:
+                continue
+            content, metadata = found[hit.key]
+            items.append({
+                'id': hit.key,
+                'content': content,
+                'metadata': metadata,
+                'distance': None,
+                # Squash unbounded BM25 into [0, 1)
+                'score': hit.score / (hit.score + 1.0),
+                'bm25': hit.score,
+            })
+        return items[:n_results]
+
+    def _search_hybrid(
+        self,
+        query: str,
+        n_results: int,
+        where: Optional[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        """Vector and BM25 rankings fused by reciprocal rank"""
+        candidates = n_results * 2
+        rankings = {
+            name: [(item, item['score']) for item in search(query, candidates, where)]
+            for name, search in (
+                ('vector', self._search_vector),
+                ('lexical', self._search_lexical),
+            )
+        }
+
+        items = []
+        distances = {item['id']: item['distance'] for item, _ in rankings['vector']}
+        # Best possible fused score: rank 1 in both rankings
+        best = 2.0 / (RRF_K + 1)
+        for item, fused in reciprocal_rank_fusion(rankings, key=lambda item: item['id']):
+            item = dict(item)
+            item['distance'] = distances.get(item['id'])
+            item['score'] = fused / best
+            items.append(item)
+        return items[:n_results]
+
+    @property
+    def lexical_index(self) -> Optional[SearchIndex]:
+        """BM25 index over observation documents (None if disabled)"""
+        if self._lexical_index is None and self.lexical_enabled:
+            self._lexical_index = SearchIndex(
+                str(self.persist_dir),
+                index_path=str(self.persist_dir / LEXICAL_INDEX_FILENAME),
+            )
+        return self._lexical_index
+
+    def _index_lexical(self, documents) -> None:
+        """Mirror (id, document) pairs into the BM25 index"""
+        if self.lexical_index is None:
+            return
+        try:
+            self.lexical_index.add_documents(documents)
+        except Exception as e:
+            # The vector store stays authoritative; the index catches up on sync
+            self._lexical_synced = False
+            logger.warning(f"Failed to update lexical index: {e}")
+
+    def _sync_lexical_index(self, page_size: int = 1000) -> None:
+        """
+        Index observations stored before the lexical index existed
+        (or missed by a failed update). Runs once per process unless an
+        update fails.
+        """
+        if self._lexical_synced:
+            return
+        indexed = self.lexical_index.count()
+        total = self._collection.count()
+        if indexed < total:
+            logger.info(f"Building lexical index for {total - indexed} observations")
+            offset = 0
+            while offset < total:
+                page = self._collection.get(limit=page_size, offset=offset)
+                if not page or not page['ids']:
+                    break
+                self.lexical_index.add_documents(zip(page['ids'], page['documents']))
+                offset += len(page['ids'])
+        self._lexical_synced = True
+
     def get(self, obs_id: str) -> Optional[Dict[str, Any]]:
         """Get a single observation by ID"""
         self._ensure_initialized()
+        self._flush_before_read()
 
         result = self._collection.get(ids=[obs_id])
         if result and result['ids']:
@@ -192,12 +495,17 @@ class MemoryStore:
     def delete(self, obs_id: str) -> None:
         """Delete an observation by ID"""
         self._ensure_initialized()
+        self._flush_before_read()
         self._collection.delete(ids=[obs_id])
+        if self.lexical_index is not None:
+            self.lexical_index.remove_keys([obs_id])
+        self.generation += 1
         logger.debug(f"Deleted observation: {obs_id}")
 
     def count(self) -> int:
         """Get total number of stored observations"""
         self._ensure_initialized()
+        self._flush_before_read()
         return self._collection.count()
 
     def list_all(
@@ -207,6 +515,7 @@ class MemoryStore:
     ) -> List[Dict[str, Any]]:
         """List all observations with pagination"""
         self._ensure_initialized()
+        self._flush_before_read()
 
         result = self._collection.get(
             limit=limit,
@@ -226,18 +535,45 @@ class MemoryStore:
     def clear(self) -> None:
         """Delete all observations"""
         self._ensure_initialized()
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            self._buffer = []
         # Re-create collection
         self._client.delete_collection(self.collection_name)
-        self._collection = self._client.get_or_create_collection(
-            name=self.collection_name,
-            metadata={"hnsw:space": "cosine"},
-        )
+        self._collection = self._get_or_create_collection()
+        if self.lexical_index is not None:
+            self.lexical_index.clear()
+        self.generation += 1
         logger.info("Memory store cleared")
 
+    def get_stats(self) -> Dict[str, Any]:
+        """Get write buffer and embedding cache statistics"""
+        stats: Dict[str, Any] = {
+            'pending': self.pending,
+            'flushes': self.flushes,
+        }
+        if self.embedding_function is not None:
+            stats['embedding_cache'] = self.embedding_function.get_stats()
+        return stats
+
 
 def create_memory_store(config: Dict[str, Any]) -> MemoryStore:
     """Create a MemoryStore from config dictionary"""
     memory_config = config.get('memory', {})
     persist_dir = memory_config.get('chromadb_dir', '.chromadb')
 
-    return MemoryStore(persist_dir=persist_dir)
+    embedding_cache_dir = None
+    if memory_config.get('embedding_cache', True):
+        embedding_cache_dir = str(get_state_dir(config) / EMBEDDING_CACHE_DIRNAME)
+
+    return MemoryStore(
+        persist_dir=persist_dir,
+        batch_size=memory_config.get('store_batch_size', 64),
+        flush_interval=memory_config.get('store_flush_interval', 2.0),
+        max_buffer=memory_config.get('store_max_buffer', 10000),
+        embedding_cache_dir=embedding_cache_dir,
+        search_mode=memory_config.get('search_mode', 'hybrid'),
+        lexical_index=memory_config.get('lexical_index', True),
+    )
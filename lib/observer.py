@@ -3,20 +3,43 @@ Observer Agent for OC-Memory
 LLM-based observation extraction from conversation logs
 
 Extracts structured observations from OpenClaw session transcripts
-using configurable LLM providers (OpenAI, Google).
+using configurable LLM providers (OpenAI, Google). Long transcripts are
+split into token-bounded, overlapping chunks that are extracted
+concurrently and merged (map-reduce).
 """
 
+import asyncio
+import itertools
 import json
 import logging
 import os
 import re
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterable, Iterator, List, Optional
+
+from lib.jsonl_tail import JsonlTailReader, parse_message_line
+from lib.llm_clients import DEFAULT_POOL_SIZE, DEFAULT_TIMEOUT, get_client_registry
+from lib.rate_limiter import RateLimiter, create_rate_limiter
+from lib.tokenizer import count_tokens
 
 logger = logging.getLogger(__name__)
 
+# Response token cap for extraction calls
+MAX_OUTPUT_TOKENS = 2000
+
+# Priority rank used when merging duplicate observations across chunks
+_PRIORITY_RANK = {'high': 0, 'medium': 1, 'low': 2}
+
+_NON_WORD_RE = re.compile(r"[^\w]+", re.UNICODE)
+
+
+class ObservationError(Exception):
+    """Observation extraction could not run"""
+    pass
+
 
 # =============================================================================
 # Data Classes
@@ -105,6 +128,12 @@ class Observer:
         model: Optional[str] = None,
         api_key: Optional[str] = None,
         api_key_env: str = "OPENAI_API_KEY",
+        chunk_tokens: int = 0,
+        chunk_overlap: int = 2,
+        chunk_workers: int = 4,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: float = DEFAULT_TIMEOUT,
+        rate_limiter: Optional[RateLimiter] = None,
     ):
         """
         Args:
@@ -112,11 +141,26 @@ class Observer:
             model: Model name (auto-selected if None)
             api_key: API key (reads from env if None)
             api_key_env: Environment variable name for API key
+            chunk_tokens: Maximum prompt tokens per LLM call; longer
+                          conversations are chunked (0 = never chunk)
+            chunk_overlap: Messages repeated from the end of the previous
+                           chunk as context for the next one
+            chunk_workers: Chunks extracted concurrently
+            pool_size: Maximum pooled HTTP connections to the provider
+            timeout: LLM request timeout in seconds
+            rate_limiter: Shared provider limiter every call queues against
         """
         self.provider = provider
         self.model = model or self._default_model(provider)
         self.api_key = api_key or os.environ.get(api_key_env, "")
-        self._observation_counter = 0
+        self.chunk_tokens = chunk_tokens
+        self.chunk_overlap = max(0, chunk_overlap)
+        self.chunk_workers = max(1, chunk_workers)
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        # itertools.count is atomic, so worker threads never share an ID
+        self._observation_counter = itertools.count(1)
 
         if not self.api_key:
             logger.warning(
@@ -133,22 +177,35 @@ class Observer:
         }
         return defaults.get(provider, "gpt-4o-mini")
 
-    def observe(self, messages: List[Dict[str, str]]) -> List[Observation]:
+    def observe(
+        self,
+        messages: List[Dict[str, str]],
+        raise_errors: bool = False,
+    ) -> List[Observation]:
         """
         Extract observations from conversation messages.
 
         Args:
             messages: List of message dicts with 'role' and 'content' keys
+            raise_errors: Propagate LLM failures (including a failed chunk)
+                          instead of logging them and returning []
 
         Returns:
             List of extracted Observation objects
+
+        Raises:
+            ObservationError, Exception: Extraction failed (raise_errors only)
         """
         if not messages:
             return []
 
         if not self.api_key:
-            logger.error("Cannot observe: no API key configured")
-            return []
+            return self._fail("no API key configured", raise_errors)
+
+        if self.chunk_tokens > 0:
+            total = sum(self._message_tokens(msg) for msg in messages)
+            if total > self.chunk_tokens:
+                return self._observe_chunked(messages, raise_errors)
 
         # Format messages for the LLM
         conversation_text = self._format_messages(messages)
@@ -161,20 +218,254 @@ class Observer:
             return observations
         except Exception as e:
             logger.error(f"Observation extraction failed: {e}")
+            if raise_errors:
+                raise
             return []
 
-    def observe_from_file(self, log_file: Path) -> List[Observation]:
+    async def observe_async(
+        self,
+        messages: List[Dict[str, str]],
+        raise_errors: bool = False,
+    ) -> List[Observation]:
+        """
+        Async version of observe() using the providers' async clients.
+
+        Args:
+            messages: List of message dicts with 'role' and 'content' keys
+            raise_errors: Propagate LLM failures instead of returning []
+
+        Returns:
+            List of extracted Observation objects
+        """
+        if not messages:
+            return []
+
+        if not self.api_key:
+            return self._fail("no API key configured", raise_errors)
+
+        if self.chunk_tokens > 0:
+            total = sum(self._message_tokens(msg) for msg in messages)
+            if total > self.chunk_tokens:
+                return await self._observe_chunked_async(messages, raise_errors)
+
+        try:
+            raw_response = await self._call_llm_async(self._format_messages(messages))
+            observations = self._parse_response(raw_response)
+            logger.info(f"Extracted {len(observations)} observations")
+            return observations
+        except Exception as e:
+            logger.error(f"Observation extraction failed: {e}")
+            if raise_errors:
+                raise
+            return []
+
+    @staticmethod
+    def _fail(reason: str, raise_errors: bool) -> List[Observation]:
+        logger.error(f"Cannot observe: {reason}")
+        if raise_errors:
+            raise ObservationError(reason)
+        return []
+
+    def observe_from_file(
+        self,
+        log_file: Path,
+        tail: Optional[JsonlTailReader] = None,
+        raise_errors: bool = False,
+    ) -> List[Observation]:
         """
         Extract observations from a JSONL log file.
 
         Args:
             log_file: Path to .jsonl session transcript
+            tail: If given, only messages appended since the last
+                  successful call with this reader are observed; the
+                  reader advances only once extraction succeeded
+            raise_errors: Propagate extraction failures instead of
+                          returning []
 
         Returns:
             List of extracted Observation objects
         """
-        messages = self._read_jsonl_log(log_file)
-        return self.observe(messages)
+        if not self.api_key:
+            # Checked before reading so a tail reader does not advance
+            return self._fail("no API key configured", raise_errors)
+
+        if tail is not None:
+            messages = tail.read_new(log_file, commit=False)
+        else:
+            messages = self._iter_jsonl_log(log_file)
+
+        try:
+            if self.chunk_tokens > 0:
+                # Stream the log so memory stays bounded by the in-flight chunks
+                observations = self._observe_chunked(messages, raise_errors=True)
+            else:
+                observations = self.observe(list(messages), raise_errors=True)
+        except Exception:
+            if raise_errors:
+                raise
+            return []
+
+        if tail is not None:
+            tail.commit(log_file)
+        return observations
+
+    # =========================================================================
+    # Chunked extraction (map-reduce)
+    # =========================================================================
+
+    def _message_tokens(self, msg: Dict[str, str]) -> int:
+        """Token count of a message as formatted for the LLM"""
+        # +4 covers the role label and separator
+        return count_tokens(str(msg.get('content', ''))) + 4
+
+    def _iter_chunks(
+        self, messages: Iterable[Dict[str, str]]
+    ) -> Iterator[List[Dict[str, str]]]:
+        """
+        Group messages into windows of at most ``chunk_tokens`` tokens.
+        Each window after the first starts with the last ``chunk_overlap``
+        messages of the previous one; oversized messages are split.
+        """
+        chunk: List[Dict[str, str]] = []
+        chunk_tokens = 0
+        fresh = 0  # messages in chunk not carried over from the previous one
+
+        for msg in messages:
+            for part in self._split_message(msg):
+                tokens = self._message_tokens(part)
+                if fresh and chunk_tokens + tokens > self.chunk_tokens:
+                    yield chunk
+                    chunk = chunk[-self.chunk_overlap:] if self.chunk_overlap else []
+                    chunk_tokens = sum(self._message_tokens(m) for m in chunk)
+                    # Drop overlap that would leave no room for new content
+                    while chunk and chunk_tokens + tokens > self.chunk_tokens:
+                        chunk_tokens -= self._message_tokens(chunk.pop(0))
+                    fresh = 0
+                chunk.append(part)
+                chunk_tokens += tokens
+                fresh += 1
+
+        if fresh:
+            yield chunk
+
+    def _split_message(self, msg: Dict[str, str]) -> List[Dict[str, str]]:
+        """Split a message longer than ``chunk_tokens`` at line boundaries"""
+        if self._message_tokens(msg) <= self.chunk_tokens:
+            return [msg]
+
+        parts: List[Dict[str, str]] = []
+        lines: List[str] = []
+        tokens = 4
+        for line in str(msg.get('content', '')).split('\n'):
+            line_tokens = count_tokens(line) + 1
+            if lines and tokens + line_tokens > self.chunk_tokens:
+                parts.append({'role': msg.get('role', 'unknown'), 'content': '\n'.join(lines)})
+                lines, tokens = [], 4
+            lines.append(line)
+            tokens += line_tokens
+        if lines:
+            parts.append({'role': msg.get('role', 'unknown'), 'content': '\n'.join(lines)})
+        return parts
+
+    def _observe_chunk(
+        self, chunk: List[Dict[str, str]], raise_errors: bool = False
+    ) -> List[Observation]:
+        """Extract observations from a single chunk (map step)"""
+        try:
+            return self._parse_response(self._call_llm(self._format_messages(chunk)))
+        except Exception as e:
+            logger.error(f"Observation extraction failed for chunk: {e}")
+            if raise_errors:
+                raise
+            return []
+
+    def _observe_chunked(
+        self, messages: Iterable[Dict[str, str]], raise_errors: bool = False
+    ) -> List[Observation]:
+        """
+        Extract observations chunk by chunk on a thread pool and merge them.
+        At most ``2 * chunk_workers`` chunks are held in memory at once.
+        """
+        results: Dict[int, List[Observation]] = {}
+        in_flight: Dict[Future, int] = {}
+        max_in_flight = self.chunk_workers * 2
+
+        with ThreadPoolExecutor(
+            max_workers=self.chunk_workers, thread_name_prefix="observer-chunk"
+        ) as executor:
+            for index, chunk in enumerate(self._iter_chunks(messages)):
+                if len(in_flight) >= max_in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        results[in_flight.pop(future)] = future.result()
+                in_flight[executor.submit(self._observe_chunk, chunk, raise_errors)] = index
+
+            for future, index in in_flight.items():
+                results[index] = future.result()
+
+        merged = self._merge_observations(
+            results[index] for index in sorted(results)
+        )
+        logger.info(
+            f"Extracted {len(merged)} observations from {len(results)} chunks"
+        )
+        return merged
+
+    async def _observe_chunk_async(
+        self, chunk: List[Dict[str, str]], raise_errors: bool = False
+    ) -> List[Observation]:
+        """Async map step for a single chunk"""
+        try:
+            raw_response = await self._call_llm_async(self._format_messages(chunk))
+            return self._parse_response(raw_response)
+        except Exception as e:
+            logger.error(f"Observation extraction failed for chunk: {e}")
+            if raise_errors:
+                raise
+            return []
+
+    async def _observe_chunked_async(
+        self, messages: Iterable[Dict[str, str]], raise_errors: bool = False
+    ) -> List[Observation]:
+        """Async chunked extraction, ``chunk_workers`` chunks in flight"""
+        semaphore = asyncio.Semaphore(self.chunk_workers)
+
+        async def run(chunk: List[Dict[str, str]]) -> List[Observation]:
+            async with semaphore:
+                return await self._observe_chunk_async(chunk, raise_errors)
+
+        results = await asyncio.gather(
+            *(run(chunk) for chunk in self._iter_chunks(messages))
+        )
+        merged = self._merge_observations(results)
+        logger.info(
+            f"Extracted {len(merged)} observations from {len(results)} chunks"
+        )
+        return merged
+
+    @staticmethod
+    def _merge_observations(
+        chunk_results: Iterable[List[Observation]],
+    ) -> List[Observation]:
+        """
+        Merge per-chunk results in order, dropping duplicates (same
+        content ignoring case/punctuation) and keeping the highest priority.
+        """
+        merged: List[Observation] = []
+        seen: Dict[str, int] = {}
+
+        for observations in chunk_results:
+            for obs in observations:
+                key = _NON_WORD_RE.sub(" ", obs.content.lower()).strip()
+                if key not in seen:
+                    seen[key] = len(merged)
+                    merged.append(obs)
+                    continue
+                kept = merged[seen[key]]
+                if _PRIORITY_RANK.get(obs.priority, 1) < _PRIORITY_RANK.get(kept.priority, 1):
+                    kept.priority = obs.priority
+        return merged
 
     def _format_messages(self, messages: List[Dict[str, str]]) -> str:
         """Format messages into a conversation string"""
@@ -195,6 +486,9 @@ class Observer:
         Returns:
             Raw LLM response string
         """
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(self._request_tokens(conversation_text))
+
         if self.provider == "openai":
             return self._call_openai(conversation_text)
         elif self.provider == "google":
@@ -202,40 +496,97 @@ class Observer:
         else:
             raise ValueError(f"Unsupported provider: {self.provider}")
 
-    def _call_openai(self, conversation_text: str) -> str:
-        """Call OpenAI API"""
-        from openai import OpenAI
+    async def _call_llm_async(self, conversation_text: str) -> str:
+        """Async version of _call_llm()"""
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire_async(self._request_tokens(conversation_text))
 
-        client = OpenAI(api_key=self.api_key)
-        response = client.chat.completions.create(
+        if self.provider == "openai":
+            return await self._call_openai_async(conversation_text)
+        elif self.provider == "google":
+            return await self._call_google_async(conversation_text)
+        else:
+            raise ValueError(f"Unsupported provider: {self.provider}")
+
+    @staticmethod
+    def _request_tokens(conversation_text: str) -> int:
+        """Tokens a request counts against the limit (prompt + response cap)"""
+        return (
+            count_tokens(OBSERVER_SYSTEM_PROMPT)
+            + count_tokens(conversation_text)
+            + MAX_OUTPUT_TOKENS
+        )
+
+    def _openai_request(self, conversation_text: str) -> Dict[str, Any]:
+        """Chat completion arguments shared by the sync and async calls"""
+        return dict(
             model=self.model,
             messages=[
                 {"role": "system", "content": OBSERVER_SYSTEM_PROMPT},
                 {"role": "user", "content": f"Extract observations from this conversation:\n\n{conversation_text}"},
             ],
             temperature=0.1,
-            max_tokens=2000,
+            max_tokens=MAX_OUTPUT_TOKENS,
             response_format={"type": "json_object"},
         )
-        return response.choices[0].message.content or "[]"
+
+    def _call_openai(self, conversation_text: str) -> str:
+        """Call OpenAI API"""
+        client = get_client_registry().openai(
+            self.api_key, pool_size=self.pool_size, timeout=self.timeout
+        )
+        response = client.chat.completions.create(
+            **self._openai_request(conversation_text)
+        )
+        return self._openai_content(response)
+
+    async def _call_openai_async(self, conversation_text: str) -> str:
+        """Call OpenAI API with the async client"""
+        client = get_client_registry().async_openai(
+            self.api_key, pool_size=self.pool_size, timeout=self.timeout
+        )
+        response = await client.chat.completions.create(
+            **self._openai_request(conversation_text)
+        )
+        return self._openai_content(response)
+
+    @staticmethod
+    def _openai_content(response: Any) -> str:
+        """Extract the message text, warning if it was truncated"""
+        choice = response.choices[0]
+        if choice.finish_reason == "length":
+            logger.warning(
+                "Observer response hit max_tokens; trailing observations may be lost"
+            )
+        return choice.message.content or "[]"
 
     def _call_google(self, conversation_text: str) -> str:
         """Call Google Gemini API"""
-        import google.generativeai as genai
+        model = get_client_registry().google_model(self.api_key, self.model)
+        response = model.generate_content(
+            self._google_prompt(conversation_text),
+            request_options={"timeout": self.timeout},
+        )
+        return response.text
 
-        genai.configure(api_key=self.api_key)
-        model = genai.GenerativeModel(self.model)
+    async def _call_google_async(self, conversation_text: str) -> str:
+        """Call Google Gemini API asynchronously"""
+        model = get_client_registry().google_model(self.api_key, self.model)
+        response = await model.generate_content_async(
+            self._google_prompt(conversation_text),
+            request_options={"timeout": self.timeout},
+        )
+        return response.text
 
-        prompt = (
+    @staticmethod
+    def _google_prompt(conversation_text: str) -> str:
+        return (
             f"{OBSERVER_SYSTEM_PROMPT}\n\n"
             f"Extract observations from this conversation:\n\n"
             f"{conversation_text}\n\n"
             f"Return ONLY a JSON array."
         )
 
-        response = model.generate_content(prompt)
-        return response.text
-
     def _parse_response(self, raw_response: str) -> List[Observation]:
         """
         Parse LLM response into Observation objects.
@@ -283,8 +634,7 @@ class Observer:
             if not isinstance(item, dict):
                 continue
 
-            self._observation_counter += 1
-            obs_id = f"obs_{now.strftime('%Y%m%d')}_{self._observation_counter:04d}"
+            obs_id = f"obs_{now.strftime('%Y%m%d')}_{next(self._observation_counter):04d}"
 
             # Validate priority
             priority = item.get('priority', 'medium').lower()
@@ -327,29 +677,27 @@ class Observer:
         Returns:
             List of message dicts
         """
-        messages = []
+        return list(Observer._iter_jsonl_log(log_file))
+
+    @staticmethod
+    def _iter_jsonl_log(log_file: Path) -> Iterator[Dict[str, str]]:
+        """
+        Yield messages from a JSONL log file one line at a time.
+
+        Args:
+            log_file: Path to .jsonl file
+        """
         try:
             with open(log_file, 'r', encoding='utf-8') as f:
                 for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        entry = json.loads(line)
-                        if 'role' in entry and 'content' in entry:
-                            messages.append({
-                                'role': entry['role'],
-                                'content': entry['content'],
-                            })
-                    except json.JSONDecodeError:
-                        continue
+                    message = parse_message_line(line)
+                    if message is not None:
+                        yield message
         except FileNotFoundError:
             logger.error(f"Log file not found: {log_file}")
         except Exception as e:
             logger.error(f"Error reading log file: {e}")
 
-        return messages
-
 
 # =============================================================================
 # Convenience functions
@@ -374,4 +722,10 @@ def create_observer(config: Dict[str, Any]) -> Observer:
         provider=provider,
         model=model,
         api_key_env=api_key_env,
+        chunk_tokens=llm_config.get('chunk_tokens', 12000),
+        chunk_overlap=llm_config.get('chunk_overlap', 2),
+        chunk_workers=llm_config.get('chunk_workers', 4),
+        pool_size=llm_config.get('pool_size', DEFAULT_POOL_SIZE),
+        timeout=llm_config.get('timeout', DEFAULT_TIMEOUT),
+        rate_limiter=create_rate_limiter(config),
     )
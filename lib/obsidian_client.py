@@ -4,18 +4,28 @@ Manages Cold memory storage in Obsidian vaults
 
 Provides create/search/read operations on Obsidian notes
 via either the obsidian-cli tool or direct file manipulation.
+Search is answered from a persistent BM25 index of the vault (title,
+frontmatter, tags and body), refreshed incrementally by file mtime.
 """
 
 import logging
 import re
 import subprocess
 import shutil
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 
+from lib.config import get_state_dir
+from lib.search_index import SearchIndex
+
 logger = logging.getLogger(__name__)
 
+# Vault index file name inside the daemon state directory
+VAULT_INDEX_FILENAME = "obsidian_index.sqlite3"
+
 
 # =============================================================================
 # Data Classes
@@ -84,16 +94,32 @@ class ObsidianClient:
         vault_path: str,
         cli_path: Optional[str] = None,
         default_folder: str = "OC-Memory",
+        use_index: bool = True,
+        index_path: Optional[str] = None,
+        refresh_interval: float = 30.0,
     ):
         """
         Args:
             vault_path: Path to Obsidian vault root
             cli_path: Path to obsidian-cli binary (auto-detected if None)
             default_folder: Default folder for OC-Memory notes
+            use_index: Search through the persistent vault index instead
+                       of scanning every note
+            index_path: Index file (default: hidden file in the vault root)
+            refresh_interval: Minimum seconds between mtime scans that pick
+                              up notes edited outside this client
         """
         self.vault_path = Path(vault_path).expanduser().resolve()
         self.cli_path = cli_path or self._find_cli()
         self.default_folder = default_folder
+        self.use_index = use_index
+        self.index_path = index_path
+        self.refresh_interval = refresh_interval
+        self._index: Optional[SearchIndex] = None
+        self._index_lock = threading.Lock()
+        self._last_refresh: Optional[float] = None
+        # Bumped on every note written through this client
+        self.generation = 0
 
         # Ensure vault directory exists
         self.vault_path.mkdir(parents=True, exist_ok=True)
@@ -151,6 +177,12 @@ class ObsidianClient:
             note_path = target_dir / f"{safe_title}_{timestamp}.md"
 
         note_path.write_text(note.to_markdown(), encoding="utf-8")
+        self.generation += 1
+        if self.use_index:
+            try:
+                self.index.add_file(note_path)
+            except Exception as e:
+                logger.warning(f"Failed to index note {note_path}: {e}")
         logger.info(f"Created Obsidian note: {note_path}")
         return note_path
 
@@ -200,7 +232,9 @@ class ObsidianClient:
         """
         Search notes in the Obsidian vault.
 
-        Uses simple text matching (grep-like).
+        With the index, notes are ranked by BM25 over title, frontmatter,
+        tags and body; otherwise every note is scanned for the literal
+        query (grep-like).
 
         Args:
             query: Search query string
@@ -208,8 +242,107 @@ class ObsidianClient:
             max_results: Maximum number of results
 
         Returns:
-            List of result dicts with 'path', 'title', 'snippet'
+            List of result dicts with 'path', 'title', 'snippet', 'folder'
+            (plus 'score' and 'tags' when the index is used), best first
+        """
+        if self.use_index:
+            return self._search_index(query, folder, max_results)
+        return self._search_scan(query, folder, max_results)
+
+    @property
+    def index(self) -> SearchIndex:
+        """Persistent full-text index of the vault"""
+        with self._index_lock:
+            if self._index is None:
+                self._index = SearchIndex(
+                    str(self.vault_path),
+                    index_path=self.index_path,
+                    transform=self._index_text,
+                )
+            return self._index
+
+    @staticmethod
+    def _index_text(path: Path, raw: str) -> str:
+        """Indexed text of a note: its title (file name) followed by the raw file"""
+        return f"{path.stem}\n{raw}"
+
+    def refresh_index(self, force: bool = False) -> Dict[str, int]:
         """
+        Re-index notes whose mtime/size changed and drop deleted ones.
+        Scans at most once per ``refresh_interval`` unless forced.
+
+        Returns:
+            Dict with 'added', 'updated', 'removed' counts
+        """
+        now = time.monotonic()
+        if (
+            not force
+            and self._last_refresh is not None
+            and now - self._last_refresh < self.refresh_interval
+        ):
+            return {'added': 0, 'updated': 0, 'removed': 0}
+
+        self._last_refresh = now
+        counts = self.index.sync()
+        if any(counts.values()):
+            self.generation += 1
+        return counts
+
+    def _search_index(
+        self,
+        query: str,
+        folder: Optional[str],
+        max_results: int,
+    ) -> List[Dict[str, Any]]:
+        """Ranked search through the vault index"""
+        try:
+            self.refresh_index()
+        except Exception as e:
+            logger.warning(f"Vault index refresh failed: {e}")
+
+        prefix = f"{folder.strip('/')}/" if folder else ""
+        # Over-fetch when hits outside the folder will be dropped
+        limit = max_results * 10 if prefix else max_results
+
+        results = []
+        for hit in self.index.search(query, limit=limit):
+            if prefix and not hit.key.startswith(prefix):
+                continue
+            try:
+                raw = hit.path.read_text(encoding="utf-8")
+            except FileNotFoundError:
+                # Deleted since the last refresh
+                self.index.remove_file(hit.path)
+                continue
+            except Exception as e:
+                logger.debug(f"Error reading {hit.path}: {e}")
+                continue
+
+            frontmatter, _ = self._parse_frontmatter(raw)
+            tags = frontmatter.get('tags', [])
+            # Offsets refer to the indexed text, which starts with the title line
+            offset = hit.offset - len(hit.path.stem) - 1
+
+            results.append({
+                'path': str(hit.path),
+                'title': hit.path.stem,
+                'snippet': self._extract_snippet(raw, query, offset=offset),
+                'folder': str(hit.path.parent.relative_to(self.vault_path)),
+                'score': hit.score,
+                'tags': tags if isinstance(tags, list) else [tags],
+            })
+            if len(results) >= max_results:
+                break
+
+        return results
+
+    def _search_scan(
+        self,
+        query: str,
+        folder: Optional[str],
+        max_results: int,
+    ) -> List[Dict[str, Any]]:
+        """Literal substring search reading every note"""
         search_dir = self.vault_path / folder if folder else self.vault_path
         if not search_dir.exists():
             return []
@@ -328,14 +461,26 @@ class ObsidianClient:
         return safe[:200]  # Limit length
 
     @staticmethod
-    def _extract_snippet(content: str, query: str, context_chars: int = 100) -> str:
-        """Extract a snippet around the first match of query in content"""
+    def _extract_snippet(
+        content: str,
+        query: str,
+        context_chars: int = 100,
+        offset: Optional[int] = None,
+    ) -> str:
+        """
+        Extract a snippet around the first match of query in content.
+        Falls back to ``offset`` (e.g. from the index) when the exact
+        query string does not occur in the content.
+        """
         idx = content.lower().find(query.lower())
+        match_len = len(query)
         if idx == -1:
-            return content[:200]
+            if offset is None or not 0 <= offset < len(content):
+                return content[:200]
+            idx, match_len = offset, 0
 
         start = max(0, idx - context_chars)
-        end = min(len(content), idx + len(query) + context_chars)
+        end = min(len(content), idx + match_len + context_chars)
 
         snippet = content[start:end].strip()
         if start > 0:
@@ -357,12 +502,19 @@ class ObsidianClient:
                 fm_text = parts[1].strip()
                 content = parts[2].strip()
 
-                # Simple YAML-like parsing
+                # Simple YAML-like parsing ("key: value" and "key:" + "- item" lists)
+                list_key = None
                 for line in fm_text.split("\n"):
                     line = line.strip()
-                    if ": " in line and not line.startswith("-"):
+                    if line.startswith("- ") and list_key is not None:
+                        frontmatter[list_key].append(line[2:].strip().strip('"'))
+                    elif line.endswith(":") and not line.startswith("-"):
+                        list_key = line[:-1].strip()
+                        frontmatter[list_key] = []
+                    elif ": " in line and not line.startswith("-"):
                         key, _, value = line.partition(": ")
                         frontmatter[key.strip()] = value.strip().strip('"')
+                        list_key = None
 
         return frontmatter, content
 
@@ -379,4 +531,10 @@ def create_obsidian_client(config: Dict[str, Any]) -> Optional[ObsidianClient]:
         return None
 
     vault_path = obsidian_config.get('vault_path', '~/Documents/ObsidianVault')
-    return ObsidianClient(vault_path=vault_path)
+    return ObsidianClient(
+        vault_path=vault_path,
+        use_index=obsidian_config.get('index', True),
+        # Keep the index out of the vault (and out of vault sync)
+        index_path=str(get_state_dir(config) / VAULT_INDEX_FILENAME),
+        refresh_interval=obsidian_config.get('refresh_interval', 30.0),
+    )
@@ -0,0 +1,141 @@
+"""
+Query Cache for OC-Memory
+LRU + TTL cache of search results with per-tier invalidation
+
+Each entry remembers the generation of every tier it was computed
+from. A lookup whose current generations differ from the stored ones
+is a miss, so writes to a tier invalidate exactly the entries that
+read it, while the TTL bounds staleness from changes made outside
+this process.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _Entry:
+    __slots__ = ('value', 'tiers', 'versions', 'expires')
+
+    def __init__(self, value: Any, versions: Dict[str, Any], expires: float):
+        self.value = value
+        self.tiers = frozenset(versions)
+        self.versions = versions
+        self.expires = expires
+
+
+# =============================================================================
+# Query Cache
+# =============================================================================
+
+class QueryCache:
+    """Thread-safe LRU cache whose entries expire and track tier versions"""
+
+    def __init__(self, max_entries: int = 256, ttl: float = 60.0):
+        """
+        Args:
+            max_entries: Maximum number of cached queries (LRU eviction)
+            ttl: Seconds an entry stays valid (0 = until invalidated)
+        """
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.invalidated = 0
+        self.evicted = 0
+
+    def get(self, key: Hashable, versions: Dict[str, Any]) -> Optional[Any]:
+        """
+        Look up a cached value.
+
+        Args:
+            key: Query key
+            versions: Current generation of every tier the query reads
+
+        Returns:
+            Cached value, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            if entry.expires and entry.expires <= time.monotonic():
+                del self._entries[key]
+                self.expired += 1
+                self.misses += 1
+                return None
+
+            if entry.versions != versions:
+                del self._entries[key]
+                self.invalidated += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def put(self, key: Hashable, value: Any, versions: Dict[str, Any]) -> None:
+        """
+        Store a value computed at the given tier versions.
+
+        Args:
+            key: Query key
+            value: Value to cache
+            versions: Tier generations read before computing the value
+        """
+        expires = time.monotonic() + self.ttl if self.ttl > 0 else 0.0
+        with self._lock:
+            self._entries[key] = _Entry(value, dict(versions), expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evicted += 1
+
+    def invalidate(self, tiers: Optional[Iterable[str]] = None) -> int:
+        """
+        Drop entries that read any of the given tiers (all entries if None).
+
+        Returns:
+            Number of entries dropped
+        """
+        with self._lock:
+            if tiers is None:
+                dropped = len(self._entries)
+                self._entries.clear()
+            else:
+                tiers = set(tiers)
+                stale = [k for k, e in self._entries.items() if e.tiers & tiers]
+                for key in stale:
+                    del self._entries[key]
+                dropped = len(stale)
+            self.invalidated += dropped
+        return dropped
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'expired': self.expired,
+                'invalidated': self.invalidated,
+                'evicted': self.evicted,
+            }
@@ -0,0 +1,123 @@
+"""
+Rank Fusion for OC-Memory
+Combine ranked result lists whose scores are not comparable
+
+Each ranker (a memory tier, or BM25 vs. vectors) produces scores on
+its own scale. Reciprocal-rank fusion uses only each item's position
+in its list; min-max fusion rescales every list to [0, 1] first. Both
+apply a per-list weight.
+"""
+
+import logging
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Standard RRF damping constant (Cormack et al.)
+RRF_K = 60
+
+FUSION_METHODS = ("rrf", "minmax")
+
+Ranking = Sequence[Tuple[Any, float]]
+
+
+def _ranked(items: Ranking) -> List[Tuple[Any, float]]:
+    """Items best-first (stable, so equal scores keep the ranker's order)"""
+    return sorted(items, key=lambda pair: pair[1], reverse=True)
+
+
+def reciprocal_rank_fusion(
+    rankings: Dict[str, Ranking],
+    weights: Optional[Dict[str, float]] = None,
+    k: int = RRF_K,
+    key: Optional[Callable[[Any], Hashable]] = None,
+) -> List[Tuple[Any, float]]:
+    """
+    Fuse rankings by summing weight / (k + rank) per item.
+
+    Args:
+        rankings: List name -> (item, score) pairs
+        weights: List name -> weight (default 1.0)
+        k: Damping constant; larger values flatten rank differences
+        key: Identity of an item across lists (default: the object itself)
+
+    Returns:
+        (item, fused score) pairs, best first. Items found by several
+        lists appear once, as the first object seen.
+    """
+    weights = weights or {}
+    key = key or id
+    fused: Dict[Hashable, List[Any]] = {}
+
+    for name, items in rankings.items():
+        weight = weights.get(name, 1.0)
+        for rank, (item, _) in enumerate(_ranked(items), start=1):
+            entry = fused.setdefault(key(item), [item, 0.0])
+            entry[1] += weight / (k + rank)
+
+    return sorted(
+        ((item, score) for item, score in fused.values()),
+        key=lambda pair: pair[1],
+        reverse=True,
+    )
+
+
+def minmax_fusion(
+    rankings: Dict[str, Ranking],
+    weights: Optional[Dict[str, float]] = None,
+    key: Optional[Callable[[Any], Hashable]] = None,
+) -> List[Tuple[Any, float]]:
+    """
+    Fuse rankings by summing weight * min-max normalized score per item.
+
+    A list whose scores are all equal maps every item to 1.0.
+
+    Args:
+        rankings: List name -> (item, score) pairs
+        weights: List name -> weight (default 1.0)
+        key: Identity of an item across lists (default: the object itself)
+
+    Returns:
+        (item, fused score) pairs, best first
+    """
+    weights = weights or {}
+    key = key or id
+    fused: Dict[Hashable, List[Any]] = {}
+
+    for name, items in rankings.items():
+        if not items:
+            continue
+        weight = weights.get(name, 1.0)
+        scores = [score for _, score in items]
+        low, high = min(scores), max(scores)
+        span = high - low
+        for item, score in items:
+            normalized = (score - low) / span if span > 0 else 1.0
+            entry = fused.setdefault(key(item), [item, 0.0])
+            entry[1] += weight * normalized
+
+    return sorted(
+        ((item, score) for item, score in fused.values()),
+        key=lambda pair: pair[1],
+        reverse=True,
+    )
+
+
+def fuse(
+    rankings: Dict[str, Ranking],
+    method: str = "rrf",
+    weights: Optional[Dict[str, float]] = None,
+    k: int = RRF_K,
+    key: Optional[Callable[[Any], Hashable]] = None,
+) -> List[Tuple[Any, float]]:
+    """
+    Fuse rankings with the named method ('rrf' or 'minmax').
+
+    Raises:
+        ValueError: Unknown method
+    """
+    if method == "rrf":
+        return reciprocal_rank_fusion(rankings, weights=weights, k=k, key=key)
+    if method == "minmax":
+        return minmax_fusion(rankings, weights=weights, key=key)
+    raise ValueError(f"Unknown fusion method: {method} (expected one of {FUSION_METHODS})")
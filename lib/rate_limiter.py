@@ -0,0 +1,235 @@
+"""
+Rate Limiter for OC-Memory
+Client-side token buckets for LLM provider limits
+
+Keeps requests/minute and tokens/minute under the provider's limits
+before a request is sent, so bulk work (backfills, batches) runs at the
+highest sustainable throughput instead of bursting into 429 responses
+and sleeping through retry backoff.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds of budget a bucket may accumulate while idle
+BURST_SECONDS = 10.0
+
+
+# =============================================================================
+# Token Bucket
+# =============================================================================
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at ``rate`` per second.
+
+    ``reserve`` debits immediately and returns how long the caller must
+    wait, so concurrent callers are served in arrival order and the
+    balance may go negative for requests larger than the capacity.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            rate: Units added per second
+            capacity: Maximum balance
+            clock: Monotonic time source in seconds
+        """
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self._clock = clock
+        self._balance = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """
+        Take ``amount`` units from the bucket.
+
+        Returns:
+            Seconds to wait before the reserved units may be used
+        """
+        with self._lock:
+            now = self._clock()
+            self._balance = min(
+                self.capacity, self._balance + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._balance -= amount
+            if self._balance >= 0:
+                return 0.0
+            return -self._balance / self.rate
+
+    @property
+    def available(self) -> float:
+        """Current balance (may be negative while requests are queued)"""
+        with self._lock:
+            elapsed = self._clock() - self._updated
+            return min(self.capacity, self._balance + elapsed * self.rate)
+
+
+# =============================================================================
+# Rate Limiter
+# =============================================================================
+
+class RateLimiter:
+    """
+    Requests/minute and tokens/minute limits for one provider/model.
+    A limit of 0 disables that dimension.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        Args:
+            requests_per_minute: Maximum requests per minute (0 = unlimited)
+            tokens_per_minute: Maximum tokens per minute (0 = unlimited)
+            clock: Monotonic time source in seconds
+            sleep: Blocking sleep used by acquire()
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._clock = clock
+        self._sleep = sleep
+
+        self._requests = self._bucket(requests_per_minute)
+        self._tokens = self._bucket(tokens_per_minute)
+        self._lock = threading.Lock()
+
+        # Statistics
+        self.acquired = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+
+    def _bucket(self, per_minute: int) -> Optional[TokenBucket]:
+        if per_minute <= 0:
+            return None
+        rate = per_minute / 60.0
+        return TokenBucket(rate=rate, capacity=rate * BURST_SECONDS, clock=self._clock)
+
+    def reserve(self, tokens: int = 0) -> float:
+        """
+        Reserve one request of ``tokens`` tokens.
+
+        Returns:
+            Seconds to wait before sending
+        """
+        wait = 0.0
+        if self._requests is not None:
+            wait = max(wait, self._requests.reserve(1))
+        if self._tokens is not None and tokens > 0:
+            wait = max(wait, self._tokens.reserve(tokens))
+
+        with self._lock:
+            self.acquired += 1
+            if wait > 0:
+                self.throttled += 1
+                self.total_wait += wait
+        return wait
+
+    def acquire(self, tokens: int = 0) -> float:
+        """
+        Block until a request of ``tokens`` tokens may be sent.
+
+        Returns:
+            Seconds waited
+        """
+        wait = self.reserve(tokens)
+        if wait > 0:
+            logger.debug(f"Rate limited, waiting {wait:.2f}s")
+            self._sleep(wait)
+        return wait
+
+    async def acquire_async(self, tokens: int = 0) -> float:
+        """Async version of acquire()"""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            logger.debug(f"Rate limited, waiting {wait:.2f}s")
+            await asyncio.sleep(wait)
+        return wait
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get limiter statistics"""
+        return {
+            'requests_per_minute': self.requests_per_minute,
+            'tokens_per_minute': self.tokens_per_minute,
+            'acquired': self.acquired,
+            'throttled': self.throttled,
+            'total_wait_seconds': round(self.total_wait, 2),
+        }
+
+
+# =============================================================================
+# Shared limiters
+# =============================================================================
+
+_limiters: Dict[Tuple[str, str], RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(
+    provider: str,
+    model: str,
+    requests_per_minute: int = 0,
+    tokens_per_minute: int = 0,
+) -> RateLimiter:
+    """
+    Get the process-wide limiter for a provider/model, so every caller
+    (Observer, Reflector, workers) draws from the same budget.
+    A limiter is rebuilt if it is requested with different limits.
+    """
+    key = (provider, model)
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if (
+            limiter is None
+            or limiter.requests_per_minute != requests_per_minute
+            or limiter.tokens_per_minute != tokens_per_minute
+        ):
+            limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+            _limiters[key] = limiter
+        return limiter
+
+
+def create_rate_limiter(
+    config: Dict[str, Any],
+    model: Optional[str] = None,
+) -> Optional[RateLimiter]:
+    """
+    Create (or share) the limiter configured in ``llm.rate_limit``.
+
+    Args:
+        config: Configuration dict with optional 'llm' section
+        model: Resolved model name (defaults to llm.model)
+
+    Returns:
+        RateLimiter, or None if no limits are configured
+    """
+    llm_config = config.get('llm', {})
+    limits = llm_config.get('rate_limit', {})
+    rpm = limits.get('requests_per_minute', 0)
+    tpm = limits.get('tokens_per_minute', 0)
+    if not rpm and not tpm:
+        return None
+
+    return get_rate_limiter(
+        llm_config.get('provider', 'openai'),
+        model or llm_config.get('model') or 'default',
+        requests_per_minute=rpm,
+        tokens_per_minute=tpm,
+    )
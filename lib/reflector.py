@@ -13,8 +13,15 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 
+from lib.llm_clients import DEFAULT_POOL_SIZE, DEFAULT_TIMEOUT, get_client_registry
+from lib.rate_limiter import RateLimiter, create_rate_limiter
+from lib.tokenizer import count_tokens
+
 logger = logging.getLogger(__name__)
 
+# Response token cap for compression calls
+MAX_OUTPUT_TOKENS = 4000
+
 
 # =============================================================================
 # Data Classes
@@ -74,10 +81,16 @@ class Reflector:
         model: Optional[str] = None,
         api_key: Optional[str] = None,
         api_key_env: str = "OPENAI_API_KEY",
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: float = DEFAULT_TIMEOUT,
+        rate_limiter: Optional[RateLimiter] = None,
     ):
         self.provider = provider
         self.model = model or self._default_model(provider)
         self.api_key = api_key or os.environ.get(api_key_env, "")
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
         self.history: List[ReflectionResult] = []
 
     @staticmethod
@@ -108,46 +121,71 @@ class Reflector:
 
         if not self.api_key:
             logger.error("Cannot reflect: no API key configured")
-            return ReflectionResult(
-                original_tokens=original_tokens,
-                compressed_tokens=original_tokens,
-                compression_ratio=1.0,
-                compressed_content=observations_text,
-                level=level,
-                timestamp=datetime.now(),
-            )
+            return self._unchanged_result(observations_text, original_tokens, level)
 
         try:
             compressed = self._call_llm(observations_text, level)
-            compressed_tokens = self._estimate_tokens(compressed)
-            ratio = original_tokens / max(compressed_tokens, 1)
-
-            result = ReflectionResult(
-                original_tokens=original_tokens,
-                compressed_tokens=compressed_tokens,
-                compression_ratio=round(ratio, 1),
-                compressed_content=compressed,
-                level=level,
-                timestamp=datetime.now(),
-            )
-
-            self.history.append(result)
-            logger.info(
-                f"Compression: {original_tokens} -> {compressed_tokens} tokens "
-                f"({ratio:.1f}x at level {level})"
-            )
-            return result
+        except Exception as e:
+            logger.error(f"Reflection failed: {e}")
+            return self._unchanged_result(observations_text, original_tokens, level)
+
+        return self._record_result(compressed, original_tokens, level)
+
+    async def reflect_async(
+        self,
+        observations_text: str,
+        level: int = 1,
+    ) -> ReflectionResult:
+        """Async version of reflect() using the providers' async clients"""
+        level = max(1, min(3, level))
+        original_tokens = self._estimate_tokens(observations_text)
+
+        if not self.api_key:
+            logger.error("Cannot reflect: no API key configured")
+            return self._unchanged_result(observations_text, original_tokens, level)
 
+        try:
+            compressed = await self._call_llm_async(observations_text, level)
         except Exception as e:
             logger.error(f"Reflection failed: {e}")
-            return ReflectionResult(
-                original_tokens=original_tokens,
-                compressed_tokens=original_tokens,
-                compression_ratio=1.0,
-                compressed_content=observations_text,
-                level=level,
-                timestamp=datetime.now(),
-            )
+            return self._unchanged_result(observations_text, original_tokens, level)
+
+        return self._record_result(compressed, original_tokens, level)
+
+    @staticmethod
+    def _unchanged_result(text: str, tokens: int, level: int) -> ReflectionResult:
+        """Result returned when compression could not run"""
+        return ReflectionResult(
+            original_tokens=tokens,
+            compressed_tokens=tokens,
+            compression_ratio=1.0,
+            compressed_content=text,
+            level=level,
+            timestamp=datetime.now(),
+        )
+
+    def _record_result(
+        self, compressed: str, original_tokens: int, level: int
+    ) -> ReflectionResult:
+        """Build the result for a successful compression and keep it in history"""
+        compressed_tokens = self._estimate_tokens(compressed)
+        ratio = original_tokens / max(compressed_tokens, 1)
+
+        result = ReflectionResult(
+            original_tokens=original_tokens,
+            compressed_tokens=compressed_tokens,
+            compression_ratio=round(ratio, 1),
+            compressed_content=compressed,
+            level=level,
+            timestamp=datetime.now(),
+        )
+
+        self.history.append(result)
+        logger.info(
+            f"Compression: {original_tokens} -> {compressed_tokens} tokens "
+            f"({ratio:.1f}x at level {level})"
+        )
+        return result
 
     def should_reflect(self, token_count: int, threshold: int = 40000) -> bool:
         """Check if compression is needed based on token count"""
@@ -187,11 +225,9 @@ class Reflector:
 
     def _call_llm(self, text: str, level: int) -> str:
         """Call LLM for compression"""
-        prompt = (
-            f"{REFLECTOR_SYSTEM_PROMPT}\n\n"
-            f"Compression Level: {level}\n\n"
-            f"Compress these observations:\n\n{text}"
-        )
+        prompt = self._build_prompt(text, level)
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(count_tokens(prompt) + MAX_OUTPUT_TOKENS)
 
         if self.provider == "openai":
             return self._call_openai(prompt)
@@ -200,33 +236,70 @@ class Reflector:
         else:
             raise ValueError(f"Unsupported provider: {self.provider}")
 
-    def _call_openai(self, prompt: str) -> str:
-        from openai import OpenAI
-        client = OpenAI(api_key=self.api_key)
-        response = client.chat.completions.create(
+    async def _call_llm_async(self, text: str, level: int) -> str:
+        """Async version of _call_llm()"""
+        prompt = self._build_prompt(text, level)
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire_async(count_tokens(prompt) + MAX_OUTPUT_TOKENS)
+
+        if self.provider == "openai":
+            return await self._call_openai_async(prompt)
+        elif self.provider == "google":
+            return await self._call_google_async(prompt)
+        else:
+            raise ValueError(f"Unsupported provider: {self.provider}")
+
+    @staticmethod
+    def _build_prompt(text: str, level: int) -> str:
+        return (
+            f"{REFLECTOR_SYSTEM_PROMPT}\n\n"
+            f"Compression Level: {level}\n\n"
+            f"Compress these observations:\n\n{text}"
+        )
+
+    def _openai_request(self, prompt: str) -> Dict[str, Any]:
+        return dict(
             model=self.model,
             messages=[
                 {"role": "system", "content": "You are a memory compression agent."},
                 {"role": "user", "content": prompt},
             ],
             temperature=0.1,
-            max_tokens=4000,
+            max_tokens=MAX_OUTPUT_TOKENS,
         )
+
+    def _call_openai(self, prompt: str) -> str:
+        client = get_client_registry().openai(
+            self.api_key, pool_size=self.pool_size, timeout=self.timeout
+        )
+        response = client.chat.completions.create(**self._openai_request(prompt))
+        return response.choices[0].message.content or ""
+
+    async def _call_openai_async(self, prompt: str) -> str:
+        client = get_client_registry().async_openai(
+            self.api_key, pool_size=self.pool_size, timeout=self.timeout
+        )
+        response = await client.chat.completions.create(**self._openai_request(prompt))
         return response.choices[0].message.content or ""
 
     def _call_google(self, prompt: str) -> str:
-        import google.generativeai as genai
-        genai.configure(api_key=self.api_key)
-        model = genai.GenerativeModel(self.model)
-        response = model.generate_content(prompt)
+        model = get_client_registry().google_model(self.api_key, self.model)
+        response = model.generate_content(
+            prompt, request_options={"timeout": self.timeout}
+        )
+        return response.text
+
+    async def _call_google_async(self, prompt: str) -> str:
+        model = get_client_registry().google_model(self.api_key, self.model)
+        response = await model.generate_content_async(
+            prompt, request_options={"timeout": self.timeout}
+        )
         return response.text
 
     @staticmethod
     def _estimate_tokens(text: str) -> int:
-        """Estimate token count"""
-        if not text:
-            return 0
-        return int(len(text.split()) * 1.3)
+        """Count tokens with the shared (cached) tokenizer"""
+        return count_tokens(text)
 
 
 def create_reflector(config: Dict[str, Any]) -> Reflector:
@@ -236,4 +309,7 @@ def create_reflector(config: Dict[str, Any]) -> Reflector:
         provider=llm_config.get('provider', 'openai'),
         model=llm_config.get('model'),
         api_key_env=llm_config.get('api_key_env', 'OPENAI_API_KEY'),
+        pool_size=llm_config.get('pool_size', DEFAULT_POOL_SIZE),
+        timeout=llm_config.get('timeout', DEFAULT_TIMEOUT),
+        rate_limiter=create_rate_limiter(config),
     )
@@ -0,0 +1,459 @@
+"""
+Search Index for OC-Memory
+Persistent inverted index with BM25 ranking
+
+Stores term -> posting lists (document id, term frequency, first offset)
+in a SQLite file so tiers backed by markdown files can be searched
+without reading every file on every query. Documents that are not
+files (e.g. vector store observations) can be indexed under any key.
+"""
+
+import logging
+import math
+import re
+import sqlite3
+import threading
+from contextlib import closing
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from lib.tokenizer import CJK_RE
+
+logger = logging.getLogger(__name__)
+
+# Default index file name, stored inside the indexed directory
+INDEX_FILENAME = ".search_index.sqlite3"
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    length INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL,
+    doc_id INTEGER NOT NULL,
+    tf INTEGER NOT NULL,
+    pos INTEGER NOT NULL,
+    PRIMARY KEY (term, doc_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc_id);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+# Files written per transaction by sync()
+SYNC_BATCH_SIZE = 500
+
+_BUMP_GENERATION = (
+    "INSERT INTO meta (key, value) VALUES ('generation', 1) "
+    "ON CONFLICT(key) DO UPDATE SET value = value + 1"
+)
+
+
+# =============================================================================
+# Tokenization
+# =============================================================================
+
+def tokenize_with_offsets(text: str) -> List[Tuple[str, int]]:
+    """
+    Split text into lowercase terms with their character offsets.
+
+    Words containing Korean/CJK characters additionally emit character
+    bigrams, so a query for a stem still matches words with particles
+    attached (e.g. "메모리" matches "메모리를").
+
+    Returns:
+        List of (term, offset) tuples
+    """
+    terms = []
+    for match in _WORD_RE.finditer(text):
+        word = match.group().lower()
+        start = match.start()
+        terms.append((word, start))
+        if len(word) > 2 and CJK_RE.search(word):
+            for i in range(len(word) - 1):
+                terms.append((word[i:i + 2], start + i))
+    return terms
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase index terms"""
+    return [term for term, _ in tokenize_with_offsets(text)]
+
+
+# =============================================================================
+# Search Hit
+# =============================================================================
+
+@dataclass
+class IndexHit:
+    """A single ranked document from the index"""
+    path: Path
+    score: float
+    offset: int  # character offset of the best matching term
+    key: str = ""  # document key (relative path, or add_documents key)
+
+
+# =============================================================================
+# Search Index
+# =============================================================================
+
+class SearchIndex:
+    """
+    SQLite-backed inverted index over the files of one directory.
+
+    Documents are keyed by their path relative to ``root`` and carry the
+    (mtime, size) they were indexed at, so ``sync`` only re-reads files
+    that actually changed. Every change bumps a persistent ``generation``
+    so other instances (and result caches) can tell the index moved on.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        index_path: Optional[str] = None,
+        pattern: str = "*.md",
+        transform: Optional[Callable[[Path, str], str]] = None,
+    ):
+        """
+        Args:
+            root: Directory whose files are indexed
+            index_path: SQLite file path (default: root/INDEX_FILENAME)
+            pattern: Glob pattern of files to index
+            transform: Maps (file path, file content) to the text that is
+                       indexed, e.g. to add fields not in the file body;
+                       hit offsets refer to the transformed text
+        """
+        self.root = Path(root).expanduser().resolve()
+        self.index_path = Path(
+            index_path or str(self.root / INDEX_FILENAME)
+        ).expanduser().resolve()
+        self.pattern = pattern
+        self.transform = transform
+        self._lock = threading.Lock()
+
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a short-lived connection (safe across threads/processes)"""
+        return sqlite3.connect(str(self.index_path), timeout=30.0)
+
+    def _key(self, file_path: Path) -> str:
+        """Index key for a file: posix path relative to root"""
+        path = Path(file_path).expanduser().resolve()
+        try:
+            return path.relative_to(self.root).as_posix()
+        except ValueError:
+            return path.as_posix()
+
+    # =========================================================================
+    # Updates
+    # =========================================================================
+
+    def add_file(self, file_path: Path, content: Optional[str] = None) -> bool:
+        """
+        Index (or re-index) a single file.
+
+        Args:
+            file_path: File to index
+            content: File content (read from disk if None)
+
+        Returns:
+            True if the file was indexed
+        """
+        file_path = Path(file_path)
+        doc = self._prepare_file(file_path, self._key(file_path), content)
+        if doc is None:
+            return False
+
+        with self._lock, closing(self._connect()) as conn, conn:
+            self._write_doc(conn, *doc)
+            conn.execute(_BUMP_GENERATION)
+
+        logger.debug(f"Indexed {doc[0]} ({doc[2]} terms)")
+        return True
+
+    def _prepare_file(
+        self, file_path: Path, key: str, content: Optional[str] = None
+    ) -> Optional[tuple]:
+        """Read and tokenize a file into _write_doc() arguments (None if unreadable)"""
+        try:
+            stat = file_path.stat()
+            if content is None:
+                content = file_path.read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError) as e:
+            logger.debug(f"Cannot index {file_path}: {e}")
+            return None
+
+        if self.transform is not None:
+            content = self.transform(file_path, content)
+        postings, length = self._postings(content)
+        return key, postings, length, stat.st_mtime, stat.st_size
+
+    def add_documents(self, documents: Iterable[Tuple[str, str]]) -> int:
+        """
+        Index (or re-index) documents that are not files, in one transaction.
+
+        Args:
+            documents: (key, content) pairs; keys are opaque strings
+
+        Returns:
+            Number of documents indexed
+        """
+        prepared = [
+            (key, len(content), *self._postings(content)) for key, content in documents
+        ]
+        if not prepared:
+            return 0
+        with self._lock, closing(self._connect()) as conn, conn:
+            for key, size, postings, length in prepared:
+                self._write_doc(conn, key, postings, length, 0.0, size)
+            conn.execute(_BUMP_GENERATION)
+        return len(prepared)
+
+    @staticmethod
+    def _postings(content: str) -> Tuple[Dict[str, List[int]], int]:
+        """Term -> [tf, first offset] of a document, and its length in terms"""
+        postings: Dict[str, List[int]] = {}
+        length = 0
+        for term, offset in tokenize_with_offsets(content):
+            length += 1
+            entry = postings.get(term)
+            if entry is None:
+                postings[term] = [1, offset]
+            else:
+                entry[0] += 1
+        return postings, length
+
+    @staticmethod
+    def _write_doc(
+        conn: sqlite3.Connection,
+        key: str,
+        postings: Dict[str, List[int]],
+        length: int,
+        mtime: float,
+        size: int,
+    ) -> None:
+        """Replace the postings of one document"""
+        row = conn.execute("SELECT id FROM docs WHERE path = ?", (key,)).fetchone()
+        if row:
+            doc_id = row[0]
+            conn.execute("DELETE FROM postings WHERE doc_id = ?", (doc_id,))
+            conn.execute(
+                "UPDATE docs SET mtime = ?, size = ?, length = ? WHERE id = ?",
+                (mtime, size, length, doc_id),
+            )
+        else:
+            doc_id = conn.execute(
+                "INSERT INTO docs (path, mtime, size, length) VALUES (?, ?, ?, ?)",
+                (key, mtime, size, length),
+            ).lastrowid
+        conn.executemany(
+            "INSERT INTO postings (term, doc_id, tf, pos) VALUES (?, ?, ?, ?)",
+            ((term, doc_id, tf, pos) for term, (tf, pos) in postings.items()),
+        )
+
+    def remove_file(self, file_path: Path) -> bool:
+        """
+        Remove a file from the index.
+
+        Returns:
+            True if the file was indexed before
+        """
+        return self._remove_keys([self._key(file_path)]) > 0
+
+    def remove_keys(self, keys: Iterable[str]) -> int:
+        """
+        Remove documents by key (see add_documents).
+
+        Returns:
+            Number of documents removed
+        """
+        return self._remove_keys(keys)
+
+    def _remove_keys(self, keys: Iterable[str]) -> int:
+        removed = 0
+        with self._lock, closing(self._connect()) as conn, conn:
+            for key in keys:
+                row = conn.execute("SELECT id FROM docs WHERE path = ?", (key,)).fetchone()
+                if not row:
+                    continue
+                conn.execute("DELETE FROM postings WHERE doc_id = ?", (row[0],))
+                conn.execute("DELETE FROM docs WHERE id = ?", (row[0],))
+                removed += 1
+            if removed:
+                conn.execute(_BUMP_GENERATION)
+        return removed
+
+    def sync(self) -> Dict[str, int]:
+        """
+        Bring the index up to date with the files under root.
+        Only files whose (mtime, size) changed are re-read.
+
+        Returns:
+            Dict with 'added', 'updated', 'removed' counts
+        """
+        counts = {'added': 0, 'updated': 0, 'removed': 0}
+        if not self.root.exists():
+            return counts
+
+        with closing(self._connect()) as conn:
+            indexed = {
+                path: (mtime, size)
+                for path, mtime, size in conn.execute("SELECT path, mtime, size FROM docs")
+            }
+
+        seen = set()
+        batch = []
+        for file_path in self.root.rglob(self.pattern):
+            try:
+                stat = file_path.stat()
+            except OSError:
+                continue
+            # rglob yields paths under the resolved root; no need to resolve each
+            key = file_path.relative_to(self.root).as_posix()
+            seen.add(key)
+
+            previous = indexed.get(key)
+            if previous == (stat.st_mtime, stat.st_size):
+                continue
+            doc = self._prepare_file(file_path, key)
+            if doc is None:
+                continue
+            batch.append(doc)
+            counts['updated' if previous else 'added'] += 1
+            if len(batch) >= SYNC_BATCH_SIZE:
+                self._write_batch(batch)
+                batch = []
+        self._write_batch(batch)
+
+        counts['removed'] = self._remove_keys(k for k in indexed if k not in seen)
+
+        if any(counts.values()):
+            logger.info(f"Search index synced ({self.root}): {counts}")
+        return counts
+
+    def _write_batch(self, docs: List[tuple]) -> None:
+        """Write prepared documents in one transaction"""
+        if not docs:
+            return
+        with self._lock, closing(self._connect()) as conn, conn:
+            for doc in docs:
+                self._write_doc(conn, *doc)
+            conn.execute(_BUMP_GENERATION)
+
+    def clear(self) -> None:
+        """Remove all documents from the index"""
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM postings")
+            conn.execute("DELETE FROM docs")
+            conn.execute(_BUMP_GENERATION)
+
+    # =========================================================================
+    # Queries
+    # =========================================================================
+
+    def search(self, query: str, limit: int = 10) -> List[IndexHit]:
+        """
+        Rank indexed documents against a query with BM25.
+
+        Args:
+            query: Free-text query
+            limit: Maximum number of hits
+
+        Returns:
+            List of IndexHit objects, best first
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or limit <= 0:
+            return []
+
+        scores: Dict[int, float] = {}
+        offsets: Dict[int, Tuple[float, int]] = {}
+
+        with closing(self._connect()) as conn:
+            n_docs, avg_len = conn.execute(
+                "SELECT COUNT(*), AVG(length) FROM docs"
+            ).fetchone()
+            if not n_docs:
+                return []
+            avg_len = avg_len or 1.0
+
+            for term in terms:
+                rows = conn.execute(
+                    "SELECT p.doc_id, p.tf, p.pos, d.length FROM postings p "
+                    "JOIN docs d ON d.id = p.doc_id WHERE p.term = ?",
+                    (term,),
+                ).fetchall()
+                if not rows:
+                    continue
+
+                df = len(rows)
+                idf = math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+                for doc_id, tf, pos, length in rows:
+                    norm = BM25_K1 * (1.0 - BM25_B + BM25_B * length / avg_len)
+                    term_score = idf * tf * (BM25_K1 + 1.0) / (tf + norm)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + term_score
+                    # Remember where the strongest term occurs (for snippets)
+                    if doc_id not in offsets or term_score > offsets[doc_id][0]:
+                        offsets[doc_id] = (term_score, pos)
+
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+            if not ranked:
+                return []
+
+            placeholders = ",".join("?" * len(ranked))
+            paths = dict(conn.execute(
+                f"SELECT id, path FROM docs WHERE id IN ({placeholders})",
+                [doc_id for doc_id, _ in ranked],
+            ))
+
+        return [
+            IndexHit(
+                path=self.root / paths[doc_id],
+                score=score,
+                offset=offsets[doc_id][1],
+                key=paths[doc_id],
+            )
+            for doc_id, score in ranked
+            if doc_id in paths
+        ]
+
+    @property
+    def generation(self) -> int:
+        """Change counter, bumped by every add/remove/clear"""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT value FROM meta WHERE key = 'generation'"
+            ).fetchone()
+        return row[0] if row else 0
+
+    def count(self) -> int:
+        """Number of indexed documents"""
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+    def get_stats(self) -> Dict[str, object]:
+        """Get index statistics"""
+        with closing(self._connect()) as conn:
+            docs = conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+            terms = conn.execute("SELECT COUNT(DISTINCT term) FROM postings").fetchone()[0]
+        return {
+            'documents': docs,
+            'terms': terms,
+            'index_path': str(self.index_path),
+        }
@@ -0,0 +1,279 @@
+"""
+Tokenizer for OC-Memory
+Token counting for memory budget enforcement
+
+Provides an exact BPE backend (tiktoken) with a heuristic fallback,
+plus a per-line LRU cache so repeated counting of the same memory
+lines stays cheap. The 'auto' backend never downloads an encoding:
+it uses tiktoken only when the encoding is already cached locally.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Approximate tokens per whitespace-separated (non-CJK) word
+TOKENS_PER_WORD = 1.3
+
+# Approximate tokens per Korean/CJK character (BPE vocabularies encode
+# these at roughly one token per syllable/ideograph)
+TOKENS_PER_CJK_CHAR = 1.0
+
+# Default BPE encoding for the tiktoken backend
+DEFAULT_ENCODING = "o200k_base"
+
+# Where tiktoken downloads the standard encodings from (its cache key)
+_ENCODING_URL = "https://openaipublic.blob.core.windows.net/encodings/{name}.tiktoken"
+
+# Hangul, CJK ideographs, Hiragana/Katakana
+CJK_RE = re.compile(r"[\u1100-\u11ff\u3040-\u30ff\u3130-\u318f\u3400-\u9fff\uac00-\ud7af]")
+
+
+# =============================================================================
+# Tokenizers
+# =============================================================================
+
+def encoding_cached(encoding: str) -> bool:
+    """
+    Whether a tiktoken encoding can be loaded without a download.
+
+    Mirrors tiktoken's cache lookup: TIKTOKEN_CACHE_DIR, then
+    DATA_GYM_CACHE_DIR, then <tmp>/data-gym-cache (an empty value
+    disables the cache).
+    """
+    if "TIKTOKEN_CACHE_DIR" in os.environ:
+        cache_dir = os.environ["TIKTOKEN_CACHE_DIR"]
+    elif "DATA_GYM_CACHE_DIR" in os.environ:
+        cache_dir = os.environ["DATA_GYM_CACHE_DIR"]
+    else:
+        cache_dir = os.path.join(tempfile.gettempdir(), "data-gym-cache")
+    if not cache_dir:
+        return False
+    key = hashlib.sha1(_ENCODING_URL.format(name=encoding).encode()).hexdigest()
+    return os.path.exists(os.path.join(cache_dir, key))
+
+
+class Tokenizer(ABC):
+    """Base class: counts tokens in a piece of text"""
+
+    name = "base"
+
+    @abstractmethod
+    def count(self, text: str) -> int:
+        """Number of tokens in text"""
+
+
+class HeuristicTokenizer(Tokenizer):
+    """
+    Offline approximation without any vocabulary.
+    Latin words count as TOKENS_PER_WORD, CJK characters individually.
+    """
+
+    name = "heuristic"
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        cjk_chars = len(CJK_RE.findall(text))
+        if cjk_chars:
+            words = len(CJK_RE.sub(" ", text).split())
+        else:
+            words = len(text.split())
+        return int(words * TOKENS_PER_WORD + cjk_chars * TOKENS_PER_CJK_CHAR)
+
+
+class TiktokenTokenizer(Tokenizer):
+    """
+    Exact BPE counts via tiktoken.
+
+    Works offline once the encoding file is in tiktoken's cache
+    (set TIKTOKEN_CACHE_DIR to a pre-populated directory).
+    """
+
+    name = "tiktoken"
+
+    def __init__(
+        self,
+        encoding: str = DEFAULT_ENCODING,
+        model: Optional[str] = None,
+        offline: bool = False,
+    ):
+        """
+        Args:
+            encoding: tiktoken encoding name
+            model: Model name; its encoding takes precedence if known
+            offline: Refuse to load an encoding that is not cached locally
+
+        Raises:
+            ImportError: If tiktoken is not installed
+            LookupError: If offline and the encoding is not cached
+            Exception: If the encoding cannot be loaded
+        """
+        import tiktoken
+        from tiktoken.model import encoding_name_for_model
+
+        name = encoding
+        if model:
+            try:
+                name = encoding_name_for_model(model)
+            except KeyError:
+                logger.debug(f"No tiktoken encoding for model {model}, using {encoding}")
+        if offline and not encoding_cached(name):
+            raise LookupError(f"tiktoken encoding {name} is not cached locally")
+        self._encoding = tiktoken.get_encoding(name)
+        self.encoding_name = self._encoding.name
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+
+class CachedTokenizer(Tokenizer):
+    """
+    Wraps a tokenizer with a per-line LRU cache of counts.
+    Multi-line text is counted as the sum of its lines.
+    """
+
+    def __init__(self, backend: Tokenizer, cache_size: int = 50000):
+        """
+        Args:
+            backend: Tokenizer doing the actual counting
+            cache_size: Maximum number of cached lines
+        """
+        self.backend = backend
+        self.name = backend.name
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if '\n' not in text:
+            return self._count_line(text)
+        return sum(self._count_line(line) for line in text.split('\n') if line)
+
+    def _count_line(self, line: str) -> int:
+        with self._lock:
+            count = self._cache.get(line)
+            if count is not None:
+                self._cache.move_to_end(line)
+                self.hits += 1
+                return count
+
+        count = self.backend.count(line)
+
+        with self._lock:
+            self.misses += 1
+            self._cache[line] = count
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return count
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        return {
+            'backend': self.name,
+            'cached_lines': len(self._cache),
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+
+# =============================================================================
+# Default tokenizer
+# =============================================================================
+
+_default_tokenizer: Optional[Tokenizer] = None
+_default_lock = threading.Lock()
+
+
+def build_tokenizer(
+    backend: str = "auto",
+    encoding: str = DEFAULT_ENCODING,
+    model: Optional[str] = None,
+    cache_size: int = 50000,
+) -> Tokenizer:
+    """
+    Build a cached tokenizer.
+
+    Args:
+        backend: 'auto' (tiktoken if installed and its encoding is cached
+                 locally), 'tiktoken' (may download the encoding) or
+                 'heuristic'
+        encoding: tiktoken encoding name
+        model: Model name used to pick the tiktoken encoding
+        cache_size: Per-line LRU cache size
+
+    Returns:
+        CachedTokenizer instance
+    """
+    impl: Tokenizer = HeuristicTokenizer()
+
+    if backend in ("auto", "tiktoken"):
+        try:
+            impl = TiktokenTokenizer(
+                encoding=encoding, model=model, offline=backend == "auto"
+            )
+            logger.info(f"Tokenizer: tiktoken ({impl.encoding_name})")
+        except ImportError:
+            log = logger.warning if backend == "tiktoken" else logger.debug
+            log("tiktoken not installed, using heuristic token counts")
+        except LookupError as e:
+            # 'auto' must not block startup on a download
+            logger.info(f"{e}, using heuristic token counts")
+        except Exception as e:
+            logger.warning(f"tiktoken encoding unavailable ({e}), using heuristic token counts")
+    elif backend != "heuristic":
+        logger.warning(f"Unknown tokenizer backend: {backend}, using heuristic")
+
+    return CachedTokenizer(impl, cache_size=cache_size)
+
+
+def get_tokenizer() -> Tokenizer:
+    """Get the process-wide default tokenizer (built on first use)"""
+    global _default_tokenizer
+    if _default_tokenizer is None:
+        with _default_lock:
+            if _default_tokenizer is None:
+                _default_tokenizer = build_tokenizer()
+    return _default_tokenizer
+
+
+def set_tokenizer(tokenizer: Optional[Tokenizer]) -> None:
+    """Replace the default tokenizer (None resets to auto-detection)"""
+    global _default_tokenizer
+    with _default_lock:
+        _default_tokenizer = tokenizer
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens with the default tokenizer"""
+    return get_tokenizer().count(text)
+
+
+def create_tokenizer(config: Dict[str, Any]) -> Tokenizer:
+    """
+    Create a tokenizer from config dictionary.
+
+    Args:
+        config: Configuration dict with optional 'tokenizer' section
+    """
+    tokenizer_config = config.get('tokenizer', {})
+    return build_tokenizer(
+        backend=tokenizer_config.get('backend', 'auto'),
+        encoding=tokenizer_config.get('encoding', DEFAULT_ENCODING),
+        model=config.get('llm', {}).get('model'),
+        cache_size=tokenizer_config.get('cache_size', 50000),
+    )
@@ -12,6 +12,9 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 
+from lib.config import get_cache_dir, get_state_dir
+from lib.search_index import SearchIndex
+
 logger = logging.getLogger(__name__)
 
 
@@ -53,6 +56,7 @@ class TTLManager:
         archive_dir: Optional[str] = None,
         hot_ttl_days: int = 90,
         warm_ttl_days: int = 365,
+        exclude_dirs: Optional[List[str]] = None,
     ):
         """
         Args:
@@ -60,11 +64,16 @@ class TTLManager:
             archive_dir: Warm archive directory
             hot_ttl_days: Days before Hot -> Warm transition
             warm_ttl_days: Days before Warm -> Cold transition
+            exclude_dirs: Directories inside memory_dir that are not Hot
+                          memory (daemon state, caches)
         """
         self.memory_dir = Path(memory_dir).expanduser().resolve()
         self.archive_dir = Path(
             archive_dir or str(self.memory_dir / "archive")
         ).expanduser().resolve()
+        self.exclude_dirs = [
+            Path(d).expanduser().resolve() for d in (exclude_dirs or [])
+        ]
         self.hot_ttl_days = hot_ttl_days
         self.warm_ttl_days = warm_ttl_days
 
@@ -72,6 +81,23 @@ class TTLManager:
         self.memory_dir.mkdir(parents=True, exist_ok=True)
         self.archive_dir.mkdir(parents=True, exist_ok=True)
 
+        self._warm_index: Optional[SearchIndex] = None
+
+    @property
+    def warm_index(self) -> SearchIndex:
+        """Inverted index over the Warm archive (shared with UnifiedSearch)"""
+        if self._warm_index is None:
+            self._warm_index = SearchIndex(str(self.archive_dir))
+        return self._warm_index
+
+    def _hot_files(self) -> List[Path]:
+        """Markdown files of the Hot tier (outside the archive and excluded dirs)"""
+        skipped = [self.archive_dir] + self.exclude_dirs
+        return [
+            md_file for md_file in self.memory_dir.glob("**/*.md")
+            if not any(d == md_file.parent or d in md_file.parents for d in skipped)
+        ]
+
     def check_and_archive(self) -> ArchiveResult:
         """
         Check all files and archive as needed.
@@ -84,11 +110,7 @@ class TTLManager:
         hot_cutoff = now - timedelta(days=self.hot_ttl_days)
 
         # Check Hot -> Warm
-        for md_file in self.memory_dir.glob("**/*.md"):
-            # Skip archive directory
-            if self.archive_dir in md_file.parents or md_file.parent == self.archive_dir:
-                continue
-
+        for md_file in self._hot_files():
             # Skip active_memory.md (always stays in Hot)
             if md_file.name == "active_memory.md":
                 continue
@@ -156,6 +178,12 @@ class TTLManager:
 
         shutil.move(str(file_path), str(target_file))
         logger.info(f"Archived to Warm: {file_path.name} -> {target_file}")
+
+        try:
+            self.warm_index.add_file(target_file)
+        except Exception as e:
+            logger.warning(f"Failed to index archived file {target_file}: {e}")
+
         return target_file
 
     def archive_to_cold(
@@ -191,6 +219,13 @@ class TTLManager:
 
         shutil.move(str(file_path), str(target_file))
         logger.info(f"Archived to Cold: {file_path.name} -> {target_file}")
+
+        if self.archive_dir in Path(file_path).resolve().parents:
+            try:
+                self.warm_index.remove_file(file_path)
+            except Exception as e:
+                logger.warning(f"Failed to unindex {file_path}: {e}")
+
         return target_file
 
     def get_cold_candidates(self) -> List[Path]:
@@ -210,12 +245,7 @@ class TTLManager:
 
     def get_stats(self) -> Dict[str, Any]:
         """Get tier statistics"""
-        hot_files = list(self.memory_dir.glob("**/*.md"))
-        # Exclude archive files from hot count
-        hot_files = [
-            f for f in hot_files
-            if self.archive_dir not in f.parents and f.parent != self.archive_dir
-        ]
+        hot_files = self._hot_files()
         warm_files = list(self.archive_dir.glob("**/*.md"))
 
         hot_size = sum(f.stat().st_size for f in hot_files if f.exists())
@@ -243,4 +273,5 @@ def create_ttl_manager(config: Dict[str, Any]) -> TTLManager:
     return TTLManager(
         memory_dir=memory_config.get('dir', '~/.openclaw/workspace/memory'),
         hot_ttl_days=hot_memory_config.get('ttl_days', 90),
+        exclude_dirs=[str(get_state_dir(config)), str(get_cache_dir(config))],
     )
@@ -3,17 +3,32 @@ Unified Search Engine for OC-Memory
 Searches across all memory tiers (Hot/Warm/Cold)
 
 Aggregates results from ChromaDB (Hot), Markdown archives (Warm),
-and Obsidian/Dropbox (Cold) into a ranked result set.
+and Obsidian/Dropbox (Cold) into a ranked result set. Tiers are queried
+concurrently under per-tier deadlines, their incomparable scores are
+combined by rank fusion, and results are cached per query and
+invalidated when a tier they came from changes.
 """
 
+import copy
 import logging
 import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from datetime import datetime
+from functools import partial
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+from lib.query_cache import QueryCache
+from lib.rank_fusion import FUSION_METHODS, RRF_K, fuse
+from lib.search_index import SearchIndex
 
 logger = logging.getLogger(__name__)
 
+# Seconds search() waits for all tiers before returning what it has
+DEFAULT_DEADLINE = 10.0
+
 
 # =============================================================================
 # Search Result
@@ -52,6 +67,23 @@ class SearchResult:
         return f"SearchResult(title='{self.title}', tier='{self.tier}', score={self.score:.3f})"
 
 
+class SearchResults(list):
+    """
+    Ranked list of SearchResult objects.
+
+    ``timed_out`` names the sources (e.g. 'warm', 'cold:dropbox') that
+    missed their deadline, in which case the list is partial.
+    """
+
+    def __init__(self, results=(), timed_out: Optional[List[str]] = None):
+        super().__init__(results)
+        self.timed_out: List[str] = timed_out or []
+
+    @property
+    def partial(self) -> bool:
+        return bool(self.timed_out)
+
+
 # =============================================================================
 # Unified Search Engine
 # =============================================================================
@@ -60,7 +92,7 @@ class UnifiedSearch:
     """
     Searches across all memory tiers:
     1. Hot: ChromaDB semantic search
-    2. Warm: Markdown file grep
+    2. Warm: Markdown archives (persistent BM25 index)
     3. Cold: Obsidian vault search
     """
 
@@ -70,6 +102,15 @@ class UnifiedSearch:
         archive_dir: Optional[str] = None,
         obsidian_client=None,
         dropbox_sync=None,
+        cache_size: int = 256,
+        cache_ttl: float = 60.0,
+        deadline: float = DEFAULT_DEADLINE,
+        tier_timeouts: Optional[Dict[str, float]] = None,
+        max_workers: int = 8,
+        fusion: str = "rrf",
+        tier_weights: Optional[Dict[str, float]] = None,
+        rrf_k: int = RRF_K,
+        candidates_per_tier: Optional[int] = None,
     ):
         """
         Args:
@@ -77,11 +118,51 @@ class UnifiedSearch:
             archive_dir: Warm archive directory path
             obsidian_client: ObsidianClient instance (Cold tier)
             dropbox_sync: DropboxSync instance (Cold tier, optional)
+            cache_size: Number of cached queries (0 = no result cache)
+            cache_ttl: Seconds a cached result stays valid; bounds staleness
+                       from changes not made through the clients above
+            deadline: Seconds search() waits for all tiers in total
+            tier_timeouts: Per-tier limits ('hot'/'warm'/'cold'), each capped
+                           by ``deadline``; a tier past its limit is dropped
+            max_workers: Threads shared by concurrent tier queries
+            fusion: How tier rankings are combined: 'rrf' (reciprocal rank),
+                    'minmax' (per-tier normalized scores) or 'score' (raw
+                    tier scores, not comparable across tiers)
+            tier_weights: Weight per tier ('hot'/'warm'/'cold') or source
+                          ('cold:dropbox'); default 1.0
+            rrf_k: RRF damping constant
+            candidates_per_tier: Results requested from each source
+                                 (default: n_results)
+
+        Raises:
+            ValueError: Unknown fusion method
         """
+        if fusion not in FUSION_METHODS + ("score",):
+            raise ValueError(f"Unknown fusion method: {fusion}")
+
         self.memory_store = memory_store
         self.archive_dir = Path(archive_dir).expanduser().resolve() if archive_dir else None
         self.obsidian_client = obsidian_client
         self.dropbox_sync = dropbox_sync
+        self._warm_index: Optional[SearchIndex] = None
+        self._warm_index_lock = threading.Lock()
+        self.cache: Optional[QueryCache] = (
+            QueryCache(max_entries=cache_size, ttl=cache_ttl) if cache_size > 0 else None
+        )
+
+        self.deadline = deadline
+        self.tier_timeouts = dict(tier_timeouts or {})
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._timeouts: Dict[str, int] = {}
+        # Source name -> call still running after its search gave up on it
+        self._stuck: Dict[str, Future] = {}
+
+        self.fusion = fusion
+        self.tier_weights = dict(tier_weights or {})
+        self.rrf_k = rrf_k
+        self.candidates_per_tier = candidates_per_tier
 
     def search(
         self,
@@ -89,7 +170,7 @@ class UnifiedSearch:
         tiers: Optional[List[str]] = None,
         n_results: int = 10,
         priority: Optional[str] = None,
-    ) -> List[SearchResult]:
+    ) -> SearchResults:
         """
         Search across specified memory tiers.
 
@@ -100,34 +181,226 @@ class UnifiedSearch:
             priority: Filter by priority ('high', 'medium', 'low')
 
         Returns:
-            List of SearchResult objects, ranked by score
+            SearchResults ranked by score; ``timed_out`` lists tiers that
+            missed their deadline
         """
         if tiers is None:
             tiers = ['hot', 'warm', 'cold']
 
-        all_results = []
+        if self.cache is None:
+            return self._search_tiers(query, tiers, n_results, priority)
 
-        for tier in tiers:
+        key = (self._normalize_query(query), tuple(sorted(set(tiers))), n_results, priority)
+        # Read versions before searching, so a write racing with the
+        # search leaves an entry that is already stale
+        versions = self._tier_versions(tiers)
+        cached = self.cache.get(key, versions)
+        if cached is not None:
+            return SearchResults(cached)
+
+        results = self._search_tiers(query, tiers, n_results, priority)
+        # Partial results would hide the slow tier until the TTL expires
+        if not results.partial:
+            self.cache.put(key, tuple(results), versions)
+        return results
+
+    def _search_tiers(
+        self,
+        query: str,
+        tiers: List[str],
+        n_results: int,
+        priority: Optional[str],
+    ) -> SearchResults:
+        """
+        Query all sources of the given tiers concurrently and fuse their
+        rankings. Sources still running at their deadline are left
+        behind and reported in ``timed_out``; until such a call returns,
+        later searches skip that source, so a hung source holds at most
+        one worker.
+        """
+        per_source = n_results
+        if self.candidates_per_tier:
+            per_source = min(n_results, self.candidates_per_tier)
+
+        sources: List[Tuple[str, str, Callable[[], List[SearchResult]]]] = []
+        for tier in dict.fromkeys(tiers):
+            tier_sources = self._tier_sources(tier, query, per_source, priority)
+            if tier_sources is None:
+                logger.warning(f"Unknown tier: {tier}")
+                continue
+            sources.extend((tier, name, fn) for name, fn in tier_sources)
+
+        by_source: Dict[str, List[SearchResult]] = {}
+        timed_out: List[str] = []
+
+        start = time.monotonic()
+        executor = self._get_executor()
+        pending: Dict[Future, Tuple[str, float]] = {}
+        for tier, name, fn in sources:
+            if self._is_stuck(name):
+                timed_out.append(name)
+                self._record_timeout(name)
+                continue
+            limit = min(self.tier_timeouts.get(tier, self.deadline), self.deadline)
+            pending[executor.submit(self._run_source, name, fn)] = (name, start + limit)
+
+        while pending:
+            now = time.monotonic()
+            for future, (name, due) in list(pending.items()):
+                if due <= now and not future.done():
+                    del pending[future]
+                    if not future.cancel():
+                        self._mark_stuck(name, future)
+                    timed_out.append(name)
+                    self._record_timeout(name)
+            if not pending:
+                break
+
+            next_due = min(due for _, due in pending.values())
+            done, _ = wait(pending, timeout=max(0.0, next_due - now), return_when=FIRST_COMPLETED)
+            for future in done:
+                name, _ = pending.pop(future)
+                by_source[name] = future.result()
+
+        if timed_out:
+            logger.warning(
+                f"Search returned partial results; timed out: {', '.join(timed_out)}"
+            )
+
+        return SearchResults(self._fuse(by_source)[:n_results], timed_out)
+
+    def _fuse(self, by_source: Dict[str, List[SearchResult]]) -> List[SearchResult]:
+        """
+        Rank results of all sources on one scale.
+
+        The same note found by several sources (a vault note and its
+        Dropbox copy, matched by vault-relative path) is ranked once. The fused value replaces ``score``; the tier's own
+        score is kept in ``metadata['tier_score']``.
+        """
+        if self.fusion == "score":
+            merged = [r for results in by_source.values() for r in results]
+            merged.sort(key=lambda r: r.score, reverse=True)
+            return merged
+
+        weights = {
+            name: self.tier_weights.get(name, self.tier_weights.get(name.split(':')[0], 1.0))
+            for name in by_source
+        }
+        keys: Dict[int, Any] = {}
+        for source, results in by_source.items():
+            for r in results:
+                note = self._note_key(source, r)
+                keys[id(r)] = note if note is not None else id(r)
+
+        fused = fuse(
+            {name: [(r, r.score) for r in results] for name, results in by_source.items()},
+            method=self.fusion,
+            weights=weights,
+            k=self.rrf_k,
+            key=lambda r: keys[id(r)],
+        )
+
+        # Copies: the originals may be held by the query cache
+        ranked = []
+        for result, score in fused:
+            result = copy.copy(result)
+            result.metadata = dict(result.metadata, tier_score=result.score)
+            result.score = score
+            ranked.append(result)
+        return ranked
+
+    def _note_key(self, source: str, result: SearchResult) -> Optional[str]:
+        """
+        Identity of a Cold note shared by the vault and its Dropbox copy:
+        the path relative to the vault root or the Dropbox remote folder
+        (lowercased, as Dropbox paths are case-insensitive). None for
+        results that cannot be matched across sources.
+        """
+        path = result.metadata.get('path')
+        if not path:
+            return None
+
+        if source == 'cold:obsidian':
+            root = getattr(self.obsidian_client, 'vault_path', None)
+            if root is None:
+                return None
             try:
-                if tier == 'hot':
-                    results = self._search_hot(query, n_results, priority)
-                elif tier == 'warm':
-                    results = self._search_warm(query, n_results)
-                elif tier == 'cold':
-                    results = self._search_cold(query, n_results)
-                else:
-                    logger.warning(f"Unknown tier: {tier}")
-                    continue
-
-                all_results.extend(results)
-            except Exception as e:
-                logger.error(f"Error searching {tier} tier: {e}")
+                relative = Path(path).resolve().relative_to(root).as_posix()
+            except ValueError:
+                return None
+        elif source == 'cold:dropbox':
+            folder = getattr(self.dropbox_sync, 'remote_folder', None)
+            prefix = f"{folder.rstrip('/')}/".lower() if folder else None
+            path = str(path).lower()
+            if prefix is None or not path.startswith(prefix):
+                return None
+            relative = path[len(prefix):]
+        else:
+            return None
+        return relative.lower()
+
+    def _tier_sources(
+        self,
+        tier: str,
+        query: str,
+        n_results: int,
+        priority: Optional[str],
+    ) -> Optional[List[Tuple[str, Callable[[], List[SearchResult]]]]]:
+        """Independent (name, search function) pairs of a tier, or None if unknown"""
+        if tier == 'hot':
+            return [('hot', partial(self._search_hot, query, n_results, priority))]
+        if tier == 'warm':
+            return [('warm', partial(self._search_warm, query, n_results))]
+        if tier == 'cold':
+            # Vault scan and Dropbox network search run side by side
+            return [
+                ('cold:obsidian', partial(self._search_obsidian, query, n_results)),
+                ('cold:dropbox', partial(self._search_dropbox, query, n_results)),
+            ]
+        return None
 
-        # Sort by score (descending)
-        all_results.sort(key=lambda r: r.score, reverse=True)
+    @staticmethod
+    def _run_source(name: str, fn: Callable[[], List[SearchResult]]) -> List[SearchResult]:
+        try:
+            return fn()
+        except Exception as e:
+            logger.error(f"Error searching {name}: {e}")
+            return []
 
-        # Limit total results
-        return all_results[:n_results]
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="unified-search"
+                )
+            return self._executor
+
+    def _record_timeout(self, name: str) -> None:
+        with self._executor_lock:
+            self._timeouts[name] = self._timeouts.get(name, 0) + 1
+
+    def _mark_stuck(self, name: str, future: Future) -> None:
+        """Remember a call still running past its deadline"""
+        with self._executor_lock:
+            self._stuck[name] = future
+
+    def _is_stuck(self, name: str) -> bool:
+        """Whether an earlier call of the source is still running past its deadline"""
+        with self._executor_lock:
+            future = self._stuck.get(name)
+            if future is None:
+                return False
+            if future.done():
+                del self._stuck[name]
+                return False
+            return True
+
+    def close(self) -> None:
+        """Release the worker threads (searches still running finish in background)"""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
 
     def search_hot(
         self,
@@ -146,6 +419,55 @@ class UnifiedSearch:
         """Search Cold tier only (Obsidian/Dropbox)"""
         return self._search_cold(query, n_results)
 
+    # =========================================================================
+    # Result cache
+    # =========================================================================
+
+    @staticmethod
+    def _normalize_query(query: str) -> str:
+        """Case- and whitespace-insensitive form of a query for cache keys"""
+        return " ".join(query.lower().split())
+
+    def _tier_versions(self, tiers: List[str]) -> Dict[str, Any]:
+        """Current generation of each tier's data sources"""
+        versions: Dict[str, Any] = {}
+        for tier in tiers:
+            if tier == 'hot':
+                versions[tier] = getattr(self.memory_store, 'generation', None)
+            elif tier == 'warm':
+                versions[tier] = self._warm_generation()
+            elif tier == 'cold':
+                versions[tier] = (
+                    getattr(self.obsidian_client, 'generation', None),
+                    getattr(self.dropbox_sync, 'generation', None),
+                )
+        return versions
+
+    def _warm_generation(self) -> Optional[int]:
+        """Generation of the Warm archive index (shared with TTLManager)"""
+        if self.archive_dir is None or not self.archive_dir.exists():
+            return None
+        try:
+            return self._get_warm_index().generation
+        except Exception as e:
+            logger.debug(f"Cannot read warm index generation: {e}")
+            return None
+
+    def invalidate(self, tier: Optional[str] = None) -> int:
+        """
+        Drop cached results that include a tier (all tiers if None).
+
+        Writes through MemoryStore, TTLManager, ObsidianClient and
+        DropboxSync invalidate automatically; use this after changing
+        a tier some other way.
+
+        Returns:
+            Number of cached queries dropped
+        """
+        if self.cache is None:
+            return 0
+        return self.cache.invalidate(None if tier is None else [tier])
+
     # =========================================================================
     # Tier-specific search implementations
     # =========================================================================
@@ -176,10 +498,12 @@ class UnifiedSearch:
 
         search_results = []
         for item in results:
-            # ChromaDB distance: 0 = identical, 2 = opposite
-            # Convert to score: 1.0 = best, 0.0 = worst
-            distance = item.get('distance', 1.0)
-            score = max(0.0, 1.0 - (distance / 2.0))
+            score = item.get('score')
+            if score is None:
+                # ChromaDB distance: 0 = identical, 2 = opposite
+                # Convert to score: 1.0 = best, 0.0 = worst
+                distance = item.get('distance', 1.0)
+                score = max(0.0, 1.0 - (distance / 2.0))
 
             search_results.append(SearchResult(
                 title=item.get('id', ''),
@@ -192,63 +516,64 @@ class UnifiedSearch:
 
         return search_results
 
+    def _get_warm_index(self) -> Optional[SearchIndex]:
+        """
+        Open the Warm archive index, catching up on files that were
+        archived without going through TTLManager (first use only).
+        """
+        with self._warm_index_lock:
+            if self._warm_index is None:
+                index = SearchIndex(str(self.archive_dir))
+                index.sync()
+                self._warm_index = index
+            return self._warm_index
+
     def _search_warm(self, query: str, n_results: int) -> List[SearchResult]:
-        """Search Warm tier via markdown file grep"""
+        """Search Warm tier via the archive's inverted index (BM25)"""
         if self.archive_dir is None or not self.archive_dir.exists():
             return []
 
+        index = self._get_warm_index()
         results = []
-        query_lower = query.lower()
-        query_words = query_lower.split()
 
-        for md_file in self.archive_dir.rglob("*.md"):
+        for hit in index.search(query, limit=n_results):
+            md_file = hit.path
             try:
                 content = md_file.read_text(encoding="utf-8")
-                content_lower = content.lower()
-
-                # Calculate relevance score based on word matches
-                if query_lower not in content_lower:
-                    # Check individual words
-                    word_matches = sum(1 for w in query_words if w in content_lower)
-                    if word_matches == 0:
-                        continue
-                    score = word_matches / len(query_words) * 0.5  # partial match
-                else:
-                    # Exact query match
-                    count = content_lower.count(query_lower)
-                    score = min(0.9, 0.5 + count * 0.1)  # cap at 0.9
-
-                # Extract snippet
-                snippet = self._extract_snippet(content, query)
-
-                results.append(SearchResult(
-                    title=md_file.stem,
-                    content=snippet,
-                    tier='warm',
-                    score=score,
-                    source=str(md_file),
-                    metadata={
-                        'path': str(md_file),
-                        'modified': datetime.fromtimestamp(
-                            md_file.stat().st_mtime
-                        ).isoformat(),
-                    },
-                ))
-
-                if len(results) >= n_results:
-                    break
+                mtime = md_file.stat().st_mtime
+            except FileNotFoundError:
+                # Deleted outside of TTLManager; drop the stale entry
+                index.remove_file(md_file)
+                continue
             except Exception as e:
                 logger.debug(f"Error reading {md_file}: {e}")
+                continue
+
+            results.append(SearchResult(
+                title=md_file.stem,
+                content=self._extract_snippet(content, query, offset=hit.offset),
+                tier='warm',
+                # Squash unbounded BM25 into [0, 1) to stay comparable
+                score=hit.score / (hit.score + 1.0),
+                source=str(md_file),
+                metadata={
+                    'path': str(md_file),
+                    'modified': datetime.fromtimestamp(mtime).isoformat(),
+                    'bm25': hit.score,
+                },
+            ))
 
-        # Sort warm results by score
-        results.sort(key=lambda r: r.score, reverse=True)
-        return results[:n_results]
+        return results
 
     def _search_cold(self, query: str, n_results: int) -> List[SearchResult]:
         """Search Cold tier via Obsidian and/or Dropbox"""
-        results = []
+        results = self._search_obsidian(query, n_results)
+        results.extend(self._search_dropbox(query, n_results))
+        return results[:n_results]
 
-        # Search Obsidian vault
+    def _search_obsidian(self, query: str, n_results: int) -> List[SearchResult]:
+        """Search the Obsidian vault (Cold tier)"""
+        results = []
         if self.obsidian_client is not None:
             try:
                 obsidian_results = self.obsidian_client.search_notes(
@@ -256,11 +581,13 @@ class UnifiedSearch:
                     max_results=n_results,
                 )
                 for item in obsidian_results:
+                    bm25 = item.get('score')
                     results.append(SearchResult(
                         title=item.get('title', ''),
                         content=item.get('snippet', ''),
                         tier='cold',
-                        score=0.4,  # Cold tier gets lower base score
+                        # Indexed vault search is ranked; the scan is not
+                        score=bm25 / (bm25 + 1.0) if bm25 is not None else 0.4,
                         source='obsidian',
                         metadata={
                             'path': item.get('path', ''),
@@ -269,8 +596,11 @@ class UnifiedSearch:
                     ))
             except Exception as e:
                 logger.error(f"Obsidian search failed: {e}")
+        return results
 
-        # Search Dropbox
+    def _search_dropbox(self, query: str, n_results: int) -> List[SearchResult]:
+        """Search Dropbox (Cold tier)"""
+        results = []
         if self.dropbox_sync is not None and self.dropbox_sync.is_configured:
             try:
                 dropbox_results = self.dropbox_sync.search(
@@ -278,35 +608,50 @@ class UnifiedSearch:
                     max_results=n_results,
                 )
                 for item in dropbox_results:
+                    bm25 = item.get('score')
                     results.append(SearchResult(
                         title=item.get('name', ''),
-                        content='',  # Content not available from search
+                        # Only cached copies carry content
+                        content=item.get('snippet', ''),
                         tier='cold',
-                        score=0.3,  # Dropbox results get lower score
+                        # Cached copies are ranked; name-only matches are not
+                        score=bm25 / (bm25 + 1.0) if bm25 is not None else 0.3,
                         source='dropbox',
                         metadata={
                             'path': item.get('path', ''),
                             'modified': str(item.get('modified', '')),
+                            'local_path': item.get('local_path'),
                         },
                     ))
             except Exception as e:
                 logger.error(f"Dropbox search failed: {e}")
-
-        return results[:n_results]
+        return results
 
     # =========================================================================
     # Helpers
     # =========================================================================
 
     @staticmethod
-    def _extract_snippet(content: str, query: str, context_chars: int = 150) -> str:
-        """Extract a snippet around the first match"""
+    def _extract_snippet(
+        content: str,
+        query: str,
+        context_chars: int = 150,
+        offset: Optional[int] = None,
+    ) -> str:
+        """
+        Extract a snippet around the first match.
+        Falls back to ``offset`` (e.g. from the index) when the exact
+        query string does not occur in the content.
+        """
         idx = content.lower().find(query.lower())
+        match_len = len(query)
         if idx == -1:
-            return content[:300]
+            if offset is None or not 0 <= offset < len(content):
+                return content[:300]
+            idx, match_len = offset, 0
 
         start = max(0, idx - context_chars)
-        end = min(len(content), idx + len(query) + context_chars)
+        end = min(len(content), idx + match_len + context_chars)
 
         snippet = content[start:end].strip()
         if start > 0:
@@ -335,6 +680,12 @@ class UnifiedSearch:
         if stats['cold_obsidian_configured'] or stats['cold_dropbox_configured']:
             stats['tiers_available'].append('cold')
 
+        if self.cache is not None:
+            stats['cache'] = self.cache.get_stats()
+
+        with self._executor_lock:
+            stats['timeouts'] = dict(self._timeouts)
+
         return stats
 
 
@@ -358,6 +709,7 @@ def create_unified_search(
         dropbox_sync: Optional DropboxSync instance
     """
     memory_config = config.get('memory', {})
+    search_config = config.get('search', {})
     archive_dir = memory_config.get('archive_dir')
 
     if archive_dir is None:
@@ -369,4 +721,13 @@ def create_unified_search(
         archive_dir=archive_dir,
         obsidian_client=obsidian_client,
         dropbox_sync=dropbox_sync,
+        cache_size=search_config.get('cache_size', 256),
+        cache_ttl=search_config.get('cache_ttl', 60.0),
+        deadline=search_config.get('deadline', DEFAULT_DEADLINE),
+        tier_timeouts=search_config.get('tier_timeouts'),
+        max_workers=search_config.get('max_workers', 8),
+        fusion=search_config.get('fusion', 'rrf'),
+        tier_weights=search_config.get('tier_weights'),
+        rrf_k=search_config.get('rrf_k', RRF_K),
+        candidates_per_tier=search_config.get('candidates_per_tier'),
     )
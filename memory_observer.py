@@ -9,6 +9,8 @@ Usage:
 """
 
 import argparse
+import asyncio
+import functools
 import logging
 import signal
 import sys
@@ -27,6 +29,13 @@ from lib.memory_merger import MemoryMerger, create_merger
 from lib.reflector import Reflector, create_reflector
 from lib.ttl_manager import TTLManager, create_ttl_manager
 from lib.error_handler import LLMRetryPolicy
+from lib.backfill import BackfillStats, create_backfill
+from lib.block_diff import incremental_content
+from lib.extraction_pipeline import AsyncExtractionPipeline, create_extraction_pipeline
+from lib.hash_store import content_hash, create_hash_store
+from lib.jsonl_tail import create_tail_reader
+from lib.llm_clients import close_clients, get_client_registry
+from lib.tokenizer import create_tokenizer, set_tokenizer
 
 
 class MemoryObserver:
@@ -35,6 +44,7 @@ class MemoryObserver:
     Orchestrates all core engines:
     - FileWatcher: directory monitoring
     - MemoryWriter: file copying to OpenClaw memory
+    - ExtractionPipeline: queued, batched observation extraction
     - Observer: LLM-based observation extraction
     - MemoryMerger: active_memory.md management
     - Reflector: memory compression
@@ -44,6 +54,7 @@ class MemoryObserver:
     # Intervals in seconds
     TTL_CHECK_INTERVAL = 3600       # 1 hour
     COMPRESSION_CHECK_INTERVAL = 300  # 5 minutes
+    SESSION_LOG_INTERVAL = 30       # 30 seconds
 
     def __init__(self, config_path: str = "config.yaml"):
         self.config_path = config_path
@@ -57,6 +68,9 @@ class MemoryObserver:
             self.logger.error(f"Configuration error: {e}")
             raise
 
+        # --- Shared token counter (budgets in MemoryMerger/Reflector) ---
+        set_tokenizer(create_tokenizer(self.config))
+
         # --- Core components (always initialized) ---
         self.memory_writer = MemoryWriter(
             memory_dir=self.config['memory']['dir']
@@ -65,13 +79,26 @@ class MemoryObserver:
         self.file_watcher = FileWatcher(
             watch_dirs=self.config['watch']['dirs'],
             callback=self.on_file_change,
-            recursive=self.config['watch'].get('recursive', True)
+            recursive=self.config['watch'].get('recursive', True),
+            debounce_seconds=self.config['watch'].get('debounce_seconds', 0.5),
         )
 
         self.merger = create_merger(self.config)
 
         self.ttl_manager = create_ttl_manager(self.config)
 
+        # Content last processed per source file (survives restarts)
+        self.hash_store = create_hash_store(self.config)
+
+        # Read position per session transcript (survives restarts)
+        self.tail_reader = create_tail_reader(self.config)
+        self.session_log_dirs = self.config['watch'].get('session_logs', [])
+
+        # Unchanged blocks of context sent around each changed region
+        self.diff_context_blocks = self.config.get('processing', {}).get(
+            'diff_context_blocks', 1
+        )
+
         # --- Optional LLM components (need API key) ---
         self.observer: Optional[Observer] = None
         self.reflector: Optional[Reflector] = None
@@ -86,14 +113,25 @@ class MemoryObserver:
             max_attempts=3, base_delay=2.0, max_delay=30.0
         )
 
+        # --- Worker pool draining file events into the Observer ---
+        self.pipeline = create_extraction_pipeline(
+            self.config,
+            self._extract_observations_batch,
+            async_handler=self._extract_observations_batch_async,
+            on_stop=get_client_registry().aclose,
+        )
+
         # --- State ---
         self.running = False
         self.files_processed = 0
+        self.files_unchanged = 0
         self.observations_extracted = 0
         self.compressions_run = 0
         self.errors = 0
+        self._stats_lock = threading.Lock()
         self._last_ttl_check = 0.0
         self._last_compression_check = 0.0
+        self._last_session_check = 0.0
 
     def _init_llm_components(self):
         """Initialize Observer and Reflector if LLM config is present."""
@@ -133,28 +171,25 @@ class MemoryObserver:
     def on_file_change(self, file_path: Path, event_type: str) -> None:
         """Handle file change events from FileWatcher."""
         try:
+            # 0. Skip files whose content (minus frontmatter/whitespace)
+            #    was already processed, even before a restart
+            digest = content_hash(file_path.read_text(encoding='utf-8'))
+            if self.hash_store.is_unchanged(file_path, digest):
+                self.files_unchanged += 1
+                self.logger.debug(f"Unchanged, skipping: {file_path}")
+                return
+
             self.logger.info(f"Processing file: {file_path} ({event_type})")
 
             # 1. Copy to memory directory
-            category = self._detect_category(file_path)
-            target_file = self.memory_writer.copy_to_memory(
-                source_file=file_path,
-                category=category
-            )
-
-            metadata = {
-                "source": str(file_path),
-                "synced_at": datetime.now().isoformat(),
-                "category": category,
-                "event_type": event_type,
-                "oc_memory_version": __version__,
-            }
-            self.memory_writer.add_metadata(target_file, metadata)
-            self.files_processed += 1
+            target_file = self._sync_to_memory(file_path, event_type)
 
-            # 2. Extract observations via LLM (if available)
+            # 2. Queue observation extraction (runs on pipeline workers);
+            #    the hash is recorded once extraction has succeeded
             if self.observer:
-                self._extract_observations_from_file(file_path)
+                self.pipeline.submit(file_path)
+            else:
+                self.hash_store.update(file_path, digest)
 
             self.logger.info(
                 f"Synced to memory: {target_file} "
@@ -169,38 +204,183 @@ class MemoryObserver:
             self.errors += 1
             self.logger.exception(f"Unexpected error processing {file_path}: {e}")
 
+    def _sync_to_memory(self, file_path: Path, event_type: str) -> Path:
+        """Copy a source file into the memory directory with metadata."""
+        category = self._detect_category(file_path)
+        target_file = self.memory_writer.copy_to_memory(
+            source_file=file_path,
+            category=category
+        )
+
+        metadata = {
+            "source": str(file_path),
+            "synced_at": datetime.now().isoformat(),
+            "category": category,
+            "event_type": event_type,
+            "oc_memory_version": __version__,
+        }
+        self.memory_writer.add_metadata(target_file, metadata)
+        with self._stats_lock:
+            self.files_processed += 1
+        return target_file
+
+    def backfill(self) -> BackfillStats:
+        """
+        Ingest files that already exist in the watch directories
+        (FileWatcher only sees new events). Resumable after interruption.
+
+        Extraction runs on the backfill's worker pool (backfill.workers),
+        or with processing.mode: async on the extraction pipeline's event
+        loop (processing.max_in_flight). Files whose extraction failed are
+        not checkpointed and are retried by the next run.
+        """
+        self.logger.info(f"Backfilling {self.config['watch']['dirs']}")
+
+        extract = None
+        pipeline = None
+        if self.observer and isinstance(self.pipeline, AsyncExtractionPipeline):
+            self.pipeline.start()
+            pipeline = self.pipeline
+            extract = functools.partial(
+                self._extract_observations_batch_async, raise_errors=True
+            )
+        elif self.observer:
+            extract = functools.partial(self._extract_observations_batch, raise_errors=True)
+
+        backfill = create_backfill(
+            self.config,
+            hash_store=self.hash_store,
+            ingest=lambda path: self._sync_to_memory(path, 'backfill'),
+            extract=extract,
+            store=self.memory_store.add_observations if self.memory_store else None,
+            pipeline=pipeline,
+        )
+        stats = backfill.run()
+
+        self.merger.flush()
+        return stats
+
     def _extract_observations_from_file(self, file_path: Path):
         """Read a markdown file and extract observations via LLM."""
         try:
             content = file_path.read_text(encoding='utf-8')
-            if not content.strip():
-                return
+        except Exception as e:
+            self.logger.warning(f"Observation extraction failed for {file_path}: {e}")
+            return
+
+        if content.strip():
+            self._extract_observations_batch([(file_path, content)])
+
+    def _extract_observations_batch(self, items, sink=None, raise_errors=False) -> None:
+        """
+        Extract observations from one or more files with a single LLM call.
+        Files processed before only contribute their new/changed blocks.
+
+        Args:
+            items: List of (file_path, content) tuples
+            sink: Optional callable receiving the observations instead of
+                  writing them to MemoryStore (used for batched backfills)
+            raise_errors: Re-raise a failed extraction (after logging it)
+        """
+        prepared = self._prepare_extraction(items)
+        if not prepared:
+            return
+        parts, messages, label = prepared
 
-            messages = [{"role": "user", "content": content}]
+        try:
             observations = self.retry_policy.call_with_retry(
-                self.observer.observe, messages
+                self.observer.observe, messages, raise_errors=True
             )
+            self._store_observations(parts, observations, label, sink=sink)
+        except Exception as e:
+            self.logger.warning(f"Observation extraction failed for {label}: {e}")
+            if raise_errors:
+                raise
+
+    async def _extract_observations_batch_async(
+        self, items, sink=None, raise_errors=False
+    ) -> None:
+        """Async version of _extract_observations_batch() (processing.mode: async)"""
+        prepared = await asyncio.to_thread(self._prepare_extraction, items)
+        if not prepared:
+            return
+        parts, messages, label = prepared
 
-            if not observations:
-                return
+        try:
+            observations = await self.retry_policy.call_with_retry_async(
+                self.observer.observe_async, messages, raise_errors=True
+            )
+            await asyncio.to_thread(
+                self._store_observations, parts, observations, label, sink=sink
+            )
+        except Exception as e:
+            self.logger.warning(f"Observation extraction failed for {label}: {e}")
+            if raise_errors:
+                raise
+
+    def _prepare_extraction(self, items):
+        """
+        Diff files against their last processed version and build messages.
+
+        Returns:
+            (parts, messages, label), or None if nothing needs observing;
+            parts are (path, content, text sent) tuples
+        """
+        parts = []
+        for path, content in items:
+            previous = self.hash_store.get_snapshot(path)
+            text = incremental_content(
+                previous, content, context=self.diff_context_blocks
+            )
+            if not text.strip():
+                # Only deletions since the last run: nothing new to observe
+                self.hash_store.update(path, content_hash(content), content=content)
+                continue
+            parts.append((path, content, text))
+
+        if not parts:
+            return None
+
+        if len(parts) == 1 and parts[0][2] == parts[0][1]:
+            messages = [{"role": "user", "content": parts[0][1]}]
+        else:
+            # One message per file, labelled so the LLM keeps them apart
+            messages = [
+                {
+                    "role": "user",
+                    "content": (
+                        f"[File: {path.name}]\n{text}" if text == content
+                        else f"[Changed sections of {path.name}]\n{text}"
+                    ),
+                }
+                for path, content, text in parts
+            ]
+        label = parts[0][0].name if len(parts) == 1 else f"{len(parts)} files"
+        return parts, messages, label
+
+    def _store_observations(self, parts, observations, label: str, sink=None) -> None:
+        """Record processed versions and store the extracted observations."""
+        for path, content, _ in parts:
+            self.hash_store.update(path, content_hash(content), content=content)
+
+        if not observations:
+            return
 
-            # Add to MemoryMerger (active_memory.md)
-            added = self.merger.add_observations(observations)
+        # Add to MemoryMerger (active_memory.md)
+        added = self.merger.add_observations(observations)
 
-            # Add to ChromaDB (if available)
-            if self.memory_store:
-                try:
-                    self.memory_store.add_observations(observations)
-                except Exception as e:
-                    self.logger.warning(f"Failed to add to MemoryStore: {e}")
+        # Add to ChromaDB (if available)
+        if sink is not None:
+            sink(observations)
+        elif self.memory_store:
+            try:
+                self.memory_store.add_observations(observations)
+            except Exception as e:
+                self.logger.warning(f"Failed to add to MemoryStore: {e}")
 
+        with self._stats_lock:
             self.observations_extracted += added
-            self.logger.info(
-                f"Extracted {added} observations from {file_path.name}"
-            )
-
-        except Exception as e:
-            self.logger.warning(f"Observation extraction failed for {file_path}: {e}")
+        self.logger.info(f"Extracted {added} observations from {label}")
 
     def _run_periodic_tasks(self):
         """Run periodic maintenance tasks (compression, TTL)."""
@@ -223,6 +403,33 @@ class MemoryObserver:
             self._last_compression_check = now
             self._check_compression()
 
+        # New messages in session transcripts
+        if now - self._last_session_check >= self.SESSION_LOG_INTERVAL:
+            self._last_session_check = now
+            self._observe_session_logs()
+
+    def _observe_session_logs(self) -> None:
+        """Extract observations from messages appended to session transcripts."""
+        if not self.observer:
+            return
+
+        for log_dir in self.session_log_dirs:
+            for log_file in sorted(Path(log_dir).glob('*.jsonl')):
+                try:
+                    # The tail reader only advances once extraction succeeded,
+                    # so a retry (or the next check) sees the same messages
+                    observations = self.retry_policy.call_with_retry(
+                        self.observer.observe_from_file,
+                        log_file,
+                        tail=self.tail_reader,
+                        raise_errors=True,
+                    )
+                    self._store_observations([], observations, log_file.name)
+                except Exception as e:
+                    self.logger.warning(
+                        f"Observation extraction failed for {log_file}: {e}"
+                    )
+
     def _check_compression(self):
         """Check if memory compression is needed and run if so."""
         if not self.reflector:
@@ -281,6 +488,9 @@ class MemoryObserver:
         signal.signal(signal.SIGINT, self._signal_handler)
         signal.signal(signal.SIGTERM, self._signal_handler)
 
+        if self.observer:
+            self.pipeline.start()
+
         try:
             self.file_watcher.start()
         except Exception as e:
@@ -311,13 +521,33 @@ class MemoryObserver:
         if self.file_watcher.is_alive():
             self.file_watcher.stop()
 
+        # Drain queued extractions before the final flush
+        self.pipeline.stop()
+
+        try:
+            self.merger.flush()
+        except Exception as e:
+            self.logger.error(f"Failed to flush active memory: {e}")
+
+        # Write buffered observations to the vector store
+        if self.memory_store:
+            try:
+                self.memory_store.close()
+            except Exception as e:
+                self.logger.error(f"Failed to flush memory store: {e}")
+
+        # Release pooled LLM connections
+        close_clients()
+
         self.logger.info("=" * 60)
         self.logger.info("OC-Memory Observer Statistics")
         self.logger.info("=" * 60)
         self.logger.info(f"Files processed: {self.files_processed}")
+        self.logger.info(f"Files unchanged (skipped): {self.files_unchanged}")
         self.logger.info(f"Observations extracted: {self.observations_extracted}")
         self.logger.info(f"Compressions run: {self.compressions_run}")
         self.logger.info(f"Errors: {self.errors}")
+        self.logger.info(f"Extraction pipeline: {self.pipeline.get_stats()}")
         if self.reflector:
             stats = self.reflector.get_stats()
             self.logger.info(f"Compression stats: {stats}")
@@ -362,6 +592,11 @@ def main() -> None:
         '--config', default='config.yaml',
         help='Path to configuration file (default: config.yaml)'
     )
+    parser.add_argument(
+        '--backfill', action='store_true',
+        help='Ingest files already in the watch directories, then exit '
+             '(resumes an interrupted backfill)'
+    )
     parser.add_argument(
         '--version', action='version',
         version=f'OC-Memory {__version__}'
@@ -384,7 +619,13 @@ def main() -> None:
 
     try:
         observer = MemoryObserver(config_path=args.config)
-        observer.start()
+        if args.backfill:
+            try:
+                observer.backfill()
+            finally:
+                observer.stop()
+        else:
+            observer.start()
     except ConfigError as e:
         logging.error(f"Configuration error: {e}")
         sys.exit(1)
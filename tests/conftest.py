@@ -2,12 +2,20 @@
 Shared test fixtures for OC-Memory test suite
 """
 
+import hashlib
 import os
+import sys
 import tempfile
+import threading
+import types
+from datetime import datetime
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
+from lib.dropbox_manifest import HASH_BLOCK_SIZE
+
 
 @pytest.fixture
 def temp_dir():
@@ -101,3 +109,206 @@ def sample_messages():
         {"role": "assistant", "content": "I'll set up ChromaDB. March 15 noted as deadline."},
         {"role": "user", "content": "Always use type hints in the code."},
     ]
+
+
+# =============================================================================
+# Fake Dropbox SDK
+# =============================================================================
+
+def dropbox_hash(data):
+    blocks = [data[i:i + HASH_BLOCK_SIZE] for i in range(0, len(data), HASH_BLOCK_SIZE)]
+    return hashlib.sha256(b"".join(hashlib.sha256(b).digest() for b in blocks)).hexdigest()
+
+
+class FileMetadata:
+    def __init__(self, path_display, rev, size, client_modified, content_hash=None):
+        self.path_display = path_display
+        self.path_lower = path_display.lower()
+        self.name = path_display.rsplit("/", 1)[-1]
+        self.rev = rev
+        self.size = size
+        self.client_modified = client_modified
+        self.content_hash = content_hash
+
+
+class DeletedMetadata:
+    def __init__(self, path_display):
+        self.path_display = path_display
+        self.path_lower = path_display.lower()
+
+
+class ApiError(Exception):
+    def __init__(self, error):
+        super().__init__(str(error))
+        self.error = error
+
+
+class _ResetError:
+    def is_reset(self):
+        return True
+
+
+class UploadSessionCursor:
+    def __init__(self, session_id, offset):
+        self.session_id = session_id
+        self.offset = offset
+
+
+class CommitInfo:
+    def __init__(self, path, mode=None, client_modified=None):
+        self.path = path
+        self.mode = mode
+        self.client_modified = client_modified
+
+
+class UploadSessionFinishArg:
+    def __init__(self, cursor, commit):
+        self.cursor = cursor
+        self.commit = commit
+
+
+class _BatchEntry:
+    def __init__(self, metadata=None, failure=None):
+        self.metadata = metadata
+        self.failure = failure
+
+    def is_success(self):
+        return self.metadata is not None
+
+    def get_success(self):
+        return self.metadata
+
+    def get_failure(self):
+        return self.failure
+
+
+def fake_dropbox_module():
+    module = types.ModuleType("dropbox")
+    module.files = types.SimpleNamespace(
+        FileMetadata=FileMetadata,
+        DeletedMetadata=DeletedMetadata,
+        WriteMode=types.SimpleNamespace(overwrite="overwrite"),
+        UploadSessionCursor=UploadSessionCursor,
+        CommitInfo=CommitInfo,
+        UploadSessionFinishArg=UploadSessionFinishArg,
+    )
+    module.exceptions = types.SimpleNamespace(ApiError=ApiError)
+    return module
+
+
+class FakeDropboxClient:
+    """In-memory Dropbox folder with a change log addressed by cursors"""
+
+    def __init__(self, page_size=100):
+        self.files = {}       # path_lower -> (FileMetadata, bytes)
+        self.log = []         # metadata entries in change order
+        self.page_size = page_size
+        self.revs = 0
+        self.calls = []
+        self.sessions = {}    # session_id -> [bytearray, closed]
+        self.lock = threading.Lock()
+
+    def put(self, path, data, modified=None):
+        self.revs += 1
+        meta = FileMetadata(
+            path, f"rev{self.revs}", len(data),
+            modified or datetime(2001, 9, 9), dropbox_hash(data),
+        )
+        self.files[meta.path_lower] = (meta, data)
+        self.log.append(meta)
+        return meta
+
+    def remove(self, path):
+        del self.files[path.lower()]
+        self.log.append(DeletedMetadata(path))
+
+    def files_list_folder(self, folder, recursive=False):
+        self.calls.append(("list", folder))
+        snapshot = [meta for meta, _ in self.files.values()]
+        self._snapshot = snapshot
+        return self._full_page(0)
+
+    def _full_page(self, start):
+        end = start + self.page_size
+        has_more = end < len(self._snapshot)
+        return types.SimpleNamespace(
+            entries=self._snapshot[start:end],
+            cursor=f"full:{end}" if has_more else f"c{len(self.log)}",
+            has_more=has_more,
+        )
+
+    def files_list_folder_continue(self, cursor):
+        self.calls.append(("continue", cursor))
+        if cursor.startswith("full:"):
+            return self._full_page(int(cursor[5:]))
+        if cursor == "expired":
+            raise ApiError(_ResetError())
+        start = int(cursor[1:])
+        end = min(start + self.page_size, len(self.log))
+        return types.SimpleNamespace(
+            entries=self.log[start:end], cursor=f"c{end}", has_more=end < len(self.log),
+        )
+
+    def files_list_folder_longpoll(self, cursor, timeout=30):
+        self.calls.append(("longpoll", cursor))
+        return types.SimpleNamespace(changes=int(cursor[1:]) < len(self.log), backoff=None)
+
+    def files_search_v2(self, query):
+        self.calls.append(("search", query))
+        words = query.lower().split()
+        matches = [
+            types.SimpleNamespace(metadata=types.SimpleNamespace(get_metadata=lambda m=meta: m))
+            for meta, data in self.files.values()
+            if any(w in meta.path_lower or w.encode() in data.lower() for w in words)
+        ]
+        return types.SimpleNamespace(matches=matches)
+
+    def files_upload(self, data, path, mode=None, client_modified=None):
+        self.calls.append(("upload", path))
+        return self.put(path, data, modified=client_modified)
+
+    def files_upload_session_start(self, data, close=False):
+        with self.lock:
+            session_id = f"s{len(self.sessions)}"
+            self.sessions[session_id] = [bytearray(data), close]
+        return types.SimpleNamespace(session_id=session_id)
+
+    def files_upload_session_append_v2(self, data, cursor, close=False):
+        buffer, closed = self.sessions[cursor.session_id]
+        assert not closed and cursor.offset == len(buffer)
+        buffer.extend(data)
+        self.sessions[cursor.session_id][1] = close
+
+    def _commit(self, arg):
+        buffer, _ = self.sessions.pop(arg.cursor.session_id)
+        assert arg.cursor.offset == len(buffer)
+        self.calls.append(("upload", arg.commit.path))
+        return self.put(arg.commit.path, bytes(buffer), modified=arg.commit.client_modified)
+
+    def files_upload_session_finish(self, data, cursor, commit):
+        self.sessions[cursor.session_id][0].extend(data)
+        return self._commit(UploadSessionFinishArg(
+            UploadSessionCursor(cursor.session_id, cursor.offset + len(data)), commit
+        ))
+
+    def files_upload_session_finish_batch_v2(self, entries):
+        self.calls.append(("finish_batch", len(entries)))
+        results = []
+        for arg in entries:
+            if not self.sessions[arg.cursor.session_id][1]:
+                results.append(_BatchEntry(failure="session not closed"))
+            else:
+                results.append(_BatchEntry(self._commit(arg)))
+        return types.SimpleNamespace(entries=results)
+
+    def files_download_to_file(self, local_path, path):
+        self.calls.append(("download", path))
+        meta, data = self.files[path.lower()]
+        Path(local_path).write_bytes(data)
+        return meta
+
+
+@pytest.fixture
+def fake_dropbox():
+    with patch.dict(sys.modules, {"dropbox": fake_dropbox_module()}):
+        yield
@@ -0,0 +1,323 @@
+"""Tests for lib/backfill.py"""
+
+import asyncio
+import threading
+from pathlib import Path
+
+import pytest
+
+from lib.backfill import (
+    Backfill,
+    BackfillCheckpoint,
+    CHECKPOINT_FILENAME,
+    create_backfill,
+    walk_markdown_files,
+)
+from lib.extraction_pipeline import AsyncExtractionPipeline
+from lib.hash_store import ContentHashStore, content_hash
+
+
+def write(path: Path, content: str) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+    return path
+
+
+class Recorder:
+    """Stands in for the daemon's ingest/extract/store steps"""
+
+    def __init__(self, hash_store, observations_per_file=1):
+        self.hash_store = hash_store
+        self.observations_per_file = observations_per_file
+        self.ingested = []
+        self.extracted = []
+        self.stored = []
+        self.lock = threading.Lock()
+
+    def ingest(self, path):
+        with self.lock:
+            self.ingested.append(path.name)
+
+    def extract(self, items, sink):
+        with self.lock:
+            self.extracted.append([p.name for p, _ in items])
+        for path, content in items:
+            self.hash_store.update(path, content_hash(content))
+        sink([f"obs:{p.name}" for p, _ in items for _ in range(self.observations_per_file)])
+
+    def store(self, observations):
+        with self.lock:
+            self.stored.append(list(observations))
+
+
+@pytest.fixture
+def setup(temp_dir):
+    src = temp_dir / "notes"
+    hash_store = ContentHashStore(str(temp_dir / "state" / "h.sqlite3"))
+    checkpoint = BackfillCheckpoint(str(temp_dir / "state" / CHECKPOINT_FILENAME))
+    rec = Recorder(hash_store)
+
+    def make(**kwargs):
+        return Backfill(
+            dirs=[str(src)],
+            hash_store=hash_store,
+            checkpoint=checkpoint,
+            ingest=rec.ingest,
+            extract=rec.extract,
+            store=rec.store,
+            **kwargs,
+        )
+
+    return src, hash_store, checkpoint, rec, make
+
+
+class TestWalk:
+    def test_finds_markdown_recursively(self, temp_dir):
+        write(temp_dir / "a.md", "a")
+        write(temp_dir / "sub" / "b.markdown", "b")
+        write(temp_dir / "sub" / "deep" / "c.MD", "c")
+        write(temp_dir / "sub" / "skip.txt", "x")
+        write(temp_dir / ".obsidian" / "hidden.md", "x")
+
+        names = sorted(p.name for p in walk_markdown_files([str(temp_dir)]))
+        assert names == ["a.md", "b.markdown", "c.MD"]
+
+    def test_non_recursive(self, temp_dir):
+        write(temp_dir / "a.md", "a")
+        write(temp_dir / "sub" / "b.md", "b")
+        names = [p.name for p in walk_markdown_files([str(temp_dir)], recursive=False)]
+        assert names == ["a.md"]
+
+    def test_missing_dir(self, temp_dir):
+        assert list(walk_markdown_files([str(temp_dir / "missing")])) == []
+
+
+class TestCheckpoint:
+    def test_roundtrip_and_clear(self, temp_dir):
+        cp = BackfillCheckpoint(str(temp_dir / "cp"))
+        assert cp.load() == set()
+
+        cp.mark_done([temp_dir / "a.md", temp_dir / "b.md"])
+        assert cp.load() == {str((temp_dir / n).resolve()) for n in ("a.md", "b.md")}
+
+        cp.clear()
+        assert cp.load() == set()
+
+    def test_torn_last_line_ignored(self, temp_dir):
+        path = temp_dir / "cp"
+        path.write_text("/x/a.md\n/x/b.m", encoding="utf-8")
+        assert BackfillCheckpoint(str(path)).load() == {"/x/a.md"}
+
+
+class TestBackfill:
+    def test_ingests_and_extracts_all(self, setup):
+        src, _, checkpoint, rec, make = setup
+        for i in range(10):
+            write(src / f"sub{i % 3}" / f"n{i}.md", f"note {i}")
+
+        stats = make(batch_size=4).run()
+
+        assert stats.found == 10
+        assert stats.copied == 10
+        assert stats.extracted == 10
+        assert stats.observations == 10
+        assert sorted(rec.ingested) == sorted(f"n{i}.md" for i in range(10))
+        assert not checkpoint.path.exists()
+
+    def test_second_run_skips_unchanged(self, setup):
+        src, _, _, rec, make = setup
+        for i in range(5):
+            write(src / f"n{i}.md", f"note {i}")
+        make().run()
+
+        write(src / "n0.md", "note 0 changed")
+        stats = make().run()
+
+        assert stats.unchanged == 4
+        assert stats.copied == 1
+
+    def test_duplicate_content_processed_once(self, setup):
+        src, _, _, rec, make = setup
+        write(src / "a.md", "same text")
+        write(src / "b" / "copy.md", "same   text\n")
+
+        stats = make().run()
+
+        assert stats.copied == 1
+        assert stats.duplicates == 1
+
+    def test_resumes_from_checkpoint(self, setup):
+        src, _, checkpoint, rec, make = setup
+        for i in range(6):
+            write(src / f"n{i}.md", f"note {i}")
+        checkpoint.mark_done([src / "n0.md", src / "n1.md"])
+
+        stats = make().run()
+
+        assert stats.resumed == 2
+        assert stats.copied == 4
+        assert "n0.md" not in rec.ingested
+
+    def test_observations_stored_in_large_batches(self, setup):
+        src, hash_store, checkpoint, _, _ = setup
+        rec = Recorder(hash_store, observations_per_file=3)
+        for i in range(20):
+            write(src / f"n{i}.md", f"note {i}")
+
+        Backfill(
+            dirs=[str(src)], hash_store=hash_store, checkpoint=checkpoint,
+            ingest=rec.ingest, extract=rec.extract, store=rec.store,
+            batch_size=5, store_batch_size=25,
+        ).run()
+
+        sizes = [len(b) for b in rec.stored]
+        assert sum(sizes) == 60
+        assert all(size >= 25 for size in sizes[:-1])
+        assert len(rec.stored) < 20
+
+    def test_small_files_grouped_for_extraction(self, setup):
+        src, _, _, rec, make = setup
+        for i in range(6):
+            write(src / f"n{i}.md", "x" * 100 + str(i))
+
+        make(batch_size=6, batch_max_chars=350).run()
+
+        assert sorted(len(g) for g in rec.extracted) == [3, 3]
+
+    def test_copy_only_without_extractor(self, setup):
+        src, hash_store, checkpoint, rec, _ = setup
+        path = write(src / "a.md", "hello")
+
+        stats = Backfill(
+            dirs=[str(src)], hash_store=hash_store, checkpoint=checkpoint,
+            ingest=rec.ingest,
+        ).run()
+
+        assert stats.copied == 1
+        assert hash_store.is_unchanged(path, content_hash("hello"))
+
+    def test_failed_copy_counted(self, setup):
+        src, hash_store, checkpoint, rec, _ = setup
+        write(src / "a.md", "hello")
+
+        def boom(path):
+            raise OSError("disk full")
+
+        stats = Backfill(
+            dirs=[str(src)], hash_store=hash_store, checkpoint=checkpoint,
+            ingest=boom, extract=rec.extract,
+        ).run()
+
+        assert stats.errors == 1
+        assert stats.copied == 0
+        assert rec.extracted == []
+
+    def test_failed_extraction_retried_with_duplicates(self, setup):
+        src, hash_store, checkpoint, rec, _ = setup
+        a = write(src / "a.md", "same text")
+        b = write(src / "b.md", "same text")
+        done = []
+
+        def failing(items, sink):
+            raise RuntimeError("LLM down")
+
+        checkpoint.mark_done = done.extend
+        stats = Backfill(
+            dirs=[str(src)], hash_store=hash_store, checkpoint=checkpoint,
+            ingest=rec.ingest, extract=failing,
+        ).run()
+
+        assert stats.errors == 1
+        assert stats.extracted == 0
+        assert stats.duplicates == 0
+        assert done == []
+        assert not hash_store.is_unchanged(a, content_hash("same text"))
+        assert not hash_store.is_unchanged(b, content_hash("same text"))
+
+        stats = Backfill(
+            dirs=[str(src)], hash_store=hash_store, checkpoint=checkpoint,
+            ingest=rec.ingest, extract=rec.extract,
+        ).run()
+
+        assert stats.extracted == 1
+        assert stats.duplicates == 1
+        assert hash_store.is_unchanged(b, content_hash("same text"))
+
+    def test_failed_copy_not_checkpointed(self, setup):
+        src, hash_store, checkpoint, rec, _ = setup
+        write(src / "a.md", "hello")
+        done = []
+        checkpoint.mark_done = done.extend
+
+        def boom(path):
+            raise OSError("disk full")
+
+        Backfill(
+            dirs=[str(src)], hash_store=hash_store, checkpoint=checkpoint,
+            ingest=boom, extract=rec.extract,
+        ).run()
+
+        assert done == []
+
+    def test_async_pipeline_extraction(self, setup):
+        src, hash_store, checkpoint, rec, _ = setup
+        for i in range(6):
+            write(src / f"n{i}.md", f"note {i}")
+        write(src / "bad.md", "fails")
+        done = []
+        checkpoint.mark_done = done.extend
+        calls = {'active': 0, 'peak': 0}
+
+        async def extract(items, sink):
+            calls['active'] += 1
+            calls['peak'] = max(calls['peak'], calls['active'])
+            await asyncio.sleep(0)
+            calls['active'] -= 1
+            if items[0][0].name == "bad.md":
+                raise RuntimeError("LLM down")
+            rec.extract(items, sink)
+
+        pipeline = AsyncExtractionPipeline(None, max_in_flight=2)
+        pipeline.start()
+        try:
+            stats = Backfill(
+                dirs=[str(src)], hash_store=hash_store, checkpoint=checkpoint,
+                ingest=rec.ingest, extract=extract, store=rec.store,
+                pipeline=pipeline, batch_max_chars=1,
+            ).run()
+        finally:
+            pipeline.stop()
+
+        assert stats.extracted == 6
+        assert stats.errors == 1
+        assert sorted(p.name for p in done) == [f"n{i}.md" for i in range(6)]
+        assert pipeline.get_stats()['errors'] == 1
+        assert sum(len(b) for b in rec.stored) == 6
+        assert calls['peak'] <= 2
+
+    def test_progress_callback(self, setup):
+        src, _, _, _, make = setup
+        for i in range(4):
+            write(src / f"n{i}.md", f"note {i}")
+        seen = []
+
+        make(batch_size=2, progress=lambda s: seen.append(s.copied)).run()
+
+        assert seen[-1] == 4
+        assert len(seen) >= 2
+
+
+class TestCreateBackfill:
+    def test_create_from_config(self, temp_dir):
+        config = {
+            'watch': {'dirs': [str(temp_dir)], 'recursive': False},
+            'memory': {'dir': str(temp_dir / "memory")},
+            'backfill': {'workers': 3, 'store_batch_size': 100},
+        }
+        hash_store = ContentHashStore(str(temp_dir / "h.sqlite3"))
+        backfill = create_backfill(config, hash_store, ingest=lambda p: None)
+
+        assert backfill.workers == 3
+        assert backfill.store_batch_size == 100
+        assert backfill.recursive is False
+        assert backfill.checkpoint.path.name == CHECKPOINT_FILENAME
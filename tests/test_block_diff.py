@@ -0,0 +1,92 @@
+"""Tests for lib/block_diff.py"""
+
+from lib.block_diff import (
+    HUNK_SEPARATOR,
+    changed_hunks,
+    incremental_content,
+    split_blocks,
+)
+
+
+def _doc(n):
+    return "\n\n".join(f"Paragraph {i} with some text." for i in range(n))
+
+
+class TestSplitBlocks:
+    def test_blank_lines_separate_blocks(self):
+        text = "# Title\n\nfirst para\nstill first\n\n  \n- item 1\n- item 2\n"
+        assert split_blocks(text) == [
+            "# Title",
+            "first para\nstill first",
+            "- item 1\n- item 2",
+        ]
+
+    def test_empty(self):
+        assert split_blocks("\n\n  \n") == []
+
+
+class TestChangedHunks:
+    def test_appended_block_with_context(self):
+        old = _doc(10)
+        new = old + "\n\nBrand new paragraph."
+
+        hunks = changed_hunks(old, new, context=1)
+        assert hunks == ["Paragraph 9 with some text.\n\nBrand new paragraph."]
+
+    def test_edit_in_middle(self):
+        old = _doc(10)
+        new = old.replace("Paragraph 5 with", "Paragraph 5 EDITED with")
+
+        hunks = changed_hunks(old, new, context=0)
+        assert hunks == ["Paragraph 5 EDITED with some text."]
+
+    def test_nearby_changes_merge(self):
+        old = _doc(10)
+        new = old.replace("Paragraph 3 ", "P3 ").replace("Paragraph 5 ", "P5 ")
+
+        hunks = changed_hunks(old, new, context=1)
+        assert len(hunks) == 1
+        assert hunks[0].startswith("Paragraph 2")
+        assert hunks[0].endswith("Paragraph 6 with some text.")
+
+    def test_distant_changes_separate(self):
+        old = _doc(20)
+        new = old.replace("Paragraph 1 ", "P1 ").replace("Paragraph 15 ", "P15 ")
+        assert len(changed_hunks(old, new, context=1)) == 2
+
+    def test_deletion_only(self):
+        old = _doc(5)
+        new = old.replace("\n\nParagraph 2 with some text.", "")
+        assert changed_hunks(old, new) == []
+
+    def test_whitespace_reflow_ignored(self):
+        old = "a\n\nb"
+        assert changed_hunks(old, "a\n\n\n\nb\n") == []
+
+
+class TestIncrementalContent:
+    def test_first_time_is_full(self):
+        assert incremental_content(None, "hello") == "hello"
+
+    def test_small_edit_sends_only_hunk(self):
+        old = _doc(200)
+        new = old + "\n\nNew insight about caching."
+
+        delta = incremental_content(old, new)
+        assert "New insight about caching." in delta
+        assert len(delta) < len(new) / 20
+
+    def test_large_change_falls_back_to_full(self):
+        old = _doc(3)
+        new = "Completely\n\ndifferent\n\ncontent"
+        assert incremental_content(old, new) == new
+
+    def test_nothing_new(self):
+        old = _doc(5)
+        assert incremental_content(old, old) == ""
+
+    def test_hunks_joined_with_separator(self):
+        old = _doc(40)
+        new = old.replace("Paragraph 1 ", "P1 ").replace("Paragraph 30 ", "P30 ")
+        delta = incremental_content(old, new, context=0)
+        assert delta == "P1 with some text." + HUNK_SEPARATOR + "P30 with some text."
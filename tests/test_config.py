@@ -4,7 +4,7 @@ import pytest
 import yaml
 from pathlib import Path
 
-from lib.config import load_config, validate_config, expand_paths, get_config, ConfigError
+from lib.config import load_config, validate_config, expand_paths, get_config, get_state_dir, get_cache_dir, ConfigError
 
 
 class TestLoadConfig:
@@ -79,3 +79,24 @@ class TestGetConfig:
         assert 'memory' in config
         # Paths should be expanded
         assert '~' not in config['memory']['dir']
+
+
+class TestGetStateDir:
+    def test_default_inside_memory_dir(self, temp_dir):
+        config = {'memory': {'dir': str(temp_dir / 'mem')}}
+        assert get_state_dir(config) == (temp_dir / 'mem' / '.oc-memory').resolve()
+
+    def test_explicit_state_dir(self, temp_dir):
+        config = {'memory': {'dir': str(temp_dir), 'state_dir': str(temp_dir / 'state')}}
+        assert get_state_dir(config) == (temp_dir / 'state').resolve()
+
+
+class TestGetCacheDir:
+    def test_default_outside_memory_dir(self, temp_dir, monkeypatch):
+        monkeypatch.setenv('XDG_CACHE_HOME', str(temp_dir / 'xdg'))
+        config = {'memory': {'dir': str(temp_dir / 'mem')}}
+        assert get_cache_dir(config) == (temp_dir / 'xdg' / 'oc-memory').resolve()
+
+    def test_explicit_cache_dir(self, temp_dir):
+        config = {'memory': {'dir': str(temp_dir), 'cache_dir': str(temp_dir / 'cache')}}
+        assert get_cache_dir(config) == (temp_dir / 'cache').resolve()
@@ -0,0 +1,124 @@
+"""Tests for lib/dropbox_cache.py"""
+
+import time
+
+from lib.dropbox_cache import CachedFile, DropboxCache
+
+
+def cache_file(cache, path, content, rev="r1"):
+    """Write a file where the cache expects it and describe it"""
+    target = cache.path_for(path.lower())
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_text(content)
+    return CachedFile(path.lower(), path, rev, len(content.encode()))
+
+
+class TestContents:
+    def test_admit_and_search(self, temp_dir):
+        cache = DropboxCache(str(temp_dir / "cache"))
+        text = "intro " * 60 + "the quarterly budget review " + "outro " * 60
+        cache.admit([cache_file(cache, "/OC/Notes/Budget.md", text)])
+
+        results = cache.search("quarterly budget")
+
+        assert len(results) == 1
+        hit = results[0]
+        assert hit['path'] == "/OC/Notes/Budget.md"
+        assert hit['name'] == "Budget.md"
+        assert hit['content'] == text
+        assert "quarterly budget" in hit['snippet']
+        assert hit['snippet'].startswith("...")
+        assert hit['score'] > 0
+
+    def test_file_name_is_searchable(self, temp_dir):
+        cache = DropboxCache(str(temp_dir / "cache"))
+        cache.admit([cache_file(cache, "/OC/roadmap.md", "nothing relevant here")])
+
+        assert [r['name'] for r in cache.search("roadmap")] == ["roadmap.md"]
+
+    def test_missing_compares_revisions(self, temp_dir):
+        cache = DropboxCache(str(temp_dir / "cache"))
+        cache.admit([cache_file(cache, "/OC/a.md", "a", rev="r1")])
+
+        wanted = [
+            CachedFile("/oc/a.md", "/OC/a.md", "r1", 1),
+            CachedFile("/oc/a.md", "/OC/a.md", "r2", 1),
+            CachedFile("/oc/b.md", "/OC/b.md", "r1", 1),
+        ]
+        assert [(f.path_lower, f.rev) for f in cache.missing(wanted)] == [
+            ("/oc/a.md", "r2"), ("/oc/b.md", "r1"),
+        ]
+
+    def test_lru_eviction(self, temp_dir):
+        cache = DropboxCache(str(temp_dir / "cache"), max_bytes=250)
+        cache.admit([cache_file(cache, "/OC/old.md", "alpha " + "x" * 94)])
+        time.sleep(0.01)
+        cache.admit([cache_file(cache, "/OC/used.md", "beta " + "y" * 95)])
+        time.sleep(0.01)
+        cache.search("alpha")  # old.md is now the most recently used
+        time.sleep(0.01)
+
+        cache.admit([cache_file(cache, "/OC/new.md", "gamma " + "z" * 94)])
+
+        assert cache.search("beta") == []
+        assert not cache.path_for("/oc/used.md").exists()
+        assert [r['name'] for r in cache.search("alpha")] == ["old.md"]
+        stats = cache.get_stats()
+        assert (stats['files'], stats['bytes'], stats['evicted']) == (2, 200, 1)
+
+    def test_discard_stale(self, temp_dir):
+        cache = DropboxCache(str(temp_dir / "cache"))
+        cache.admit([
+            cache_file(cache, "/OC/same.md", "same", rev="r1"),
+            cache_file(cache, "/OC/edited.md", "edited", rev="r1"),
+            cache_file(cache, "/OC/gone.md", "gone", rev="r1"),
+        ])
+
+        dropped = cache.discard_stale(
+            {"/oc/same.md": "r1", "/oc/edited.md": "r2", "/oc/gone.md": None, "/oc/x.md": "r1"}
+        )
+
+        assert dropped == 2
+        assert [r['name'] for r in cache.search("same edited gone")] == ["same.md"]
+
+    def test_persists_across_instances(self, temp_dir):
+        cache = DropboxCache(str(temp_dir / "cache"))
+        cache.admit([cache_file(cache, "/OC/a.md", "persistent note")])
+
+        reopened = DropboxCache(str(temp_dir / "cache"))
+        assert [r['name'] for r in reopened.search("persistent")] == ["a.md"]
+
+
+class TestQueries:
+    def test_remembered_matches(self, temp_dir):
+        cache = DropboxCache(str(temp_dir / "cache"))
+        matches = [
+            {'path': "/OC/b.pdf", 'name': "b.pdf", 'modified': "2026-01-01 00:00:00"},
+            {'path': "/OC/a.md", 'name': "a.md", 'modified': ""},
+        ]
+        cache.remember_query("Budget", matches)
+
+        assert cache.query_matches("budget") == matches
+        cache.forget_queries()
+        assert cache.query_matches("budget") == []
+
+    def test_remembered_query_is_fresh(self, temp_dir):
+        cache = DropboxCache(str(temp_dir / "cache"))
+        assert cache.is_fresh("Budget Review") is False
+
+        cache.remember_query("Budget Review")
+
+        assert cache.is_fresh("budget   review") is True
+        cache.forget_queries()
+        assert cache.is_fresh("budget review") is False
+
+    def test_query_ttl(self, temp_dir):
+        cache = DropboxCache(str(temp_dir / "cache"), query_ttl=0.05)
+        cache.remember_query("q")
+        time.sleep(0.1)
+        assert cache.is_fresh("q") is False
+
+    def test_query_ttl_disabled(self, temp_dir):
+        cache = DropboxCache(str(temp_dir / "cache"), query_ttl=0)
+        cache.remember_query("q")
+        assert cache.is_fresh("q") is False
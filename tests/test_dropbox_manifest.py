@@ -0,0 +1,159 @@
+"""Tests for lib/dropbox_manifest.py"""
+
+import hashlib
+import os
+from unittest.mock import patch
+
+from lib.dropbox_manifest import (
+    HASH_BLOCK_SIZE,
+    DropboxManifest,
+    LocalEntry,
+    RemoteEntry,
+    content_hash,
+)
+
+
+def _remote(path, rev="r1", size=10, modified=100.0):
+    return RemoteEntry(
+        path_lower=path.lower(),
+        path_display=path,
+        rev=rev,
+        content_hash=None,
+        size=size,
+        modified=modified,
+    )
+
+
+class TestRemoteSide:
+    def test_cursor_saved_with_page(self, temp_dir):
+        manifest = DropboxManifest(str(temp_dir / "m.sqlite3"))
+        assert manifest.get_cursor("/OC") is None
+
+        manifest.apply_remote_changes("/OC", [_remote("/OC/a.md")], [], "cur1")
+
+        assert manifest.get_cursor("/oc") == "cur1"
+        assert manifest.get_remote("/oc/a.md").path_display == "/OC/a.md"
+
+    def test_deletion_removes_folder_contents(self, temp_dir):
+        manifest = DropboxManifest(str(temp_dir / "m.sqlite3"))
+        manifest.apply_remote_changes(
+            "/OC",
+            [_remote("/OC/a.md"), _remote("/OC/sub/b.md"), _remote("/OC/sub_x.md")],
+            [],
+            "cur1",
+        )
+
+        manifest.apply_remote_changes("/OC", [], ["/oc/sub"], "cur2")
+
+        assert set(manifest.remote_entries("/OC")) == {"/oc/a.md", "/oc/sub_x.md"}
+        assert manifest.get_cursor("/OC") == "cur2"
+
+    def test_reset_replaces_folder(self, temp_dir):
+        manifest = DropboxManifest(str(temp_dir / "m.sqlite3"))
+        manifest.apply_remote_changes("/OC", [_remote("/OC/old.md")], [], "cur1")
+        manifest.apply_remote_changes("/Other", [_remote("/Other/x.md")], [], "o1")
+
+        manifest.apply_remote_changes("/OC", [_remote("/OC/new.md")], [], "cur2", reset=True)
+
+        assert set(manifest.remote_entries("/OC")) == {"/oc/new.md"}
+        assert set(manifest.remote_entries("/Other")) == {"/other/x.md"}
+
+    def test_changes_without_cursor_keep_saved_one(self, temp_dir):
+        manifest = DropboxManifest(str(temp_dir / "m.sqlite3"))
+        manifest.apply_remote_changes("/OC", [], [], "cur1")
+
+        manifest.apply_remote_changes("/OC", [_remote("/OC/a.md")], [])
+        assert manifest.get_cursor("/OC") == "cur1"
+        assert manifest.get_remote("/oc/a.md") is not None
+
+        manifest.set_cursor("/OC", "cur2")
+        assert manifest.get_cursor("/oc") == "cur2"
+
+    def test_reset_forgets_cursor(self, temp_dir):
+        manifest = DropboxManifest(str(temp_dir / "m.sqlite3"))
+        manifest.apply_remote_changes("/OC", [], [], "cur1")
+        manifest.reset("/OC")
+        assert manifest.get_cursor("/OC") is None
+
+    def test_put_remote_keeps_cursor(self, temp_dir):
+        manifest = DropboxManifest(str(temp_dir / "m.sqlite3"))
+        manifest.apply_remote_changes("/OC", [], [], "cur1")
+        manifest.put_remote(_remote("/OC/a.md", rev="r2"))
+
+        assert manifest.get_remote("/oc/a.md").rev == "r2"
+        assert manifest.get_cursor("/OC") == "cur1"
+
+
+class TestLocalSide:
+    def test_put_and_get(self, temp_dir):
+        manifest = DropboxManifest(str(temp_dir / "m.sqlite3"))
+        entry = LocalEntry("/oc/a.md", str(temp_dir / "a.md"), 5, 1.5, rev="r1")
+        manifest.put_local(entry)
+
+        assert manifest.get_local("/oc/a.md") == entry
+        assert manifest.local_entries("/OC") == {"/oc/a.md": entry}
+        assert manifest.local_entries("/Other") == {}
+
+    def test_remove_local(self, temp_dir):
+        manifest = DropboxManifest(str(temp_dir / "m.sqlite3"))
+        manifest.put_local(LocalEntry("/oc/a.md", "a", 1, 1.0))
+        manifest.put_local(LocalEntry("/oc/b.md", "b", 1, 1.0))
+
+        assert manifest.remove_local(["/oc/a.md"]) == 1
+        assert manifest.get_local("/oc/a.md") is None
+        assert manifest.get_local("/oc/b.md") is not None
+
+    def test_persists_across_instances(self, temp_dir):
+        path = str(temp_dir / "state" / "m.sqlite3")
+        manifest = DropboxManifest(path)
+        manifest.apply_remote_changes("/OC", [_remote("/OC/a.md")], [], "cur1")
+        manifest.put_local(LocalEntry("/oc/a.md", "a", 1, 1.0, rev="r1"))
+
+        reopened = DropboxManifest(path)
+        assert reopened.get_stats() == {
+            'remote_files': 1, 'local_files': 1, 'cursors': 1, 'hashed_files': 0
+        }
+        assert reopened.get_cursor("/OC") == "cur1"
+
+
+class TestContentHash:
+    def test_empty_file(self, temp_dir):
+        path = temp_dir / "empty.md"
+        path.write_bytes(b"")
+        assert content_hash(path) == hashlib.sha256(b"").hexdigest()
+
+    def test_block_digests(self, temp_dir):
+        data = b"a" * HASH_BLOCK_SIZE + b"tail"
+        path = temp_dir / "big.bin"
+        path.write_bytes(data)
+
+        expected = hashlib.sha256(
+            hashlib.sha256(data[:HASH_BLOCK_SIZE]).digest()
+            + hashlib.sha256(b"tail").digest()
+        ).hexdigest()
+        assert content_hash(path) == expected
+
+    def test_hash_cached_until_file_changes(self, temp_dir):
+        manifest = DropboxManifest(str(temp_dir / "m.sqlite3"))
+        path = temp_dir / "note.md"
+        path.write_text("v1")
+
+        first = manifest.hash_file(path)
+        with patch("lib.dropbox_manifest.content_hash") as hasher:
+            assert manifest.hash_file(path) == first
+            hasher.assert_not_called()
+
+        path.write_text("version 2")
+        os.utime(path, (2_000_000_000, 2_000_000_000))
+        assert manifest.hash_file(path) == content_hash(path) != first
+
+    def test_remove_local_drops_hash(self, temp_dir):
+        manifest = DropboxManifest(str(temp_dir / "m.sqlite3"))
+        path = temp_dir / "note.md"
+        path.write_text("x")
+        manifest.hash_file(path)
+        manifest.put_local(LocalEntry("/oc/note.md", str(path), 1, 1.0))
+
+        manifest.remove_local(["/oc/note.md"])
+
+        assert manifest.get_stats()['hashed_files'] == 0
@@ -1,9 +1,31 @@
 """Tests for lib/dropbox_sync.py"""
 
-import pytest
+import os
+from datetime import datetime
 from pathlib import Path
+from unittest.mock import patch
+
+import pytest
 
 from lib.dropbox_sync import DropboxSync, SyncResult, create_dropbox_sync
+from tests.conftest import FakeDropboxClient, dropbox_hash
+
+
+def make_sync(temp_dir, client, **kwargs):
+    sync = DropboxSync(
+        app_key="key",
+        refresh_token="token",
+        remote_folder="/OC",
+        local_dir=str(temp_dir / "vault"),
+        manifest_path=str(temp_dir / "state" / "manifest.sqlite3"),
+        **kwargs,
+    )
+    sync._client = client
+    return sync
+
+
+def transfers(client):
+    return [call for call in client.calls if call[0] in ("upload", "download")]
 
 
 class TestSyncResult:
@@ -88,6 +110,452 @@ class TestDropboxSync:
             client.reverse_lookup("test query")
 
 
+class TestIncrementalSync:
+    def test_first_sync_transfers_both_ways(self, temp_dir, fake_dropbox):
+        client = FakeDropboxClient()
+        client.put("/OC/remote.md", b"from dropbox")
+        vault = temp_dir / "vault"
+        vault.mkdir()
+        (vault / "local.md").write_text("from disk")
+
+        result = make_sync(temp_dir, client).sync_folder()
+
+        assert (result.uploaded, result.downloaded) == (1, 1)
+        assert (vault / "remote.md").read_text() == "from dropbox"
+        assert client.files["/oc/local.md"][1] == b"from disk"
+
+    def test_second_sync_touches_nothing(self, temp_dir, fake_dropbox):
+        client = FakeDropboxClient()
+        for i in range(5):
+            client.put(f"/OC/r{i}.md", b"x")
+        sync = make_sync(temp_dir, client)
+        sync.sync_folder()
+        client.calls.clear()
+
+        result = sync.sync_folder()
+
+        assert result.total_synced == 0
+        assert transfers(client) == []
+        assert [c[0] for c in client.calls] == ["continue"]
+
+    def test_only_changes_are_transferred(self, temp_dir, fake_dropbox):
+        client = FakeDropboxClient()
+        for i in range(20):
+            client.put(f"/OC/r{i}.md", b"x")
+        sync = make_sync(temp_dir, client)
+        sync.sync_folder()
+        client.calls.clear()
+
+        client.put("/OC/r3.md", b"edited remotely")
+        client.put("/OC/new.md", b"new")
+        local = temp_dir / "vault" / "r7.md"
+        local.write_text("edited locally")
+        os.utime(local, (2_000_000_000, 2_000_000_000))
+
+        result = sync.sync_folder()
+
+        assert sorted(transfers(client)) == [
+            ("download", "/OC/new.md"),
+            ("download", "/OC/r3.md"),
+            ("upload", "/OC/r7.md"),
+        ]
+        assert result.conflicts == 0
+        assert (temp_dir / "vault" / "r3.md").read_text() == "edited remotely"
+
+    def test_own_upload_not_downloaded_back(self, temp_dir, fake_dropbox):
+        client = FakeDropboxClient()
+        sync = make_sync(temp_dir, client)
+        (temp_dir / "vault").mkdir()
+        (temp_dir / "vault" / "note.md").write_text("mine")
+        sync.sync_folder()
+        client.calls.clear()
+
+        result = sync.sync_folder()
+
+        assert result.downloaded == 0
+        assert transfers(client) == []
+
+    def test_conflict_keeps_local(self, temp_dir, fake_dropbox):
+        client = FakeDropboxClient()
+        client.put("/OC/note.md", b"v1")
+        sync = make_sync(temp_dir, client)
+        sync.sync_folder()
+
+        client.put("/OC/note.md", b"remote v2")
+        local = temp_dir / "vault" / "note.md"
+        local.write_text("local v2")
+        os.utime(local, (2_000_000_000, 2_000_000_000))
+
+        result = sync.sync_folder()
+
+        assert result.conflicts == 1
+        assert result.uploaded == 1
+        assert client.files["/oc/note.md"][1] == b"local v2"
+        assert local.read_text() == "local v2"
+
+    def test_paged_listing(self, temp_dir, fake_dropbox):
+        client = FakeDropboxClient(page_size=3)
+        for i in range(10):
+            client.put(f"/OC/r{i}.md", b"x")
+
+        result = make_sync(temp_dir, client).sync_folder()
+
+        assert result.downloaded == 10
+
+    def test_expired_cursor_relists(self, temp_dir, fake_dropbox):
+        client = FakeDropboxClient()
+        client.put("/OC/a.md", b"a")
+        sync = make_sync(temp_dir, client)
+        sync.sync_folder()
+        manifest = sync._get_manifest(temp_dir / "vault")
+        manifest.apply_remote_changes("/OC", [], [], "expired")
+        client.remove("/OC/a.md")
+        client.put("/OC/b.md", b"b")
+
+        result = sync.sync_folder()
+
+        assert result.downloaded == 1
+        assert set(manifest.remote_entries("/OC")) == {"/oc/b.md"}
+
+    def test_changed_paths_skip_scan(self, temp_dir, fake_dropbox):
+        client = FakeDropboxClient()
+        sync = make_sync(temp_dir, client)
+        vault = temp_dir / "vault"
+        vault.mkdir()
+        (vault / "a.md").write_text("a")
+        (vault / "b.md").write_text("b")
+
+        result = sync.sync_folder(changed_paths=[vault / "a.md"])
+
+        assert result.uploaded == 1
+        assert "/oc/b.md" not in client.files
+
+    def test_unchanged_local_file_baselined(self, temp_dir, fake_dropbox):
+        client = FakeDropboxClient()
+        client.put("/OC/note.md", b"same", modified=datetime.fromtimestamp(2_100_000_000))
+        vault = temp_dir / "vault"
+        vault.mkdir()
+        (vault / "note.md").write_text("same")
+        sync = make_sync(temp_dir, client)
+
+        first = sync.sync_folder()
+        client.calls.clear()
+        second = sync.sync_folder()
+
+        assert (first.uploaded, first.downloaded, first.skipped) == (0, 0, 1)
+        assert second.skipped == 0
+        assert transfers(client) == []
+
+    def test_failed_download_retried(self, temp_dir, fake_dropbox):
+        client = FakeDropboxClient()
+        client.put("/OC/a.md", b"a")
+        sync = make_sync(temp_dir, client)
+        sync.sync_folder()
+
+        client.put("/OC/b.md", b"b")
+        with patch.object(client, "files_download_to_file", side_effect=OSError("reset")):
+            failed = sync.sync_folder()
+
+        retried = sync.sync_folder()
+
+        assert failed.errors == 1
+        assert (retried.downloaded, retried.errors) == (1, 0)
+        assert (temp_dir / "vault" / "b.md").read_text() == "b"
+        client.calls.clear()
+        assert sync.sync_folder().total_synced == 0
+        assert transfers(client) == []
+
+    def test_wait_for_changes(self, temp_dir, fake_dropbox):
+        client = FakeDropboxClient()
+        sync = make_sync(temp_dir, client)
+        assert sync.wait_for_changes() is True  # never synced
+
+        sync.sync_folder()
+        assert sync.wait_for_changes() is False
+        client.put("/OC/x.md", b"x")
+        assert sync.wait_for_changes() is True
+
+    def test_manifest_stats(self, temp_dir, fake_dropbox):
+        client = FakeDropboxClient()
+        client.put("/OC/a.md", b"a")
+        sync = make_sync(temp_dir, client)
+        sync.sync_folder()
+
+        stats = sync.get_stats()['manifest']
+        assert list(stats.values()) == [
+            {'remote_files': 1, 'local_files': 1, 'cursors': 1, 'hashed_files': 1}
+        ]
+
+
+class TestParallelSync:
+    def test_chunked_uploads_committed_in_batch(self, temp_dir, fake_dropbox):
+        client = FakeDropboxClient()
+        vault = temp_dir / "vault"
+        (vault / "sub").mkdir(parents=True)
+        for i in range(4):
+            (vault / "sub" / f"n{i}.md").write_text(f"note {i} " * 50)
+        sync = make_sync(temp_dir, client, chunk_size=64, max_workers=3)
+
+        result = sync.sync_folder()
+
+        assert result.uploaded == 4
+        assert sync.generation == 4
+        assert [c for c in client.calls if c[0] == "finish_batch"] == [("finish_batch", 4)]
+        assert client.files["/oc/sub/n2.md"][1] == b"note 2 " * 50
+        assert sync.get_stats()['transfers']['upload_sessions'] == 4
+
+    def test_failed_upload_counted(self, temp_dir, fake_dropbox):
+        client = FakeDropboxClient()
+        client.files_upload_session_start = lambda data, close=False: 1 / 0
+        vault = temp_dir / "vault"
+        vault.mkdir()
+        (vault / "a.md").write_text("a")
+        sync = make_sync(temp_dir, client)
+
+        result = sync.sync_folder()
+
+        assert (result.uploaded, result.errors) == (0, 1)
+        assert sync._get_manifest(vault).get_local("/oc/a.md") is None
+
+
+def make_cached_sync(temp_dir, client, **kwargs):
+    return make_sync(temp_dir, client, cache_dir=str(temp_dir / "cache"), **kwargs)
+
+
+class TestSearchCache:
+    def test_search_without_cache_returns_names(self, temp_dir, fake_dropbox):
+        client = FakeDropboxClient()
+        client.put("/OC/budget.md", b"quarterly budget")
+
+        results = make_sync(temp_dir, client).search("budget")
+
+        assert [(r['path'], r['name']) for r in results] == [("/OC/budget.md", "budget.md")]
+        assert 'content' not in results[0]
+
+    def test_search_returns_content_and_snippet(self, temp_dir, fake_dropbox):
+        client = FakeDropboxClient()
+        client.put("/OC/Notes/plan.md", b"the quarterly budget plan")
+        client.put("/OC/other.md", b"unrelated")
+
+        results = make_cached_sync(temp_dir, client).search("quarterly budget")
+
+        assert len(results) == 1
+        assert results[0]['path'] == "/OC/Notes/plan.md"
+        assert results[0]['content'] == "the quarterly budget plan"
+        assert "quarterly budget" in results[0]['snippet']
+        assert results[0]['score'] > 0
+
+    def test_repeat_lookup_served_locally(self, temp_dir, fake_dropbox):
+        client = FakeDropboxClient()
+        client.put("/OC/plan.md", b"budget plan")
+        sync = make_cached_sync(temp_dir, client)
+        sync.search("budget")
+        client.calls.clear()
+
+        results = sync.search("budget")
+
+        assert [r['name'] for r in results] == ["plan.md"]
+        assert client.calls == []
+
+    def test_failed_prefetch_not_remembered(self, temp_dir, fake_dropbox):
+        client = FakeDropboxClient()
+        client.put("/OC/plan.md", b"budget plan")
+        sync = make_cached_sync(temp_dir, client)
+        parts = []
+
+        def fail(local_path, path):
+            parts.append(local_path)
+            Path(local_path).write_bytes(b"partial")
+            raise OSError("connection reset")
+
+        with patch.object(client, "files_download_to_file", side_effect=fail):
+            sync.search("budget")
+            sync.search("budget")
+
+        assert len(parts) == 2 and parts[0] != parts[1]
+        assert list((temp_dir / "cache").rglob("*.part")) == []
+        client.calls.clear()
+        assert [r['name'] for r in sync.search("budget")] == ["plan.md"]
+        assert ("search", "budget") in client.calls
+
+    def test_fresh_lookup_keeps_name_only_matches(self, temp_dir, fake_dropbox):
+        client = FakeDropboxClient()
+        client.put("/OC/plan.md", b"budget plan")
+        client.put("/OC/budget-scan.pdf", b"x" * 500)
+        sync = make_cached_sync(temp_dir, client, cache_max_bytes=100)
+
+        first = sync.search("budget")
+        client.calls.clear()
+        second = sync.search("budget")
+
+        assert client.calls == []
+        assert [r['name'] for r in first] == ["plan.md", "budget-scan.pdf"]
+        assert second == first
+
+    def test_prefetch_skips_cached_revisions(self, temp_dir, fake_dropbox):
+        client = FakeDropboxClient()
+        for i in range(4):
+            client.put(f"/OC/n{i}.md", f"budget {i}".encode())
+        sync = make_cached_sync(temp_dir, client, cache_query_ttl=0)
+
+        sync.search("budget")
+        first = [c for c in client.calls if c[0] == "download"]
+        client.calls.clear()
+        sync.search("budget")
+
+        assert len(first) == 4
+        assert [c[0] for c in client.calls] == ["search"]
+
+    def test_sync_invalidates_changed_files(self, temp_dir, fake_dropbox):
+        client = FakeDropboxClient()
+        client.put("/OC/plan.md", b"old budget")
+        sync = make_cached_sync(temp_dir, client)
+        sync.sync_folder()
+        sync.search("budget")
+
+        client.put("/OC/plan.md", b"new budget")
+        sync.sync_folder()
+        results = sync.search("budget")
+
+        assert results[0]['content'] == "new budget"
+
+    def test_offline_falls_back_to_cache(self, temp_dir, fake_dropbox):
+        client = FakeDropboxClient()
+        client.put("/OC/plan.md", b"budget plan")
+        sync = make_cached_sync(temp_dir, client, cache_query_ttl=0)
+        sync.search("budget")
+
+        def offline(query):
+            raise ConnectionError("offline")
+
+        client.files_search_v2 = offline
+        assert [r['name'] for r in sync.search("budget")] == ["plan.md"]
+
+    def test_reverse_lookup_copies_cached_files(self, temp_dir, fake_dropbox):
+        client = FakeDropboxClient()
+        client.put("/OC/a.md", b"budget a")
+        client.put("/OC/b.md", b"budget b")
+        sync = make_cached_sync(temp_dir, client)
+        sync.search("budget")
+        client.calls.clear()
+
+        paths = sync.reverse_lookup("budget", download_dir=temp_dir / "hot")
+
+        assert sorted(p.name for p in paths) == ["a.md", "b.md"]
+        assert (temp_dir / "hot" / "a.md").read_text() == "budget a"
+        assert client.calls == []
+
+    def test_reverse_lookup_without_cache_downloads(self, temp_dir, fake_dropbox):
+        client = FakeDropboxClient()
+        client.put("/OC/a.md", b"budget a")
+        client.put("/OC/b.md", b"budget b")
+
+        paths = make_sync(temp_dir, client).reverse_lookup("budget", download_dir=temp_dir / "hot")
+
+        assert sorted(p.name for p in paths) == ["a.md", "b.md"]
+        assert len([c for c in client.calls if c[0] == "download"]) == 2
+
+
+class TestContentHashSync:
+    def test_touched_file_not_uploaded(self, temp_dir, fake_dropbox):
+        client = FakeDropboxClient()
+        vault = temp_dir / "vault"
+        vault.mkdir()
+        note = vault / "note.md"
+        note.write_text("content")
+        sync = make_sync(temp_dir, client)
+        sync.sync_folder()
+        client.calls.clear()
+
+        os.utime(note, (2_000_000_000, 2_000_000_000))
+        result = sync.sync_folder()
+
+        assert result.total_synced == 0
+        assert transfers(client) == []
+
+    def test_copy_with_skewed_mtime_not_transferred(self, temp_dir, fake_dropbox):
+        client = FakeDropboxClient()
+        client.put("/OC/note.md", b"same", modified=datetime(2030, 1, 1))
+        vault = temp_dir / "vault"
+        vault.mkdir()
+        (vault / "note.md").write_bytes(b"same")
+        os.utime(vault / "note.md", (2_100_000_000, 2_100_000_000))
+
+        result = make_sync(temp_dir, client).sync_folder()
+
+        assert result.skipped == 1
+        assert transfers(client) == []
+
+    def test_unsynced_difference_newer_local_wins(self, temp_dir, fake_dropbox):
+        client = FakeDropboxClient()
+        client.put("/OC/note.md", b"remote", modified=datetime(2001, 9, 9))
+        vault = temp_dir / "vault"
+        vault.mkdir()
+        (vault / "note.md").write_text("local")
+        sync = make_sync(temp_dir, client)
+
+        result = sync.sync_folder()
+
+        assert result.conflicts == 1
+        assert transfers(client) == [("upload", "/OC/note.md")]
+        assert client.files["/oc/note.md"][1] == b"local"
+        assert sync.sync_folder().conflicts == 0
+
+    def test_unsynced_difference_newer_remote_wins(self, temp_dir, fake_dropbox):
+        client = FakeDropboxClient()
+        client.put("/OC/note.md", b"remote", modified=datetime(2040, 1, 1))
+        vault = temp_dir / "vault"
+        vault.mkdir()
+        (vault / "note.md").write_text("local")
+        sync = make_sync(temp_dir, client)
+
+        result = sync.sync_folder()
+
+        assert result.conflicts == 1
+        assert transfers(client) == [("download", "/OC/note.md")]
+        assert (vault / "note.md").read_text() == "remote"
+        assert sync.sync_folder().conflicts == 0
+
+    def test_touched_file_still_gets_remote_edit(self, temp_dir, fake_dropbox):
+        client = FakeDropboxClient()
+        client.put("/OC/note.md", b"v1")
+        sync = make_sync(temp_dir, client)
+        sync.sync_folder()
+        note = temp_dir / "vault" / "note.md"
+
+        client.put("/OC/note.md", b"remote v2")
+        os.utime(note, (2_000_000_000, 2_000_000_000))
+        result = sync.sync_folder()
+
+        assert (result.downloaded, result.uploaded, result.conflicts) == (1, 0, 0)
+        assert note.read_text() == "remote v2"
+
+    def test_upload_sets_client_modified(self, temp_dir, fake_dropbox):
+        client = FakeDropboxClient()
+        vault = temp_dir / "vault"
+        vault.mkdir()
+        (vault / "note.md").write_text("x")
+        os.utime(vault / "note.md", (1_700_000_000.7, 1_700_000_000.7))
+
+        make_sync(temp_dir, client).sync_folder()
+
+        meta = client.files["/oc/note.md"][0]
+        assert meta.client_modified == datetime(2023, 11, 14, 22, 13, 20)
+
+    def test_download_primes_hash_cache(self, temp_dir, fake_dropbox):
+        client = FakeDropboxClient()
+        client.put("/OC/note.md", b"remote")
+        sync = make_sync(temp_dir, client)
+
+        with patch("lib.dropbox_manifest.content_hash") as hasher:
+            sync.sync_folder()
+            manifest = sync._get_manifest(temp_dir / "vault")
+            digest = manifest.hash_file(temp_dir / "vault" / "note.md")
+
+        hasher.assert_not_called()
+        assert digest == dropbox_hash(b"remote")
+
+
 class TestCreateDropboxSync:
     def test_disabled(self):
         client = create_dropbox_sync({'dropbox': {'enabled': False}})
@@ -107,3 +575,33 @@ class TestCreateDropboxSync:
         client = create_dropbox_sync(config)
         assert client is not None
         assert client.remote_folder == '/MyMemory'
+
+    def test_transfer_settings(self):
+        config = {
+            'dropbox': {'enabled': True, 'max_workers': 4, 'chunk_size_mb': 16},
+        }
+        client = create_dropbox_sync(config)
+        assert client.max_workers == 4
+        assert client.chunk_size == 16 * 1024 * 1024
+
+    def test_cache_settings(self, temp_dir):
+        config = {
+            'memory': {'dir': str(temp_dir), 'cache_dir': str(temp_dir / "cache")},
+            'dropbox': {'enabled': True, 'cache_size_mb': 64, 'cache_query_ttl': 30},
+        }
+        client = create_dropbox_sync(config)
+        assert client.cache_dir == str(temp_dir / "cache" / "dropbox_cache")
+        assert client.cache_max_bytes == 64 * 1024 * 1024
+        assert client.cache_query_ttl == 30
+
+    def test_cache_disabled(self):
+        client = create_dropbox_sync({'dropbox': {'enabled': True, 'cache': False}})
+        assert client.cache is None
+
+    def test_manifest_in_state_dir(self, temp_dir):
+        config = {
+            'memory': {'dir': str(temp_dir)},
+            'dropbox': {'enabled': True, 'app_key': 'test_key'},
+        }
+        client = create_dropbox_sync(config)
+        assert client.manifest_path == str(temp_dir / ".oc-memory" / "dropbox_manifest.sqlite3")
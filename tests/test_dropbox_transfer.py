@@ -0,0 +1,147 @@
+"""Tests for lib/dropbox_transfer.py"""
+
+import threading
+from datetime import datetime
+from unittest.mock import patch
+
+from lib.dropbox_transfer import TransferEngine, client_modified
+from tests.conftest import FakeDropboxClient
+
+
+class SlowClient(FakeDropboxClient):
+    """
+    Fake client tracking concurrency: requests hold until ``concurrency``
+    of them are in flight at once, which only parallel callers reach
+    """
+
+    def __init__(self, concurrency):
+        super().__init__()
+        self.concurrency = concurrency
+        self.in_flight = 0
+        self.peak = 0
+        self._gauge = threading.Lock()
+        self._reached = threading.Event()
+
+    def _request(self):
+        with self._gauge:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            if self.in_flight >= self.concurrency:
+                self._reached.set()
+        self._reached.wait(10)
+        with self._gauge:
+            self.in_flight -= 1
+
+    def files_upload_session_start(self, data, close=False):
+        self._request()
+        return super().files_upload_session_start(data, close=close)
+
+    def files_download_to_file(self, local_path, path):
+        self._request()
+        return super().files_download_to_file(local_path, path)
+
+
+class TestUploads:
+    def test_small_file_single_request(self, temp_dir, fake_dropbox):
+        client = FakeDropboxClient()
+        path = temp_dir / "a.md"
+        path.write_text("hello")
+
+        meta = TransferEngine(client, chunk_size=64).upload(path, "/OC/a.md")
+
+        assert meta.path_lower == "/oc/a.md"
+        assert client.sessions == {}
+        assert client.files["/oc/a.md"][1] == b"hello"
+
+    def test_large_file_streams_chunks(self, temp_dir, fake_dropbox):
+        client = FakeDropboxClient()
+        data = bytes(range(256)) * 4
+        path = temp_dir / "big.bin"
+        path.write_bytes(data)
+        appends = []
+        original = client.files_upload_session_append_v2
+
+        def record(chunk, cursor, close=False):
+            appends.append(len(chunk))
+            return original(chunk, cursor, close=close)
+
+        client.files_upload_session_append_v2 = record
+        engine = TransferEngine(client, chunk_size=300)
+        engine.upload(path, "/OC/big.bin")
+
+        assert appends == [300, 300, 124]
+        assert client.files["/oc/big.bin"][1] == data
+        assert engine.get_stats()['bytes_uploaded'] == len(data)
+
+    def test_upload_many_commits_in_one_batch(self, temp_dir, fake_dropbox):
+        client = FakeDropboxClient()
+        items = []
+        for i in range(5):
+            path = temp_dir / f"n{i}.md"
+            path.write_text(f"note {i}" * 20)
+            items.append((path, f"/OC/n{i}.md"))
+
+        results = TransferEngine(client, chunk_size=16).upload_many(items)
+
+        assert [m.path_lower for m in results] == [f"/oc/n{i}.md" for i in range(5)]
+        assert [c for c in client.calls if c[0] == "finish_batch"] == [("finish_batch", 5)]
+        assert client.files["/oc/n3.md"][1] == b"note 3" * 20
+
+    def test_upload_many_batch_limit(self, temp_dir, fake_dropbox):
+        client = FakeDropboxClient()
+        items = []
+        for i in range(5):
+            path = temp_dir / f"n{i}.md"
+            path.write_text("x")
+            items.append((path, f"/OC/n{i}.md"))
+
+        with patch("lib.dropbox_transfer.FINISH_BATCH_SIZE", 2):
+            TransferEngine(client).upload_many(items)
+
+        batches = [c[1] for c in client.calls if c[0] == "finish_batch"]
+        assert batches == [2, 2, 1]
+
+    def test_upload_many_reports_failures(self, temp_dir, fake_dropbox):
+        client = FakeDropboxClient()
+        good = temp_dir / "good.md"
+        good.write_text("ok")
+
+        results = TransferEngine(client).upload_many(
+            [(temp_dir / "missing.md", "/OC/missing.md"), (good, "/OC/good.md")]
+        )
+
+        assert results[0] is None
+        assert results[1].path_lower == "/oc/good.md"
+
+    def test_client_modified_from_mtime(self, temp_dir, fake_dropbox):
+        assert client_modified(1_700_000_000.9) == datetime(2023, 11, 14, 22, 13, 20)
+
+    def test_uploads_run_in_parallel(self, temp_dir, fake_dropbox):
+        client = SlowClient(concurrency=8)
+        items = []
+        for i in range(16):
+            path = temp_dir / f"n{i}.md"
+            path.write_text("x")
+            items.append((path, f"/OC/n{i}.md"))
+
+        results = TransferEngine(client, max_workers=8).upload_many(items)
+
+        assert all(results)
+        assert client.peak == 8
+
+
+class TestDownloads:
+    def test_download_many(self, temp_dir, fake_dropbox):
+        client = SlowClient(concurrency=4)
+        for i in range(6):
+            client.put(f"/OC/r{i}.md", f"remote {i}".encode())
+        items = [(f"/OC/r{i}.md", temp_dir / "out" / f"r{i}.md") for i in range(6)]
+        items.append(("/OC/missing.md", temp_dir / "out" / "missing.md"))
+
+        engine = TransferEngine(client, max_workers=4)
+        results = engine.download_many(items)
+
+        assert [m is not None for m in results] == [True] * 6 + [False]
+        assert (temp_dir / "out" / "r4.md").read_text() == "remote 4"
+        assert client.peak == 4
+        assert engine.get_stats()['bytes_downloaded'] == sum(len(f"remote {i}") for i in range(6))
@@ -0,0 +1,145 @@
+"""Tests for lib/embedding_cache.py"""
+
+import threading
+
+from lib.embedding_cache import CachedEmbeddingFunction, EmbeddingCache, embedding_key
+
+
+class FakeEmbedder:
+    """Deterministic 3-d embedder that records the texts it was asked for"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, input):
+        self.calls.append(list(input))
+        return [[float(len(t)), float(sum(map(ord, t)) % 97), 0.5] for t in input]
+
+
+class TestEmbeddingKey:
+    def test_model_is_part_of_key(self):
+        assert embedding_key("x", "a") != embedding_key("x", "b")
+        assert embedding_key("x", "a") == embedding_key("x", "a")
+
+
+class TestEmbeddingCache:
+    def test_roundtrip(self, temp_dir):
+        cache = EmbeddingCache(str(temp_dir / "emb"))
+        assert cache.get_many(["k1"]) == {}
+        assert cache.put_many({"k1": [1.0, 2.0], "k2": [3.0, 4.0]}) == 2
+        assert cache.get_many(["k2", "k1", "missing"]) == {"k1": [1.0, 2.0], "k2": [3.0, 4.0]}
+        assert cache.count() == 2
+
+    def test_existing_keys_not_rewritten(self, temp_dir):
+        cache = EmbeddingCache(str(temp_dir / "emb"))
+        cache.put_many({"k1": [1.0, 2.0]})
+        assert cache.put_many({"k1": [9.0, 9.0], "k2": [3.0, 4.0]}) == 1
+        assert cache.get_many(["k1"])["k1"] == [1.0, 2.0]
+        assert cache.vectors_path.stat().st_size == 2 * 2 * 4
+
+    def test_persists_across_instances(self, temp_dir):
+        cache = EmbeddingCache(str(temp_dir / "emb"))
+        cache.put_many({"k1": [0.25, 0.5, 0.75]})
+        cache.close()
+
+        reopened = EmbeddingCache(str(temp_dir / "emb"))
+        assert reopened.dim == 3
+        assert reopened.get_many(["k1"]) == {"k1": [0.25, 0.5, 0.75]}
+
+    def test_reads_after_growth(self, temp_dir):
+        cache = EmbeddingCache(str(temp_dir / "emb"))
+        cache.put_many({"a": [1.0]})
+        assert cache.get_many(["a"]) == {"a": [1.0]}
+        cache.put_many({f"k{i}": [float(i)] for i in range(100)})
+        assert cache.get_many(["k99", "a"]) == {"k99": [99.0], "a": [1.0]}
+
+    def test_dimension_mismatch_skipped(self, temp_dir):
+        cache = EmbeddingCache(str(temp_dir / "emb"))
+        cache.put_many({"a": [1.0, 2.0]})
+        assert cache.put_many({"b": [1.0, 2.0, 3.0]}) == 0
+        assert cache.get_many(["b"]) == {}
+
+    def test_torn_tail_overwritten(self, temp_dir):
+        cache = EmbeddingCache(str(temp_dir / "emb"))
+        cache.put_many({"a": [1.0, 2.0, 3.0, 4.0]})
+        cache.close()
+        with open(cache.vectors_path, 'ab') as f:
+            f.write(b"\x00" * 8)
+
+        reopened = EmbeddingCache(str(temp_dir / "emb"))
+        reopened.put_many({"b": [5.0, 6.0, 7.0, 8.0]})
+        assert reopened.get_many(["a", "b"]) == {
+            "a": [1.0, 2.0, 3.0, 4.0],
+            "b": [5.0, 6.0, 7.0, 8.0],
+        }
+        assert reopened.vectors_path.stat().st_size == 2 * 4 * 4
+
+    def test_instances_sharing_directory(self, temp_dir):
+        first = EmbeddingCache(str(temp_dir / "emb"))
+        second = EmbeddingCache(str(temp_dir / "emb"))
+        first.put_many({"a": [1.0, 2.0]})
+        assert second.get_many(["a"]) == {"a": [1.0, 2.0]}
+        second.put_many({"b": [3.0, 4.0]})
+        first.put_many({"c": [5.0, 6.0]})
+
+        expected = {"a": [1.0, 2.0], "b": [3.0, 4.0], "c": [5.0, 6.0]}
+        assert first.get_many(["a", "b", "c"]) == expected
+        assert second.get_many(["a", "b", "c"]) == expected
+
+
+class TestCachedEmbeddingFunction:
+    def test_misses_then_hits(self, temp_dir):
+        backend = FakeEmbedder()
+        fn = CachedEmbeddingFunction(backend, EmbeddingCache(str(temp_dir / "emb")))
+
+        first = fn(["alpha", "beta"])
+        second = fn(["beta", "alpha", "gamma"])
+
+        assert backend.calls == [["alpha", "beta"], ["gamma"]]
+        assert second[:2] == [first[1], first[0]]
+        assert fn.get_stats() == {'hits': 2, 'misses': 3, 'cached_vectors': 3}
+
+    def test_duplicates_in_one_call_embedded_once(self, temp_dir):
+        backend = FakeEmbedder()
+        fn = CachedEmbeddingFunction(backend, EmbeddingCache(str(temp_dir / "emb")))
+
+        result = fn(["same", "same", "other", "same"])
+
+        assert backend.calls == [["same", "other"]]
+        assert result[0] == result[1] == result[3]
+
+    def test_fully_cached_call_skips_backend(self, temp_dir):
+        cache_dir = str(temp_dir / "emb")
+        CachedEmbeddingFunction(FakeEmbedder(), EmbeddingCache(cache_dir))(["q"])
+
+        backend = FakeEmbedder()
+        fn = CachedEmbeddingFunction(backend, EmbeddingCache(cache_dir))
+        fn(["q"])
+        assert backend.calls == []
+
+    def test_model_name_separates_entries(self, temp_dir):
+        cache = EmbeddingCache(str(temp_dir / "emb"))
+        CachedEmbeddingFunction(FakeEmbedder(), cache, model_name="a")(["q"])
+
+        backend = FakeEmbedder()
+        CachedEmbeddingFunction(backend, cache, model_name="b")(["q"])
+        assert backend.calls == [["q"]]
+
+    def test_concurrent_calls(self, temp_dir):
+        fn = CachedEmbeddingFunction(FakeEmbedder(), EmbeddingCache(str(temp_dir / "emb")))
+        texts = [f"text {i}" for i in range(20)]
+        expected = FakeEmbedder()(texts)
+        results = []
+
+        def worker():
+            results.append(fn(texts))
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        for result in results:
+            assert result == expected
+        assert fn.cache.count() == 20
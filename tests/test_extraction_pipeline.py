@@ -0,0 +1,296 @@
+"""Tests for lib/extraction_pipeline.py"""
+
+import asyncio
+import threading
+
+import pytest
+
+from lib.extraction_pipeline import (
+    AsyncExtractionPipeline,
+    ExtractionPipeline,
+    create_extraction_pipeline,
+)
+
+
+class Recorder:
+    def __init__(self, barrier=None):
+        self.batches = []
+        self.barrier = barrier
+        self.lock = threading.Lock()
+
+    def __call__(self, batch):
+        if self.barrier is not None:
+            self.barrier.wait()
+        with self.lock:
+            self.batches.append([(p.name, c) for p, c in batch])
+
+
+def write(dir_path, name, content):
+    path = dir_path / name
+    path.write_text(content, encoding="utf-8")
+    return path
+
+
+class TestExtractionPipeline:
+    def test_processes_submitted_file(self, temp_dir):
+        rec = Recorder()
+        pipeline = ExtractionPipeline(rec, workers=1)
+        pipeline.start()
+        pipeline.submit(write(temp_dir, "a.md", "hello"))
+        pipeline.join()
+        pipeline.stop()
+
+        assert rec.batches == [[("a.md", "hello")]]
+        assert pipeline.get_stats()['files_processed'] == 1
+
+    def test_small_files_are_batched(self, temp_dir):
+        rec = Recorder()
+        pipeline = ExtractionPipeline(rec, workers=1, batch_max_files=10)
+        for i in range(5):
+            pipeline.submit(write(temp_dir, f"{i}.md", f"note {i}"))
+        pipeline.start()
+        pipeline.join()
+        pipeline.stop()
+
+        assert len(rec.batches) == 1
+        assert len(rec.batches[0]) == 5
+
+    def test_batch_respects_limits(self, temp_dir):
+        rec = Recorder()
+        pipeline = ExtractionPipeline(rec, workers=1, batch_max_files=2)
+        for i in range(5):
+            pipeline.submit(write(temp_dir, f"{i}.md", f"note {i}"))
+        pipeline.start()
+        pipeline.join()
+        pipeline.stop()
+
+        assert [len(b) for b in rec.batches] == [2, 2, 1]
+
+    def test_large_files_run_alone(self, temp_dir):
+        rec = Recorder()
+        pipeline = ExtractionPipeline(rec, workers=1, batch_max_chars=100)
+        pipeline.submit(write(temp_dir, "small.md", "tiny"))
+        pipeline.submit(write(temp_dir, "big.md", "x" * 500))
+        pipeline.start()
+        pipeline.join()
+        pipeline.stop()
+
+        assert sorted(len(b) for b in rec.batches) == [1, 1]
+
+    def test_duplicate_submissions_coalesce(self, temp_dir):
+        rec = Recorder()
+        pipeline = ExtractionPipeline(rec, workers=1)
+        path = write(temp_dir, "a.md", "hello")
+        for _ in range(3):
+            pipeline.submit(path)
+        pipeline.start()
+        pipeline.join()
+        pipeline.stop()
+
+        assert sum(len(b) for b in rec.batches) == 1
+        assert pipeline.get_stats()['coalesced'] == 2
+
+    def test_empty_and_missing_files_skipped(self, temp_dir):
+        rec = Recorder()
+        pipeline = ExtractionPipeline(rec, workers=1)
+        pipeline.submit(write(temp_dir, "empty.md", "   "))
+        pipeline.submit(temp_dir / "missing.md")
+        pipeline.start()
+        pipeline.join()
+        pipeline.stop()
+
+        assert rec.batches == []
+
+    def test_full_queue_rejects_without_blocking(self, temp_dir):
+        pipeline = ExtractionPipeline(Recorder(), queue_size=1)
+        assert pipeline.submit(write(temp_dir, "a.md", "a"))
+        assert not pipeline.submit(write(temp_dir, "b.md", "b"), block=False)
+        assert pipeline.get_stats()['rejected'] == 1
+
+    def test_handler_errors_counted(self, temp_dir):
+        def boom(batch):
+            raise RuntimeError("llm down")
+
+        pipeline = ExtractionPipeline(boom, workers=1)
+        pipeline.start()
+        pipeline.submit(write(temp_dir, "a.md", "hello"))
+        pipeline.join()
+        pipeline.stop()
+
+        assert pipeline.get_stats()['errors'] == 1
+
+    def test_workers_run_concurrently(self, temp_dir):
+        # Every handler call waits for all four, which only serial
+        # processing could fail to reach
+        rec = Recorder(barrier=threading.Barrier(4, timeout=10))
+        pipeline = ExtractionPipeline(rec, workers=4, batch_max_chars=1)
+        for i in range(4):
+            pipeline.submit(write(temp_dir, f"{i}.md", f"note {i}"))
+
+        pipeline.start()
+        pipeline.join()
+        pipeline.stop()
+
+        assert len(rec.batches) == 4
+        assert pipeline.get_stats()['errors'] == 0
+
+    def test_stop_drains_queue(self, temp_dir):
+        rec = Recorder()
+        pipeline = ExtractionPipeline(rec, workers=2)
+        pipeline.start()
+        for i in range(10):
+            pipeline.submit(write(temp_dir, f"{i}.md", f"note {i}"))
+        pipeline.stop()
+
+        assert sum(len(b) for b in rec.batches) == 10
+        assert not pipeline.is_running
+
+
+class AsyncRecorder:
+    """
+    Records batches; with a gate, each call holds until the gate is set,
+    which the recorder does itself once ``release_at`` calls are active
+    """
+
+    def __init__(self, gate=None, release_at=None):
+        self.batches = []
+        self.gate = gate
+        self.release_at = release_at
+        self.active = 0
+        self.peak = 0
+
+    async def __call__(self, batch):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        if self.release_at is not None and self.active >= self.release_at:
+            self.gate.set()
+        if self.gate is not None:
+            while not self.gate.is_set():
+                await asyncio.sleep(0.001)
+        self.active -= 1
+        self.batches.append([(p.name, c) for p, c in batch])
+
+
+class TestAsyncExtractionPipeline:
+    def test_many_files_in_flight(self, temp_dir):
+        # Nothing finishes until 20 calls are in flight at once
+        rec = AsyncRecorder(gate=threading.Event(), release_at=20)
+        pipeline = AsyncExtractionPipeline(rec, max_in_flight=100)
+        pipeline.start()
+
+        for i in range(50):
+            pipeline.submit(write(temp_dir, f"{i}.md", f"note {i}"))
+        pipeline.join()
+        pipeline.stop()
+
+        assert len(rec.batches) == 50
+        assert rec.peak >= 20
+
+    def test_semaphore_bounds_concurrency(self, temp_dir):
+        # Calls hold until a fourth is in flight, which the bound prevents
+        gate = threading.Event()
+        rec = AsyncRecorder(gate=gate, release_at=4)
+        pipeline = AsyncExtractionPipeline(rec, max_in_flight=3)
+        pipeline.start()
+        for i in range(12):
+            pipeline.submit(write(temp_dir, f"{i}.md", f"note {i}"))
+        gate.set()
+        pipeline.stop()
+
+        assert len(rec.batches) == 12
+        assert rec.peak <= 3
+
+    def test_full_rejects_without_blocking(self, temp_dir):
+        gate = threading.Event()
+        pipeline = AsyncExtractionPipeline(AsyncRecorder(gate=gate), queue_size=1)
+        pipeline.start()
+        assert pipeline.submit(write(temp_dir, "a.md", "a"))
+        assert not pipeline.submit(write(temp_dir, "b.md", "b"), block=False)
+        gate.set()
+        pipeline.stop()
+
+        assert pipeline.get_stats()['rejected'] == 1
+
+    def test_errors_counted_and_missing_skipped(self, temp_dir):
+        async def boom(batch):
+            raise RuntimeError("llm down")
+
+        pipeline = AsyncExtractionPipeline(boom)
+        pipeline.start()
+        pipeline.submit(write(temp_dir, "a.md", "hello"))
+        pipeline.submit(temp_dir / "missing.md")
+        pipeline.stop()
+
+        stats = pipeline.get_stats()
+        assert stats['errors'] == 1
+        assert stats['files_processed'] == 1
+        assert stats['queued'] == 0
+
+    def test_on_stop_runs_on_loop(self, temp_dir):
+        seen = []
+
+        async def on_stop():
+            seen.append(asyncio.get_running_loop())
+
+        pipeline = AsyncExtractionPipeline(AsyncRecorder(), on_stop=on_stop)
+        pipeline.start()
+        loop = pipeline._loop
+        pipeline.stop()
+
+        assert seen == [loop]
+        assert not pipeline.is_running
+
+    def test_submit_batch_reports_failures(self, temp_dir):
+        rec = AsyncRecorder()
+
+        async def flaky(batch):
+            if batch[0][1] == "bad":
+                raise RuntimeError("llm down")
+            await rec(batch)
+
+        pipeline = AsyncExtractionPipeline(rec, max_in_flight=2)
+        pipeline.start()
+        good = pipeline.submit_batch([(temp_dir / "a.md", "a"), (temp_dir / "b.md", "b")], flaky)
+        bad = pipeline.submit_batch([(temp_dir / "c.md", "bad")], flaky)
+        pipeline.stop()
+
+        assert good.exception() is None
+        assert isinstance(bad.exception(), RuntimeError)
+        assert rec.batches == [[("a.md", "a"), ("b.md", "b")]]
+        stats = pipeline.get_stats()
+        assert stats['errors'] == 1
+        assert stats['submitted'] == 3
+
+    def test_submit_requires_start(self, temp_dir):
+        pipeline = AsyncExtractionPipeline(AsyncRecorder())
+        with pytest.raises(RuntimeError):
+            pipeline.submit(write(temp_dir, "a.md", "a"))
+
+
+class TestCreateExtractionPipeline:
+    def test_create_from_config(self):
+        pipeline = create_extraction_pipeline(
+            {'processing': {'workers': 2, 'batch_max_files': 3}},
+            handler=lambda batch: None,
+        )
+        assert pipeline.workers == 2
+        assert pipeline.batch_max_files == 3
+
+    def test_create_with_defaults(self):
+        pipeline = create_extraction_pipeline({}, handler=lambda batch: None)
+        assert pipeline.workers == 4
+
+    def test_create_async_mode(self):
+        pipeline = create_extraction_pipeline(
+            {'processing': {'mode': 'async', 'max_in_flight': 7}},
+            handler=lambda batch: None,
+            async_handler=AsyncRecorder(),
+        )
+        assert isinstance(pipeline, AsyncExtractionPipeline)
+        assert pipeline.max_in_flight == 7
+
+    def test_async_mode_requires_async_handler(self):
+        with pytest.raises(ValueError):
+            create_extraction_pipeline(
+                {'processing': {'mode': 'async'}}, handler=lambda batch: None
+            )
@@ -0,0 +1,175 @@
+"""Tests for lib/file_watcher.py"""
+
+import threading
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("watchdog")
+
+from watchdog.events import (
+    FileCreatedEvent, FileDeletedEvent, FileModifiedEvent, FileMovedEvent,
+)
+
+from lib.file_watcher import EventDebouncer, MarkdownFileHandler, FileWatcher
+
+
+class Recorder:
+    def __init__(self):
+        self.calls = []
+        self.event = threading.Event()
+
+    def __call__(self, file_path, event_type):
+        self.calls.append((Path(file_path).name, event_type))
+        self.event.set()
+
+
+class FakeClock:
+    """Manual monotonic clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestEventDebouncer:
+    def test_burst_fires_once(self, temp_dir):
+        path = temp_dir / "note.md"
+        path.write_text("x")
+        rec = Recorder()
+        clock = FakeClock()
+        debouncer = EventDebouncer(rec, quiet_period=0.01, clock=clock)
+        debouncer.start()
+
+        for _ in range(10):
+            debouncer.schedule(path, 'modified')
+        assert not rec.event.is_set()
+
+        clock.now += 0.01
+        assert rec.event.wait(5.0)
+        debouncer.stop(flush=False)
+
+        assert rec.calls == [("note.md", "modified")]
+        assert debouncer.pending_count() == 0
+
+    def test_created_survives_followup_modify(self, temp_dir):
+        path = temp_dir / "note.md"
+        path.write_text("x")
+        rec = Recorder()
+        debouncer = EventDebouncer(rec, quiet_period=10)
+
+        debouncer.schedule(path, 'created')
+        debouncer.schedule(path, 'modified')
+        debouncer.flush()
+
+        assert rec.calls == [("note.md", "created")]
+
+    def test_cancel_drops_event(self, temp_dir):
+        path = temp_dir / "note.md"
+        path.write_text("x")
+        rec = Recorder()
+        debouncer = EventDebouncer(rec, quiet_period=10)
+
+        debouncer.schedule(path, 'modified')
+        debouncer.cancel(path)
+        debouncer.flush()
+
+        assert rec.calls == []
+
+    def test_vanished_file_skipped(self, temp_dir):
+        rec = Recorder()
+        debouncer = EventDebouncer(rec, quiet_period=10)
+        debouncer.schedule(temp_dir / "gone.md", 'modified')
+        debouncer.flush()
+        assert rec.calls == []
+
+    def test_stop_flushes_pending(self, temp_dir):
+        path = temp_dir / "note.md"
+        path.write_text("x")
+        rec = Recorder()
+        debouncer = EventDebouncer(rec, quiet_period=10)
+        debouncer.start()
+        debouncer.schedule(path, 'modified')
+        debouncer.stop(flush=True)
+
+        assert rec.calls == [("note.md", "modified")]
+        assert debouncer.pending_count() == 0
+
+
+class TestMarkdownFileHandler:
+    def test_direct_callback_without_debouncer(self, temp_dir):
+        rec = Recorder()
+        handler = MarkdownFileHandler(callback=rec)
+        handler.on_modified(FileModifiedEvent(str(temp_dir / "a.md")))
+        handler.on_modified(FileModifiedEvent(str(temp_dir / "a.txt")))
+        assert rec.calls == [("a.md", "modified")]
+
+    def test_atomic_rename_save(self, temp_dir):
+        target = temp_dir / "note.md"
+        target.write_text("saved")
+        rec = Recorder()
+        debouncer = EventDebouncer(rec, quiet_period=10)
+        handler = MarkdownFileHandler(callback=rec, debouncer=debouncer)
+
+        # Editor writes a temp file, then renames it over the note
+        handler.on_created(FileCreatedEvent(str(temp_dir / ".note.md.tmp")))
+        handler.on_modified(FileModifiedEvent(str(temp_dir / ".note.md.tmp")))
+        handler.on_moved(FileMovedEvent(str(temp_dir / ".note.md.tmp"), str(target)))
+        handler.on_modified(FileModifiedEvent(str(target)))
+        debouncer.flush()
+
+        assert rec.calls == [("note.md", "moved")]
+
+    def test_move_away_cancels_pending(self, temp_dir):
+        rec = Recorder()
+        debouncer = EventDebouncer(rec, quiet_period=10)
+        handler = MarkdownFileHandler(callback=rec, debouncer=debouncer)
+
+        src = temp_dir / "note.md"
+        handler.on_modified(FileModifiedEvent(str(src)))
+        handler.on_moved(FileMovedEvent(str(src), str(temp_dir / "note.md~")))
+        assert debouncer.pending_count() == 0
+
+    def test_delete_cancels_pending(self, temp_dir):
+        rec = Recorder()
+        debouncer = EventDebouncer(rec, quiet_period=10)
+        handler = MarkdownFileHandler(callback=rec, debouncer=debouncer)
+
+        path = temp_dir / "note.md"
+        handler.on_modified(FileModifiedEvent(str(path)))
+        handler.on_deleted(FileDeletedEvent(str(path)))
+        assert debouncer.pending_count() == 0
+
+
+class TestFileWatcher:
+    def test_chunked_writes_processed_once(self, watch_dir):
+        rec = Recorder()
+        # The quiet period never elapses; stop() flushes what was scheduled
+        watcher = FileWatcher([str(watch_dir)], callback=rec, debounce_seconds=60)
+        scheduled = threading.Event()
+        schedule = watcher.debouncer.schedule
+
+        def record_schedule(*args, **kwargs):
+            schedule(*args, **kwargs)
+            scheduled.set()
+
+        watcher.debouncer.schedule = record_schedule
+        watcher.start()
+        try:
+            path = watch_dir / "chunked.md"
+            with open(path, "w") as f:
+                for i in range(5):
+                    f.write(f"chunk {i}\n")
+                    f.flush()
+            assert scheduled.wait(5.0)
+            assert rec.calls == []
+        finally:
+            watcher.stop()
+
+        assert [name for name, _ in rec.calls] == ["chunked.md"]
+
+    def test_no_debouncer_when_disabled(self, watch_dir):
+        watcher = FileWatcher([str(watch_dir)], callback=Recorder(), debounce_seconds=0)
+        assert watcher.debouncer is None
@@ -0,0 +1,84 @@
+"""Tests for lib/hash_store.py"""
+
+from lib.hash_store import ContentHashStore, content_hash, create_hash_store, HASH_STORE_FILENAME
+
+
+class TestContentHash:
+    def test_same_content_same_hash(self):
+        assert content_hash("# Note\nbody") == content_hash("# Note\nbody")
+
+    def test_whitespace_ignored(self):
+        assert content_hash("# Note\n\nbody  text\n") == content_hash("# Note\nbody text")
+
+    def test_frontmatter_ignored(self):
+        with_fm = "---\nsynced_at: 2026-01-01\n---\n\n# Note\nbody"
+        assert content_hash(with_fm) == content_hash("# Note\nbody")
+
+    def test_content_change_detected(self):
+        assert content_hash("# Note\nbody") != content_hash("# Note\nbody!")
+
+
+class TestContentHashStore:
+    def test_update_and_get(self, temp_dir):
+        store = ContentHashStore(str(temp_dir / "h.sqlite3"))
+        f = temp_dir / "a.md"
+        f.write_text("hello")
+
+        assert store.get(f) is None
+        store.update(f, content_hash("hello"))
+        assert store.get(f) == content_hash("hello")
+        assert store.is_unchanged(f, content_hash("hello"))
+        assert not store.is_unchanged(f, content_hash("changed"))
+
+    def test_snapshot_roundtrip(self, temp_dir):
+        store = ContentHashStore(str(temp_dir / "h.sqlite3"))
+        f = temp_dir / "a.md"
+        f.write_text("메모 v1")
+
+        assert store.get_snapshot(f) is None
+        store.update(f, content_hash("메모 v1"), content="메모 v1")
+        assert store.get_snapshot(f) == "메모 v1"
+
+        # Hash-only update keeps the previous snapshot
+        store.update(f, content_hash("other"))
+        assert store.get_snapshot(f) == "메모 v1"
+
+        store.remove(f)
+        assert store.get_snapshot(f) is None
+
+    def test_survives_restart(self, temp_dir):
+        db = temp_dir / "h.sqlite3"
+        f = temp_dir / "a.md"
+        f.write_text("hello")
+        ContentHashStore(str(db)).update(f, "abc")
+
+        assert ContentHashStore(str(db)).get(f) == "abc"
+
+    def test_is_unchanged_stat(self, temp_dir):
+        store = ContentHashStore(str(temp_dir / "h.sqlite3"))
+        f = temp_dir / "a.md"
+        f.write_text("hello")
+        store.update(f, "abc")
+        assert store.is_unchanged_stat(f)
+
+        f.write_text("hello world")
+        assert not store.is_unchanged_stat(f)
+
+    def test_remove(self, temp_dir):
+        store = ContentHashStore(str(temp_dir / "h.sqlite3"))
+        f = temp_dir / "a.md"
+        store.update(f, "abc")
+        assert store.count() == 1
+        store.remove(f)
+        assert store.get(f) is None
+        assert store.count() == 0
+
+
+class TestCreateHashStore:
+    def test_default_location(self, temp_dir):
+        store = create_hash_store({'memory': {'dir': str(temp_dir / 'mem')}})
+        assert store.db_path == (temp_dir / 'mem' / '.oc-memory' / HASH_STORE_FILENAME).resolve()
+
+    def test_state_dir_override(self, temp_dir):
+        store = create_hash_store({'memory': {'dir': str(temp_dir), 'state_dir': str(temp_dir / 'state')}})
+        assert store.db_path.parent == (temp_dir / 'state').resolve()
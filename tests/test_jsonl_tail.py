@@ -0,0 +1,147 @@
+"""Tests for lib/jsonl_tail.py"""
+
+import json
+import os
+import pytest
+
+from lib.jsonl_tail import (
+    JsonlTailReader,
+    LogOffsetStore,
+    LogPosition,
+    OFFSET_STORE_FILENAME,
+    create_tail_reader,
+    parse_message_line,
+)
+
+
+def _line(role, content):
+    return json.dumps({"role": role, "content": content}) + "\n"
+
+
+@pytest.fixture
+def reader(temp_dir):
+    return JsonlTailReader(LogOffsetStore(str(temp_dir / "offsets.sqlite3")))
+
+
+class TestParseMessageLine:
+    def test_valid(self):
+        assert parse_message_line(_line("user", "hi")) == {"role": "user", "content": "hi"}
+
+    def test_invalid(self):
+        assert parse_message_line("") is None
+        assert parse_message_line("not json") is None
+        assert parse_message_line('{"type": "meta"}') is None
+        assert parse_message_line("[1, 2]") is None
+
+
+class TestLogOffsetStore:
+    def test_set_get_remove(self, temp_dir):
+        store = LogOffsetStore(str(temp_dir / "o.sqlite3"))
+        log = temp_dir / "a.jsonl"
+
+        assert store.get(log) is None
+        store.set(log, LogPosition(inode=7, offset=120))
+        assert store.get(log) == LogPosition(inode=7, offset=120)
+        assert store.count() == 1
+
+        store.remove(log)
+        assert store.get(log) is None
+
+
+class TestJsonlTailReader:
+    def test_only_new_messages(self, reader, temp_dir):
+        log = temp_dir / "session.jsonl"
+        log.write_text(_line("user", "one") + _line("assistant", "two"), encoding="utf-8")
+
+        assert [m["content"] for m in reader.read_new(log)] == ["one", "two"]
+        assert list(reader.read_new(log)) == []
+
+        with open(log, "a", encoding="utf-8") as f:
+            f.write(_line("user", "세 번째"))
+        assert [m["content"] for m in reader.read_new(log)] == ["세 번째"]
+
+    def test_partial_line_left_for_next_read(self, reader, temp_dir):
+        log = temp_dir / "session.jsonl"
+        full = _line("user", "done")
+        partial = _line("user", "half")
+        log.write_text(full + partial[:10], encoding="utf-8")
+
+        assert [m["content"] for m in reader.read_new(log)] == ["done"]
+
+        with open(log, "a", encoding="utf-8") as f:
+            f.write(partial[10:])
+        assert [m["content"] for m in reader.read_new(log)] == ["half"]
+
+    def test_truncation_restarts(self, reader, temp_dir):
+        log = temp_dir / "session.jsonl"
+        log.write_text(_line("user", "a") * 5, encoding="utf-8")
+        list(reader.read_new(log))
+
+        log.write_text(_line("user", "fresh"), encoding="utf-8")
+        assert [m["content"] for m in reader.read_new(log)] == ["fresh"]
+
+    def test_rotation_restarts(self, reader, temp_dir):
+        log = temp_dir / "session.jsonl"
+        log.write_text(_line("user", "old"), encoding="utf-8")
+        list(reader.read_new(log))
+
+        # Rotate: move the old file away, create a new one with more data
+        os.replace(log, temp_dir / "session.jsonl.1")
+        log.write_text(_line("user", "new 1") + _line("user", "new 2"), encoding="utf-8")
+        if log.stat().st_ino == reader.store.get(log).inode:
+            pytest.skip("filesystem reused the inode")
+
+        assert [m["content"] for m in reader.read_new(log)] == ["new 1", "new 2"]
+
+    def test_interrupted_read_is_repeated(self, reader, temp_dir):
+        log = temp_dir / "session.jsonl"
+        log.write_text(_line("user", "a") + _line("user", "b"), encoding="utf-8")
+
+        gen = reader.read_new(log)
+        next(gen)
+        gen.close()
+
+        assert [m["content"] for m in reader.read_new(log)] == ["a", "b"]
+
+    def test_no_commit(self, reader, temp_dir):
+        log = temp_dir / "session.jsonl"
+        log.write_text(_line("user", "a"), encoding="utf-8")
+
+        assert len(list(reader.read_new(log, commit=False))) == 1
+        assert len(list(reader.read_new(log))) == 1
+
+    def test_commit_after_uncommitted_read(self, reader, temp_dir):
+        log = temp_dir / "session.jsonl"
+        log.write_text(_line("user", "a"), encoding="utf-8")
+
+        assert reader.commit(log) is False
+        list(reader.read_new(log, commit=False))
+        assert reader.commit(log) is True
+        assert list(reader.read_new(log)) == []
+
+    def test_reset(self, reader, temp_dir):
+        log = temp_dir / "session.jsonl"
+        log.write_text(_line("user", "a"), encoding="utf-8")
+        list(reader.read_new(log))
+
+        reader.reset(log)
+        assert len(list(reader.read_new(log))) == 1
+
+    def test_missing_file(self, reader, temp_dir):
+        assert list(reader.read_new(temp_dir / "missing.jsonl")) == []
+
+    def test_offsets_survive_restart(self, temp_dir):
+        db = str(temp_dir / "o.sqlite3")
+        log = temp_dir / "session.jsonl"
+        log.write_text(_line("user", "a"), encoding="utf-8")
+
+        list(JsonlTailReader(LogOffsetStore(db)).read_new(log))
+        assert list(JsonlTailReader(LogOffsetStore(db)).read_new(log)) == []
+
+
+class TestCreateTailReader:
+    def test_uses_state_dir(self, temp_dir):
+        config = {'memory': {'dir': str(temp_dir / "memory")}}
+        reader = create_tail_reader(config)
+        assert reader.store.db_path.name == OFFSET_STORE_FILENAME
+        assert reader.store.db_path.parent == (temp_dir / "memory" / ".oc-memory").resolve()
@@ -0,0 +1,177 @@
+"""Tests for lib/llm_clients.py"""
+
+import sys
+import types
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from lib.llm_clients import LLMClientRegistry, DEFAULT_POOL_SIZE, DEFAULT_TIMEOUT
+
+
+@pytest.fixture
+def fake_openai():
+    """Stand-in openai/httpx modules recording client construction"""
+    openai_mod = types.ModuleType("openai")
+    openai_mod.OpenAI = MagicMock(name="OpenAI")
+    openai_mod.AsyncOpenAI = MagicMock(name="AsyncOpenAI")
+    httpx_mod = types.ModuleType("httpx")
+    httpx_mod.Client = MagicMock(name="Client")
+    httpx_mod.AsyncClient = MagicMock(name="AsyncClient")
+    httpx_mod.Limits = MagicMock(name="Limits")
+    with patch.dict(sys.modules, {"openai": openai_mod, "httpx": httpx_mod}):
+        yield openai_mod, httpx_mod
+
+
+@pytest.fixture
+def fake_genai():
+    google_mod = types.ModuleType("google")
+    genai_mod = types.ModuleType("google.generativeai")
+    genai_mod.configure = MagicMock(name="configure")
+    genai_mod.GenerativeModel = MagicMock(name="GenerativeModel")
+    google_mod.generativeai = genai_mod
+    with patch.dict(sys.modules, {"google": google_mod, "google.generativeai": genai_mod}):
+        yield genai_mod
+
+
+class TestOpenAIClients:
+    def test_client_reused(self, fake_openai):
+        openai_mod, httpx_mod = fake_openai
+        registry = LLMClientRegistry()
+
+        first = registry.openai("key")
+        second = registry.openai("key")
+
+        assert first is second
+        assert openai_mod.OpenAI.call_count == 1
+        assert registry.get_stats()['reused'] == 1
+
+    def test_pool_settings_applied(self, fake_openai):
+        openai_mod, httpx_mod = fake_openai
+        LLMClientRegistry().openai("key", pool_size=3, timeout=5.0)
+
+        httpx_mod.Limits.assert_called_once_with(
+            max_connections=3, max_keepalive_connections=3
+        )
+        assert httpx_mod.Client.call_args.kwargs['timeout'] == 5.0
+        assert openai_mod.OpenAI.call_args.kwargs['http_client'] is httpx_mod.Client.return_value
+
+    def test_separate_clients_per_key(self, fake_openai):
+        registry = LLMClientRegistry()
+        registry.openai("a")
+        registry.openai("b")
+        assert registry.get_stats()['openai_clients'] == 2
+
+    def test_close(self, fake_openai):
+        openai_mod, _ = fake_openai
+        registry = LLMClientRegistry()
+        client = registry.openai("key")
+
+        registry.close()
+        client.close.assert_called_once()
+        assert registry.get_stats()['openai_clients'] == 0
+
+
+class TestAsyncOpenAIClients:
+    def test_cached_per_event_loop(self, fake_openai):
+        import asyncio
+        openai_mod, httpx_mod = fake_openai
+        openai_mod.AsyncOpenAI.return_value.close = AsyncMock()
+        registry = LLMClientRegistry()
+
+        async def get_twice():
+            return registry.async_openai("key"), registry.async_openai("key")
+
+        a, b = asyncio.run(get_twice())
+        assert a is b
+        asyncio.run(get_twice())
+        assert openai_mod.AsyncOpenAI.call_count == 2
+        assert httpx_mod.AsyncClient.call_count == 2
+
+    def test_aclose_closes_loop_clients(self, fake_openai):
+        import asyncio
+        openai_mod, _ = fake_openai
+        openai_mod.AsyncOpenAI.return_value.close = AsyncMock()
+        registry = LLMClientRegistry()
+
+        async def use_and_close():
+            registry.async_openai("key")
+            await registry.aclose()
+
+        asyncio.run(use_and_close())
+        openai_mod.AsyncOpenAI.return_value.close.assert_awaited_once()
+        assert registry.get_stats()['async_openai_clients'] == 0
+
+    def test_requires_running_loop(self, fake_openai):
+        with pytest.raises(RuntimeError):
+            LLMClientRegistry().async_openai("key")
+
+
+class TestGoogleModels:
+    def test_configure_once_per_key(self, fake_genai):
+        registry = LLMClientRegistry()
+
+        m1 = registry.google_model("key", "gemini-2.5-flash")
+        m2 = registry.google_model("key", "gemini-2.5-flash")
+        registry.google_model("key", "gemini-2.5-pro")
+
+        assert m1 is m2
+        assert fake_genai.configure.call_count == 1
+        assert fake_genai.GenerativeModel.call_count == 2
+
+    def test_key_change_reconfigures(self, fake_genai):
+        registry = LLMClientRegistry()
+        registry.google_model("a", "m")
+        registry.google_model("b", "m")
+        registry.google_model("a", "m")
+
+        assert fake_genai.configure.call_count == 3
+
+
+class TestAgentsUseRegistry:
+    def test_observer_uses_shared_client(self, fake_openai):
+        from lib.llm_clients import get_client_registry, close_clients
+        from lib.observer import Observer
+
+        openai_mod, _ = fake_openai
+        client = openai_mod.OpenAI.return_value
+        client.chat.completions.create.return_value.choices = [
+            MagicMock(finish_reason="stop", message=MagicMock(content="[]"))
+        ]
+
+        close_clients()
+        obs = Observer(api_key="key", pool_size=4, timeout=9.0)
+        obs._call_openai("hello")
+        obs._call_openai("again")
+
+        assert openai_mod.OpenAI.call_count == 1
+        assert get_client_registry().get_stats()['openai_clients'] == 1
+        close_clients()
+
+    def test_reflector_shares_observer_client(self, fake_openai):
+        from lib.llm_clients import close_clients
+        from lib.observer import Observer
+        from lib.reflector import Reflector
+
+        openai_mod, _ = fake_openai
+        client = openai_mod.OpenAI.return_value
+        client.chat.completions.create.return_value.choices = [
+            MagicMock(finish_reason="stop", message=MagicMock(content="[]"))
+        ]
+
+        close_clients()
+        Observer(api_key="key")._call_openai("hello")
+        Reflector(api_key="key")._call_openai("compress")
+
+        assert openai_mod.OpenAI.call_count == 1
+        close_clients()
+
+    def test_config_settings(self):
+        from lib.observer import create_observer
+        from lib.reflector import create_reflector
+
+        config = {'llm': {'pool_size': 2, 'timeout': 15}}
+        assert create_observer(config).pool_size == 2
+        assert create_reflector(config).timeout == 15
+
+        assert create_observer({}).pool_size == DEFAULT_POOL_SIZE
+        assert create_reflector({}).timeout == DEFAULT_TIMEOUT
@@ -9,6 +9,10 @@ from lib.observer import Observation
 
 
 class TestEstimateTokens:
+    def test_korean_counts_characters(self):
+        # Korean has few spaces; word-based estimates undercount badly
+        assert estimate_tokens("메모리시스템은벡터검색을사용합니다") >= 15
+
     def test_empty_string(self):
         assert estimate_tokens("") == 0
 
@@ -159,6 +163,138 @@ class TestMemoryMerger:
         assert token_count < 200  # reasonable bound given small max_tokens
 
 
+class TestMemoryMergerSectionModel:
+    def _obs(self, i, category="fact"):
+        return Observation(
+            id=f"obs_{i:03d}",
+            timestamp=datetime.now(),
+            priority="medium",
+            category=category,
+            content=f"Observation {i}",
+        )
+
+    def test_placeholder_not_loaded_as_entry(self, memory_dir):
+        merger = MemoryMerger(str(memory_dir))
+        merger.save({s: [] for s in merger.SECTIONS})
+
+        reloaded = MemoryMerger(str(memory_dir))
+        assert all(entries == [] for entries in reloaded.load().values())
+
+    def test_load_does_not_reparse_unchanged_file(self, memory_dir, monkeypatch):
+        merger = MemoryMerger(str(memory_dir))
+        merger.add_entry("Observations Log", "- first")
+
+        calls = []
+        original = merger._parse_file
+        monkeypatch.setattr(merger, "_parse_file", lambda: calls.append(1) or original())
+
+        merger.add_entry("Observations Log", "- second")
+        merger.load()
+        assert calls == []
+
+    def test_external_edit_is_reloaded(self, memory_dir):
+        merger = MemoryMerger(str(memory_dir))
+        merger.add_entry("Observations Log", "- ours")
+
+        other = MemoryMerger(str(memory_dir))
+        other.add_entry("Critical Decisions", "- theirs")
+
+        sections = merger.load()
+        assert "- theirs" in sections["Critical Decisions"]
+        assert "- ours" in sections["Observations Log"]
+
+    def test_writes_are_coalesced(self, memory_dir):
+        merger = MemoryMerger(str(memory_dir), flush_interval=60.0)
+        merger.add_observations([self._obs(0)])  # first write goes through
+        mtime = merger.get_memory_file().stat().st_mtime_ns
+
+        for i in range(1, 20):
+            merger.add_observations([self._obs(i)])
+
+        assert merger.dirty
+        assert merger.get_memory_file().stat().st_mtime_ns == mtime
+        assert len(merger.load()["Observations Log"]) == 20
+
+        merger.flush()
+        assert not merger.dirty
+        content = merger.get_memory_file().read_text()
+        assert "Observation 19" in content
+
+    def test_pending_inserts_survive_external_edit(self, memory_dir):
+        merger = MemoryMerger(str(memory_dir), flush_interval=60.0)
+        merger.add_entry("Observations Log", "- flushed")
+        merger.add_entry("Observations Log", "- pending")
+
+        other = MemoryMerger(str(memory_dir))
+        other.add_entry("Critical Decisions", "- external")
+
+        merger.flush()
+        sections = MemoryMerger(str(memory_dir)).load()
+        assert "- pending" in sections["Observations Log"]
+        assert "- external" in sections["Critical Decisions"]
+
+    def test_timer_flushes_deferred_writes(self, memory_dir):
+        merger = MemoryMerger(str(memory_dir), flush_interval=60)
+        merger.add_entry("Observations Log", "- one")
+        merger.add_entry("Observations Log", "- two")
+        assert merger.dirty
+
+        # Fire the scheduled write-back now instead of waiting it out
+        timer = merger._flush_timer
+        assert 0 < timer.interval <= 60
+        timer.cancel()
+        timer.function()
+        assert not merger.dirty
+        assert merger._flush_timer is None
+        assert "- two" in merger.get_memory_file().read_text()
+
+
+class TestMemoryMergerTokenCounters:
+    def _obs(self, i):
+        return Observation(
+            id=f"obs_{i:05d}",
+            timestamp=datetime.now(),
+            priority="low",
+            category="fact",
+            content=f"Observation number {i} with some extra words",
+        )
+
+    def test_running_total_matches_recount(self, memory_dir):
+        merger = MemoryMerger(str(memory_dir), max_tokens=300)
+        for i in range(100):
+            merger.add_observations([self._obs(i)])
+        merger.add_entry("Critical Decisions", "- Use SQLite")
+
+        sections = merger._get_sections()
+        recount = merger.tokenizer.backend.count
+        expected = sum(recount(line) for s in sections.values() for line in s)
+        assert merger._estimate_section_tokens(sections) == expected
+        assert expected <= 300
+
+    def test_inserts_with_trimming_are_linear(self, memory_dir):
+        from lib.tokenizer import HeuristicTokenizer
+
+        chars_counted = []
+
+        class CountingTokenizer(HeuristicTokenizer):
+            def count(self, text):
+                chars_counted.append(len(text))
+                return super().count(text)
+
+        merger = MemoryMerger(
+            str(memory_dir), max_tokens=500, flush_interval=3600.0,
+            tokenizer=CountingTokenizer(),
+        )
+        n = 10000
+        for i in range(n):
+            merger.add_observations([self._obs(i)])
+
+        # Each line is counted a constant number of times, independent of
+        # how many entries are already in the file
+        line_len = len(self._obs(0).to_markdown())
+        assert sum(chars_counted) < 3 * n * line_len
+
+
 class TestCreateMerger:
     def test_create_from_config(self, temp_dir):
         config = {
@@ -173,3 +309,17 @@ class TestCreateMerger:
     def test_create_with_defaults(self, temp_dir):
         merger = create_merger({})
         assert merger.max_tokens == 30000
+        assert merger.flush_interval == 2.0
+
+    def test_uses_given_tokenizer(self, memory_dir):
+        from lib.tokenizer import Tokenizer
+
+        class FixedTokenizer(Tokenizer):
+            def count(self, text):
+                return 10
+
+        merger = MemoryMerger(str(memory_dir), max_tokens=25, tokenizer=FixedTokenizer())
+        merger.add_entry("Observations Log", "- a")
+        merger.add_entry("Observations Log", "- b")
+        merger.add_entry("Observations Log", "- c")
+        assert len(merger.load()["Observations Log"]) == 2
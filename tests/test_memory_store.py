@@ -0,0 +1,271 @@
+"""Tests for lib/memory_store.py (write-behind buffering, fake collection)"""
+
+from datetime import datetime
+
+import pytest
+
+from lib.memory_store import MemoryStore, create_memory_store
+from lib.observer import Observation
+
+
+class FakeCollection:
+    """In-memory stand-in for a ChromaDB collection"""
+
+    def __init__(self):
+        self.docs = {}
+        self.metas = {}
+        self.upserts = []
+        self.fail = False
+
+    def upsert(self, ids, documents, metadatas):
+        if self.fail:
+            raise RuntimeError("chroma unavailable")
+        self.upserts.append(list(ids))
+        for i, doc, meta in zip(ids, documents, metadatas):
+            self.docs[i] = doc
+            self.metas[i] = meta
+
+    def count(self):
+        return len(self.docs)
+
+    def _matches(self, key, where):
+        return not where or all(self.metas.get(key, {}).get(k) == v for k, v in where.items())
+
+    def get(self, ids=None, where=None, limit=None, offset=None):
+        keys = ids if ids is not None else list(self.docs)
+        keys = [k for k in keys if k in self.docs and self._matches(k, where)]
+        if offset is not None:
+            keys = keys[offset:]
+        if limit is not None:
+            keys = keys[:limit]
+        return {
+            'ids': keys,
+            'documents': [self.docs[k] for k in keys],
+            'metadatas': [self.metas.get(k, {}) for k in keys],
+        }
+
+    def query(self, query_texts, n_results, where=None):
+        """'Semantic' similarity: share of query words found in the document"""
+        words = set(query_texts[0].lower().split())
+        scored = []
+        for key, doc in self.docs.items():
+            if self._matches(key, where):
+                overlap = len(words & set(doc.lower().split())) / max(len(words), 1)
+                scored.append((2.0 * (1.0 - overlap), key))
+        scored.sort()
+        scored = scored[:n_results]
+        return {
+            'ids': [[k for _, k in scored]],
+            'documents': [[self.docs[k] for _, k in scored]],
+            'metadatas': [[self.metas.get(k, {}) for _, k in scored]],
+            'distances': [[d for d, _ in scored]],
+        }
+
+    def delete(self, ids):
+        for i in ids:
+            self.docs.pop(i, None)
+
+
+def make_store(temp_dir, **kwargs):
+    store = MemoryStore(persist_dir=str(temp_dir / "chroma"), **kwargs)
+    store._collection = FakeCollection()
+    return store
+
+
+def obs(i):
+    return Observation(
+        id=f"obs_{i}", timestamp=datetime.now(), priority="medium",
+        category="fact", content=f"fact {i}",
+    )
+
+
+class TestWriteThrough:
+    def test_each_call_upserts(self, temp_dir):
+        store = make_store(temp_dir)
+        store.add_observations([obs(1)])
+        store.add_observations([obs(2)])
+        assert store._collection.upserts == [["obs_1"], ["obs_2"]]
+
+
+class TestWriteBehind:
+    def test_buffers_until_batch_size(self, temp_dir):
+        store = make_store(temp_dir, batch_size=5, flush_interval=60)
+        for i in range(4):
+            assert store.add_observations([obs(i)]) == 1
+        assert store._collection.upserts == []
+        assert store.pending == 4
+
+        store.add_observations([obs(4)])
+        assert store._collection.upserts == [[f"obs_{i}" for i in range(5)]]
+        assert store.pending == 0
+
+    def test_flush_interval(self, temp_dir):
+        store = make_store(temp_dir, batch_size=100, flush_interval=60)
+        store.add_observations([obs(1), obs(2)])
+        assert store._collection.upserts == []
+
+        # Fire the scheduled flush now instead of waiting it out
+        timer = store._flush_timer
+        assert timer.interval == 60
+        timer.cancel()
+        timer.function()
+        assert store.pending == 0
+        assert store._collection.upserts == [["obs_1", "obs_2"]]
+
+    def test_explicit_flush_and_close(self, temp_dir):
+        store = make_store(temp_dir, batch_size=100, flush_interval=60)
+        store.add_observations([obs(1)])
+        assert store.flush() == 1
+        assert store.flush() == 0
+
+        store.add_observations([obs(2)])
+        store.close()
+        assert store.pending == 0
+        assert store._flush_timer is None
+
+    def test_reads_see_buffered_observations(self, temp_dir):
+        store = make_store(temp_dir, batch_size=100, flush_interval=60)
+        store.add_observations([obs(1)])
+        assert store.count() == 1
+        assert store.get("obs_1")['content'] == "fact 1"
+
+    def test_duplicate_ids_collapsed(self, temp_dir):
+        store = make_store(temp_dir, batch_size=100, flush_interval=60)
+        store.add_observations([obs(1)])
+        store.add_observations([obs(1)])
+        store.flush()
+        assert store._collection.upserts == [["obs_1"]]
+
+    def test_failed_flush_keeps_buffer_bounded(self, temp_dir):
+        store = make_store(temp_dir, batch_size=100, flush_interval=60, max_buffer=150)
+        store._collection.fail = True
+        store.add_observations([obs(i) for i in range(50)])
+
+        with pytest.raises(RuntimeError):
+            store.flush()
+        assert store.pending == 50
+
+        with pytest.raises(RuntimeError):
+            store.add_observations([obs(i) for i in range(50, 200)])
+        assert store.pending == 150
+
+        store._collection.fail = False
+        assert store.flush() == 150
+        assert store._collection.upserts[0][0] == "obs_50"
+
+
+class TestCreateMemoryStore:
+    def test_buffer_settings(self, temp_dir):
+        store = create_memory_store({'memory': {
+            'chromadb_dir': str(temp_dir / "c"),
+            'store_batch_size': 10,
+            'store_flush_interval': 0.5,
+        }})
+        assert store.batch_size == 10
+        assert store.flush_interval == 0.5
+
+    def test_defaults(self, temp_dir):
+        store = create_memory_store({'memory': {'chromadb_dir': str(temp_dir / "c")}})
+        assert store.batch_size == 64
+
+    def test_embedding_cache_in_state_dir(self, temp_dir):
+        store = create_memory_store({'memory': {
+            'chromadb_dir': str(temp_dir / "c"),
+            'state_dir': str(temp_dir / "state"),
+        }})
+        assert store.embedding_cache_dir == str((temp_dir / "state" / "embeddings").resolve())
+
+    def test_embedding_cache_disabled(self, temp_dir):
+        store = create_memory_store({'memory': {
+            'chromadb_dir': str(temp_dir / "c"),
+            'embedding_cache': False,
+        }})
+        assert store.embedding_cache_dir is None
+
+
+class TestGeneration:
+    def test_writes_bump_generation(self, temp_dir):
+        store = make_store(temp_dir, batch_size=10)
+        store.add_observations([obs(1)])
+        assert store.generation == 1
+        store.delete("obs_1")
+        assert store.generation == 2
+        store.add_observations([])
+        assert store.generation == 2
+
+
+def note(obs_id, content, priority="medium"):
+    return Observation(
+        id=obs_id, timestamp=datetime.now(), priority=priority,
+        category="fact", content=content,
+    )
+
+
+class TestHybridSearch:
+    def make(self, temp_dir, **kwargs):
+        store = make_store(temp_dir, **kwargs)
+        store.add_observations([
+            note("a", "deploy failed with ERR-4521 on staging", priority="high"),
+            note("b", "deploy pipeline is slow on staging"),
+            note("c", "user prefers dark mode"),
+        ])
+        return store
+
+    def test_lexical_finds_exact_identifier(self, temp_dir):
+        store = self.make(temp_dir)
+        results = store.search("ERR-4521", mode="lexical")
+        assert [r['id'] for r in results] == ["a"]
+        assert results[0]['distance'] is None
+        assert 0 < results[0]['score'] < 1
+
+    def test_vector_mode_is_default(self, temp_dir):
+        store = self.make(temp_dir)
+        results = store.search("deploy staging")
+        assert results[0]['distance'] is not None
+        assert all('score' in r for r in results)
+
+    def test_hybrid_fuses_both_rankings(self, temp_dir):
+        store = self.make(temp_dir, search_mode="hybrid")
+        results = store.search("staging ERR-4521", n_results=2)
+        assert results[0]['id'] == "a"
+        assert results[0]['score'] == pytest.approx(1.0)
+        assert results[0]['distance'] is not None
+
+    def test_lexical_respects_where(self, temp_dir):
+        store = self.make(temp_dir)
+        results = store.search("deploy", mode="lexical", where={'priority': 'medium'})
+        assert [r['id'] for r in results] == ["b"]
+
+    def test_delete_updates_index(self, temp_dir):
+        store = self.make(temp_dir)
+        store.delete("a")
+        assert store.search("ERR-4521", mode="lexical") == []
+        assert store.lexical_index.count() == 2
+
+    def test_index_built_for_existing_observations(self, temp_dir):
+        store = make_store(temp_dir)
+        store._collection.upsert(
+            ids=["old"], documents=["legacy ticket OPS-77"], metadatas=[{}],
+        )
+        assert [r['id'] for r in store.search("OPS-77", mode="lexical")] == ["old"]
+
+    def test_buffered_observations_searchable(self, temp_dir):
+        store = make_store(temp_dir, batch_size=100)
+        store.add_observations([note("x", "ticket JIRA-12 reopened")])
+        assert [r['id'] for r in store.search("JIRA-12", mode="lexical")] == ["x"]
+
+    def test_disabled_index(self, temp_dir):
+        store = make_store(temp_dir, lexical_index=False)
+        store.add_observations([note("x", "alpha")])
+        assert not (temp_dir / "chroma").exists()
+        with pytest.raises(ValueError):
+            store.search("alpha", mode="hybrid")
+
+    def test_unknown_mode(self, temp_dir):
+        with pytest.raises(ValueError):
+            MemoryStore(persist_dir=str(temp_dir / "c"), search_mode="fuzzy")
+
+    def test_config_defaults_to_hybrid(self, temp_dir):
+        store = create_memory_store({'memory': {'chromadb_dir': str(temp_dir / "c")}})
+        assert store.search_mode == "hybrid"
+        assert store.lexical_enabled
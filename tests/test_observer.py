@@ -6,7 +6,9 @@ from datetime import datetime
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 
-from lib.observer import Observer, Observation, OBSERVER_SYSTEM_PROMPT, create_observer
+from lib.observer import (
+    Observer, Observation, ObservationError, OBSERVER_SYSTEM_PROMPT, create_observer,
+)
 
 
 class TestObservation:
@@ -207,6 +209,18 @@ class TestObserverLLMIntegration:
 
         assert result == []
 
+    def test_observe_raise_errors_propagates(self):
+        """With raise_errors the caller can retry instead of losing the batch"""
+        obs = Observer(api_key="fake-key")
+        with patch.object(obs, '_call_llm', side_effect=TimeoutError("API timeout")):
+            with pytest.raises(TimeoutError):
+                obs.observe([{"role": "user", "content": "test"}], raise_errors=True)
+
+    def test_observe_raise_errors_without_api_key(self):
+        obs = Observer(api_key="", api_key_env="OC_MEMORY_TEST_NO_SUCH_KEY")
+        with pytest.raises(ObservationError):
+            obs.observe([{"role": "user", "content": "test"}], raise_errors=True)
+
     def test_observe_llm_returns_malformed_json(self):
         """LLM returns non-JSON response, handled gracefully"""
         obs = Observer(api_key="fake-key")
@@ -216,6 +230,249 @@ class TestObserverLLMIntegration:
         assert result == []
 
 
+class TestObserverChunking:
+    """Tests for chunked (map-reduce) extraction of long conversations"""
+
+    @staticmethod
+    def _messages(n, words=20):
+        return [
+            {"role": "user" if i % 2 == 0 else "assistant",
+             "content": f"message {i} " + "word " * words}
+            for i in range(n)
+        ]
+
+    def test_short_conversation_single_call(self):
+        obs = Observer(api_key="fake-key", chunk_tokens=10000)
+        with patch.object(obs, '_call_llm', return_value="[]") as call:
+            obs.observe(self._messages(5))
+        assert call.call_count == 1
+
+    def test_chunks_respect_token_limit_and_overlap(self):
+        obs = Observer(api_key="fake-key", chunk_tokens=200, chunk_overlap=1)
+        messages = self._messages(20)
+        chunks = list(obs._iter_chunks(messages))
+
+        assert len(chunks) > 1
+        for chunk in chunks:
+            assert sum(obs._message_tokens(m) for m in chunk) <= 200
+        for prev, nxt in zip(chunks, chunks[1:]):
+            assert nxt[0] == prev[-1]
+        # Every message is covered, in order
+        seen = []
+        for chunk in chunks:
+            seen.extend(m for m in chunk if m not in seen)
+        assert seen == messages
+
+    def test_oversized_message_is_split(self):
+        obs = Observer(api_key="fake-key", chunk_tokens=50, chunk_overlap=0)
+        big = {"role": "user", "content": "\n".join(f"line {i} a b c" for i in range(100))}
+        chunks = list(obs._iter_chunks([big]))
+
+        assert len(chunks) > 1
+        assert all(len(chunk) == 1 for chunk in chunks)
+        assert "\n".join(c[0]["content"] for c in chunks) == big["content"]
+
+    def test_long_conversation_merged_and_deduped(self):
+        obs = Observer(api_key="fake-key", chunk_tokens=200, chunk_workers=3)
+        responses = iter([
+            json.dumps([{"priority": "low", "category": "fact", "content": "Uses Python 3.11"}]),
+        ] * 100)
+
+        def fake_call(text):
+            if "message 0 " in text:
+                return json.dumps([
+                    {"priority": "high", "category": "decision", "content": "Use PostgreSQL"},
+                ])
+            return next(responses)
+
+        with patch.object(obs, '_call_llm', side_effect=fake_call) as call:
+            result = obs.observe(self._messages(30))
+
+        assert call.call_count > 1
+        assert [o.content for o in result] == ["Use PostgreSQL", "Uses Python 3.11"]
+
+    def test_merge_keeps_highest_priority(self):
+        def make(priority, content):
+            return Observation(
+                id="x", timestamp=datetime.now(), priority=priority,
+                category="fact", content=content,
+            )
+
+        merged = Observer._merge_observations([
+            [make("low", "Dark mode preferred")],
+            [make("high", "dark mode preferred!"), make("medium", "Other")],
+        ])
+        assert [(o.priority, o.content) for o in merged] == [
+            ("high", "Dark mode preferred"),
+            ("medium", "Other"),
+        ]
+
+    def test_failed_chunk_does_not_lose_others(self):
+        obs = Observer(api_key="fake-key", chunk_tokens=200, chunk_workers=2)
+        calls = []
+
+        def fake_call(text):
+            calls.append(text)
+            if len(calls) == 1:
+                raise Exception("API timeout")
+            return json.dumps([{"priority": "medium", "category": "fact",
+                                "content": f"Fact {len(calls)}"}])
+
+        with patch.object(obs, '_call_llm', side_effect=fake_call):
+            result = obs.observe(self._messages(30))
+
+        assert len(result) == len(calls) - 1
+
+    def test_failed_chunk_raises_with_raise_errors(self):
+        obs = Observer(api_key="fake-key", chunk_tokens=200, chunk_workers=2)
+        calls = []
+
+        def fake_call(text):
+            calls.append(text)
+            if len(calls) == 1:
+                raise Exception("API timeout")
+            return "[]"
+
+        with patch.object(obs, '_call_llm', side_effect=fake_call):
+            with pytest.raises(Exception, match="API timeout"):
+                obs.observe(self._messages(30), raise_errors=True)
+
+    def test_observe_from_file_streams_chunks(self, temp_dir):
+        log = temp_dir / "session.jsonl"
+        log.write_text(
+            "\n".join(json.dumps(m) for m in self._messages(30)),
+            encoding="utf-8",
+        )
+        obs = Observer(api_key="fake-key", chunk_tokens=200)
+        with patch.object(obs, '_call_llm', return_value="[]") as call:
+            obs.observe_from_file(log)
+        assert call.call_count > 1
+
+
+class TestObserverAsync:
+    def test_observe_async(self):
+        import asyncio
+        obs = Observer(api_key="fake-key")
+        response = json.dumps([
+            {"priority": "high", "category": "decision", "content": "Use SQLite"},
+        ])
+
+        async def fake_call(text):
+            assert "Use SQLite please" in text
+            return response
+
+        with patch.object(obs, '_call_llm_async', side_effect=fake_call):
+            result = asyncio.run(obs.observe_async(
+                [{"role": "user", "content": "Use SQLite please"}]
+            ))
+
+        assert [o.content for o in result] == ["Use SQLite"]
+
+    def test_observe_async_chunked(self):
+        import asyncio
+        obs = Observer(api_key="fake-key", chunk_tokens=200, chunk_workers=2)
+        calls = []
+
+        async def fake_call(text):
+            calls.append(text)
+            return json.dumps([{"priority": "low", "category": "fact", "content": "Same fact"}])
+
+        messages = TestObserverChunking._messages(30)
+        with patch.object(obs, '_call_llm_async', side_effect=fake_call):
+            result = asyncio.run(obs.observe_async(messages))
+
+        assert len(calls) > 1
+        assert [o.content for o in result] == ["Same fact"]
+
+    def test_observe_async_failure_returns_empty(self):
+        import asyncio
+        obs = Observer(api_key="fake-key")
+
+        async def fail(text):
+            raise Exception("API timeout")
+
+        with patch.object(obs, '_call_llm_async', side_effect=fail):
+            assert asyncio.run(obs.observe_async([{"role": "user", "content": "x"}])) == []
+
+    def test_observe_async_raise_errors_propagates(self):
+        import asyncio
+        obs = Observer(api_key="fake-key")
+
+        async def fail(text):
+            raise TimeoutError("API timeout")
+
+        with patch.object(obs, '_call_llm_async', side_effect=fail):
+            with pytest.raises(TimeoutError):
+                asyncio.run(obs.observe_async(
+                    [{"role": "user", "content": "x"}], raise_errors=True
+                ))
+
+
+class TestObserverRateLimit:
+    def test_calls_queue_against_limiter(self):
+        limiter = MagicMock()
+        obs = Observer(api_key="fake-key", rate_limiter=limiter)
+
+        with patch.object(obs, '_call_openai', return_value="[]"):
+            obs.observe([{"role": "user", "content": "hello"}])
+
+        limiter.acquire.assert_called_once()
+        tokens = limiter.acquire.call_args[0][0]
+        assert tokens > 2000  # prompt estimate + response cap
+
+
+class TestObserverTail:
+    def test_observe_from_file_with_tail_sees_only_delta(self, temp_dir):
+        from lib.jsonl_tail import JsonlTailReader, LogOffsetStore
+
+        log = temp_dir / "session.jsonl"
+        log.write_text(json.dumps({"role": "user", "content": "first"}) + "\n", encoding="utf-8")
+        tail = JsonlTailReader(LogOffsetStore(str(temp_dir / "offsets.sqlite3")))
+        obs = Observer(api_key="fake-key")
+
+        with patch.object(obs, '_call_llm', return_value="[]") as call:
+            obs.observe_from_file(log, tail=tail)
+            with open(log, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"role": "user", "content": "second"}) + "\n")
+            obs.observe_from_file(log, tail=tail)
+            obs.observe_from_file(log, tail=tail)
+
+        assert call.call_count == 2
+        assert "first" not in call.call_args_list[1][0][0]
+        assert "second" in call.call_args_list[1][0][0]
+
+    def test_no_api_key_does_not_advance_tail(self, temp_dir):
+        from lib.jsonl_tail import JsonlTailReader, LogOffsetStore
+
+        log = temp_dir / "session.jsonl"
+        log.write_text(json.dumps({"role": "user", "content": "x"}) + "\n", encoding="utf-8")
+        tail = JsonlTailReader(LogOffsetStore(str(temp_dir / "offsets.sqlite3")))
+
+        with patch.dict('os.environ', {}, clear=True):
+            assert Observer().observe_from_file(log, tail=tail) == []
+        assert tail.start_offset(log) == 0
+
+
+    def test_failed_extraction_does_not_advance_tail(self, temp_dir):
+        from lib.jsonl_tail import JsonlTailReader, LogOffsetStore
+
+        log = temp_dir / "session.jsonl"
+        log.write_text(json.dumps({"role": "user", "content": "x"}) + "\n", encoding="utf-8")
+        tail = JsonlTailReader(LogOffsetStore(str(temp_dir / "offsets.sqlite3")))
+        obs = Observer(api_key="fake-key")
+
+        with patch.object(obs, '_call_llm', side_effect=Exception("API timeout")):
+            assert obs.observe_from_file(log, tail=tail) == []
+            with pytest.raises(Exception, match="API timeout"):
+                obs.observe_from_file(log, tail=tail, raise_errors=True)
+        assert tail.start_offset(log) == 0
+
+        with patch.object(obs, '_call_llm', return_value="[]") as call:
+            obs.observe_from_file(log, tail=tail)
+        assert "[User]: x" in call.call_args[0][0]
+        assert tail.start_offset(log) == log.stat().st_size
+
+
 class TestCreateObserver:
     def test_create_from_config(self):
         config = {
@@ -233,3 +490,9 @@ class TestCreateObserver:
         obs = create_observer({})
         assert obs.provider == "openai"
         assert obs.model == "gpt-4o-mini"
+        assert obs.chunk_tokens == 12000
+
+    def test_create_with_chunking_config(self):
+        obs = create_observer({'llm': {'chunk_tokens': 0, 'chunk_workers': 8}})
+        assert obs.chunk_tokens == 0
+        assert obs.chunk_workers == 8
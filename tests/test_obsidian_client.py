@@ -140,6 +140,74 @@ class TestObsidianClient:
         assert content == raw
 
 
+class TestObsidianIndex:
+    def test_ranked_by_relevance(self, temp_dir):
+        client = ObsidianClient(vault_path=str(temp_dir))
+        client.create_note(title="Once", content="kafka mentioned once among other things")
+        client.create_note(title="Often", content="kafka kafka kafka consumer lag")
+
+        results = client.search_notes("kafka")
+        assert [r['title'] for r in results] == ["Often", "Once"]
+        assert results[0]['score'] > results[1]['score']
+
+    def test_matches_title_tags_and_frontmatter(self, temp_dir):
+        client = ObsidianClient(vault_path=str(temp_dir))
+        client.create_note(
+            title="Quarterly Roadmap", content="plans", tags=["strategy"],
+            metadata={'owner': 'platform-team'},
+        )
+        for query in ("roadmap", "strategy", "platform"):
+            results = client.search_notes(query)
+            assert [r['title'] for r in results] == ["Quarterly Roadmap"], query
+        assert "strategy" in client.search_notes("strategy")[0]['tags']
+
+    def test_picks_up_external_edits(self, temp_dir):
+        client = ObsidianClient(vault_path=str(temp_dir), refresh_interval=0)
+        assert client.search_notes("zeppelin") == []
+
+        (temp_dir / "manual.md").write_text("zeppelin flight log", encoding="utf-8")
+        results = client.search_notes("zeppelin")
+        assert [r['title'] for r in results] == ["manual"]
+
+        (temp_dir / "manual.md").unlink()
+        assert client.search_notes("zeppelin") == []
+
+    def test_refresh_is_throttled(self, temp_dir):
+        client = ObsidianClient(vault_path=str(temp_dir), refresh_interval=3600)
+        client.search_notes("anything")
+        (temp_dir / "late.md").write_text("zeppelin", encoding="utf-8")
+        assert client.search_notes("zeppelin") == []
+        assert client.refresh_index(force=True)['added'] == 1
+        assert len(client.search_notes("zeppelin")) == 1
+
+    def test_deleted_note_dropped_before_refresh(self, temp_dir):
+        client = ObsidianClient(vault_path=str(temp_dir), refresh_interval=3600)
+        path = client.create_note(title="Temp", content="ephemeral")
+        client.search_notes("ephemeral")
+        path.unlink()
+        assert client.search_notes("ephemeral") == []
+
+    def test_folder_filter(self, temp_dir):
+        client = ObsidianClient(vault_path=str(temp_dir))
+        client.create_note(title="A", content="shared term", folder="Work")
+        client.create_note(title="B", content="shared term", folder="Home")
+        results = client.search_notes("shared", folder="Work")
+        assert [r['title'] for r in results] == ["A"]
+
+    def test_scan_mode(self, temp_dir):
+        client = ObsidianClient(vault_path=str(temp_dir), use_index=False)
+        client.create_note(title="Alpha", content="ChromaDB is great")
+        results = client.search_notes("ChromaDB")
+        assert [r['title'] for r in results] == ["Alpha"]
+        assert 'score' not in results[0]
+
+    def test_parse_frontmatter_lists(self):
+        raw = '---\ntitle: "T"\ntags:\n  - a\n  - b\nsource: x\n---\nbody'
+        fm, _ = ObsidianClient._parse_frontmatter(raw)
+        assert fm['tags'] == ['a', 'b']
+        assert fm['source'] == 'x'
+
+
 class TestCreateObsidianClient:
     def test_disabled(self):
         client = create_obsidian_client({'obsidian': {'enabled': False}})
@@ -157,3 +225,13 @@ class TestCreateObsidianClient:
 
     def test_not_configured(self):
         assert create_obsidian_client({}) is None
+
+    def test_index_in_state_dir(self, temp_dir):
+        config = {
+            'memory': {'state_dir': str(temp_dir / 'state')},
+            'obsidian': {'enabled': True, 'vault_path': str(temp_dir / 'vault')},
+        }
+        client = create_obsidian_client(config)
+        client.create_note(title="N", content="indexed")
+        assert (temp_dir / 'state' / 'obsidian_index.sqlite3').exists()
+        assert not list((temp_dir / 'vault').glob('.search_index*'))
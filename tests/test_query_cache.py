@@ -0,0 +1,63 @@
+"""Tests for lib/query_cache.py"""
+
+import time
+
+from lib.query_cache import QueryCache
+
+
+class TestQueryCache:
+    def test_hit_and_miss(self):
+        cache = QueryCache()
+        assert cache.get("q", {'hot': 1}) is None
+        cache.put("q", ["r"], {'hot': 1})
+        assert cache.get("q", {'hot': 1}) == ["r"]
+        stats = cache.get_stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['hit_rate'] == 0.5
+
+    def test_version_change_invalidates(self):
+        cache = QueryCache()
+        cache.put("q", ["r"], {'hot': 1, 'warm': 5})
+        assert cache.get("q", {'hot': 2, 'warm': 5}) is None
+        assert cache.get_stats()['invalidated'] == 1
+        assert len(cache) == 0
+
+    def test_ttl_expiry(self):
+        cache = QueryCache(ttl=0.05)
+        cache.put("q", ["r"], {})
+        time.sleep(0.1)
+        assert cache.get("q", {}) is None
+        assert cache.get_stats()['expired'] == 1
+
+    def test_zero_ttl_never_expires(self):
+        cache = QueryCache(ttl=0)
+        cache.put("q", ["r"], {})
+        assert cache.get("q", {}) == ["r"]
+
+    def test_lru_eviction(self):
+        cache = QueryCache(max_entries=2)
+        cache.put("a", 1, {})
+        cache.put("b", 2, {})
+        cache.get("a", {})
+        cache.put("c", 3, {})
+        assert cache.get("b", {}) is None
+        assert cache.get("a", {}) == 1
+        assert cache.get_stats()['evicted'] == 1
+
+    def test_invalidate_by_tier(self):
+        cache = QueryCache()
+        cache.put("hot_only", 1, {'hot': 0})
+        cache.put("warm_only", 2, {'warm': 0})
+        cache.put("both", 3, {'hot': 0, 'warm': 0})
+
+        assert cache.invalidate(['warm']) == 2
+        assert cache.get("hot_only", {'hot': 0}) == 1
+        assert len(cache) == 1
+
+    def test_invalidate_all(self):
+        cache = QueryCache()
+        cache.put("a", 1, {'hot': 0})
+        cache.put("b", 2, {'cold': 0})
+        assert cache.invalidate() == 2
+        assert len(cache) == 0
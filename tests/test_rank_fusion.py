@@ -0,0 +1,67 @@
+"""Tests for lib/rank_fusion.py"""
+
+import pytest
+
+from lib.rank_fusion import RRF_K, fuse, minmax_fusion, reciprocal_rank_fusion
+
+
+class TestReciprocalRankFusion:
+    def test_single_list_keeps_order(self):
+        fused = reciprocal_rank_fusion({'a': [("x", 0.9), ("y", 0.5)]})
+        assert [item for item, _ in fused] == ["x", "y"]
+        assert fused[0][1] == pytest.approx(1 / (RRF_K + 1))
+
+    def test_ignores_score_scale(self):
+        fused = reciprocal_rank_fusion({
+            'big': [("b1", 1000.0), ("b2", 900.0)],
+            'small': [("s1", 0.01), ("s2", 0.001)],
+        })
+        scores = dict(fused)
+        assert scores["b1"] == pytest.approx(scores["s1"])
+        assert scores["b2"] == pytest.approx(scores["s2"])
+
+    def test_sorts_each_list_by_score(self):
+        fused = reciprocal_rank_fusion({'a': [("low", 0.1), ("high", 0.9)]})
+        assert fused[0][0] == "high"
+
+    def test_weights(self):
+        fused = reciprocal_rank_fusion(
+            {'a': [("a1", 1.0)], 'b': [("b1", 1.0)]}, weights={'b': 2.0},
+        )
+        assert fused[0][0] == "b1"
+
+    def test_items_in_several_lists_are_summed(self):
+        fused = reciprocal_rank_fusion(
+            {'bm25': [("d1", 3.0), ("d2", 2.0)], 'vec': [("d2", 0.9), ("d3", 0.8)]},
+            key=lambda item: item,
+        )
+        assert fused[0][0] == "d2"
+        assert len(fused) == 3
+
+
+class TestMinmaxFusion:
+    def test_normalizes_per_list(self):
+        fused = minmax_fusion({
+            'a': [("a1", 10.0), ("a2", 5.0), ("a3", 0.0)],
+            'b': [("b1", 0.2), ("b2", 0.1)],
+        })
+        scores = dict(fused)
+        assert scores["a1"] == pytest.approx(1.0)
+        assert scores["a2"] == pytest.approx(0.5)
+        assert scores["b1"] == pytest.approx(1.0)
+        assert scores["b2"] == pytest.approx(0.0)
+
+    def test_constant_scores_map_to_one(self):
+        fused = minmax_fusion({'a': [("x", 0.4), ("y", 0.4)]}, weights={'a': 0.5})
+        assert dict(fused) == {"x": 0.5, "y": 0.5}
+
+
+class TestFuse:
+    def test_dispatch(self):
+        rankings = {'a': [("x", 1.0)]}
+        assert fuse(rankings, "rrf") == reciprocal_rank_fusion(rankings)
+        assert fuse(rankings, "minmax") == minmax_fusion(rankings)
+
+    def test_unknown_method(self):
+        with pytest.raises(ValueError):
+            fuse({}, "borda")
@@ -0,0 +1,154 @@
+"""Tests for lib/rate_limiter.py"""
+
+import asyncio
+import threading
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from lib.rate_limiter import (
+    BURST_SECONDS,
+    RateLimiter,
+    TokenBucket,
+    create_rate_limiter,
+    get_rate_limiter,
+)
+
+
+class FakeClock:
+    """Manual clock; sleep() advances it unless the clock is frozen"""
+
+    def __init__(self, frozen=False):
+        self.now = 0.0
+        self.frozen = frozen
+        self.sleeps = []
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        with self._lock:
+            self.sleeps.append(seconds)
+            if not self.frozen:
+                self.now += seconds
+
+
+class TestTokenBucket:
+    def test_within_capacity_no_wait(self):
+        bucket = TokenBucket(rate=10, capacity=5, clock=FakeClock())
+        assert all(bucket.reserve(1) == 0 for _ in range(5))
+
+    def test_over_capacity_waits_proportionally(self):
+        bucket = TokenBucket(rate=10, capacity=5, clock=FakeClock())
+        for _ in range(5):
+            bucket.reserve(1)
+        assert bucket.reserve(1) == pytest.approx(0.1)
+        assert bucket.reserve(1) == pytest.approx(0.2)
+
+    def test_refills_over_time(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=100, capacity=2, clock=clock)
+        bucket.reserve(2)
+        assert bucket.reserve(1) == pytest.approx(0.01)
+        clock.now += 0.03
+        assert bucket.available == pytest.approx(2)
+        assert bucket.reserve(2) == 0
+
+    def test_large_request_allowed_with_wait(self):
+        bucket = TokenBucket(rate=100, capacity=10, clock=FakeClock())
+        assert bucket.reserve(30) == pytest.approx(0.2)
+
+
+class TestRateLimiter:
+    def test_unlimited(self):
+        limiter = RateLimiter()
+        assert limiter.acquire(10 ** 9) == 0
+        assert limiter.get_stats()['throttled'] == 0
+
+    def test_requests_per_minute(self):
+        limiter = RateLimiter(requests_per_minute=600, clock=FakeClock())  # 10/s, burst 100
+        burst = int(10 * BURST_SECONDS)
+        waits = [limiter.reserve() for _ in range(burst + 1)]
+        assert waits[:burst] == [0.0] * burst
+        assert waits[-1] == pytest.approx(0.1)
+
+    def test_tokens_per_minute(self):
+        limiter = RateLimiter(tokens_per_minute=6000, clock=FakeClock())  # 100/s, burst 1000
+        assert limiter.reserve(1000) == 0
+        assert limiter.reserve(50) == pytest.approx(0.5)
+
+    def test_sustained_throughput(self):
+        # 6000 rpm = 100/s; after the burst, requests are paced evenly
+        clock = FakeClock()
+        limiter = RateLimiter(requests_per_minute=6000, clock=clock, sleep=clock.sleep)
+        limiter._requests.reserve(limiter._requests.capacity)
+
+        for _ in range(20):
+            limiter.acquire()
+
+        assert clock.sleeps == pytest.approx([0.01] * 20)
+        assert clock.now == pytest.approx(0.2)
+        assert limiter.get_stats()['throttled'] == 20
+
+    def test_threads_share_budget(self):
+        # With the clock frozen, each reservation queues behind the last
+        clock = FakeClock(frozen=True)
+        limiter = RateLimiter(requests_per_minute=6000, clock=clock, sleep=clock.sleep)
+        limiter._requests.reserve(limiter._requests.capacity)
+
+        def worker():
+            for _ in range(5):
+                limiter.acquire()
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert sorted(clock.sleeps) == pytest.approx([0.01 * i for i in range(1, 21)])
+
+    def test_acquire_async(self):
+        limiter = RateLimiter(requests_per_minute=6000, clock=FakeClock(frozen=True))
+        limiter._requests.reserve(limiter._requests.capacity)
+
+        async def run():
+            return await asyncio.gather(*(limiter.acquire_async() for _ in range(10)))
+
+        with patch('lib.rate_limiter.asyncio.sleep', new=AsyncMock()) as sleep:
+            waits = asyncio.run(run())
+
+        assert waits == pytest.approx([0.01 * i for i in range(1, 11)])
+        assert sleep.await_count == 10
+
+
+class TestSharedLimiters:
+    def test_same_provider_model_shared(self):
+        a = get_rate_limiter("openai", "shared-test", 100, 1000)
+        b = get_rate_limiter("openai", "shared-test", 100, 1000)
+        c = get_rate_limiter("openai", "other-model", 100, 1000)
+        assert a is b
+        assert a is not c
+
+    def test_changed_limits_rebuild(self):
+        a = get_rate_limiter("openai", "rebuild-test", 100, 0)
+        b = get_rate_limiter("openai", "rebuild-test", 200, 0)
+        assert a is not b
+        assert b.requests_per_minute == 200
+
+    def test_create_from_config(self):
+        config = {'llm': {'model': 'cfg-test', 'rate_limit': {'requests_per_minute': 60}}}
+        limiter = create_rate_limiter(config)
+        assert limiter.requests_per_minute == 60
+        assert limiter.tokens_per_minute == 0
+
+    def test_create_without_limits(self):
+        assert create_rate_limiter({}) is None
+
+    def test_observer_and_reflector_share_limiter(self):
+        from lib.observer import create_observer
+        from lib.reflector import create_reflector
+
+        config = {'llm': {'model': 'agents-test', 'rate_limit': {'tokens_per_minute': 1000}}}
+        assert create_observer(config).rate_limiter is create_reflector(config).rate_limiter
@@ -132,6 +132,36 @@ class TestReflectorLLMIntegration:
         assert stats['average_ratio'] > 1.0
 
 
+class TestReflectorAsync:
+    def test_reflect_async_success(self):
+        import asyncio
+        r = Reflector(api_key="fake-key")
+
+        async def fake_call(text, level):
+            assert level == 2
+            return "Short."
+
+        with patch.object(r, '_call_llm_async', side_effect=fake_call):
+            result = asyncio.run(r.reflect_async("A long text with many words in it", level=2))
+
+        assert result.compressed_content == "Short."
+        assert len(r.history) == 1
+
+    def test_reflect_async_failure_returns_original(self):
+        import asyncio
+        r = Reflector(api_key="fake-key")
+
+        async def fail(text, level):
+            raise Exception("API error")
+
+        with patch.object(r, '_call_llm_async', side_effect=fail):
+            result = asyncio.run(r.reflect_async("Some observations"))
+
+        assert result.compressed_content == "Some observations"
+        assert result.compression_ratio == 1.0
+        assert r.history == []
+
+
 class TestCreateReflector:
     def test_create_from_config(self):
         config = {
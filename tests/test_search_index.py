@@ -0,0 +1,146 @@
+"""Tests for lib/search_index.py"""
+
+from lib.search_index import SearchIndex, IndexHit, tokenize, tokenize_with_offsets, INDEX_FILENAME
+
+
+class TestTokenize:
+    def test_lowercases_words(self):
+        assert tokenize("ChromaDB Vector-Store") == ["chromadb", "vector", "store"]
+
+    def test_offsets(self):
+        terms = tokenize_with_offsets("foo bar")
+        assert terms == [("foo", 0), ("bar", 4)]
+
+    def test_korean_bigrams(self):
+        terms = tokenize("메모리를")
+        assert "메모리를" in terms
+        assert "메모" in terms
+        assert "모리" in terms
+
+    def test_empty(self):
+        assert tokenize("") == []
+
+
+class TestSearchIndex:
+    def test_creates_index_file(self, temp_dir):
+        SearchIndex(str(temp_dir))
+        assert (temp_dir / INDEX_FILENAME).exists()
+
+    def test_add_and_search(self, temp_dir):
+        doc = temp_dir / "doc.md"
+        doc.write_text("ChromaDB is a vector database", encoding="utf-8")
+
+        index = SearchIndex(str(temp_dir))
+        assert index.add_file(doc)
+
+        hits = index.search("chromadb")
+        assert len(hits) == 1
+        assert isinstance(hits[0], IndexHit)
+        assert hits[0].path == doc.resolve()
+        assert hits[0].score > 0
+        assert hits[0].offset == 0
+
+    def test_bm25_ranks_by_term_frequency(self, temp_dir):
+        (temp_dir / "once.md").write_text("python and other things here", encoding="utf-8")
+        (temp_dir / "many.md").write_text("python python python tips", encoding="utf-8")
+        (temp_dir / "none.md").write_text("unrelated words only", encoding="utf-8")
+
+        index = SearchIndex(str(temp_dir))
+        index.sync()
+
+        hits = index.search("python")
+        assert [h.path.name for h in hits] == ["many.md", "once.md"]
+
+    def test_search_respects_limit(self, temp_dir):
+        for i in range(5):
+            (temp_dir / f"n{i}.md").write_text(f"topic {i}", encoding="utf-8")
+        index = SearchIndex(str(temp_dir))
+        index.sync()
+        assert len(index.search("topic", limit=2)) == 2
+
+    def test_readd_replaces_postings(self, temp_dir):
+        doc = temp_dir / "doc.md"
+        doc.write_text("alpha", encoding="utf-8")
+        index = SearchIndex(str(temp_dir))
+        index.add_file(doc)
+
+        doc.write_text("beta", encoding="utf-8")
+        index.add_file(doc)
+
+        assert index.search("alpha") == []
+        assert len(index.search("beta")) == 1
+        assert index.count() == 1
+
+    def test_remove_file(self, temp_dir):
+        doc = temp_dir / "doc.md"
+        doc.write_text("alpha", encoding="utf-8")
+        index = SearchIndex(str(temp_dir))
+        index.add_file(doc)
+
+        assert index.remove_file(doc)
+        assert index.search("alpha") == []
+        assert not index.remove_file(doc)
+
+    def test_sync_is_incremental(self, temp_dir):
+        (temp_dir / "a.md").write_text("alpha", encoding="utf-8")
+        (temp_dir / "b.md").write_text("beta", encoding="utf-8")
+        index = SearchIndex(str(temp_dir))
+
+        assert index.sync() == {'added': 2, 'updated': 0, 'removed': 0}
+        assert index.sync() == {'added': 0, 'updated': 0, 'removed': 0}
+
+        (temp_dir / "b.md").unlink()
+        assert index.sync()['removed'] == 1
+        assert index.count() == 1
+
+    def test_persists_across_instances(self, temp_dir):
+        (temp_dir / "a.md").write_text("persistent content", encoding="utf-8")
+        SearchIndex(str(temp_dir)).sync()
+
+        reopened = SearchIndex(str(temp_dir))
+        assert len(reopened.search("persistent")) == 1
+
+    def test_ignores_non_matching_pattern(self, temp_dir):
+        (temp_dir / "a.txt").write_text("alpha", encoding="utf-8")
+        index = SearchIndex(str(temp_dir))
+        index.sync()
+        assert index.count() == 0
+
+    def test_empty_query(self, temp_dir):
+        index = SearchIndex(str(temp_dir))
+        assert index.search("   ") == []
+
+    def test_get_stats(self, temp_dir):
+        (temp_dir / "a.md").write_text("alpha beta", encoding="utf-8")
+        index = SearchIndex(str(temp_dir))
+        index.sync()
+        stats = index.get_stats()
+        assert stats['documents'] == 1
+        assert stats['terms'] == 2
+
+    def test_generation_tracks_changes(self, temp_dir):
+        doc = temp_dir / "a.md"
+        doc.write_text("alpha", encoding="utf-8")
+        index = SearchIndex(str(temp_dir))
+        assert index.generation == 0
+
+        index.add_file(doc)
+        other = SearchIndex(str(temp_dir))
+        assert other.generation == 1
+
+        assert not index.remove_file(temp_dir / "missing.md")
+        assert index.generation == 1
+        index.remove_file(doc)
+        index.clear()
+        assert other.generation == 3
+
+    def test_add_documents_by_key(self, temp_dir):
+        index = SearchIndex(str(temp_dir), index_path=str(temp_dir / "obs.sqlite3"))
+        assert index.add_documents([("obs_1", "error ERR-42 in deploy"), ("obs_2", "deploy ok")]) == 2
+
+        hits = index.search("ERR-42")
+        assert [h.key for h in hits] == ["obs_1"]
+
+        assert index.remove_keys(["obs_1", "missing"]) == 1
+        assert index.search("ERR-42") == []
+        assert index.count() == 1
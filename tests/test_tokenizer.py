@@ -0,0 +1,167 @@
+"""Tests for lib/tokenizer.py"""
+
+import hashlib
+import sys
+import types
+
+import pytest
+
+from lib.tokenizer import (
+    Tokenizer, HeuristicTokenizer, CachedTokenizer, TiktokenTokenizer,
+    build_tokenizer, create_tokenizer, get_tokenizer, set_tokenizer, count_tokens,
+    encoding_cached,
+)
+
+
+@pytest.fixture
+def fake_tiktoken(monkeypatch, temp_dir):
+    """tiktoken stand-in whose cache dir starts empty; records loads"""
+    loaded = []
+
+    def get_encoding(name):
+        loaded.append(name)
+        return types.SimpleNamespace(name=name, encode=lambda text, **kw: text.split())
+
+    module = types.ModuleType("tiktoken")
+    module.get_encoding = get_encoding
+    model = types.ModuleType("tiktoken.model")
+    model.encoding_name_for_model = lambda m: {"gpt-4": "cl100k_base"}[m]
+    module.model = model
+    monkeypatch.setitem(sys.modules, "tiktoken", module)
+    monkeypatch.setitem(sys.modules, "tiktoken.model", model)
+    monkeypatch.setenv("TIKTOKEN_CACHE_DIR", str(temp_dir))
+    return loaded
+
+
+def cache_encoding(cache_dir, name):
+    url = f"https://openaipublic.blob.core.windows.net/encodings/{name}.tiktoken"
+    (cache_dir / hashlib.sha1(url.encode()).hexdigest()).write_text("")
+
+
+class CountingTokenizer(Tokenizer):
+    name = "counting"
+
+    def __init__(self):
+        self.calls = 0
+
+    def count(self, text):
+        self.calls += 1
+        return len(text.split())
+
+
+class TestHeuristicTokenizer:
+    def test_empty(self):
+        assert HeuristicTokenizer().count("") == 0
+
+    def test_latin_words(self):
+        assert HeuristicTokenizer().count("one two three four five six seven eight nine ten") == 13
+
+    def test_korean_characters(self):
+        # 5 Hangul syllables, no Latin words
+        assert HeuristicTokenizer().count("안녕하세요") == 5
+
+    def test_mixed_text(self):
+        tokens = HeuristicTokenizer().count("ChromaDB 벡터 검색")
+        assert tokens == int(1 * 1.3 + 4 * 1.0)
+
+
+class TestCachedTokenizer:
+    def test_caches_lines(self):
+        backend = CountingTokenizer()
+        tok = CachedTokenizer(backend)
+        assert tok.count("a b c") == 3
+        assert tok.count("a b c") == 3
+        assert backend.calls == 1
+        assert tok.get_stats()['hits'] == 1
+
+    def test_multiline_sums_lines(self):
+        backend = CountingTokenizer()
+        tok = CachedTokenizer(backend)
+        assert tok.count("a b\nc\n\nd e f") == 6
+        # Re-counting a text sharing lines only counts the new line
+        tok.count("a b\nnew line")
+        assert backend.calls == 4
+
+    def test_lru_eviction(self):
+        backend = CountingTokenizer()
+        tok = CachedTokenizer(backend, cache_size=2)
+        tok.count("a")
+        tok.count("b")
+        tok.count("c")  # evicts "a"
+        tok.count("a")
+        assert backend.calls == 4
+        assert tok.get_stats()['cached_lines'] == 2
+
+
+class TestTokenizerBase:
+    def test_is_abstract(self):
+        with pytest.raises(TypeError):
+            Tokenizer()
+
+
+class TestBuildTokenizer:
+    def test_heuristic_backend(self):
+        tok = build_tokenizer(backend="heuristic")
+        assert isinstance(tok, CachedTokenizer)
+        assert isinstance(tok.backend, HeuristicTokenizer)
+
+    def test_auto_falls_back_without_tiktoken(self, monkeypatch):
+        import builtins
+        real_import = builtins.__import__
+
+        def fake_import(name, *args, **kwargs):
+            if name == "tiktoken":
+                raise ImportError("no tiktoken")
+            return real_import(name, *args, **kwargs)
+
+        monkeypatch.setattr(builtins, "__import__", fake_import)
+        tok = build_tokenizer(backend="auto")
+        assert tok.name == "heuristic"
+
+    def test_auto_skips_uncached_encoding(self, fake_tiktoken):
+        tok = build_tokenizer(backend="auto")
+        assert tok.name == "heuristic"
+        assert fake_tiktoken == []
+
+    def test_auto_uses_cached_encoding(self, fake_tiktoken, temp_dir):
+        cache_encoding(temp_dir, "o200k_base")
+        tok = build_tokenizer(backend="auto")
+        assert tok.name == "tiktoken"
+        assert tok.count("a b c") == 3
+
+    def test_auto_resolves_model_encoding(self, fake_tiktoken, temp_dir):
+        cache_encoding(temp_dir, "cl100k_base")
+        tok = build_tokenizer(backend="auto", model="gpt-4")
+        assert tok.backend.encoding_name == "cl100k_base"
+
+    def test_explicit_tiktoken_may_download(self, fake_tiktoken):
+        tok = build_tokenizer(backend="tiktoken")
+        assert tok.name == "tiktoken"
+        assert fake_tiktoken == ["o200k_base"]
+
+    def test_offline_raises_when_uncached(self, fake_tiktoken):
+        with pytest.raises(LookupError):
+            TiktokenTokenizer(offline=True)
+
+    def test_cache_disabled(self, monkeypatch):
+        monkeypatch.setenv("TIKTOKEN_CACHE_DIR", "")
+        assert encoding_cached("o200k_base") is False
+
+    def test_unknown_backend(self):
+        assert build_tokenizer(backend="nope").name == "heuristic"
+
+    def test_create_from_config(self):
+        tok = create_tokenizer({'tokenizer': {'backend': 'heuristic', 'cache_size': 10}})
+        assert tok.cache_size == 10
+
+
+class TestDefaultTokenizer:
+    def test_set_and_reset(self):
+        original = get_tokenizer()
+        try:
+            backend = CountingTokenizer()
+            set_tokenizer(backend)
+            assert count_tokens("x y") == 2
+            assert backend.calls == 1
+        finally:
+            set_tokenizer(original)
@@ -6,6 +6,8 @@ import pytest
 from datetime import datetime, timedelta
 from pathlib import Path
 
+from lib.config import get_state_dir
+from lib.dropbox_cache import CachedFile, DropboxCache
 from lib.ttl_manager import TTLManager, ArchiveResult, create_ttl_manager
 
 
@@ -53,6 +55,22 @@ class TestTTLManager:
         assert result.hot_to_warm == 1
         assert not old_file.exists()  # Should be moved
 
+    def test_archived_file_is_indexed(self, temp_dir):
+        mem_dir = temp_dir / "mem"
+        mem_dir.mkdir(parents=True)
+
+        old_file = mem_dir / "old_note.md"
+        old_file.write_text("# Old Note\nkubernetes migration plan")
+        old_time = time.time() - (100 * 86400)
+        os.utime(old_file, (old_time, old_time))
+
+        mgr = TTLManager(str(mem_dir), str(temp_dir / "archive"), hot_ttl_days=90)
+        mgr.check_and_archive()
+
+        hits = mgr.warm_index.search("kubernetes")
+        assert len(hits) == 1
+        assert hits[0].path.name == "old_note.md"
+
     def test_recent_file_not_archived(self, temp_dir):
         mem_dir = temp_dir / "mem"
         mem_dir.mkdir(parents=True)
@@ -107,6 +125,18 @@ class TestTTLManager:
         assert result.exists()
         assert not test_file.exists()
 
+    def test_archive_to_cold_unindexes(self, temp_dir):
+        archive_dir = temp_dir / "archive"
+        archive_dir.mkdir(parents=True)
+        test_file = archive_dir / "to_cold.md"
+        test_file.write_text("glacier content")
+
+        mgr = TTLManager(str(temp_dir / "mem"), str(archive_dir))
+        mgr.warm_index.add_file(test_file)
+        mgr.archive_to_cold(test_file, temp_dir / "cold")
+
+        assert mgr.warm_index.search("glacier") == []
+
     def test_archive_to_cold_no_dir(self, temp_dir):
         mgr = TTLManager(str(temp_dir / "mem"))
         result = mgr.archive_to_cold(temp_dir / "nonexistent.md")
@@ -121,3 +151,34 @@ class TestCreateTTLManager:
         }
         mgr = create_ttl_manager(config)
         assert mgr.hot_ttl_days == 60
+
+    def test_state_and_cache_dirs_not_archived(self, temp_dir):
+        mem_dir = temp_dir / "mem"
+        config = {'memory': {'dir': str(mem_dir), 'cache_dir': str(mem_dir / ".cache")}}
+        old_time = time.time() - (100 * 86400)
+
+        cache = DropboxCache(str(mem_dir / ".cache" / "dropbox_cache"))
+        cached = cache.path_for("/notes/a.md")
+        cached.parent.mkdir(parents=True)
+        cached.write_text("cached copy")
+        os.utime(cached, (old_time, old_time))
+        cache.admit([CachedFile("/notes/a.md", "/Notes/a.md", "r1", 11)])
+
+        state_note = get_state_dir(config) / "note.md"
+        state_note.parent.mkdir(parents=True)
+        state_note.write_text("state")
+        os.utime(state_note, (old_time, old_time))
+
+        hot_note = mem_dir / "old.md"
+        hot_note.write_text("old hot note")
+        os.utime(hot_note, (old_time, old_time))
+
+        mgr = create_ttl_manager(config)
+        result = mgr.check_and_archive()
+
+        assert result.hot_to_warm == 1
+        assert result.files_checked == 1
+        assert not hot_note.exists()
+        assert cached.exists() and state_note.exists()
+        assert cache.missing([CachedFile("/notes/a.md", "/Notes/a.md", "r1", 11)]) == []
+        assert mgr.get_stats()['hot']['files'] == 0
@@ -1,10 +1,12 @@
 """Tests for lib/unified_search.py"""
 
+import threading
+
 import pytest
 from pathlib import Path
 from datetime import datetime
 
-from lib.unified_search import UnifiedSearch, SearchResult, create_unified_search
+from lib.unified_search import UnifiedSearch, SearchResult, SearchResults, create_unified_search
 from lib.obsidian_client import ObsidianClient
 
 
@@ -64,6 +66,44 @@ class TestUnifiedSearchWarm:
         results = search.search_warm("test")
         assert results == []
 
+    def test_search_warm_ranked_by_bm25(self, temp_dir):
+        archive = temp_dir / "archive"
+        archive.mkdir()
+        (archive / "weak.md").write_text("deploy notes and other topics", encoding="utf-8")
+        (archive / "strong.md").write_text("deploy deploy deploy checklist", encoding="utf-8")
+
+        search = UnifiedSearch(archive_dir=str(archive))
+        results = search.search_warm("deploy")
+        assert [r.title for r in results] == ["strong", "weak"]
+        assert all(0 < r.score < 1 for r in results)
+
+    def test_search_warm_sees_files_indexed_later(self, temp_dir):
+        from lib.ttl_manager import TTLManager
+
+        archive = temp_dir / "archive"
+        archive.mkdir()
+        search = UnifiedSearch(archive_dir=str(archive))
+        assert search.search_warm("zeppelin") == []
+
+        new_file = archive / "late.md"
+        new_file.write_text("zeppelin launch", encoding="utf-8")
+        TTLManager(str(temp_dir / "mem"), str(archive)).warm_index.add_file(new_file)
+
+        results = search.search_warm("zeppelin")
+        assert len(results) == 1
+
+    def test_search_warm_drops_deleted_files(self, temp_dir):
+        archive = temp_dir / "archive"
+        archive.mkdir()
+        doc = archive / "gone.md"
+        doc.write_text("ephemeral", encoding="utf-8")
+
+        search = UnifiedSearch(archive_dir=str(archive))
+        assert len(search.search_warm("ephemeral")) == 1
+
+        doc.unlink()
+        assert search.search_warm("ephemeral") == []
+
     def test_search_warm_word_match(self, temp_dir):
         archive = temp_dir / "archive"
         archive.mkdir()
@@ -91,6 +131,26 @@ class TestUnifiedSearchCold:
         results = search.search_cold("test")
         assert results == []
 
+    def test_search_cold_dropbox_content(self):
+        class FakeDropbox:
+            is_configured = True
+            generation = 0
+
+            def search(self, query, max_results=10):
+                return [
+                    {'path': '/OC/a.md', 'name': 'a.md', 'modified': '',
+                     'snippet': '...cold text...', 'score': 3.0, 'local_path': '/c/a.md'},
+                    {'path': '/OC/b.pdf', 'name': 'b.pdf', 'modified': ''},
+                ]
+
+        results = UnifiedSearch(dropbox_sync=FakeDropbox()).search_cold("cold")
+
+        by_name = {r.title: r for r in results}
+        assert by_name['a.md'].content == '...cold text...'
+        assert by_name['a.md'].metadata['local_path'] == '/c/a.md'
+        assert by_name['b.pdf'].content == ''
+        assert by_name['a.md'].score > by_name['b.pdf'].score
+
 
 class TestUnifiedSearchMultiTier:
     def test_search_all_tiers(self, temp_dir):
@@ -186,3 +246,324 @@ class TestCreateUnifiedSearch:
         content = "The quick brown fox jumps over the lazy dog"
         snippet = UnifiedSearch._extract_snippet(content, "fox", context_chars=10)
         assert "fox" in snippet
+
+    def test_extract_snippet_uses_offset(self):
+        content = "a" * 500 + " needle " + "b" * 500
+        snippet = UnifiedSearch._extract_snippet(
+            content, "missing phrase", context_chars=10, offset=501,
+        )
+        assert "needle" in snippet
+
+
+class FakeMemoryStore:
+    """Hot tier stand-in counting searches"""
+
+    def __init__(self):
+        self.generation = 0
+        self.calls = 0
+
+    def search(self, query, n_results=5, where=None):
+        self.calls += 1
+        return [{'id': 'obs_1', 'content': query, 'metadata': {}, 'distance': 0.2}]
+
+
+class TestUnifiedSearchCache:
+    def test_repeated_query_is_cached(self):
+        store = FakeMemoryStore()
+        search = UnifiedSearch(memory_store=store)
+        first = search.search("Deploy  Plan", tiers=['hot'])
+        second = search.search("deploy plan", tiers=['hot'])
+        assert store.calls == 1
+        assert [r.title for r in second] == [r.title for r in first]
+        assert search.get_stats()['cache']['hits'] == 1
+
+    def test_key_includes_options(self):
+        store = FakeMemoryStore()
+        search = UnifiedSearch(memory_store=store)
+        search.search("q", tiers=['hot'], n_results=5)
+        search.search("q", tiers=['hot'], n_results=3)
+        search.search("q", tiers=['hot'], n_results=3, priority='high')
+        assert store.calls == 3
+
+    def test_hot_write_invalidates(self):
+        store = FakeMemoryStore()
+        search = UnifiedSearch(memory_store=store)
+        search.search("q", tiers=['hot'])
+        store.generation += 1
+        search.search("q", tiers=['hot'])
+        assert store.calls == 2
+
+    def test_warm_archive_invalidates(self, temp_dir):
+        from lib.ttl_manager import TTLManager
+
+        archive = temp_dir / "archive"
+        archive.mkdir()
+        (archive / "old.md").write_text("zeppelin notes", encoding="utf-8")
+        search = UnifiedSearch(archive_dir=str(archive))
+        assert len(search.search("zeppelin", tiers=['warm'])) == 1
+
+        new_file = archive / "late.md"
+        new_file.write_text("zeppelin launch", encoding="utf-8")
+        TTLManager(str(temp_dir / "mem"), str(archive)).warm_index.add_file(new_file)
+
+        assert len(search.search("zeppelin", tiers=['warm'])) == 2
+
+    def test_cold_note_invalidates(self, temp_dir):
+        client = ObsidianClient(vault_path=str(temp_dir / "vault"))
+        search = UnifiedSearch(obsidian_client=client)
+        assert search.search("glacier", tiers=['cold']) == []
+
+        client.create_note(title="Ice", content="glacier survey")
+        assert len(search.search("glacier", tiers=['cold'])) == 1
+
+    def test_invalidate_only_touches_tier(self):
+        store = FakeMemoryStore()
+        search = UnifiedSearch(memory_store=store)
+        search.search("q", tiers=['hot'])
+        assert search.invalidate('warm') == 0
+        assert search.invalidate('hot') == 1
+        search.search("q", tiers=['hot'])
+        assert store.calls == 2
+
+    def test_cache_disabled(self):
+        store = FakeMemoryStore()
+        search = UnifiedSearch(memory_store=store, cache_size=0)
+        search.search("q", tiers=['hot'])
+        search.search("q", tiers=['hot'])
+        assert store.calls == 2
+        assert 'cache' not in search.get_stats()
+
+    def test_cache_config(self):
+        search = create_unified_search({'search': {'cache_size': 7, 'cache_ttl': 5}})
+        assert search.cache.max_entries == 7
+        assert search.cache.ttl == 5
+
+
+class SlowMemoryStore(FakeMemoryStore):
+    """Memory store whose searches hold until ``wait()`` returns"""
+
+    def __init__(self, wait):
+        super().__init__()
+        self.wait = wait
+
+    def search(self, query, n_results=5, where=None):
+        self.wait()
+        return super().search(query, n_results, where)
+
+
+class SlowObsidian:
+    """Vault whose searches hold until ``wait()`` returns"""
+
+    generation = 0
+
+    def __init__(self, wait):
+        self.wait = wait
+
+    def search_notes(self, query, max_results=5):
+        self.wait()
+        return [{'title': 'vault note', 'snippet': query, 'path': 'n.md', 'folder': ''}]
+
+
+class TestUnifiedSearchFanOut:
+    def test_tiers_run_concurrently(self):
+        # Each tier waits for the other, which serial searches never reach
+        both = threading.Barrier(2, timeout=5)
+        search = UnifiedSearch(
+            memory_store=SlowMemoryStore(both.wait), obsidian_client=SlowObsidian(both.wait),
+            deadline=10.0,
+        )
+        results = search.search("q", tiers=['hot', 'cold'])
+
+        assert {r.tier for r in results} == {'hot', 'cold'}
+        assert not results.partial
+
+    def test_slow_tier_dropped_at_its_timeout(self):
+        release = threading.Event()
+        search = UnifiedSearch(
+            memory_store=FakeMemoryStore(), obsidian_client=SlowObsidian(release.wait),
+            tier_timeouts={'cold': 0.1},
+        )
+        try:
+            results = search.search("q", tiers=['hot', 'cold'])
+        finally:
+            release.set()
+
+        assert isinstance(results, SearchResults)
+        assert [r.tier for r in results] == ['hot']
+        assert results.timed_out == ['cold:obsidian']
+        assert search.get_stats()['timeouts'] == {'cold:obsidian': 1}
+
+    def test_overall_deadline_caps_tier_timeouts(self):
+        release = threading.Event()
+        search = UnifiedSearch(
+            memory_store=SlowMemoryStore(release.wait), deadline=0.1, tier_timeouts={'hot': 5.0},
+        )
+        try:
+            results = search.search("q", tiers=['hot'])
+        finally:
+            release.set()
+        assert results == []
+        assert results.timed_out == ['hot']
+
+    def test_partial_results_not_cached(self):
+        release = threading.Event()
+        store = FakeMemoryStore()
+        search = UnifiedSearch(
+            memory_store=store, obsidian_client=SlowObsidian(release.wait),
+            tier_timeouts={'cold': 0.05},
+        )
+        try:
+            assert search.search("q", tiers=['hot', 'cold']).partial
+            search.search("q", tiers=['hot', 'cold'])
+        finally:
+            release.set()
+        assert store.calls == 2
+
+    def test_failing_tier_does_not_block_others(self):
+        class Broken:
+            generation = 0
+
+            def search_notes(self, query, max_results=5):
+                raise RuntimeError("vault offline")
+
+        search = UnifiedSearch(memory_store=FakeMemoryStore(), obsidian_client=Broken())
+        results = search.search("q", tiers=['hot', 'cold'])
+        assert [r.tier for r in results] == ['hot']
+        assert not results.partial
+
+    def test_hung_source_does_not_exhaust_workers(self):
+        release = threading.Event()
+
+        class Hung:
+            generation = 0
+            calls = 0
+
+            def search_notes(self, query, max_results=5):
+                Hung.calls += 1
+                release.wait(5)
+                return []
+
+        search = UnifiedSearch(
+            memory_store=FakeMemoryStore(), obsidian_client=Hung(),
+            tier_timeouts={'cold': 0.05}, max_workers=2, cache_size=0,
+        )
+        try:
+            for _ in range(5):
+                results = search.search("q", tiers=['hot', 'cold'])
+                assert [r.tier for r in results] == ['hot']
+                assert results.timed_out == ['cold:obsidian']
+            assert Hung.calls == 1
+        finally:
+            release.set()
+            search.close()
+
+    def test_deadline_config(self):
+        search = create_unified_search({'search': {
+            'deadline': 3.0, 'tier_timeouts': {'cold': 1.0},
+        }})
+        assert search.deadline == 3.0
+        assert search.tier_timeouts == {'cold': 1.0}
+        search.close()
+
+
+class TestUnifiedSearchFusion:
+    def make_search(self, temp_dir, **kwargs):
+        archive = temp_dir / "archive"
+        archive.mkdir()
+        (archive / "w.md").write_text("alpha beta", encoding="utf-8")
+        client = ObsidianClient(vault_path=str(temp_dir / "vault"))
+        client.create_note(title="C", content="alpha notes")
+        return UnifiedSearch(
+            memory_store=FakeMemoryStore(), archive_dir=str(archive),
+            obsidian_client=client, **kwargs,
+        )
+
+    def test_rrf_puts_tier_leaders_level(self, temp_dir):
+        search = self.make_search(temp_dir, cache_size=0)
+        results = search.search("alpha")
+        assert {r.tier for r in results} == {'hot', 'warm', 'cold'}
+        assert len({round(r.score, 9) for r in results}) == 1
+        assert all('tier_score' in r.metadata for r in results)
+
+    def test_tier_weights_order_tiers(self, temp_dir):
+        search = self.make_search(
+            temp_dir, cache_size=0, tier_weights={'cold': 3.0, 'warm': 2.0},
+        )
+        assert [r.tier for r in search.search("alpha")] == ['cold', 'warm', 'hot']
+
+    def test_source_weight_overrides_tier(self, temp_dir):
+        search = self.make_search(
+            temp_dir, cache_size=0, tier_weights={'cold': 0.1, 'cold:obsidian': 5.0},
+        )
+        assert search.search("alpha")[0].tier == 'cold'
+
+    def test_raw_score_mode(self, temp_dir):
+        search = self.make_search(temp_dir, cache_size=0, fusion="score")
+        results = search.search("alpha")
+        assert results[0].tier == 'hot'
+        assert results[0].score == pytest.approx(0.9)
+
+    def test_candidates_per_tier(self, temp_dir):
+        store = FakeMemoryStore()
+        seen = []
+        original = store.search
+
+        def record(query, n_results=5, where=None):
+            seen.append(n_results)
+            return original(query, n_results, where)
+
+        store.search = record
+        search = UnifiedSearch(memory_store=store, candidates_per_tier=3)
+        search.search("q", tiers=['hot'], n_results=10)
+        assert seen == [3]
+
+    @staticmethod
+    def dropbox_with(*paths):
+        """Dropbox stand-in syncing the vault to /Vault, finding ``paths``"""
+        class VaultCopy:
+            is_configured = True
+            generation = 0
+            remote_folder = "/Vault"
+
+            def search(self, query, max_results=10):
+                return [{'path': path, 'name': path.rsplit('/', 1)[-1], 'modified': '',
+                         'snippet': 'alpha notes', 'score': 2.0} for path in paths]
+
+        return VaultCopy()
+
+    def test_same_note_from_two_sources_fused_once(self, temp_dir):
+        search = self.make_search(temp_dir, cache_size=0)
+        vault = search.obsidian_client.vault_path
+        relative = next(vault.rglob("C.md")).relative_to(vault).as_posix()
+        search.dropbox_sync = self.dropbox_with(f"/VAULT/{relative}")
+        results = search.search("alpha", tiers=['cold', 'hot'])
+
+        assert [r.tier for r in results] == ['cold', 'hot']
+        assert results[0].score > results[1].score
+
+    def test_different_notes_sharing_a_name_kept_apart(self, temp_dir):
+        search = self.make_search(temp_dir, cache_size=0)
+        (search.archive_dir / "C.md").write_text("alpha archived", encoding="utf-8")
+        search.dropbox_sync = self.dropbox_with("/Vault/Elsewhere/C.md", "/Other/C.md")
+
+        results = search.search("alpha", tiers=['warm', 'cold'], n_results=10)
+
+        sources = sorted(r.source for r in results if r.metadata['path'].endswith('C.md'))
+        assert sources == sorted([
+            'dropbox', 'dropbox', 'obsidian', str(search.archive_dir / "C.md"),
+        ])
+
+    def test_fuse_does_not_rewrite_inputs(self):
+        search = UnifiedSearch()
+        original = SearchResult(title="t", content="c", tier="hot", score=0.7)
+
+        fused = search._fuse({'hot': [original]})
+
+        assert fused[0] is not original
+        assert original.score == 0.7
+        assert original.metadata == {}
+        assert fused[0].metadata['tier_score'] == 0.7
+
+    def test_unknown_fusion(self):
+        with pytest.raises(ValueError):
+            UnifiedSearch(fusion="borda")